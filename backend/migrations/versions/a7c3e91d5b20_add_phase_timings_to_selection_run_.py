@@ -0,0 +1,46 @@
+"""add phase timings and run shape to selection_run_records
+
+Revision ID: a7c3e91d5b20
+Revises: 4b420dba5d65
+Create Date: 2026-10-18 10:12:40.512316
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "a7c3e91d5b20"  # pragma: allowlist secret
+down_revision: str | Sequence[str] | None = "4b420dba5d65"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "selection_run_records",
+        sa.Column(
+            "phase_timings",
+            postgresql.JSON(astext_type=sa.Text()),
+            nullable=False,
+            server_default="{}",
+        ),
+    )
+    op.add_column("selection_run_records", sa.Column("pool_size", sa.Integer(), nullable=True))
+    op.add_column("selection_run_records", sa.Column("category_count", sa.Integer(), nullable=True))
+    op.add_column(
+        "selection_run_records",
+        sa.Column("selection_algorithm", sa.String(length=50), nullable=False, server_default=""),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("selection_run_records", "selection_algorithm")
+    op.drop_column("selection_run_records", "category_count")
+    op.drop_column("selection_run_records", "pool_size")
+    op.drop_column("selection_run_records", "phase_timings")
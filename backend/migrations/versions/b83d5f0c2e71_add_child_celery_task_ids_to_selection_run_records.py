@@ -0,0 +1,39 @@
+"""add child celery task ids to selection_run_records
+
+Revision ID: b83d5f0c2e71
+Revises: f2a6c8d41b93
+Create Date: 2026-10-19 15:40:12.207831
+
+The Celery ids of the tasks a run fans out to - the samples and callback of a
+stability analysis chord - so cancelling the run can revoke them too.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b83d5f0c2e71"  # pragma: allowlist secret
+down_revision: str | Sequence[str] | None = "f2a6c8d41b93"  # pragma: allowlist secret
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "selection_run_records",
+        sa.Column(
+            "child_celery_task_ids",
+            postgresql.JSON(astext_type=sa.Text()),
+            nullable=False,
+            server_default="[]",
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("selection_run_records", "child_celery_task_ids")
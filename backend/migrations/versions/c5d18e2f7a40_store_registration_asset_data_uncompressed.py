@@ -0,0 +1,34 @@
+"""store registration asset bytes uncompressed out of line
+
+Revision ID: c5d18e2f7a40
+Revises: a7c3e91d5b20
+Create Date: 2026-10-18 14:05:12.204518
+
+PNGs and PDFs are already compressed, so TOAST compression gains nothing and
+stops Postgres reading a slice of the value without decompressing all of it.
+With EXTERNAL storage, substr() on the data column reads only the chunks it
+needs, which is how the public asset routes stream the bytes. Only affects
+rows written after the upgrade.
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d18e2f7a40"  # pragma: allowlist secret
+down_revision: str | Sequence[str] | None = "a7c3e91d5b20"  # pragma: allowlist secret
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE registration_images ALTER COLUMN data SET STORAGE EXTERNAL")
+    op.execute("ALTER TABLE registration_documents ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE registration_documents ALTER COLUMN data SET STORAGE EXTENDED")
+    op.execute("ALTER TABLE registration_images ALTER COLUMN data SET STORAGE EXTENDED")
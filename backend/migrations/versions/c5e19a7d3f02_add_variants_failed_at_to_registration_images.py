@@ -0,0 +1,35 @@
+"""add variants_failed_at to registration_images
+
+Revision ID: c5e19a7d3f02
+Revises: b83d5f0c2e71
+Create Date: 2026-10-19 16:22:48.513207
+
+Set when rendering an image's variants failed, so the periodic backfill skips
+the image rather than retrying it on every run.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+import opendlp.adapters.orm
+
+# revision identifiers, used by Alembic.
+revision: str = "c5e19a7d3f02"  # pragma: allowlist secret
+down_revision: str | Sequence[str] | None = "b83d5f0c2e71"  # pragma: allowlist secret
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "registration_images",
+        sa.Column("variants_failed_at", opendlp.adapters.orm.TZAwareDatetime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("registration_images", "variants_failed_at")
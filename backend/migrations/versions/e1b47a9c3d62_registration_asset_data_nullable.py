@@ -0,0 +1,33 @@
+"""let registration asset bytes live in the blob store
+
+Revision ID: e1b47a9c3d62
+Revises: c5d18e2f7a40
+Create Date: 2026-10-18 16:41:37.582190
+
+With BLOB_STORE=filesystem a row's bytes are written to the blob store under
+its sha256 and its data column is left NULL. Downgrading needs every row's
+bytes back in the table first: run `opendlp blobs restore`.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e1b47a9c3d62"  # pragma: allowlist secret
+down_revision: str | Sequence[str] | None = "c5d18e2f7a40"  # pragma: allowlist secret
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column("registration_images", "data", existing_type=sa.LargeBinary(), nullable=True)
+    op.alter_column("registration_documents", "data", existing_type=sa.LargeBinary(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column("registration_documents", "data", existing_type=sa.LargeBinary(), nullable=False)
+    op.alter_column("registration_images", "data", existing_type=sa.LargeBinary(), nullable=False)
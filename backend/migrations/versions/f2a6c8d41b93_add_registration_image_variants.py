@@ -0,0 +1,58 @@
+"""add registration image variants
+
+Revision ID: f2a6c8d41b93
+Revises: e1b47a9c3d62
+Create Date: 2026-10-19 09:12:44.318506
+
+Resized WebP and PNG copies of each registration image, rendered by a Celery
+task after upload. Like the images themselves, the bytes are stored without
+TOAST compression since they are already compressed.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from opendlp.adapters import orm
+
+# revision identifiers, used by Alembic.
+revision: str = "f2a6c8d41b93"  # pragma: allowlist secret
+down_revision: str | Sequence[str] | None = "e1b47a9c3d62"  # pragma: allowlist secret
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "registration_image_variants",
+        sa.Column("id", sa.UUID(), nullable=False),
+        sa.Column("image_id", sa.UUID(), nullable=False),
+        sa.Column("image_format", sa.String(length=8), nullable=False),
+        sa.Column("width", sa.Integer(), nullable=False),
+        sa.Column("height", sa.Integer(), nullable=False),
+        sa.Column("byte_size", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("data", sa.LargeBinary(), nullable=True),
+        sa.Column("created_at", orm.TZAwareDatetime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["image_id"], ["registration_images.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_registration_image_variants_image_id"), "registration_image_variants", ["image_id"], unique=False
+    )
+    op.create_index(
+        "ix_registration_image_variants_image_format_width",
+        "registration_image_variants",
+        ["image_id", "image_format", "width"],
+        unique=True,
+    )
+    op.execute("ALTER TABLE registration_image_variants ALTER COLUMN data SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_registration_image_variants_image_format_width", table_name="registration_image_variants")
+    op.drop_index(op.f("ix_registration_image_variants_image_id"), table_name="registration_image_variants")
+    op.drop_table("registration_image_variants")
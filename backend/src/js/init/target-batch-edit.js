@@ -0,0 +1,69 @@
+// ABOUTME: HTMX extension posting the targets page's edited min/max counts as one JSON batch
+// ABOUTME: Sends only the values whose counts changed, in the shape the batch edit route expects
+
+/**
+ * The value changes to send: one per value whose min or max differs from what is stored.
+ *
+ * Each count input carries its value's identity in data attributes, and its
+ * stored count in `data-original` - not the input's default value, which after
+ * a rejected batch is the organiser's unsaved edit.
+ *
+ * @param {HTMLFormElement} form - the batch form the count inputs belong to
+ * @returns {Array<Object>} the changes, each with both counts
+ */
+export function collectValueChanges(form) {
+  var rows = new Map();
+  Array.prototype.forEach.call(form.elements, function (field) {
+    var data = field.dataset || {};
+    if (!data.batchField || !data.valueId) {
+      return;
+    }
+    var row = rows.get(data.valueId);
+    if (!row) {
+      row = {
+        changed: false,
+        change: {
+          category_id: data.categoryId,
+          value_id: data.valueId,
+          value: data.value,
+        },
+      };
+      rows.set(data.valueId, row);
+    }
+    row.change[data.batchField] = Number(field.value);
+    if (field.value !== data.original) {
+      row.changed = true;
+    }
+  });
+  return Array.from(rows.values())
+    .filter(function (row) {
+      return row.changed;
+    })
+    .map(function (row) {
+      return row.change;
+    });
+}
+
+/**
+ * Register the `target-batch-edit` extension, for a form with hx-ext="target-batch-edit".
+ *
+ * Waits for the page to load, as some pages load HTMX after this script, and
+ * does nothing on pages without HTMX.
+ */
+export function initTargetBatchEdit() {
+  document.addEventListener("DOMContentLoaded", function () {
+    if (typeof htmx === "undefined") {
+      return;
+    }
+    htmx.defineExtension("target-batch-edit", {
+      onEvent: function (name, evt) {
+        if (name === "htmx:configRequest") {
+          evt.detail.headers["Content-Type"] = "application/json";
+        }
+      },
+      encodeParameters: function (xhr, parameters, elt) {
+        return JSON.stringify({ changes: collectValueChanges(elt) });
+      },
+    });
+  });
+}
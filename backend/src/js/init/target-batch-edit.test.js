@@ -0,0 +1,76 @@
+// ABOUTME: Tests for collecting the targets page's edited counts into a batch of value changes
+// ABOUTME: Covers unchanged values being left out and edits kept after a rejected batch
+
+import { afterEach, describe, expect, it } from "vitest";
+
+import { collectValueChanges } from "./target-batch-edit.js";
+
+afterEach(() => {
+  document.body.innerHTML = "";
+});
+
+function countInput(valueId, field, original, current) {
+  return (
+    '<input form="batch" name="' +
+    field +
+    '" value="' +
+    current +
+    '" data-batch-field="' +
+    field +
+    '" data-category-id="cat-1" data-value-id="' +
+    valueId +
+    '" data-value="Value ' +
+    valueId +
+    '" data-original="' +
+    original +
+    '" />'
+  );
+}
+
+function render(inputs) {
+  document.body.innerHTML =
+    '<form id="batch"><input name="csrf_token" value="x" /></form>' +
+    "<table><tr><td>" +
+    inputs.join("</td><td>") +
+    "</td></tr></table>";
+  return document.getElementById("batch");
+}
+
+describe("collectValueChanges", () => {
+  it("sends nothing when no count was edited", () => {
+    const form = render([
+      countInput("a", "min_count", "1", "1"),
+      countInput("a", "max_count", "3", "3"),
+    ]);
+
+    expect(collectValueChanges(form)).toEqual([]);
+  });
+
+  it("sends both counts of each edited value, as numbers", () => {
+    const form = render([
+      countInput("a", "min_count", "1", "1"),
+      countInput("a", "max_count", "3", "5"),
+      countInput("b", "min_count", "0", "0"),
+      countInput("b", "max_count", "2", "2"),
+    ]);
+
+    expect(collectValueChanges(form)).toEqual([
+      {
+        category_id: "cat-1",
+        value_id: "a",
+        value: "Value a",
+        min_count: 1,
+        max_count: 5,
+      },
+    ]);
+  });
+
+  it("compares with the stored count, not the rendered one, after a rejected batch", () => {
+    const form = render([
+      countInput("a", "min_count", "1", "4"),
+      countInput("a", "max_count", "3", "3"),
+    ]);
+
+    expect(collectValueChanges(form)).toHaveLength(1);
+  });
+});
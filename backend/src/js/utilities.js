@@ -1,10 +1,12 @@
 // ABOUTME: Entry point for the site-wide utility behaviours loaded on every page
-// ABOUTME: Wires up navigation, confirm/print/copy/download actions and progress modals
+// ABOUTME: Wires up navigation, confirm/print/copy/download actions, progress modals and batch target edits
 
 import { initNavigation } from "./init/navigation.js";
 import { initDocumentActions } from "./init/document-actions.js";
 import { initProgressModals } from "./init/progress-modals.js";
+import { initTargetBatchEdit } from "./init/target-batch-edit.js";
 
 initNavigation();
 initDocumentActions();
 initProgressModals();
+initTargetBatchEdit();
@@ -0,0 +1,254 @@
+"""ABOUTME: Content-addressed store for the bytes of registration images and documents, outside Postgres
+ABOUTME: Files live once under their sha256; also moves existing rows' bytes in and out of the store"""
+
+from __future__ import annotations
+
+import abc
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import structlog
+from sqlalchemy import select, update
+
+from opendlp import config
+from opendlp.adapters import orm
+from opendlp.domain.uploads import UPLOAD_CHUNK_BYTES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from sqlalchemy import Table
+    from sqlalchemy.orm import Session, sessionmaker
+
+logger = structlog.get_logger(__name__)
+
+IMAGES = "images"
+DOCUMENTS = "documents"
+IMAGE_VARIANTS = "image-variants"
+
+# Which table's rows point at each kind of blob.
+BLOB_TABLES: dict[str, Table] = {
+    IMAGES: orm.registration_images,
+    DOCUMENTS: orm.registration_documents,
+    IMAGE_VARIANTS: orm.registration_image_variants,
+}
+
+_SHA256 = re.compile(r"[0-9a-f]{64}")
+
+# A blob written this recently may belong to an upload whose row is not committed yet.
+PRUNE_MIN_AGE_SECONDS = 3600
+
+
+class BlobStoreError(Exception):
+    """Raised when a blob that a row points at cannot be read."""
+
+
+class BlobStore(abc.ABC):
+    """Holds each file once, keyed by its kind ("images", "documents" or "image-variants") and sha256."""
+
+    @abc.abstractmethod
+    def put(self, kind: str, sha256: str, data: bytes) -> None:
+        """Store ``data`` under its hash. Storing the same content twice is a no-op."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def exists(self, kind: str, sha256: str) -> bool:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_chunks(
+        self, kind: str, sha256: str, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0
+    ) -> Iterator[bytes]:
+        """Yield the stored bytes from ``offset`` on, in pieces of at most ``chunk_size``; BlobStoreError if missing."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def delete(self, kind: str, sha256: str) -> None:
+        """Remove a blob if present."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list_hashes(self, kind: str, older_than_seconds: float = 0) -> list[str]:
+        """The hashes stored for ``kind``, leaving out blobs written in the last ``older_than_seconds``."""
+        raise NotImplementedError
+
+    def sendfile_headers(self, kind: str, sha256: str) -> dict[str, str]:
+        """Headers asking a fronting web server to send the blob itself; empty to send it from Python."""
+        return {}
+
+
+class FilesystemBlobStore(BlobStore):
+    """Blobs as files at ``<root>/<kind>/<sha[:2]>/<sha>``, written atomically."""
+
+    def __init__(self, root: Path, sendfile_mode: str = "", accel_redirect_prefix: str = "/_blobs/") -> None:
+        self.root = root
+        self.sendfile_mode = sendfile_mode
+        self.accel_redirect_prefix = accel_redirect_prefix
+
+    def relative_path(self, kind: str, sha256: str) -> str:
+        if kind not in BLOB_TABLES or not _SHA256.fullmatch(sha256):
+            raise ValueError(f"Not a blob key: {kind}/{sha256}")
+        return f"{kind}/{sha256[:2]}/{sha256}"
+
+    def path(self, kind: str, sha256: str) -> Path:
+        return self.root / self.relative_path(kind, sha256)
+
+    def put(self, kind: str, sha256: str, data: bytes) -> None:
+        path = self.path(kind, sha256)
+        if path.exists():
+            # The row about to point at this blob may not be committed yet, so it must
+            # look freshly written to prune_blob_store, however old the file is.
+            try:
+                os.utime(path)
+                return
+            except FileNotFoundError:
+                pass  # pruned since the check; write it again
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        tmp_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            # mkstemp makes the file private; a fronting web server needs to read it.
+            tmp_path.chmod(0o644)
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def exists(self, kind: str, sha256: str) -> bool:
+        return self.path(kind, sha256).is_file()
+
+    def iter_chunks(
+        self, kind: str, sha256: str, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0
+    ) -> Iterator[bytes]:
+        try:
+            blob = self.path(kind, sha256).open("rb")
+        except FileNotFoundError as error:
+            raise BlobStoreError(f"Blob {kind}/{sha256} is missing from {self.root}") from error
+        with blob:
+            blob.seek(offset)
+            while chunk := blob.read(chunk_size):
+                yield chunk
+
+    def delete(self, kind: str, sha256: str) -> None:
+        self.path(kind, sha256).unlink(missing_ok=True)
+
+    def list_hashes(self, kind: str, older_than_seconds: float = 0) -> list[str]:
+        kind_dir = self.root / kind
+        if not kind_dir.is_dir():
+            return []
+        cutoff = time.time() - older_than_seconds
+        return sorted(
+            path.name
+            for path in kind_dir.glob("*/*")
+            if _SHA256.fullmatch(path.name) and path.stat().st_mtime <= cutoff
+        )
+
+    def sendfile_headers(self, kind: str, sha256: str) -> dict[str, str]:
+        if self.sendfile_mode == "x-accel-redirect":
+            return {"X-Accel-Redirect": self.accel_redirect_prefix + self.relative_path(kind, sha256)}
+        if self.sendfile_mode == "x-sendfile":
+            return {"X-Sendfile": str(self.path(kind, sha256).absolute())}
+        return {}
+
+
+def get_filesystem_blob_store() -> FilesystemBlobStore:
+    """The filesystem store at ``BLOB_STORE_PATH``, whichever store new uploads go to."""
+    root = config.get_blob_store_path()
+    if root is None:
+        raise ValueError("BLOB_STORE_PATH must be set to use the filesystem blob store")
+    return FilesystemBlobStore(
+        root,
+        sendfile_mode=config.get_blob_sendfile_mode(),
+        accel_redirect_prefix=config.get_blob_accel_redirect_prefix(),
+    )
+
+
+def get_blob_store() -> BlobStore | None:
+    """The configured blob store, or None when bytes stay in Postgres (the default)."""
+    if config.get_blob_store() == "filesystem":
+        return get_filesystem_blob_store()
+    return None
+
+
+def _ids_with_data_in_row(session: Session, table: Table, batch_size: int) -> list:
+    return list(session.execute(select(table.c.id).where(table.c.data.is_not(None)).limit(batch_size)).scalars())
+
+
+def move_data_to_blob_store(session_factory: sessionmaker, store: BlobStore, batch_size: int = 50) -> dict[str, int]:
+    """Write every row's bytes to ``store`` and clear its ``data`` column, committing each batch.
+
+    Rows are read one at a time so only one file is in memory. Returns rows moved by kind.
+    """
+    moved: dict[str, int] = {}
+    for kind, table in BLOB_TABLES.items():
+        moved[kind] = 0
+        while True:
+            with session_factory() as session:
+                ids = _ids_with_data_in_row(session, table, batch_size)
+                if not ids:
+                    break
+                for item_id in ids:
+                    row = session.execute(select(table.c.sha256, table.c.data).where(table.c.id == item_id)).one()
+                    store.put(kind, row.sha256, bytes(row.data))
+                    session.execute(update(table).where(table.c.id == item_id).values(data=None))
+                session.commit()
+            moved[kind] += len(ids)
+            logger.info("Moved upload bytes to blob store", kind=kind, rows=moved[kind])
+    return moved
+
+
+def restore_data_from_blob_store(
+    session_factory: sessionmaker, store: BlobStore, batch_size: int = 50
+) -> dict[str, int]:
+    """Copy blobs back into the ``data`` column of every row that points at the store.
+
+    Returns rows restored by kind.
+    """
+    restored: dict[str, int] = {}
+    for kind, table in BLOB_TABLES.items():
+        restored[kind] = 0
+        while True:
+            with session_factory() as session:
+                rows = session.execute(
+                    select(table.c.id, table.c.sha256).where(table.c.data.is_(None)).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                for row in rows:
+                    data = b"".join(store.iter_chunks(kind, row.sha256))
+                    session.execute(update(table).where(table.c.id == row.id).values(data=data))
+                session.commit()
+            restored[kind] += len(rows)
+            logger.info("Restored upload bytes from blob store", kind=kind, rows=restored[kind])
+    return restored
+
+
+def prune_blob_store(
+    session_factory: sessionmaker, store: BlobStore, min_age_seconds: float = PRUNE_MIN_AGE_SECONDS
+) -> dict[str, int]:
+    """Delete blobs no row points at any more, e.g. after an image or assembly was deleted.
+
+    Blobs are shared by every assembly that uploaded the same file, so one is only
+    removed once no row of its kind has that hash. Recently written blobs are kept,
+    since their row may not be committed yet; storing an existing blob again counts
+    as writing it. The blobs are listed before the rows are read, so a row committed
+    in between still protects its blob. Returns blobs deleted by kind.
+    """
+    pruned: dict[str, int] = {}
+    for kind, table in BLOB_TABLES.items():
+        candidates = store.list_hashes(kind, older_than_seconds=min_age_seconds)
+        with session_factory() as session:
+            referenced = set(session.execute(select(table.c.sha256).where(table.c.data.is_(None))).scalars())
+        orphans = [sha for sha in candidates if sha not in referenced]
+        for sha256 in orphans:
+            store.delete(kind, sha256)
+        pruned[kind] = len(orphans)
+    return pruned
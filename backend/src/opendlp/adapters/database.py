@@ -1,12 +1,23 @@
 """ABOUTME: Database connection setup and imperative mapping for OpenDLP
 ABOUTME: Configures SQLAlchemy sessions and maps domain objects to tables"""
 
-from sqlalchemy import create_engine
+import contextlib
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import structlog
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session, deferred, relationship, sessionmaker
 from sqlalchemy.orm import clear_mappers as sqla_clear_mappers
-from sqlalchemy.orm import relationship, sessionmaker
+from sqlalchemy.pool import NullPool
 
-from opendlp.adapters import orm
-from opendlp.config import bool_environ_get, get_db_uri
+from opendlp.adapters import orm, selection_data_cache
+from opendlp.config import DBPoolCfg, bool_environ_get, get_db_uri
 from opendlp.domain import (
     assembly,
     assembly_csv,
@@ -29,29 +40,186 @@ from opendlp.domain import (
     users,
 )
 
+logger = structlog.get_logger(__name__)
+
 
 class DatabaseError(Exception):
     """Base exception for database-related errors."""
 
 
-def create_session_factory(database_url: str = "", echo: bool = False) -> sessionmaker:
-    """Create a SQLAlchemy session factory with proper configuration."""
+# The same SQL statement running this many times in one request or task is
+# reported as a likely N+1 - a loop issuing one query per row.
+N_PLUS_ONE_THRESHOLD = 10
+
+
+@dataclass
+class QueryStats:
+    """SQL statements run, and the time spent running them, in one request or task."""
+
+    count: int = 0
+    duration_ms: float = 0.0
+    statements: Counter[str] = field(default_factory=Counter)
+
+    def repeated_statements(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int]]:
+        """Statements run at least ``threshold`` times, most repeated first."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        """Value for a ``Server-Timing`` response header."""
+        return f'db;desc="{self.count} queries";dur={self.duration_ms:.1f}'
+
+
+_query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+_QUERY_START_KEY = "opendlp_query_start"
+
+
+def _before_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    if _query_stats.get() is not None:
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    stats = _query_stats.get()
+    starts = conn.info.get(_QUERY_START_KEY)
+    if stats is None or not starts:
+        return
+    stats.count += 1
+    stats.duration_ms += (time.perf_counter() - starts.pop()) * 1000
+    stats.statements[statement] += 1
+
+
+def register_query_instrumentation() -> None:
+    """Count statements on every engine. Only tracked while ``start_query_tracking`` is active."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def start_query_tracking() -> QueryStats:
+    """Start counting SQL statements for the current request, task or test."""
+    register_query_instrumentation()
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+def stop_query_tracking() -> QueryStats | None:
+    """Stop counting and return what was counted, or None if tracking was not started."""
+    stats = _query_stats.get()
+    _query_stats.set(None)
+    return stats
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Count SQL statements run inside the block, restoring any outer tracking afterwards."""
+    register_query_instrumentation()
+    stats = QueryStats()
+    token = _query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _query_stats.reset(token)
+
+
+def log_query_stats(stats: QueryStats, **context: Any) -> None:
+    """Log the counts at debug level, or as a warning if a statement looks like an N+1."""
+    repeated = stats.repeated_statements()
+    if repeated:
+        statement, times = repeated[0]
+        logger.warning(
+            "Repeated SQL statement, possible N+1",
+            queries=stats.count,
+            db_ms=round(stats.duration_ms, 1),
+            repeated_times=times,
+            statement=statement[:200],
+            **context,
+        )
+    else:
+        logger.debug("SQL queries", queries=stats.count, db_ms=round(stats.duration_ms, 1), **context)
+
+
+def engine_pool_args(database_url: str, pool_cfg: DBPoolCfg) -> dict[str, Any]:
+    """Connection pool arguments for ``create_engine``."""
+    if pool_cfg.pgbouncer:
+        # PgBouncer in transaction pooling mode hands each transaction to whichever
+        # server connection is free. Holding connections in our own pool as well
+        # would just pin them, and prepared statements live on one server connection,
+        # so later transactions could not find them.
+        args: dict[str, Any] = {"poolclass": NullPool}
+        if database_url.startswith("postgresql+psycopg://"):
+            # psycopg 3 prepares repeated statements server-side; psycopg2 never does.
+            args["connect_args"] = {"prepare_threshold": None}
+        return args
+    return {
+        "pool_pre_ping": True,  # Verify connections before use
+        "pool_size": pool_cfg.pool_size,
+        "max_overflow": pool_cfg.max_overflow,
+        "pool_timeout": pool_cfg.pool_timeout,
+        "pool_recycle": pool_cfg.pool_recycle,
+    }
+
+
+def _log_pool_settings(pool_cfg: DBPoolCfg) -> None:
+    if pool_cfg.pgbouncer:
+        logger.info("Database connection pool configured", role=pool_cfg.role, pool="none, PgBouncer transaction mode")
+        return
+    logger.info(
+        "Database connection pool configured",
+        role=pool_cfg.role,
+        pool_size=pool_cfg.pool_size,
+        max_overflow=pool_cfg.max_overflow,
+        pool_timeout=pool_cfg.pool_timeout,
+        pool_recycle=pool_cfg.pool_recycle,
+    )
+
+
+def create_session_factory(
+    database_url: str = "", echo: bool = False, pool_cfg: DBPoolCfg | None = None
+) -> sessionmaker:
+    """Create a SQLAlchemy session factory with proper configuration.
+
+    Postgres pools are sized for the process role (web, worker or beat), see ``DBPoolCfg``.
+    """
     database_url = database_url or get_db_uri()
     echo = bool_environ_get("DB_ECHO") or echo
-    extra_args: dict[str, int | bool] = {}
-    if database_url.startswith("postgresql://"):
-        # Sized for 8 connection-opening processes (5 celery workers + beat +
-        # 2 gunicorn workers) against postgres max_connections=100. Worst-case
-        # burst is 8 * (3 + 7) = 80, leaving headroom for psql/admin.
-        extra_args = {
-            "pool_pre_ping": True,  # Verify connections before use
-            "pool_recycle": 3600,  # Recycle connections after 1 hour
-            "pool_size": 3,
-            "max_overflow": 7,
-        }
+    extra_args: dict[str, Any] = {}
+    if database_url.startswith("postgresql"):
+        pool_cfg = pool_cfg or DBPoolCfg.from_env()
+        extra_args = engine_pool_args(database_url, pool_cfg)
+        _log_pool_settings(pool_cfg)
     engine = create_engine(database_url, echo=echo, **extra_args)
 
-    return sessionmaker(bind=engine, expire_on_commit=False)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    selection_data_cache.register_change_tracking(session_factory)
+    register_query_instrumentation()
+    return session_factory
+
+
+# 0 on a primary. On a replica: infinite when its WAL receiver is not running (it
+# has stopped receiving, so having replayed everything received says nothing), 0
+# when it has replayed everything it has received, else the age of the last
+# replayed transaction. pg_stat_wal_receiver has a row only while the receiver
+# runs, and that row is visible without pg_read_all_stats.
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver) THEN 'Infinity'::float8 "
+    "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())::float8 END"
+)
+
+
+def replica_lag_seconds(session: Session) -> float:
+    """How many seconds the database behind ``session`` is behind its primary (0 for a primary).
+
+    Infinite for a replica that is not streaming from its primary, so it is never trusted.
+    """
+    lag = session.execute(_REPLICA_LAG_SQL).scalar()
+    return float(lag) if lag is not None else 0.0
 
 
 # Track if mappers have been started
@@ -221,8 +389,23 @@ def start_mappers() -> None:
 
         orm.mapper_registry.map_imperatively(registration_page.RegistrationPage, orm.registration_pages)
         orm.mapper_registry.map_imperatively(registration_page.RegistrationPageHtml, orm.registration_page_html_sources)
-        orm.mapper_registry.map_imperatively(registration_image.RegistrationImage, orm.registration_images)
-        orm.mapper_registry.map_imperatively(registration_document.RegistrationDocument, orm.registration_documents)
+        # The bytes are only read by the public asset routes, which stream them with
+        # substr(); loading an image or document object never pulls them in.
+        orm.mapper_registry.map_imperatively(
+            registration_image.RegistrationImage,
+            orm.registration_images,
+            properties={"data": deferred(orm.registration_images.c.data)},
+        )
+        orm.mapper_registry.map_imperatively(
+            registration_image.RegistrationImageVariant,
+            orm.registration_image_variants,
+            properties={"data": deferred(orm.registration_image_variants.c.data)},
+        )
+        orm.mapper_registry.map_imperatively(
+            registration_document.RegistrationDocument,
+            orm.registration_documents,
+            properties={"data": deferred(orm.registration_documents.c.data)},
+        )
 
         # Map EmailTemplate and RespondentEmailSendRecord domain objects. Mapped
         # independently - no ORM relationship; the service layer resolves links.
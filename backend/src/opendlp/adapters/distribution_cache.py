@@ -0,0 +1,283 @@
+"""ABOUTME: Redis-backed cache of the panel distributions computed by maximin, leximin and nash
+ABOUTME: Repeat selections with identical inputs skip the solver and only redraw the lottery"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import pickle
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from redis import Redis
+from redis.exceptions import RedisError
+from sortition_algorithms import errors, run_stratification
+from sortition_algorithms.committee_generation import (
+    GUROBI_AVAILABLE,
+    find_any_committee,
+    find_distribution_leximin,
+    find_distribution_maximin,
+    find_distribution_nash,
+    standardize_distribution,
+)
+
+# Not public API: the report tables and lottery run_stratification uses, reused so a
+# cached selection reports exactly as an uncached one. sortition-algorithms is pinned
+# to an exact version in pyproject.toml, and test_distribution_cache checks these.
+from sortition_algorithms.core import (
+    _category_info_table,
+    _distribution_stats,
+    _initial_category_info_table,
+    lottery_rounding,
+)
+from sortition_algorithms.features import check_desired, iterate_feature_collection
+from sortition_algorithms.people import check_enough_people_for_every_feature_value, exclude_matching_selected_addresses
+from sortition_algorithms.progress import coerce_reporter
+from sortition_algorithms.utils import ReportLevel, RunReport, set_random_provider
+
+from opendlp import config
+from opendlp.config import RedisCfg
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sortition_algorithms.features import FeatureCollection
+    from sortition_algorithms.people import People
+    from sortition_algorithms.progress import ProgressReporter
+    from sortition_algorithms.settings import Settings
+
+logger = structlog.get_logger(__name__)
+
+_KEY_PREFIX = "selection_distribution:"
+# The algorithms that compute a distribution over panels. Legacy and diversimax return
+# a panel directly, so are never cached; test selections cache the one panel they find.
+_DISTRIBUTION_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "maximin": find_distribution_maximin,
+    "leximin": find_distribution_leximin,
+    "nash": find_distribution_nash,
+}
+_TEST_SELECTION = "test"
+# The errors run_stratification reports as a failed selection rather than raising.
+_SELECTION_ERRORS = (errors.SelectionError, ValueError, RuntimeError, errors.InfeasibleQuotasCantRelaxError)
+
+Distribution = tuple[list[frozenset[str]], list[float], RunReport]
+
+
+def _get_redis() -> Redis:
+    cfg = RedisCfg.from_env()
+    # decode_responses=False because the cached payloads are compressed pickles.
+    return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+
+
+def distribution_key(
+    algorithm: str,
+    features: FeatureCollection,
+    people: People,
+    number_people_wanted: int,
+    check_same_address_columns: list[str],
+    solver_backend: str,
+) -> str:
+    """Hash everything the distribution depends on.
+
+    Only the columns the algorithm looks at - the target categories and address
+    columns - are hashed for each person, and people are sorted by id, so the key
+    does not change with the order respondents were loaded in.
+    """
+    columns = [*features.keys(), *check_same_address_columns]
+    digest = hashlib.sha256()
+    digest.update(
+        json.dumps([
+            algorithm,
+            solver_backend,
+            number_people_wanted,
+            check_same_address_columns,
+            [[fname, fvalue, minmax.min, minmax.max] for fname, fvalue, minmax in iterate_feature_collection(features)],
+        ]).encode("utf-8")
+    )
+    for person_key, person in sorted(people.items()):
+        digest.update(json.dumps([person_key, *(person[column] for column in columns)]).encode("utf-8"))
+    return f"{_KEY_PREFIX}{digest.hexdigest()}"
+
+
+@dataclass
+class DistributionCacheOutcome:
+    """What happened to the distribution cache during one selection."""
+
+    key: str = ""
+    hit: bool = False
+
+
+class DistributionCache:
+    def __init__(self, redis_client: Redis | None = None, ttl_seconds: int | None = None) -> None:
+        self._redis = redis_client
+        self._ttl = config.get_selection_distribution_cache_ttl_seconds() if ttl_seconds is None else ttl_seconds
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = _get_redis()
+        return self._redis
+
+    def get(self, key: str) -> Distribution | None:
+        try:
+            raw = self._client().get(key)
+        except RedisError as exc:
+            logger.warning("Distribution cache read failed", error=str(exc))
+            return None
+        if not isinstance(raw, bytes):
+            return None
+        # Only ever holds payloads written by set below, never user-supplied bytes.
+        committees, probabilities, report = pickle.loads(zlib.decompress(raw))  # noqa: S301
+        return committees, probabilities, report
+
+    def set(self, key: str, distribution: Distribution) -> None:
+        try:
+            payload = zlib.compress(pickle.dumps(distribution, protocol=pickle.HIGHEST_PROTOCOL), 1)
+            self._client().set(key, payload, ex=self._ttl)
+        except RedisError as exc:
+            logger.warning("Distribution cache write failed", error=str(exc))
+
+    def _distribution(
+        self,
+        algorithm: str,
+        features: FeatureCollection,
+        people: People,
+        number_people_wanted: int,
+        settings: Settings,
+        progress_reporter: ProgressReporter,
+        outcome: DistributionCacheOutcome,
+    ) -> Distribution:
+        columns = settings.normalised_address_columns
+        outcome.key = distribution_key(
+            algorithm, features, people, number_people_wanted, columns, settings.solver_backend
+        )
+        cached_distribution = self.get(outcome.key)
+        if cached_distribution is not None:
+            outcome.hit = True
+            return cached_distribution
+        if algorithm == _TEST_SELECTION:
+            committees, report = find_any_committee(
+                features, people, number_people_wanted, columns, settings.solver_backend
+            )
+            distribution = committees, [1.0] * len(committees), report
+        else:
+            distribution = _DISTRIBUTION_FUNCTIONS[algorithm](
+                features,
+                people,
+                number_people_wanted,
+                columns,
+                settings.solver_backend,
+                progress_reporter=progress_reporter,
+            )
+        self.set(outcome.key, distribution)
+        return distribution
+
+    def _find_random_sample(
+        self,
+        features: FeatureCollection,
+        people: People,
+        number_people_wanted: int,
+        settings: Settings,
+        test_selection: bool,
+        progress_reporter: ProgressReporter,
+        outcome: DistributionCacheOutcome,
+    ) -> tuple[list[frozenset[str]], RunReport]:
+        """The library's ``find_random_sample`` for one panel, with the solver step cached."""
+        args = (features, people, number_people_wanted, settings, progress_reporter, outcome)
+        if test_selection:
+            committees, _probabilities, test_report = self._distribution(_TEST_SELECTION, *args)
+            return committees, test_report
+
+        report = RunReport()
+        algorithm = settings.selection_algorithm
+        if algorithm == "leximin" and not GUROBI_AVAILABLE:
+            report.add_message("gurobi_unavailable_switching")
+            algorithm = "maximin"
+        committees, probabilities, solver_report = self._distribution(algorithm, *args)
+        report.add_report(solver_report)
+
+        committees, probabilities = standardize_distribution(committees, probabilities)
+        if len(committees) > people.count:
+            report.add_message_and_log(
+                "basic_solution_warning",
+                logging.WARNING,
+                algorithm=algorithm,
+                num_panels=len(committees),
+                num_agents=people.count,
+                min_probs=min(probabilities),
+            )
+        report.add_report(_distribution_stats(people, committees, probabilities))
+        return lottery_rounding(committees, probabilities, 1), report
+
+    def run_stratification(
+        self,
+        features: FeatureCollection,
+        people: People,
+        number_people_wanted: int,
+        settings: Settings,
+        *,
+        test_selection: bool = False,
+        already_selected: People | None = None,
+        progress_reporter: ProgressReporter | None = None,
+    ) -> tuple[bool, list[frozenset[str]], RunReport, DistributionCacheOutcome]:
+        """``sortition_algorithms.run_stratification``, serving the solver step from the cache.
+
+        Everything else - the pre-checks, the random number provider, the lottery
+        draw and the report tables - runs as the library does, so a hit gives a
+        fresh random panel from the same distribution. Algorithms that are not
+        cached, and every selection while the cache is disabled (a TTL of 0), go
+        straight to the library.
+        """
+        outcome = DistributionCacheOutcome()
+        if not self._ttl or not (test_selection or settings.selection_algorithm in _DISTRIBUTION_FUNCTIONS):
+            success, panels, report = run_stratification(
+                features,
+                people,
+                number_people_wanted,
+                settings,
+                test_selection=test_selection,
+                already_selected=already_selected,
+                progress_reporter=progress_reporter,
+            )
+            return success, panels, report, outcome
+
+        report = RunReport()
+        try:
+            working_people = exclude_matching_selected_addresses(people, already_selected, settings)
+            dropped_count = people.count - working_people.count
+            if dropped_count:
+                report.add_line_and_log(
+                    f"Dropped {dropped_count} people who have an address matching a selected person.", logging.INFO
+                )
+            check_desired(features, number_people_wanted)
+            check_enough_people_for_every_feature_value(features, working_people)
+        except errors.SelectionError as error:
+            report.add_error(error)
+            return False, [], report, outcome
+
+        set_random_provider(settings.random_number_seed)
+        if test_selection:
+            report.add_message("test_selection_warning", ReportLevel.CRITICAL)
+        report.add_message("initial_state", ReportLevel.IMPORTANT)
+        report.add_report(_initial_category_info_table(features, working_people))
+
+        try:
+            panels, sample_report = self._find_random_sample(
+                features,
+                working_people,
+                number_people_wanted,
+                settings,
+                test_selection,
+                coerce_reporter(progress_reporter),
+                outcome,
+            )
+            report.add_report(sample_report)
+        except _SELECTION_ERRORS as error:
+            report.add_error(error)
+            return False, [], report, outcome
+
+        report.add_message("selection_success", ReportLevel.IMPORTANT)
+        report.add_report(_category_info_table(features, working_people, panels, number_people_wanted))
+        return True, panels, report, outcome
@@ -1,20 +1,34 @@
 """ABOUTME: gspread-backed export target writing respondent data to Google Sheets
-ABOUTME: Authenticates with the shared service account and writes one worksheet"""
+ABOUTME: Sizes the worksheet once, then writes rows in bounded batches, backing off when rate limited"""
 
-from collections.abc import Callable
-from typing import Any
+import time
+from collections.abc import Callable, Iterator
+from itertools import islice
+from typing import Any, TypeVar
 
 import gspread
-from gspread.exceptions import GSpreadException, WorksheetNotFound
+import structlog
+from gspread.exceptions import APIError, GSpreadException, SpreadsheetNotFound, WorksheetNotFound
+from gspread.utils import rowcol_to_a1
 
 from opendlp import config
 from opendlp.adapters.tabular_export import AbstractGSheetExportTarget, ExportTargetError, TabularData
 
-__all__ = ["GSheetExportTarget", "WorksheetNotFound"]
+__all__ = ["GSheetExportTarget", "WorksheetNotFound", "call_with_backoff", "is_rate_limited"]
 
-# Enough headroom for a fresh worksheet; Google Sheets grows as needed.
-_DEFAULT_ROWS = 1000
-_DEFAULT_COLS = 26
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# Cells sent per values request. Google rejects very large request bodies, and
+# smaller requests also mean a 429 only costs one batch's worth of work.
+DEFAULT_CELLS_PER_BATCH = 50_000
+# "Too many requests" and "service unavailable" are worth waiting out.
+_RETRY_STATUS_CODES = frozenset({429, 503})
+# "Forbidden" and "not found": the sheet is not shared with the service account, or does not exist.
+_ACCESS_DENIED_STATUS_CODES = frozenset({403, 404})
+DEFAULT_MAX_RETRIES = 5
+_MAX_BACKOFF_SECONDS = 64.0
 
 
 def _default_client_factory() -> Any:
@@ -22,37 +36,123 @@ def _default_client_factory() -> Any:
     return gspread.service_account(filename=str(config.get_google_auth_json_path()))
 
 
+def is_rate_limited(exc: APIError) -> bool:
+    """Whether Google rejected a request only because it is busy, so waiting and retrying can succeed."""
+    return exc.code in _RETRY_STATUS_CODES
+
+
+def is_access_denied(exc: GSpreadException) -> bool:
+    """Whether Google refused access to the sheet or could not find it, as opposed to any other failure."""
+    if isinstance(exc, SpreadsheetNotFound):
+        return True
+    return isinstance(exc, APIError) and exc.code in _ACCESS_DENIED_STATUS_CODES
+
+
+def call_with_backoff[R](
+    func: Callable[[], R],
+    *,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    backoff_seconds: float = 1.0,
+    sleep: Callable[[float], None] = time.sleep,
+) -> R:
+    """Make one Google API call, retrying it with exponential backoff while Google says to slow down."""
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except APIError as exc:
+            if not is_rate_limited(exc) or attempt >= max_retries:
+                raise
+            delay = min(backoff_seconds * 2**attempt, _MAX_BACKOFF_SECONDS)
+            logger.warning("Google Sheets rate limited the request", status=exc.code, retry_in_seconds=delay)
+            sleep(delay)
+            attempt += 1
+
+
+def _batches(rows: list[list[str]], size: int) -> Iterator[list[list[str]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 class GSheetExportTarget(AbstractGSheetExportTarget):
     """Write a table into a worksheet of an existing Google Spreadsheet.
 
     The service account must have edit access to the target spreadsheet
     (organisers share it with the service-account email). A ``client_factory``
     can be injected in tests so no real Google access is needed.
+
+    The worksheet is resized to the table's exact dimensions up front, then the
+    header and rows are sent in ``batch_update`` requests of at most
+    ``cells_per_batch`` cells. Requests that Google rejects as rate limited are
+    retried with exponential backoff before the export gives up.
     """
 
     def __init__(
         self,
         spreadsheet_url: str,
         client_factory: Callable[[], Any] = _default_client_factory,
+        *,
+        cells_per_batch: int = DEFAULT_CELLS_PER_BATCH,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = 1.0,
+        sleep: Callable[[float], None] = time.sleep,
     ) -> None:
         self.spreadsheet_url = spreadsheet_url
         self._client_factory = client_factory
+        self.cells_per_batch = cells_per_batch
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self._sleep = sleep
         self.result_url: str = ""
         self.result_title: str = ""
 
+    def _call(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Make one Google API call, retrying it while Google says to slow down."""
+        return call_with_backoff(
+            lambda: func(*args, **kwargs),
+            max_retries=self.max_retries,
+            backoff_seconds=self.backoff_seconds,
+            sleep=self._sleep,
+        )
+
+    def _open_worksheet(self, spreadsheet: Any, title: str, rows: int, cols: int) -> Any:
+        """The worksheet called ``title``, emptied and sized to exactly ``rows`` x ``cols``."""
+        try:
+            worksheet = self._call(spreadsheet.worksheet, title)
+        except WorksheetNotFound:
+            return self._call(spreadsheet.add_worksheet, title=title, rows=rows, cols=cols)
+        self._call(worksheet.clear)
+        self._call(worksheet.resize, rows=rows, cols=cols)
+        return worksheet
+
     def write_sheet(self, title: str, table: TabularData) -> None:
+        cols = max(len(table.headers), 1)
+        total_rows = len(table.rows)
+        rows_per_batch = max(self.cells_per_batch // cols, 1)
         try:
             client = self._client_factory()
-            spreadsheet = client.open_by_url(self.spreadsheet_url)
-            try:
-                worksheet = spreadsheet.worksheet(title)
-                worksheet.clear()
-            except WorksheetNotFound:
-                worksheet = spreadsheet.add_worksheet(title=title, rows=_DEFAULT_ROWS, cols=_DEFAULT_COLS)
-            worksheet.update([table.headers, *table.rows])
+            spreadsheet = self._call(client.open_by_url, self.spreadsheet_url)
+            worksheet = self._open_worksheet(spreadsheet, title, rows=total_rows + 1, cols=cols)
+
+            # The header rides along with the first batch of rows.
+            pending = [{"range": rowcol_to_a1(1, 1), "values": [table.headers]}]
+            written = 0
+            for batch in _batches(table.rows, rows_per_batch):
+                first_row = written + 2  # 1-based, below the header row
+                cell_range = f"{rowcol_to_a1(first_row, 1)}:{rowcol_to_a1(first_row + len(batch) - 1, cols)}"
+                pending.append({"range": cell_range, "values": batch})
+                self._call(worksheet.batch_update, pending)
+                pending = []
+                written += len(batch)
+                if self.on_progress is not None:
+                    self.on_progress(written, total_rows)
+            if pending:
+                self._call(worksheet.batch_update, pending)
+
             self.result_url = worksheet.url
             self.result_title = spreadsheet.title
         except GSpreadException as exc:
             # Wrap any Google Sheets failure (missing sheet, no access, API error)
             # so callers handle one export-layer exception, not gspread internals.
-            raise ExportTargetError(str(exc)) from exc
+            raise ExportTargetError(str(exc), access_denied=is_access_denied(exc)) from exc
@@ -0,0 +1,219 @@
+"""ABOUTME: Redis-backed snapshot of the Google Sheet tabs a load reads, reused by the selection run that follows
+ABOUTME: Keyed by spreadsheet id, tab names and Drive modifiedTime, so any edit to the sheet forces a fresh read"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from gspread.exceptions import GSpreadException
+from gspread.urls import DRIVE_FILES_API_V3_URL
+from redis import Redis
+from redis.exceptions import RedisError
+from sortition_algorithms import AbstractDataSource
+
+from opendlp import config
+from opendlp.config import RedisCfg
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Sequence
+
+    import gspread
+    from sortition_algorithms import GSheetDataSource, RunReport, errors
+
+logger = structlog.get_logger(__name__)
+
+_KEY_PREFIX = "gsheet_snapshot:"
+FEATURES = "features"
+PEOPLE = "people"
+ALREADY_SELECTED = "already_selected"
+_TABS = (FEATURES, PEOPLE, ALREADY_SELECTED)
+
+# (header row, records) as yielded by the GSheetDataSource read_*_data methods
+TabData = tuple[list[str], list[dict[str, str]]]
+
+
+def _get_redis() -> Redis:
+    cfg = RedisCfg.from_env()
+    # decode_responses=False because the snapshots are stored compressed.
+    return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+
+
+def drive_modified_time(gsheet_data_source: GSheetDataSource) -> str:
+    """When the spreadsheet was last edited, according to Drive. Opens the spreadsheet if needed."""
+    spreadsheet_id = gsheet_data_source.spreadsheet.id
+    response = gsheet_data_source.client.http_client.request(
+        "get",
+        f"{DRIVE_FILES_API_V3_URL}/{spreadsheet_id}",
+        params={"supportsAllDrives": True, "fields": "modifiedTime"},
+    )
+    return str(response.json().get("modifiedTime", ""))
+
+
+def snapshot_key(gsheet_data_source: GSheetDataSource, modified_time: str) -> str:
+    """The Redis key for the tabs this data source reads, as they were at ``modified_time``."""
+    # id_column decides which row of the already selected tab is the header.
+    parts = [
+        gsheet_data_source.spreadsheet.id,
+        gsheet_data_source.feature_tab_name,
+        gsheet_data_source.people_tab_name,
+        gsheet_data_source.already_selected_tab_name,
+        gsheet_data_source.id_column,
+        modified_time,
+    ]
+    return _KEY_PREFIX + hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class SnapshotGSheetDataSource(AbstractDataSource):
+    """Wraps a ``GSheetDataSource`` so its three input tabs are downloaded once per sheet edit.
+
+    ``load_gsheet`` and the ``run_select`` that follows it both read the targets,
+    respondents and already selected tabs. The first to read them stores the rows
+    in Redis, compressed; later reads of the same, unedited spreadsheet come from
+    there instead of the Sheets API. Drive's ``modifiedTime`` is fetched before the
+    tabs are read, so an edit made mid-read can only cause a miss, never stale data.
+    Writes always go to the wrapped source. With a TTL of 0, Redis unreachable or
+    the Drive lookup failing, this is a plain pass-through.
+    """
+
+    def __init__(
+        self,
+        gsheet_data_source: GSheetDataSource,
+        *,
+        redis_client: Redis | None = None,
+        ttl_seconds: int | None = None,
+    ) -> None:
+        self.gsheet_data_source = gsheet_data_source
+        self._redis = redis_client
+        self._ttl = config.get_gsheet_snapshot_ttl_seconds() if ttl_seconds is None else ttl_seconds
+        self._key: str | None = None
+        self._snapshot: dict[str, TabData] | None = None
+        self._fetched: dict[str, TabData] = {}
+        self.reused = False
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = _get_redis()
+        return self._redis
+
+    def _load_snapshot(self) -> None:
+        """Work out the key and fetch any stored snapshot, once, before the first tab is read."""
+        if self._key is not None or not self._ttl:
+            return
+        try:
+            self._key = snapshot_key(self.gsheet_data_source, drive_modified_time(self.gsheet_data_source))
+        except GSpreadException as exc:
+            logger.warning("Could not read the spreadsheet's modified time", error=str(exc))
+            self._ttl = 0
+            return
+        try:
+            raw = self._client().get(self._key)
+        except RedisError as exc:
+            logger.warning("Google Sheet snapshot read failed", error=str(exc))
+            return
+        if isinstance(raw, bytes):
+            stored = json.loads(zlib.decompress(raw))
+            self._snapshot = {tab: (head, body) for tab, (head, body) in stored.items()}
+            self.reused = True
+
+    def _store_snapshot(self) -> None:
+        if self._key is None or self._snapshot is not None or set(self._fetched) != set(_TABS):
+            return
+        try:
+            payload = zlib.compress(json.dumps(self._fetched).encode("utf-8"), 1)
+            self._client().set(self._key, payload, ex=self._ttl)
+        except RedisError as exc:
+            logger.warning("Google Sheet snapshot write failed", error=str(exc))
+
+    @contextmanager
+    def _read_tab(self, tab: str, read: Any, report: RunReport) -> Generator[TabData, None, None]:
+        self._load_snapshot()
+        if self._snapshot is not None:
+            yield self._snapshot[tab]
+            return
+        with read(report) as (head, body):
+            tab_data = (list(head), list(body))
+        if self._key is not None:
+            self._fetched[tab] = tab_data
+            self._store_snapshot()
+        yield tab_data
+
+    @property
+    def people_data_container(self) -> str:
+        return self.gsheet_data_source.people_data_container
+
+    @property
+    def already_selected_data_container(self) -> str:
+        return self.gsheet_data_source.already_selected_data_container
+
+    @contextmanager
+    def read_feature_data(
+        self, report: RunReport
+    ) -> Generator[tuple[Iterable[str], Iterable[dict[str, str]]], None, None]:
+        with self._read_tab(FEATURES, self.gsheet_data_source.read_feature_data, report) as feature_data:
+            yield feature_data
+
+    @contextmanager
+    def read_people_data(
+        self, report: RunReport
+    ) -> Generator[tuple[Iterable[str], Iterable[dict[str, str]]], None, None]:
+        with self._read_tab(PEOPLE, self.gsheet_data_source.read_people_data, report) as people_data:
+            if self.reused:
+                report.add_message("reading_gsheet_tab", tab_name=self.people_tab_name)
+            yield people_data
+
+    @contextmanager
+    def read_already_selected_data(
+        self, report: RunReport
+    ) -> Generator[tuple[Iterable[str], Iterable[dict[str, str]]], None, None]:
+        read = self.gsheet_data_source.read_already_selected_data
+        with self._read_tab(ALREADY_SELECTED, read, report) as already_selected_data:
+            yield already_selected_data
+
+    def write_selected(self, selected: list[list[str]], report: RunReport) -> None:
+        self.gsheet_data_source.write_selected(selected, report)
+
+    def write_remaining(self, remaining: list[list[str]], report: RunReport) -> None:
+        self.gsheet_data_source.write_remaining(remaining, report)
+
+    def highlight_dupes(self, dupes: list[int]) -> None:
+        self.gsheet_data_source.highlight_dupes(dupes)
+
+    @property
+    def spreadsheet(self) -> gspread.Spreadsheet:
+        return self.gsheet_data_source.spreadsheet
+
+    @property
+    def feature_tab_name(self) -> str:
+        return self.gsheet_data_source.feature_tab_name
+
+    @property
+    def people_tab_name(self) -> str:
+        return self.gsheet_data_source.people_tab_name
+
+    @property
+    def already_selected_tab_name(self) -> str:
+        return self.gsheet_data_source.already_selected_tab_name
+
+    @property
+    def _g_sheet_name(self) -> str:
+        return self.gsheet_data_source._g_sheet_name
+
+    def customise_features_parse_error(
+        self, error: errors.ParseTableMultiError, headers: Sequence[str]
+    ) -> errors.SelectionMultilineError:
+        return self.gsheet_data_source.customise_features_parse_error(error, headers)
+
+    def customise_people_parse_error(
+        self, error: errors.ParseTableMultiError, headers: Sequence[str]
+    ) -> errors.SelectionMultilineError:
+        return self.gsheet_data_source.customise_people_parse_error(error, headers)
+
+    def customise_already_selected_parse_error(
+        self, error: errors.ParseTableMultiError, headers: Sequence[str]
+    ) -> errors.SelectionMultilineError:
+        return self.gsheet_data_source.customise_already_selected_parse_error(error, headers)
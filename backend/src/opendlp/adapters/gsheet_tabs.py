@@ -0,0 +1,99 @@
+"""ABOUTME: Finds and deletes the old selection output tabs of a Google Sheet in batched Sheets API requests
+ABOUTME: Sends the deleteSheet requests together in chunks, retrying a rejected chunk tab by tab to report each outcome"""
+
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import islice
+from typing import Any
+
+import structlog
+from gspread.exceptions import APIError
+from sortition_algorithms import GSheetDataSource
+
+from opendlp.adapters.gsheet_export import call_with_backoff
+from opendlp.adapters.sortition_algorithms import CSVGSheetDataSource
+
+logger = structlog.get_logger(__name__)
+
+# deleteSheet requests per spreadsheets.batchUpdate call: enough for even a heavily
+# used sheet in one call, while bounding what one failed (all-or-nothing) call costs.
+DELETE_REQUESTS_PER_BATCH = 100
+# Google rejects a whole batch as invalid when one of its requests is, e.g. a tab
+# that is already gone; only then does deleting tab by tab tell us anything more.
+_INVALID_REQUEST = 400
+
+
+@dataclass
+class OldTabsOutcome:
+    """Which old output tabs were deleted (or would be, on a dry run) and which could not be."""
+
+    tab_names: list[str] = field(default_factory=list)
+    failures: dict[str, str] = field(default_factory=dict)
+
+
+def _chunks(tabs: list[Any], size: int) -> Iterator[list[Any]]:
+    iterator = iter(tabs)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _delete_one_at_a_time(
+    spreadsheet: Any, tabs: list[Any], outcome: OldTabsOutcome, sleep: Callable[[float], None]
+) -> None:
+    for tab in tabs:
+        try:
+            call_with_backoff(partial(spreadsheet.del_worksheet, tab), sleep=sleep)
+        except APIError as exc:
+            outcome.failures[tab.title] = str(exc)
+        else:
+            outcome.tab_names.append(tab.title)
+
+
+def delete_old_output_tabs(
+    data_source: GSheetDataSource | CSVGSheetDataSource,
+    *,
+    dry_run: bool,
+    chunk_size: int = DELETE_REQUESTS_PER_BATCH,
+    sleep: Callable[[float], None] = time.sleep,
+) -> OldTabsOutcome:
+    """List, or delete, the tabs earlier selections wrote to the spreadsheet.
+
+    ``GSheetDataSource.delete_old_output_tabs`` deletes one tab per API call,
+    which with dozens of old tabs is slow and runs into the Sheets rate limit.
+    Here the worksheets are listed once and the deletions go out as
+    ``deleteSheet`` requests in a single ``batch_update`` per chunk. A rate
+    limited call is retried with backoff. Google applies a batch all or
+    nothing, so if a chunk is rejected as invalid its tabs are retried one at a
+    time to find out which of them could not be deleted; any other failure
+    (still rate limited, Google unavailable, no access) leaves the remaining
+    tabs undeleted rather than repeating the failing call for each of them.
+    """
+    if isinstance(data_source, CSVGSheetDataSource):
+        # The CSV-backed stand-in used by the BDD tests only simulates its tabs.
+        return OldTabsOutcome(tab_names=data_source.delete_old_output_tabs(dry_run=dry_run))
+    if not data_source._g_sheet_name:
+        return OldTabsOutcome()
+
+    spreadsheet = data_source.spreadsheet
+    old_tabs = [tab for tab in spreadsheet.worksheets() if data_source.tab_namer.matches_stubs(tab.title)]
+    if dry_run:
+        return OldTabsOutcome(tab_names=[tab.title for tab in old_tabs])
+
+    outcome = OldTabsOutcome()
+    chunks = list(_chunks(old_tabs, chunk_size))
+    for index, chunk in enumerate(chunks):
+        body = {"requests": [{"deleteSheet": {"sheetId": tab.id}} for tab in chunk]}
+        try:
+            call_with_backoff(partial(spreadsheet.batch_update, body), sleep=sleep)
+        except APIError as exc:
+            if exc.code != _INVALID_REQUEST:
+                logger.warning("Batched tab deletion failed", tabs=len(chunk), status=exc.code, error=str(exc))
+                outcome.failures.update((tab.title, str(exc)) for later in chunks[index:] for tab in later)
+                break
+            logger.warning("Batched tab deletion rejected, deleting one at a time", tabs=len(chunk), error=str(exc))
+            _delete_one_at_a_time(spreadsheet, chunk, outcome, sleep)
+        else:
+            outcome.tab_names.extend(tab.title for tab in chunk)
+    return outcome
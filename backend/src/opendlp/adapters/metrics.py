@@ -0,0 +1,242 @@
+"""ABOUTME: Prometheus text-format metrics for request latency, DB pools, Celery queues and task durations
+ABOUTME: Counters and histograms live in Redis so every gunicorn and Celery process adds to the same series"""
+
+from __future__ import annotations
+
+import math
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import structlog
+from redis import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.pool import QueuePool
+
+from opendlp.config import RedisCfg
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Engine
+
+logger = structlog.get_logger(__name__)
+
+_KEY_PREFIX = "metrics:"
+
+# Web requests are mostly well under a second; the long tail is CSV exports and the like.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Selections take from seconds (small pools, maximin) to an hour or more (large pools, leximin).
+TASK_DURATION_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+
+
+@dataclass(frozen=True)
+class MetricDefinition:
+    name: str
+    kind: str  # "counter" or "histogram"
+    help: str
+    buckets: tuple[float, ...] = ()
+
+
+HTTP_REQUEST_DURATION = MetricDefinition(
+    "opendlp_http_request_duration_seconds",
+    "histogram",
+    "Time taken to handle a web request, by Flask endpoint and method.",
+    LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = MetricDefinition(
+    "opendlp_http_requests_total",
+    "counter",
+    "Web requests handled, by Flask endpoint, method and status code.",
+)
+CELERY_TASK_DURATION = MetricDefinition(
+    "opendlp_celery_task_duration_seconds",
+    "histogram",
+    "Time a Celery worker spent running a task, by task name and final state.",
+    TASK_DURATION_BUCKETS,
+)
+SELECTION_TASK_DURATION = MetricDefinition(
+    "opendlp_selection_task_duration_seconds",
+    "histogram",
+    "Time from submitting a selection task to it finishing, including queueing, by task type and status.",
+    TASK_DURATION_BUCKETS,
+)
+REGISTRATION_SUBMISSIONS = MetricDefinition(
+    "opendlp_registration_submissions_total",
+    "counter",
+    "Registration form submissions, by outcome.",
+)
+
+RECORDED_METRICS = (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    CELERY_TASK_DURATION,
+    SELECTION_TASK_DURATION,
+    REGISTRATION_SUBMISSIONS,
+)
+
+# Metrics are recorded after every request and task, so a hung Redis must cost
+# them no more than this per command before the recorder gives up and logs it.
+REDIS_TIMEOUT_SECONDS = 0.25
+
+_redis_client: Redis | None = None
+
+
+def _get_redis() -> Redis:
+    # One client per process, so recording reuses a pooled connection rather than
+    # opening one per request. redis-py resets the pool itself after a fork.
+    global _redis_client
+    if _redis_client is None:
+        cfg = RedisCfg.from_env()
+        _redis_client = Redis(
+            host=cfg.host,
+            port=cfg.port,
+            db=cfg.db,
+            decode_responses=True,
+            socket_timeout=REDIS_TIMEOUT_SECONDS,
+            socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+        )
+    return _redis_client
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict[str, str]) -> str:
+    return ",".join(f'{key}="{_escape_label_value(value)}"' for key, value in labels.items())
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _bucket_for(value: float, buckets: tuple[float, ...]) -> str:
+    for bound in buckets:
+        if value <= bound:
+            return _format_value(bound)
+    return "+Inf"
+
+
+class MetricsRecorder:
+    """Adds to counters and histograms kept as Redis hashes, one hash per metric.
+
+    Each hash field is ``<labels>|<part>``. Histogram buckets are stored per bucket
+    rather than cumulatively, so an observation is a single increment, and are
+    summed up when rendered. Recording never raises: a Redis outage loses samples
+    but must not fail the request or task being measured.
+    """
+
+    def __init__(self, redis_client: Redis | None = None) -> None:
+        self._redis = redis_client
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = _get_redis()
+        return self._redis
+
+    def increment(self, metric: MetricDefinition, labels: dict[str, str], amount: int = 1) -> None:
+        try:
+            self._client().hincrby(f"{_KEY_PREFIX}{metric.name}", f"{format_labels(labels)}|value", amount)
+        except RedisError as exc:
+            logger.debug("Recording metric failed", metric=metric.name, error=str(exc))
+
+    def observe(self, metric: MetricDefinition, labels: dict[str, str], value: float) -> None:
+        key = f"{_KEY_PREFIX}{metric.name}"
+        label_str = format_labels(labels)
+        try:
+            pipeline = self._client().pipeline(transaction=False)
+            pipeline.hincrby(key, f"{label_str}|le={_bucket_for(value, metric.buckets)}", 1)
+            pipeline.hincrbyfloat(key, f"{label_str}|sum", value)
+            pipeline.hincrby(key, f"{label_str}|count", 1)
+            pipeline.execute()
+        except RedisError as exc:
+            logger.debug("Recording metric failed", metric=metric.name, error=str(exc))
+
+    def read(self, metric: MetricDefinition) -> dict[str, str]:
+        """The raw hash for ``metric``. Raises RedisError if Redis is unreachable."""
+        values: dict[str, str] = self._client().hgetall(f"{_KEY_PREFIX}{metric.name}")  # type: ignore[assignment]
+        return values
+
+    def queue_length(self, queue_name: str) -> int:
+        """Messages waiting in a Celery queue on the Redis broker. Raises RedisError if Redis is unreachable."""
+        length: int = self._client().llen(queue_name)  # type: ignore[assignment]
+        return length
+
+
+def _render_recorded(metric: MetricDefinition, raw: dict[str, str]) -> list[str]:
+    lines = [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+    if metric.kind == "counter":
+        for field, value in sorted(raw.items()):
+            label_str, _part = field.rsplit("|", 1)
+            lines.append(f"{metric.name}{{{label_str}}} {value}")
+        return lines
+
+    series: dict[str, dict[str, str]] = {}
+    for field, value in raw.items():
+        label_str, part = field.rsplit("|", 1)
+        series.setdefault(label_str, {})[part] = value
+    for label_str, parts in sorted(series.items()):
+        separator = "," if label_str else ""
+        cumulative = 0
+        for bound in (*(_format_value(bound) for bound in metric.buckets), "+Inf"):
+            cumulative += int(parts.get(f"le={bound}", 0))
+            lines.append(f'{metric.name}_bucket{{{label_str}{separator}le="{bound}"}} {cumulative}')
+        lines.append(f"{metric.name}_sum{{{label_str}}} {parts.get('sum', '0')}")
+        lines.append(f"{metric.name}_count{{{label_str}}} {parts.get('count', '0')}")
+    return lines
+
+
+def _render_pool_stats(engines: Iterable[Engine]) -> list[str]:
+    gauges = {
+        "opendlp_db_pool_size": "Connections the SQLAlchemy pool keeps open, in the process serving /metrics.",
+        "opendlp_db_pool_checked_out": "Connections currently in use, in the process serving /metrics.",
+        "opendlp_db_pool_overflow": "Connections open beyond the pool size, in the process serving /metrics.",
+    }
+    samples: dict[str, list[str]] = {name: [] for name in gauges}
+    pid = str(os.getpid())
+    for engine in engines:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        label_str = format_labels({"database": engine.url.database or "", "pid": pid})
+        samples["opendlp_db_pool_size"].append(f"opendlp_db_pool_size{{{label_str}}} {pool.size()}")
+        samples["opendlp_db_pool_checked_out"].append(f"opendlp_db_pool_checked_out{{{label_str}}} {pool.checkedout()}")
+        # overflow() starts at -size and counts up as connections are opened
+        samples["opendlp_db_pool_overflow"].append(f"opendlp_db_pool_overflow{{{label_str}}} {max(pool.overflow(), 0)}")
+    lines: list[str] = []
+    for name, help_text in gauges.items():
+        lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} gauge", *samples[name]])
+    return lines
+
+
+def render_metrics(recorder: MetricsRecorder, engines: Iterable[Engine], queue_names: Iterable[str]) -> str:
+    """All metrics in the Prometheus text exposition format.
+
+    Pool stats come from this process only: each gunicorn worker has its own pools,
+    so a scrape sees whichever worker answered it. Everything else is shared through Redis.
+    """
+    lines = _render_pool_stats(engines)
+    try:
+        queue_lines = [
+            "# HELP opendlp_celery_queue_length Tasks waiting in a Celery queue.",
+            "# TYPE opendlp_celery_queue_length gauge",
+        ]
+        for queue_name in sorted(set(queue_names)):
+            length = recorder.queue_length(queue_name)
+            queue_lines.append(f"opendlp_celery_queue_length{{{format_labels({'queue': queue_name})}}} {length}")
+        for metric in RECORDED_METRICS:
+            queue_lines.extend(_render_recorded(metric, recorder.read(metric)))
+        lines.extend(queue_lines)
+        redis_up = 1
+    except RedisError as exc:
+        logger.warning("Reading metrics from Redis failed", error=str(exc))
+        redis_up = 0
+    lines.extend([
+        "# HELP opendlp_metrics_redis_up Whether the metrics kept in Redis could be read.",
+        "# TYPE opendlp_metrics_redis_up gauge",
+        f"opendlp_metrics_redis_up {redis_up}",
+    ])
+    return "\n".join(lines) + "\n"
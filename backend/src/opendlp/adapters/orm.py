@@ -460,6 +460,11 @@ selection_run_records = Table(
     Column("remaining_ids", JSON, nullable=True),
     Column("progress", JSON, nullable=True),
     Column("targets_used", JSON, nullable=False, default=list),
+    Column("phase_timings", JSON, nullable=False, default=dict),
+    Column("pool_size", Integer, nullable=True),
+    Column("category_count", Integer, nullable=True),
+    Column("selection_algorithm", String(50), nullable=False, default=""),
+    Column("child_celery_task_ids", JSON, nullable=False, default=list),
 )
 
 # User backup codes table for 2FA recovery
@@ -693,14 +698,37 @@ registration_images = Table(
     Column("width", Integer, nullable=False),
     Column("height", Integer, nullable=False),
     Column("sha256", String(64), nullable=False),
-    Column("data", LargeBinary, nullable=False),
+    Column("data", LargeBinary, nullable=True),  # NULL when the bytes are in the blob store
     Column("alt", String, nullable=False, server_default=""),
     Column("original_filename", String(255), nullable=False, server_default=""),
     Column("created_by", PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True),
     Column("created_at", TZAwareDatetime(), nullable=False, default=aware_utcnow),
+    Column("variants_failed_at", TZAwareDatetime(), nullable=True),  # set when rendering variants failed
     Index("ix_registration_images_assembly_sha_unique", "assembly_id", "sha256", unique=True),
 )
 
+# Registration image variants table — resized WebP/PNG copies of an image, made in the background.
+registration_image_variants = Table(
+    "registration_image_variants",
+    metadata,
+    Column("id", PostgresUUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+    Column(
+        "image_id",
+        PostgresUUID(as_uuid=True),
+        ForeignKey("registration_images.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    ),
+    Column("image_format", String(8), nullable=False),
+    Column("width", Integer, nullable=False),
+    Column("height", Integer, nullable=False),
+    Column("byte_size", Integer, nullable=False),
+    Column("sha256", String(64), nullable=False),
+    Column("data", LargeBinary, nullable=True),  # NULL when the bytes are in the blob store
+    Column("created_at", TZAwareDatetime(), nullable=False, default=aware_utcnow),
+    Index("ix_registration_image_variants_image_format_width", "image_id", "image_format", "width", unique=True),
+)
+
 # Registration documents table — PDF bytes shared by an assembly's pages.
 registration_documents = Table(
     "registration_documents",
@@ -715,7 +743,7 @@ registration_documents = Table(
     ),
     Column("byte_size", Integer, nullable=False),
     Column("sha256", String(64), nullable=False),
-    Column("data", LargeBinary, nullable=False),
+    Column("data", LargeBinary, nullable=True),  # NULL when the bytes are in the blob store
     Column("label", String, nullable=False, server_default=""),
     Column("original_filename", String(255), nullable=False, server_default=""),
     Column("created_by", PostgresUUID(as_uuid=True), ForeignKey("users.id"), nullable=True),
@@ -0,0 +1,124 @@
+"""ABOUTME: Opt-in cProfile profiling of web requests and selection tasks, split into named phases
+ABOUTME: Profiles are kept in Redis for a limited time as pstats files that admins can download"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import json
+import marshal
+import pstats
+import time
+from typing import TYPE_CHECKING
+
+import structlog
+from redis import Redis
+from redis.exceptions import RedisError
+
+from opendlp import config
+from opendlp.config import RedisCfg
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+logger = structlog.get_logger(__name__)
+
+_KEY_PREFIX = "profile:"
+
+
+def _get_redis() -> Redis:
+    cfg = RedisCfg.from_env()
+    # decode_responses=False because the pstats payload is binary.
+    return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+
+
+class PhaseProfiler:
+    """One cProfile profile collected over named phases, with the wall-clock time of each phase.
+
+    The pstats show where the time went function by function; the phase times show
+    how it splits between, say, loading the data, the solver and writing the results.
+    """
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+        self._phase: str | None = None
+        self._started = 0.0
+        self.phase_seconds: dict[str, float] = {}
+
+    def start(self, phase: str) -> None:
+        self._phase = phase
+        self._started = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self) -> None:
+        self._profile.disable()
+        if self._phase is not None:
+            elapsed = time.perf_counter() - self._started
+            self.phase_seconds[self._phase] = self.phase_seconds.get(self._phase, 0.0) + elapsed
+            self._phase = None
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    def pstats_bytes(self) -> bytes:
+        """The profile in the format ``pstats.Stats.dump_stats`` writes, for snakeviz or ``python -m pstats``."""
+        stats = pstats.Stats(self._profile)
+        return marshal.dumps(stats.stats)  # type: ignore[attr-defined]
+
+
+@contextlib.contextmanager
+def profiled_phase(profiler: PhaseProfiler | None, name: str) -> Iterator[None]:
+    """Profile the block as phase ``name``, or just run it when there is no profiler."""
+    if profiler is None:
+        yield
+        return
+    with profiler.phase(name):
+        yield
+
+
+class ProfileStore:
+    def __init__(self, redis_client: Redis | None = None, ttl_seconds: int | None = None) -> None:
+        self._redis = redis_client
+        self._ttl = config.get_profile_ttl_seconds() if ttl_seconds is None else ttl_seconds
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = _get_redis()
+        return self._redis
+
+    def save(self, profile_id: str, profiler: PhaseProfiler) -> bool:
+        """Store the profile under ``profile_id``. Returns False if Redis could not be written to."""
+        try:
+            pipeline = self._client().pipeline()
+            pipeline.set(f"{_KEY_PREFIX}{profile_id}:pstats", profiler.pstats_bytes(), ex=self._ttl)
+            pipeline.set(f"{_KEY_PREFIX}{profile_id}:phases", json.dumps(profiler.phase_seconds), ex=self._ttl)
+            pipeline.execute()
+        except RedisError as exc:
+            logger.warning("Saving profile failed", profile_id=profile_id, error=str(exc))
+            return False
+        return True
+
+    def get_pstats(self, profile_id: str) -> bytes | None:
+        try:
+            raw = self._client().get(f"{_KEY_PREFIX}{profile_id}:pstats")
+        except RedisError as exc:
+            logger.warning("Reading profile failed", profile_id=profile_id, error=str(exc))
+            return None
+        return raw if isinstance(raw, bytes) else None
+
+    def get_phase_seconds(self, profile_id: str) -> dict[str, float] | None:
+        """The wall-clock seconds of each phase, or None if there is no such profile."""
+        try:
+            raw = self._client().get(f"{_KEY_PREFIX}{profile_id}:phases")
+        except RedisError as exc:
+            logger.warning("Reading profile failed", profile_id=profile_id, error=str(exc))
+            return None
+        if not isinstance(raw, bytes):
+            return None
+        phases: dict[str, float] = json.loads(raw)
+        return phases
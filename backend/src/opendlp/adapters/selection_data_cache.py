@@ -0,0 +1,285 @@
+"""ABOUTME: Redis-backed cache of parsed selection data (targets and respondents) per assembly
+ABOUTME: Keyed by a per-assembly data version that is bumped whenever respondents or targets change"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import pickle
+import uuid
+import zlib
+from typing import TYPE_CHECKING, Any
+
+import structlog
+from redis import Redis
+from redis.exceptions import RedisError
+from sortition_algorithms.features import check_min_max
+from sqlalchemy import event
+
+from opendlp import config
+from opendlp.config import RedisCfg
+from opendlp.domain.respondents import Respondent
+from opendlp.domain.targets import TargetCategory
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sortition_algorithms import adapters
+    from sortition_algorithms.features import FeatureCollection
+    from sortition_algorithms.people import People
+    from sortition_algorithms.settings import Settings
+    from sortition_algorithms.utils import RunReport
+    from sqlalchemy.orm import Session, sessionmaker
+
+logger = structlog.get_logger(__name__)
+
+_VERSION_KEY_PREFIX = "selection_data_version:"
+_DATA_KEY_PREFIX = "selection_data:"
+# session.info key collecting the assemblies whose respondents/targets changed in
+# the current transaction. Their versions are bumped once the transaction commits.
+_CHANGED_ASSEMBLIES_KEY = "selection_data_changed_assemblies"
+
+
+class SelectionDataUnavailable(Exception):
+    """Raised when data shared for a version can no longer be used.
+
+    ``changed`` is True when the assembly's respondents or targets have been edited
+    since, and False when the shared copy has expired from Redis.
+    """
+
+    def __init__(self, message: str, *, changed: bool) -> None:
+        super().__init__(message)
+        self.changed = changed
+
+
+def _get_redis() -> Redis:
+    cfg = RedisCfg.from_env()
+    # decode_responses=False because the cached payloads are compressed pickles.
+    return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+
+
+def _version_key(assembly_id: uuid.UUID) -> str:
+    return f"{_VERSION_KEY_PREFIX}{assembly_id}"
+
+
+def get_data_version(assembly_id: uuid.UUID, redis_client: Redis | None = None) -> str:
+    """Return the current data version token for an assembly, creating one if needed.
+
+    Versions are opaque random tokens rather than counters: if Redis evicts or
+    loses the version key, the replacement token can never match data cached
+    under an earlier one.
+    """
+    r = redis_client or _get_redis()
+    key = _version_key(assembly_id)
+    r.set(key, uuid.uuid4().hex, nx=True)
+    raw: bytes | str | None = r.get(key)
+    assert raw is not None
+    return raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+
+def bump_data_versions(assembly_ids: Iterable[uuid.UUID], redis_client: Redis | None = None) -> None:
+    """Invalidate cached data for these assemblies by giving each a new version.
+
+    Runs even when the parsed data cache is disabled, as other results (such as
+    the detailed target check) are also keyed by the data version. Redis failures
+    are logged rather than raised - this runs after the database transaction has
+    already committed.
+    """
+    try:
+        r = redis_client or _get_redis()
+        pipe = r.pipeline(transaction=False)
+        for assembly_id in assembly_ids:
+            pipe.set(_version_key(assembly_id), uuid.uuid4().hex)
+        pipe.execute()
+    except RedisError as exc:
+        logger.warning("Could not bump selection data versions", error=str(exc))
+
+
+def mark_selection_data_changed(session: Session, assembly_id: uuid.UUID) -> None:
+    """Record that an assembly's respondents or targets changed in this session's transaction.
+
+    The ORM listeners registered by ``register_change_tracking`` catch changes to
+    mapped objects. Repository methods that bypass the unit of work (bulk inserts,
+    ``update``/``delete`` statements) must call this themselves.
+    """
+    session.info.setdefault(_CHANGED_ASSEMBLIES_KEY, set()).add(assembly_id)
+
+
+def _collect_changed_assemblies(session: Session, flush_context: Any, instances: Any) -> None:
+    for obj in itertools.chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Respondent | TargetCategory):
+            mark_selection_data_changed(session, obj.assembly_id)
+
+
+def _bump_after_commit(session: Session) -> None:
+    changed = session.info.pop(_CHANGED_ASSEMBLIES_KEY, None)
+    if changed:
+        bump_data_versions(changed)
+
+
+def _forget_after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_ASSEMBLIES_KEY, None)
+
+
+def register_change_tracking(session_factory: sessionmaker) -> None:
+    """Bump data versions for every assembly whose respondents or targets a session commits."""
+    event.listen(session_factory, "before_flush", _collect_changed_assemblies)
+    event.listen(session_factory, "after_commit", _bump_after_commit)
+    event.listen(session_factory, "after_rollback", _forget_after_rollback)
+
+
+def _settings_fingerprint(settings: Settings) -> str:
+    """Hash the settings that change how respondents are parsed (not how they are selected)."""
+    relevant = [
+        settings.id_column,
+        settings.full_columns_to_keep,
+        settings.check_same_address,
+        settings.check_same_address_columns,
+    ]
+    return hashlib.sha256(json.dumps(relevant).encode("utf-8")).hexdigest()[:16]
+
+
+def _dumps(value: Any) -> bytes:
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+
+def _loads(raw: bytes) -> Any:
+    # Only ever holds payloads written by this module, never user-supplied bytes.
+    return pickle.loads(zlib.decompress(raw))  # noqa: S301
+
+
+def _shared_key(assembly_id: uuid.UUID, data_version: str, settings: Settings) -> str:
+    return f"{_DATA_KEY_PREFIX}{assembly_id}:{data_version}:shared:{_settings_fingerprint(settings)}"
+
+
+def share_selection_data(
+    assembly_id: uuid.UUID,
+    data_version: str,
+    settings: Settings,
+    features: FeatureCollection,
+    people: People,
+    ttl_seconds: int,
+    redis_client: Redis | None = None,
+) -> None:
+    """Store parsed data for tasks that are sent ``data_version`` and must use exactly this data.
+
+    Unlike the cache this is written whatever its TTL setting, and Redis errors are
+    raised: the tasks that need it have no other way to get the same data.
+    """
+    r = redis_client or _get_redis()
+    r.set(_shared_key(assembly_id, data_version, settings), _dumps((features, people)), ex=ttl_seconds)
+
+
+def load_shared_selection_data(
+    assembly_id: uuid.UUID, data_version: str, settings: Settings, redis_client: Redis | None = None
+) -> tuple[FeatureCollection, People]:
+    """Return the data stored by ``share_selection_data`` - never a fresh parse.
+
+    Raises SelectionDataUnavailable if the assembly's data has changed since
+    ``data_version`` was read, or if the shared copy has expired.
+    """
+    r = redis_client or _get_redis()
+    if get_data_version(assembly_id, redis_client=r) != data_version:
+        raise SelectionDataUnavailable(
+            f"Selection data for assembly {assembly_id} changed after version {data_version!r}", changed=True
+        )
+    raw = r.get(_shared_key(assembly_id, data_version, settings))
+    if not isinstance(raw, bytes):
+        raise SelectionDataUnavailable(
+            f"Shared selection data for assembly {assembly_id} version {data_version!r} has expired", changed=False
+        )
+    features, people = _loads(raw)
+    return features, people
+
+
+class CachedSelectionData:
+    """Wraps ``SelectionData`` so parsed targets and respondents are shared between calls.
+
+    Offers the same ``load_features``/``load_people`` interface, so the data check,
+    the targets page check and the selection task can all reuse one parse for as
+    long as the assembly's data version is unchanged. Misses parse through the
+    wrapped ``SelectionData`` as usual; failures are never cached, so error paths
+    behave exactly as before. With the cache disabled (a TTL of 0) or Redis
+    unreachable this is a plain pass-through.
+
+    Pass ``fill_cache=False`` when reading from the replica: it may lag behind the
+    version token, so what it parses must not be stored under that version.
+    """
+
+    def __init__(
+        self,
+        select_data: adapters.SelectionData,
+        assembly_id: uuid.UUID,
+        *,
+        eligible_only: bool = True,
+        redis_client: Redis | None = None,
+        ttl_seconds: int | None = None,
+        fill_cache: bool = True,
+    ) -> None:
+        self.select_data = select_data
+        self.assembly_id = assembly_id
+        self.eligible_only = eligible_only
+        self._redis = redis_client
+        self._ttl = config.get_selection_data_cache_ttl_seconds() if ttl_seconds is None else ttl_seconds
+        self._fill_cache = fill_cache
+        # Read once per instance so features and people always come from the same version.
+        self._version: str | None = None
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            self._redis = _get_redis()
+        return self._redis
+
+    def _data_key(self, part: str) -> str:
+        if self._version is None:
+            self._version = get_data_version(self.assembly_id, redis_client=self._client())
+        return f"{_DATA_KEY_PREFIX}{self.assembly_id}:{self._version}:{part}"
+
+    def _get(self, part: str) -> Any:
+        try:
+            raw = self._client().get(self._data_key(part))
+        except RedisError as exc:
+            logger.warning("Selection data cache read failed", assembly_id=self.assembly_id, error=str(exc))
+            return None
+        if not isinstance(raw, bytes):
+            return None
+        return _loads(raw)
+
+    def _set(self, part: str, value: Any) -> None:
+        if not self._fill_cache:
+            return
+        try:
+            self._client().set(self._data_key(part), _dumps(value), ex=self._ttl)
+        except RedisError as exc:
+            logger.warning("Selection data cache write failed", assembly_id=self.assembly_id, error=str(exc))
+
+    def load_features(self, number_to_select: int = 0) -> tuple[FeatureCollection, RunReport]:
+        if not self._ttl:
+            return self.select_data.load_features(number_to_select)
+
+        cached = self._get("features")
+        if cached is None:
+            features, report = self.select_data.load_features()
+            self._set("features", (features, report, self.select_data.feature_column_name))
+        else:
+            features, report, self.select_data.feature_column_name = cached
+        # The cached collection is parsed without a number to select, so the check
+        # load_features(number_to_select) would have made is applied here instead.
+        check_min_max(
+            features, number_to_select=number_to_select, feature_column_name=self.select_data.feature_column_name
+        )
+        return features, report
+
+    def load_people(self, settings: Settings, features: FeatureCollection) -> tuple[People, RunReport]:
+        if not self._ttl:
+            return self.select_data.load_people(settings, features)
+
+        part = f"people:{int(self.eligible_only)}:{_settings_fingerprint(settings)}"
+        cached = self._get(part)
+        if cached is not None:
+            people, report = cached
+            return people, report
+        people, report = self.select_data.load_people(settings, features)
+        self._set(part, (people, report))
+        return people, report
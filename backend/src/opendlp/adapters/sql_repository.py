@@ -3,20 +3,29 @@ ABOUTME: Provides concrete database operations using SQLAlchemy sessions"""
 
 from __future__ import annotations
 
+from dataclasses import fields
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
 from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import defer
 
 from opendlp.adapters import orm
+from opendlp.adapters.blob_store import DOCUMENTS, IMAGE_VARIANTS, IMAGES, BlobStoreError
+from opendlp.adapters.selection_data_cache import mark_selection_data_changed
 from opendlp.domain.assembly import Assembly, AssemblyGSheet, SelectionRunRecord
 from opendlp.domain.assembly_respondent_gsheet import AssemblyRespondentGSheet
 from opendlp.domain.email_confirmation import EmailConfirmationToken
 from opendlp.domain.email_send_record import RespondentEmailSendRecord
 from opendlp.domain.email_template import EmailTemplate
 from opendlp.domain.password_reset import PasswordResetToken
-from opendlp.domain.registration_document import RegistrationDocument
-from opendlp.domain.registration_image import RegistrationImage
+from opendlp.domain.registration_document import RegistrationDocument, RegistrationDocumentSummary
+from opendlp.domain.registration_image import (
+    ImageVariantInfo,
+    RegistrationImage,
+    RegistrationImageSummary,
+    RegistrationImageVariant,
+)
 from opendlp.domain.registration_page import RegistrationPage, RegistrationPageHtml
 from opendlp.domain.respondent_field_schema import (
     GROUP_DISPLAY_ORDER,
@@ -26,6 +35,7 @@ from opendlp.domain.respondents import Respondent
 from opendlp.domain.targets import TargetCategory
 from opendlp.domain.totp_attempts import TotpVerificationAttempt
 from opendlp.domain.two_factor_audit import TwoFactorAuditLog
+from opendlp.domain.uploads import UPLOAD_CHUNK_BYTES, StoredUploadInfo
 from opendlp.domain.user_backup_codes import UserBackupCode
 from opendlp.domain.user_invites import UserInvite
 from opendlp.domain.users import User, UserAssemblyRole
@@ -46,6 +56,7 @@ from opendlp.service_layer.repositories import (
     PasswordResetTokenRepository,
     RegistrationDocumentRepository,
     RegistrationImageRepository,
+    RegistrationImageVariantRepository,
     RegistrationPageHtmlRepository,
     RegistrationPageRepository,
     RespondentEmailSendRecordRepository,
@@ -63,10 +74,13 @@ from opendlp.service_layer.repositories import (
 
 if TYPE_CHECKING:
     import uuid
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
 
+    from sqlalchemy import Table
     from sqlalchemy.orm import Session
 
+    from opendlp.adapters.blob_store import BlobStore
+
 
 class SqlAlchemyRepository:
     """Base SQLAlchemy repository with common functionality."""
@@ -75,6 +89,86 @@ class SqlAlchemyRepository:
         self.session = session
 
 
+def _stored_upload_info(session: Session, table: Table, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+    """The metadata columns of an uploaded file's row, leaving its ``data`` column unread."""
+    row = session.execute(
+        select(
+            table.c.id,
+            table.c.sha256,
+            table.c.byte_size,
+            table.c.original_filename,
+            table.c.data.is_(None).label("in_blob_store"),
+        ).where(table.c.assembly_id == assembly_id, table.c.sha256 == sha256)
+    ).first()
+    if row is None:
+        return None
+    return StoredUploadInfo(
+        id=row.id,
+        sha256=row.sha256,
+        byte_size=row.byte_size,
+        original_filename=row.original_filename,
+        in_blob_store=row.in_blob_store,
+    )
+
+
+def _iter_stored_upload_data(
+    session: Session, table: Table, item_id: uuid.UUID, chunk_size: int, offset: int = 0
+) -> Iterator[bytes]:
+    """Read an uploaded file's ``data`` column one ``substr`` at a time, so no query returns all of it."""
+    while True:
+        chunk = session.execute(
+            select(func.substr(table.c.data, offset + 1, chunk_size)).where(table.c.id == item_id)
+        ).scalar()
+        if not chunk:
+            return
+        yield bytes(chunk)
+        if len(chunk) < chunk_size:
+            return
+        offset += chunk_size
+
+
+_IMAGE_SUMMARY_COLUMNS = [field.name for field in fields(RegistrationImageSummary)]
+_DOCUMENT_SUMMARY_COLUMNS = [field.name for field in fields(RegistrationDocumentSummary)]
+
+
+class SqlAlchemyStoredUploadRepository(SqlAlchemyRepository):
+    """Keeps an upload's bytes in its row, or in a blob store when one is configured.
+
+    A row whose ``data`` is NULL has its bytes in the blob store under its sha256.
+    """
+
+    table: Table
+    blob_kind: str
+
+    def __init__(self, session: Session, blob_store: BlobStore | None = None) -> None:
+        super().__init__(session)
+        self.blob_store = blob_store
+
+    def _add_upload(self, item: RegistrationImage | RegistrationDocument | RegistrationImageVariant) -> None:
+        if self.blob_store is not None and item.data is not None:
+            self.blob_store.put(self.blob_kind, item.sha256, item.data)
+            item.data = None
+        self.session.add(item)
+
+    def _iter_upload_data(self, item_id: uuid.UUID, chunk_size: int, offset: int = 0) -> Iterator[bytes]:
+        row = self.session.execute(
+            select(self.table.c.sha256, self.table.c.data.is_(None).label("in_blob_store")).where(
+                self.table.c.id == item_id
+            )
+        ).first()
+        if row is None:
+            return
+        if not row.in_blob_store:
+            yield from _iter_stored_upload_data(self.session, self.table, item_id, chunk_size, offset)
+            return
+        if self.blob_store is None:
+            raise BlobStoreError(
+                f"{self.blob_kind} {item_id} is in the blob store but BLOB_STORE is postgres; "
+                "run `opendlp blobs restore` before switching back"
+            )
+        yield from self.blob_store.iter_chunks(self.blob_kind, row.sha256, chunk_size, offset)
+
+
 class SqlAlchemyUserRepository(SqlAlchemyRepository, UserRepository):
     """SQLAlchemy implementation of UserRepository."""
 
@@ -554,12 +648,15 @@ class SqlAlchemyRegistrationPageHtmlRepository(SqlAlchemyRepository, Registratio
         self.session.delete(item)
 
 
-class SqlAlchemyRegistrationImageRepository(SqlAlchemyRepository, RegistrationImageRepository):
+class SqlAlchemyRegistrationImageRepository(SqlAlchemyStoredUploadRepository, RegistrationImageRepository):
     """SQLAlchemy implementation of RegistrationImageRepository."""
 
+    table = orm.registration_images
+    blob_kind = IMAGES
+
     def add(self, item: RegistrationImage) -> None:
-        """Add a RegistrationImage to the repository."""
-        self.session.add(item)
+        """Add a RegistrationImage to the repository, writing its bytes to the blob store if there is one."""
+        self._add_upload(item)
 
     def get(self, item_id: uuid.UUID) -> RegistrationImage | None:
         """Get a RegistrationImage by its ID."""
@@ -573,15 +670,23 @@ class SqlAlchemyRegistrationImageRepository(SqlAlchemyRepository, RegistrationIm
         """Get an image for a page by its content hash, or None."""
         return self.session.query(RegistrationImage).filter_by(assembly_id=assembly_id, sha256=sha256).first()
 
-    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationImage]:
-        """Get all images for a registration page, oldest first."""
-        return (
-            self.session
-            .query(RegistrationImage)
-            .filter_by(assembly_id=assembly_id)
-            .order_by(orm.registration_images.c.created_at)
-            .all()
-        )
+    def get_info_by_assembly_and_sha(self, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+        """Get the metadata of a page's image by its content hash, without loading its bytes."""
+        return _stored_upload_info(self.session, orm.registration_images, assembly_id, sha256)
+
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of an image from ``offset`` on, in pieces of at most ``chunk_size``."""
+        return self._iter_upload_data(item_id, chunk_size, offset)
+
+    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationImageSummary]:
+        """Get the metadata of all of an assembly's images, oldest first, without their bytes."""
+        table = orm.registration_images
+        rows = self.session.execute(
+            select(*(table.c[name] for name in _IMAGE_SUMMARY_COLUMNS))
+            .where(table.c.assembly_id == assembly_id)
+            .order_by(table.c.created_at)
+        ).all()
+        return [RegistrationImageSummary(**row._asdict()) for row in rows]
 
     def count_by_assembly_id(self, assembly_id: uuid.UUID) -> int:
         """Count images for a registration page."""
@@ -592,12 +697,72 @@ class SqlAlchemyRegistrationImageRepository(SqlAlchemyRepository, RegistrationIm
         self.session.delete(item)
 
 
-class SqlAlchemyRegistrationDocumentRepository(SqlAlchemyRepository, RegistrationDocumentRepository):
+class SqlAlchemyRegistrationImageVariantRepository(
+    SqlAlchemyStoredUploadRepository, RegistrationImageVariantRepository
+):
+    """SQLAlchemy implementation of RegistrationImageVariantRepository."""
+
+    table = orm.registration_image_variants
+    blob_kind = IMAGE_VARIANTS
+
+    def add(self, item: RegistrationImageVariant) -> None:
+        """Add a variant to the repository, writing its bytes to the blob store if there is one."""
+        self._add_upload(item)
+
+    def get(self, item_id: uuid.UUID) -> RegistrationImageVariant | None:
+        """Get a RegistrationImageVariant by its ID."""
+        return self.session.query(RegistrationImageVariant).filter_by(id=item_id).first()
+
+    def all(self) -> Iterable[RegistrationImageVariant]:
+        """Get all RegistrationImageVariants."""
+        return self.session.query(RegistrationImageVariant).all()
+
+    def list_info_by_image_id(self, image_id: uuid.UUID) -> list[ImageVariantInfo]:
+        """Get the metadata of an image's variants, without their bytes."""
+        table = orm.registration_image_variants
+        rows = self.session.execute(
+            select(
+                table.c.id,
+                table.c.image_format,
+                table.c.width,
+                table.c.byte_size,
+                table.c.sha256,
+                table.c.data.is_(None).label("in_blob_store"),
+            ).where(table.c.image_id == image_id)
+        ).all()
+        return [ImageVariantInfo(**row._asdict()) for row in rows]
+
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of a variant from ``offset`` on, in pieces of at most ``chunk_size``."""
+        return self._iter_upload_data(item_id, chunk_size, offset)
+
+    def list_image_ids_without_variants(self, created_before: datetime, limit: int) -> list[uuid.UUID]:
+        """Get the ids of up to ``limit`` images created before ``created_before`` with no variants, oldest first.
+
+        Images whose variants failed to render are left out.
+        """
+        images = orm.registration_images
+        variants = orm.registration_image_variants
+        has_variants = select(variants.c.id).where(variants.c.image_id == images.c.id).exists()
+        return list(
+            self.session.execute(
+                select(images.c.id)
+                .where(~has_variants, images.c.variants_failed_at.is_(None), images.c.created_at < created_before)
+                .order_by(images.c.created_at)
+                .limit(limit)
+            ).scalars()
+        )
+
+
+class SqlAlchemyRegistrationDocumentRepository(SqlAlchemyStoredUploadRepository, RegistrationDocumentRepository):
     """SQLAlchemy implementation of RegistrationDocumentRepository."""
 
+    table = orm.registration_documents
+    blob_kind = DOCUMENTS
+
     def add(self, item: RegistrationDocument) -> None:
-        """Add a RegistrationDocument to the repository."""
-        self.session.add(item)
+        """Add a RegistrationDocument to the repository, writing its bytes to the blob store if there is one."""
+        self._add_upload(item)
 
     def get(self, item_id: uuid.UUID) -> RegistrationDocument | None:
         """Get a RegistrationDocument by its ID."""
@@ -611,15 +776,23 @@ class SqlAlchemyRegistrationDocumentRepository(SqlAlchemyRepository, Registratio
         """Get a document for a page by its content hash, or None."""
         return self.session.query(RegistrationDocument).filter_by(assembly_id=assembly_id, sha256=sha256).first()
 
-    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationDocument]:
-        """Get all documents for a registration page, oldest first."""
-        return (
-            self.session
-            .query(RegistrationDocument)
-            .filter_by(assembly_id=assembly_id)
-            .order_by(orm.registration_documents.c.created_at)
-            .all()
-        )
+    def get_info_by_assembly_and_sha(self, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+        """Get the metadata of a page's document by its content hash, without loading its bytes."""
+        return _stored_upload_info(self.session, orm.registration_documents, assembly_id, sha256)
+
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of a document from ``offset`` on, in pieces of at most ``chunk_size``."""
+        return self._iter_upload_data(item_id, chunk_size, offset)
+
+    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationDocumentSummary]:
+        """Get the metadata of all of an assembly's documents, oldest first, without their bytes."""
+        table = orm.registration_documents
+        rows = self.session.execute(
+            select(*(table.c[name] for name in _DOCUMENT_SUMMARY_COLUMNS))
+            .where(table.c.assembly_id == assembly_id)
+            .order_by(table.c.created_at)
+        ).all()
+        return [RegistrationDocumentSummary(**row._asdict()) for row in rows]
 
     def count_by_assembly_id(self, assembly_id: uuid.UUID) -> int:
         """Count documents for a registration page."""
@@ -785,6 +958,29 @@ class SqlAlchemySelectionRunRecordRepository(SqlAlchemyRepository, SelectionRunR
 
         return [(record, user) for record, user in results], total_count
 
+    # Run records can carry every respondent id; timing summaries need none of them.
+    _NOT_NEEDED_FOR_TIMINGS = (
+        "log_messages",
+        "selected_ids",
+        "remaining_ids",
+        "run_report",
+        "targets_used",
+        "progress",
+    )
+
+    def get_timed_runs(self, limit: int = 1000) -> list[SelectionRunRecord]:
+        """Get up to ``limit`` completed runs with a recorded pool size, newest first, without the large columns."""
+        return (
+            self.session
+            .query(SelectionRunRecord)
+            .options(*(defer(getattr(SelectionRunRecord, name)) for name in self._NOT_NEEDED_FOR_TIMINGS))
+            .filter(orm.selection_run_records.c.status == SelectionRunStatus.COMPLETED.value)
+            .filter(orm.selection_run_records.c.pool_size.is_not(None))
+            .order_by(orm.selection_run_records.c.created_at.desc())
+            .limit(limit)
+            .all()
+        )
+
 
 class SqlAlchemyPasswordResetTokenRepository(SqlAlchemyRepository, PasswordResetTokenRepository):
     """SQLAlchemy implementation of PasswordResetTokenRepository."""
@@ -1090,10 +1286,17 @@ class SqlAlchemyTargetCategoryRepository(SqlAlchemyRepository, TargetCategoryRep
     def delete(self, item: TargetCategory) -> None:
         self.session.delete(item)
 
+    def bulk_add(self, items: list[TargetCategory]) -> None:
+        # bulk_save_objects bypasses the unit of work, so the flush listener never sees these
+        for assembly_id in {item.assembly_id for item in items}:
+            mark_selection_data_changed(self.session, assembly_id)
+        self.session.bulk_save_objects(items)
+
     def delete_all_for_assembly(self, assembly_id: uuid.UUID) -> int:
         # Expire cached instances so subsequent inserts with the same
         # unique constraint values (assembly_id, name) don't collide.
         self.session.expire_all()
+        mark_selection_data_changed(self.session, assembly_id)
         result = self.session.execute(
             delete(orm.target_categories).where(orm.target_categories.c.assembly_id == assembly_id)
         )
@@ -1236,11 +1439,15 @@ class SqlAlchemyRespondentRepository(SqlAlchemyRepository, RespondentRepository)
         self.session.delete(item)
 
     def bulk_add(self, items: list[Respondent]) -> None:
+        # bulk_save_objects bypasses the unit of work, so the flush listener never sees these
+        for assembly_id in {item.assembly_id for item in items}:
+            mark_selection_data_changed(self.session, assembly_id)
         self.session.bulk_save_objects(items)
 
     def delete_all_for_assembly(self, assembly_id: uuid.UUID) -> int:
         """Delete all respondents for an assembly."""
         self.session.expire_all()
+        mark_selection_data_changed(self.session, assembly_id)
         result = self.session.execute(delete(orm.respondents).where(orm.respondents.c.assembly_id == assembly_id))
         return result.rowcount  # type: ignore[attr-defined, no-any-return]
 
@@ -1286,6 +1493,7 @@ class SqlAlchemyRespondentRepository(SqlAlchemyRepository, RespondentRepository)
             .count()
         )
         if count:
+            mark_selection_data_changed(self.session, assembly_id)
             self.session.execute(
                 update(orm.respondents)
                 .where(
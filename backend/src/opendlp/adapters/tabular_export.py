@@ -3,6 +3,7 @@ ABOUTME: TabularData plus an in-memory CsvExportTarget, sharing one write interf
 
 import csv
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
 from io import StringIO
 
@@ -15,7 +16,13 @@ class ExportTargetError(Exception):
 
     Raised when the destination itself fails (for example a Google Sheet that is
     missing or not shared with the service account), so entrypoints can surface a
-    controlled message without depending on any concrete backend's exceptions."""
+    controlled message without depending on any concrete backend's exceptions.
+    ``access_denied`` is True only when the destination was missing or refused
+    access, which the user can fix by sharing it or correcting its address."""
+
+    def __init__(self, message: str, *, access_denied: bool = False) -> None:
+        super().__init__(message)
+        self.access_denied = access_denied
 
 
 @dataclass(frozen=True)
@@ -48,10 +55,14 @@ class AbstractGSheetExportTarget(AbstractTabularExportTarget):
     (``result_url``) and the containing spreadsheet's own title
     (``result_title``), so the caller can persist and display them. Both are
     blank until a write has happened.
+
+    A caller that wants progress sets ``on_progress``; targets call it with
+    (rows written, total rows) as the rows go out.
     """
 
     result_url: str = ""
     result_title: str = ""
+    on_progress: Callable[[int, int], None] | None = None
 
 
 class CsvExportTarget(AbstractTabularExportTarget):
@@ -4,6 +4,7 @@ from pathlib import Path
 
 from flask import Flask, current_app
 from sortition_algorithms import adapters
+from sqlalchemy import Engine
 from sqlalchemy.orm import sessionmaker
 
 from opendlp import config
@@ -26,16 +27,29 @@ def bootstrap_session_factory(
         database.start_mappers()
 
     if session_factory is None:
-        db_uri = get_db_uri()
-        cached = _session_factory_cache.get(db_uri)
-        if cached is None:
-            cached = database.create_session_factory(db_uri)
-            _session_factory_cache[db_uri] = cached
-        session_factory = cached
+        session_factory = _cached_session_factory(get_db_uri())
 
     return session_factory
 
 
+def _cached_session_factory(db_uri: str) -> sessionmaker:
+    cached = _session_factory_cache.get(db_uri)
+    if cached is None:
+        cached = database.create_session_factory(db_uri)
+        _session_factory_cache[db_uri] = cached
+    return cached
+
+
+def bootstrap_replica_session_factory(start_orm: bool = True) -> sessionmaker | None:
+    """Session factory for the read replica in DB_REPLICA_URI, or None when there is no replica."""
+    replica_uri = config.get_db_replica_uri()
+    if not replica_uri:
+        return None
+    if start_orm:
+        database.start_mappers()
+    return _cached_session_factory(replica_uri)
+
+
 def dispose_cached_engines() -> None:
     """Dispose all engines cached by ``bootstrap_session_factory`` and clear the cache.
 
@@ -50,6 +64,11 @@ def dispose_cached_engines() -> None:
     _session_factory_cache.clear()
 
 
+def cached_engines() -> list[Engine]:
+    """The engines behind the session factories cached in this process, e.g. to report pool usage."""
+    return [factory.kw["bind"] for factory in _session_factory_cache.values()]
+
+
 def bootstrap(
     start_orm: bool = True,
     uow: unit_of_work.AbstractUnitOfWork | None = None,
@@ -71,6 +90,30 @@ def default_uow_factory() -> unit_of_work.AbstractUnitOfWork:
     return unit_of_work.SqlAlchemyUnitOfWork(bootstrap_session_factory())
 
 
+def default_read_uow_factory() -> unit_of_work.AbstractUnitOfWork:
+    """Production read-only UnitOfWork factory: reads from the replica if there is one, else the primary."""
+    return unit_of_work.ReadOnlySqlAlchemyUnitOfWork(
+        bootstrap_session_factory(),
+        replica_session_factory=bootstrap_replica_session_factory(),
+        max_lag_seconds=config.get_db_replica_max_lag_seconds(),
+    )
+
+
+def get_flask_read_uow(max_lag_seconds: float | None = None) -> unit_of_work.AbstractUnitOfWork:
+    """Return a read-only UnitOfWork for heavy reads in the current request (exports, reports, histograms).
+
+    It reads from the replica in DB_REPLICA_URI when one is configured and caught up to
+    within ``max_lag_seconds`` (default DB_REPLICA_MAX_LAG_SECONDS), and from the primary
+    otherwise. Pass a small ``max_lag_seconds`` where the page must show data written just before.
+    The factory is ``app.extensions["read_uow_factory"]``, registered by ``create_app``.
+    """
+    factory: UowFactory = current_app.extensions.get("read_uow_factory", default_read_uow_factory)
+    uow = factory()
+    if max_lag_seconds is not None and isinstance(uow, unit_of_work.ReadOnlySqlAlchemyUnitOfWork):
+        uow.max_lag_seconds = max_lag_seconds
+    return uow
+
+
 def get_flask_uow() -> unit_of_work.AbstractUnitOfWork:
     """Return a UnitOfWork for the current request, using the app-configured factory.
 
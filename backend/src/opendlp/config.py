@@ -14,7 +14,6 @@ from functools import cache
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-import sortition_algorithms.settings
 from cachelib.file import FileSystemCache
 from cachelib.simple import SimpleCache
 from dotenv import load_dotenv
@@ -84,6 +83,101 @@ def get_db_uri() -> str:
     return os.environ.get("DB_URI", PostgresCfg.from_env().to_url())
 
 
+PROCESS_ROLES = ("web", "worker", "beat")
+
+# Default (pool_size, max_overflow) per process role. With the defaults, 5 celery
+# workers + beat + 2 gunicorn workers burst to at most 7 * (3 + 7) + (1 + 1) = 72
+# connections against postgres max_connections=100, leaving headroom for psql/admin.
+_DEFAULT_POOL_SIZES = {"web": (3, 7), "worker": (3, 7), "beat": (1, 1)}
+
+
+def get_process_role() -> str:
+    """The kind of process this is - web, worker or beat - for sizing its database pool.
+
+    Celery marks its worker and beat processes itself (see ``entrypoints/celery/app.py``),
+    so anything else is a web process unless this says otherwise.
+    Environment variable: ``OPENDLP_PROCESS_ROLE``.
+    """
+    role = os.environ.get("OPENDLP_PROCESS_ROLE", "").strip().lower() or "web"
+    if role not in PROCESS_ROLES:
+        logger.warning(f"Invalid OPENDLP_PROCESS_ROLE value '{role}'. Using web.")
+        return "web"
+    return role
+
+
+WEB_SURFACES = ("all", "public")
+
+
+def get_web_surface() -> str:
+    """Which routes this web process serves: "all", or "public" for just the registration form.
+
+    A "public" process skips importing the backoffice, selection, targets and
+    respondent blueprints, so it boots faster and can be scaled on its own
+    behind a proxy that sends it ``/register``, ``/r`` and ``/registration-closed``.
+    Environment variable: ``OPENDLP_WEB_SURFACE``.
+    """
+    surface = os.environ.get("OPENDLP_WEB_SURFACE", "").strip().lower() or "all"
+    if surface not in WEB_SURFACES:
+        logger.warning(f"Invalid OPENDLP_WEB_SURFACE value '{surface}'. Using all.")
+        return "all"
+    return surface
+
+
+def _role_int_env(role: str, name: str, default: int, minimum: int, maximum: int) -> int:
+    """``DB_<ROLE>_<NAME>`` if set, else ``DB_<NAME>``, else ``default``."""
+    role_key = f"DB_{role.upper()}_{name}"
+    if os.environ.get(role_key, ""):
+        return _clamped_int_env(role_key, default, minimum, maximum)
+    return _clamped_int_env(f"DB_{name}", default, minimum, maximum)
+
+
+@dataclass(slots=True, kw_only=True)
+class DBPoolCfg:
+    """SQLAlchemy connection pool settings for one process role.
+
+    Each setting can be set for every role (``DB_POOL_SIZE``) or for one role
+    (``DB_WORKER_POOL_SIZE``), the latter taking precedence. ``DB_PGBOUNCER``
+    switches to a pool-less mode for PgBouncer in transaction pooling mode.
+    """
+
+    role: str
+    pool_size: int
+    max_overflow: int
+    pool_timeout: int
+    pool_recycle: int
+    pgbouncer: bool = False
+
+    @classmethod
+    def from_env(cls, role: str = "") -> "DBPoolCfg":
+        role = role or get_process_role()
+        default_size, default_overflow = _DEFAULT_POOL_SIZES[role]
+        return DBPoolCfg(
+            role=role,
+            pool_size=_role_int_env(role, "POOL_SIZE", default_size, 1, 100),
+            max_overflow=_role_int_env(role, "MAX_OVERFLOW", default_overflow, 0, 200),
+            pool_timeout=_role_int_env(role, "POOL_TIMEOUT", 30, 1, 600),
+            pool_recycle=_role_int_env(role, "POOL_RECYCLE", 3600, 60, 86400),
+            pgbouncer=bool_environ_get("DB_PGBOUNCER"),
+        )
+
+
+def get_db_replica_uri() -> str:
+    """URI of a read-only streaming replica for exports and reports, or "" to read everything from the primary.
+
+    Environment variable: ``DB_REPLICA_URI``.
+    """
+    return os.environ.get("DB_REPLICA_URI", "").strip()
+
+
+def get_db_replica_max_lag_seconds() -> int:
+    """How far behind the primary the replica may be before reads go to the primary instead.
+
+    Default 30. Bounded to [0, 3600].
+    Environment variable: ``DB_REPLICA_MAX_LAG_SECONDS``.
+    """
+    return _clamped_int_env("DB_REPLICA_MAX_LAG_SECONDS", 30, 0, 3600)
+
+
 def get_api_url() -> str:
     host = os.environ.get("API_HOST", "localhost")
     port = 5005 if host == "localhost" else 80
@@ -372,6 +466,122 @@ def get_max_documents_per_assembly() -> int:
     return _clamped_int_env("MAX_DOCUMENTS_PER_ASSEMBLY", 5, 1, 20)
 
 
+BLOB_STORES = ("postgres", "filesystem")
+BLOB_SENDFILE_MODES = ("", "x-accel-redirect", "x-sendfile")
+
+
+def get_blob_store() -> str:
+    """Where the bytes of new registration images and documents are kept.
+
+    "postgres" (the default) keeps them in the ``data`` column of their row;
+    "filesystem" writes each file once under ``BLOB_STORE_PATH``, named by its
+    sha256, and leaves the row holding metadata only.
+    Environment variable: ``BLOB_STORE``.
+    """
+    store = os.environ.get("BLOB_STORE", "").strip().lower() or "postgres"
+    if store not in BLOB_STORES:
+        logger.warning(f"Invalid BLOB_STORE value '{store}'. Using postgres.")
+        return "postgres"
+    return store
+
+
+def get_blob_store_path() -> Path | None:
+    """Directory of the filesystem blob store, or None when unset.
+
+    Every web and Celery container must see the same directory, e.g. a shared volume.
+    Environment variable: ``BLOB_STORE_PATH``.
+    """
+    value = os.environ.get("BLOB_STORE_PATH", "").strip()
+    return Path(value) if value else None
+
+
+def get_blob_sendfile_mode() -> str:
+    """How filesystem blobs are handed to a fronting web server instead of being sent by Python.
+
+    "" (the default) streams them from the app; "x-accel-redirect" is for nginx
+    and "x-sendfile" for Apache mod_xsendfile or lighttpd.
+    Environment variable: ``BLOB_SENDFILE``.
+    """
+    mode = os.environ.get("BLOB_SENDFILE", "").strip().lower()
+    if mode not in BLOB_SENDFILE_MODES:
+        logger.warning(f"Invalid BLOB_SENDFILE value '{mode}'. Blobs will be sent by the app.")
+        return ""
+    return mode
+
+
+def get_blob_accel_redirect_prefix() -> str:
+    """The nginx ``internal`` location that aliases ``BLOB_STORE_PATH``. Default ``/_blobs/``.
+
+    Environment variable: ``BLOB_ACCEL_REDIRECT_PREFIX``.
+    """
+    prefix = os.environ.get("BLOB_ACCEL_REDIRECT_PREFIX", "").strip() or "/_blobs/"
+    return prefix if prefix.endswith("/") else f"{prefix}/"
+
+
+def get_selection_data_cache_ttl_seconds() -> int:
+    """How long parsed selection data (targets + respondents) is kept in Redis, in seconds.
+
+    Default 3600 (one hour), or 0 when ``FLASK_ENV=testing`` so tests never share
+    parsed data through Redis. 0 disables the cache. Bounded to [0, 86400].
+    Environment variable: ``SELECTION_DATA_CACHE_TTL_SECONDS``.
+    """
+    default = 0 if os.environ.get("FLASK_ENV") == "testing" else 3600
+    return _clamped_int_env("SELECTION_DATA_CACHE_TTL_SECONDS", default, 0, 86400)
+
+
+def get_gsheet_snapshot_ttl_seconds() -> int:
+    """How long the tabs read from a Google Sheet are kept in Redis for the next task, in seconds.
+
+    Lets the selection run after a data check reuse the rows the check downloaded,
+    as long as the spreadsheet has not been edited since. Default 3600 (one hour),
+    or 0 when ``FLASK_ENV=testing``. 0 disables the snapshot. Bounded to [0, 86400].
+    Environment variable: ``GSHEET_SNAPSHOT_TTL_SECONDS``.
+    """
+    default = 0 if os.environ.get("FLASK_ENV") == "testing" else 3600
+    return _clamped_int_env("GSHEET_SNAPSHOT_TTL_SECONDS", default, 0, 86400)
+
+
+def get_selection_distribution_cache_ttl_seconds() -> int:
+    """How long panel distributions computed by maximin/leximin/nash are kept in Redis, in seconds.
+
+    A repeat selection with identical targets, respondents and settings reuses the
+    distribution and only redraws the lottery. Default 86400 (one day), or 0 when
+    ``FLASK_ENV=testing``. 0 disables the cache. Bounded to [0, 604800].
+    Environment variable: ``SELECTION_DISTRIBUTION_CACHE_TTL_SECONDS``.
+    """
+    default = 0 if os.environ.get("FLASK_ENV") == "testing" else 86400
+    return _clamped_int_env("SELECTION_DISTRIBUTION_CACHE_TTL_SECONDS", default, 0, 604800)
+
+
+def get_profiling_admin_emails() -> frozenset[str]:
+    """Emails of the admins allowed to profile requests and selection runs.
+
+    Profiling is off for everyone while this is empty, which is the default.
+    Environment variable: ``PROFILING_ADMIN_EMAILS`` (comma separated).
+    """
+    emails = os.environ.get("PROFILING_ADMIN_EMAILS", "")
+    return frozenset(email.strip().lower() for email in emails.split(",") if email.strip())
+
+
+def get_profile_ttl_seconds() -> int:
+    """How long profiles of requests and selection runs are kept in Redis, in seconds.
+
+    Default 604800 (one week). Bounded to [60, 2592000].
+    Environment variable: ``PROFILE_TTL_SECONDS``.
+    """
+    return _clamped_int_env("PROFILE_TTL_SECONDS", 604800, 60, 2592000)
+
+
+def get_metrics_token() -> str:
+    """Bearer token that Prometheus must send to scrape ``/metrics``.
+
+    Metrics are neither recorded nor served while this is empty, which is the default.
+    Set it on the web and Celery containers alike so both record their metrics.
+    Environment variable: ``METRICS_TOKEN``.
+    """
+    return os.environ.get("METRICS_TOKEN", "").strip()
+
+
 def _get_monitor_uuid_env(env_key: str) -> "uuid.UUID | None":
     value = os.environ.get(env_key, "").strip()
     if not value:
@@ -735,6 +945,10 @@ def get_solver_backend() -> str:
     """
     env_value = os.environ.get("SOLVER_BACKEND", "").strip().lower()
     if env_value:
+        # config is imported by every process first thing; sortition_algorithms
+        # (and gspread, which it loads) can wait until a solver is being picked.
+        import sortition_algorithms.settings  # noqa: PLC0415
+
         if env_value not in sortition_algorithms.settings.SOLVER_BACKENDS:
             logger.warning(
                 f"Invalid SOLVER_BACKEND value '{env_value}'. Must be one of "
@@ -14,7 +14,13 @@ from opendlp import config
 from opendlp.adapters.sortition_algorithms import CSVGSheetDataSource
 from opendlp.domain.respondents import normalise_field_name
 from opendlp.domain.validators import GoogleSpreadsheetURLValidator, validate_email
-from opendlp.domain.value_objects import AssemblyStatus, ProgressInfo, SelectionRunStatus, SelectionTaskType
+from opendlp.domain.value_objects import (
+    AssemblyStatus,
+    PhaseTiming,
+    ProgressInfo,
+    SelectionRunStatus,
+    SelectionTaskType,
+)
 from opendlp.translations import lazy_gettext as _l
 
 if TYPE_CHECKING:
@@ -274,6 +280,13 @@ class SelectionRunRecord:
     remaining_ids: list[str] | None = None  # JSON: external IDs of remaining pool at selection time
     progress: dict[str, Any] | None = None  # JSON: live progress payload written by DatabaseProgressReporter
     targets_used: list[dict[str, Any]] = field(default_factory=list)  # JSON: snapshot of target categories
+    # JSON: {phase: {"wall_seconds": float, "cpu_seconds": float}}, in the order the phases ran
+    phase_timings: dict[str, dict[str, float]] = field(default_factory=dict)
+    pool_size: int | None = None  # number of people the selection drew from
+    category_count: int | None = None  # number of target categories
+    selection_algorithm: str = ""
+    # JSON: celery ids of the tasks this run fanned out to, revoked along with celery_task_id
+    child_celery_task_ids: list[str] = field(default_factory=list)
 
     def __post_init__(self) -> None:
         if self.created_at is None:
@@ -348,3 +361,36 @@ class SelectionRunRecord:
         We always have an empty report to add new reports to.
         """
         self.run_report.add_report(report)
+
+    def add_phase_timing(self, phase: str, wall_seconds: float, cpu_seconds: float, *, replace: bool = False) -> None:
+        """Record how long a phase took, adding to any earlier time for the same phase.
+
+        Runs that repeat a phase - a stability analysis selects many times - get the total.
+        With ``replace`` the earlier time is dropped instead, for phases that are redone
+        on demand like generating the CSV downloads.
+        """
+        # Build a new dict rather than mutating in place, so the change is seen when
+        # the record is persisted without anyone having to call flag_modified.
+        timings = dict(self.phase_timings)
+        if replace:
+            timings.pop(phase, None)
+        earlier = timings.get(phase, {"wall_seconds": 0.0, "cpu_seconds": 0.0})
+        timings[phase] = {
+            "wall_seconds": round(earlier["wall_seconds"] + wall_seconds, 3),
+            "cpu_seconds": round(earlier["cpu_seconds"] + cpu_seconds, 3),
+        }
+        self.phase_timings = timings
+
+    @property
+    def timings(self) -> list[PhaseTiming]:
+        return [
+            PhaseTiming(phase=phase, wall_seconds=timing["wall_seconds"], cpu_seconds=timing["cpu_seconds"])
+            for phase, timing in self.phase_timings.items()
+        ]
+
+    @property
+    def total_wall_seconds(self) -> float | None:
+        """Seconds across all the recorded phases, or None if none were recorded."""
+        if not self.phase_timings:
+            return None
+        return round(sum(timing["wall_seconds"] for timing in self.phase_timings.values()), 3)
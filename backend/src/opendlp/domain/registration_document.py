@@ -27,13 +27,27 @@ class ValidatedDocument:
     byte_size: int
 
 
+@dataclass(frozen=True)
+class RegistrationDocumentSummary:
+    """A document's metadata without its bytes, for the editor's listings."""
+
+    id: uuid.UUID
+    assembly_id: uuid.UUID
+    byte_size: int
+    sha256: str
+    label: str
+    original_filename: str
+    created_by: uuid.UUID | None
+    created_at: datetime
+
+
 class RegistrationDocument:
     def __init__(
         self,
         assembly_id: uuid.UUID,
         byte_size: int,
         sha256: str,
-        data: bytes,
+        data: bytes | None,
         original_filename: str = "",
         label: str = "",
         created_by: uuid.UUID | None = None,
@@ -69,12 +83,13 @@ class RegistrationDocument:
             created_by=created_by,
         )
 
-    def create_detached_copy(self) -> "RegistrationDocument":
+    def create_detached_copy(self, data: bytes | None = None) -> "RegistrationDocument":
+        """A copy outside the session; pass ``data`` when the bytes are already at hand, to skip reading them."""
         return RegistrationDocument(
             assembly_id=self.assembly_id,
             byte_size=self.byte_size,
             sha256=self.sha256,
-            data=self.data,
+            data=self.data if data is None else data,
             original_filename=self.original_filename,
             label=self.label,
             created_by=self.created_by,
@@ -82,6 +97,18 @@ class RegistrationDocument:
             created_at=self.created_at,
         )
 
+    def summary(self) -> RegistrationDocumentSummary:
+        return RegistrationDocumentSummary(
+            id=self.id,
+            assembly_id=self.assembly_id,
+            byte_size=self.byte_size,
+            sha256=self.sha256,
+            label=self.label,
+            original_filename=self.original_filename,
+            created_by=self.created_by,
+            created_at=self.created_at,
+        )
+
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, RegistrationDocument):
             return False
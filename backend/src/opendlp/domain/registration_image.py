@@ -1,8 +1,9 @@
-"""ABOUTME: RegistrationImage domain model and image value objects
-ABOUTME: Holds a stored registration image plus pure <img> HTML generation"""
+"""ABOUTME: RegistrationImage domain model, its resized variants and image value objects
+ABOUTME: Holds a stored registration image, picks the variant to serve and generates <img> HTML"""
 
 import html as html_lib
 import uuid
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import UTC, datetime
 
@@ -12,16 +13,33 @@ IMAGE_CONTENT_TYPE = "image/png"
 IMAGE_FILE_EXTENSION = "png"
 ALLOWED_INPUT_FORMATS = {"PNG", "JPEG", "WEBP"}
 
+# Widths the background task renders, for srcset. Only those narrower than the
+# image itself are made; the original is always the widest candidate.
+IMAGE_VARIANT_WIDTHS = (320, 640, 1024, 1600)
+WEBP = "webp"
+PNG = "png"
+VARIANT_CONTENT_TYPES = {WEBP: "image/webp", PNG: "image/png"}
+
 __all__ = [
     "ALLOWED_INPUT_FORMATS",
     "IMAGE_CONTENT_TYPE",
     "IMAGE_FILE_EXTENSION",
+    "IMAGE_VARIANT_WIDTHS",
     "MAX_ORIGINAL_FILENAME_LENGTH",
+    "PNG",
+    "VARIANT_CONTENT_TYPES",
+    "WEBP",
     "ImageValidationError",
+    "ImageVariantInfo",
     "ProcessedImage",
     "RegistrationImage",
+    "RegistrationImageSummary",
+    "RegistrationImageVariant",
+    "choose_variant",
     "generate_image_html",
+    "image_srcset",
     "sanitise_original_filename",
+    "variant_sizes",
 ]
 
 
@@ -43,6 +61,22 @@ class ProcessedImage:
     byte_size: int
 
 
+@dataclass(frozen=True)
+class RegistrationImageSummary:
+    """An image's metadata without its bytes, for the editor's listings."""
+
+    id: uuid.UUID
+    assembly_id: uuid.UUID
+    byte_size: int
+    width: int
+    height: int
+    sha256: str
+    alt: str
+    original_filename: str
+    created_by: uuid.UUID | None
+    created_at: datetime
+
+
 class RegistrationImage:
     def __init__(
         self,
@@ -51,12 +85,13 @@ class RegistrationImage:
         width: int,
         height: int,
         sha256: str,
-        data: bytes,
+        data: bytes | None,
         alt: str = "",
         original_filename: str = "",
         created_by: uuid.UUID | None = None,
         image_id: uuid.UUID | None = None,
         created_at: datetime | None = None,
+        variants_failed_at: datetime | None = None,
     ):
         self.id = image_id or uuid.uuid4()
         self.assembly_id = assembly_id
@@ -69,6 +104,8 @@ class RegistrationImage:
         self.original_filename = original_filename
         self.created_by = created_by
         self.created_at = created_at or datetime.now(UTC)
+        # Set when rendering its variants failed, so the backfill stops retrying it.
+        self.variants_failed_at = variants_failed_at
 
     @classmethod
     def from_processed(
@@ -91,19 +128,35 @@ class RegistrationImage:
             created_by=created_by,
         )
 
-    def create_detached_copy(self) -> "RegistrationImage":
+    def create_detached_copy(self, data: bytes | None = None) -> "RegistrationImage":
+        """A copy outside the session; pass ``data`` when the bytes are already at hand, to skip reading them."""
         return RegistrationImage(
             assembly_id=self.assembly_id,
             byte_size=self.byte_size,
             width=self.width,
             height=self.height,
             sha256=self.sha256,
-            data=self.data,
+            data=self.data if data is None else data,
             alt=self.alt,
             original_filename=self.original_filename,
             created_by=self.created_by,
             image_id=self.id,
             created_at=self.created_at,
+            variants_failed_at=self.variants_failed_at,
+        )
+
+    def summary(self) -> RegistrationImageSummary:
+        return RegistrationImageSummary(
+            id=self.id,
+            assembly_id=self.assembly_id,
+            byte_size=self.byte_size,
+            width=self.width,
+            height=self.height,
+            sha256=self.sha256,
+            alt=self.alt,
+            original_filename=self.original_filename,
+            created_by=self.created_by,
+            created_at=self.created_at,
         )
 
     def __eq__(self, other: object) -> bool:
@@ -115,7 +168,105 @@ class RegistrationImage:
         return hash(self.id)
 
 
-def generate_image_html(src_url: str, alt: str = "") -> str:
-    src = html_lib.escape(src_url, quote=True)
-    alt_attr = html_lib.escape(alt, quote=True)
-    return f'<img src="{src}" alt="{alt_attr}">'
+@dataclass(frozen=True)
+class ImageVariantInfo:
+    """A variant's metadata without its bytes: enough to choose one and answer a revalidation."""
+
+    id: uuid.UUID
+    image_format: str
+    width: int
+    byte_size: int
+    sha256: str
+    in_blob_store: bool = False
+
+
+class RegistrationImageVariant:
+    """A copy of a registration image re-encoded at a smaller width or as WebP."""
+
+    def __init__(
+        self,
+        image_id: uuid.UUID,
+        image_format: str,
+        width: int,
+        height: int,
+        sha256: str,
+        data: bytes | None,
+        byte_size: int,
+        variant_id: uuid.UUID | None = None,
+        created_at: datetime | None = None,
+    ):
+        self.id = variant_id or uuid.uuid4()
+        self.image_id = image_id
+        self.image_format = image_format
+        self.width = width
+        self.height = height
+        self.sha256 = sha256
+        self.data = data
+        self.byte_size = byte_size
+        self.created_at = created_at or datetime.now(UTC)
+
+    def info(self) -> ImageVariantInfo:
+        return ImageVariantInfo(
+            id=self.id,
+            image_format=self.image_format,
+            width=self.width,
+            byte_size=self.byte_size,
+            sha256=self.sha256,
+            in_blob_store=self.data is None,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RegistrationImageVariant):
+            return False
+        return self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+def variant_sizes(original_width: int) -> list[tuple[str, int]]:
+    """The (format, width) pairs to render for an image: WebP at every width, PNG below the original's."""
+    widths = [width for width in IMAGE_VARIANT_WIDTHS if width < original_width]
+    return [(WEBP, width) for width in [*widths, original_width]] + [(PNG, width) for width in widths]
+
+
+def choose_variant(
+    variants: Iterable[ImageVariantInfo],
+    *,
+    original_width: int,
+    original_byte_size: int,
+    requested_width: int | None,
+    accepts_webp: bool,
+) -> ImageVariantInfo | None:
+    """The smallest variant at least as wide as requested, or None to serve the original PNG.
+
+    Without a width hint the full-width image is wanted, which only a WebP variant can beat.
+    """
+    target = min(requested_width or original_width, original_width)
+    candidates = [
+        variant for variant in variants if variant.width >= target and (accepts_webp or variant.image_format != WEBP)
+    ]
+    if not candidates:
+        return None
+    best = min(candidates, key=lambda variant: (variant.width, variant.byte_size))
+    return best if best.byte_size < original_byte_size else None
+
+
+def image_srcset(src_url: str, original_width: int) -> str:
+    """A ``srcset`` offering the public URL at each variant width, with ``?w=`` as the width hint.
+
+    Empty for an image no wider than the narrowest variant, which has nothing to offer.
+    """
+    widths = [width for width in IMAGE_VARIANT_WIDTHS if width < original_width]
+    if not widths:
+        return ""
+    return ", ".join([*(f"{src_url}?w={width} {width}w" for width in widths), f"{src_url} {original_width}w"])
+
+
+def generate_image_html(src_url: str, alt: str = "", srcset: str = "", sizes: str = "100vw") -> str:
+    attrs = [("src", src_url)]
+    if srcset:
+        attrs += [("srcset", srcset), ("sizes", sizes)]
+    attrs.append(("alt", alt))
+    rendered = " ".join(f'{name}="{html_lib.escape(value, quote=True)}"' for name, value in attrs)
+    return f"<img {rendered}>"
@@ -1,13 +1,30 @@
 """ABOUTME: Shared helpers for handling uploaded files
-ABOUTME: Filename sanitising and human-readable byte sizes, used by image and document features"""
+ABOUTME: Filename sanitising, human-readable byte sizes and stored-file metadata, used by image and document features"""
 
 import re
+import uuid
+from dataclasses import dataclass
 
 # Bound on a stored original filename to stop an oversized name bloating a row.
 MAX_ORIGINAL_FILENAME_LENGTH = 255
 
 _CONTROL_CHARS = re.compile(r"[\x00-\x1f\x7f]")
 
+# Stored files are read and sent in pieces of this size rather than as one bytes object.
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+
+@dataclass(frozen=True)
+class StoredUploadInfo:
+    """What the public routes need to answer for a stored image or document, without its bytes."""
+
+    id: uuid.UUID
+    sha256: str
+    byte_size: int
+    original_filename: str = ""
+    # True when the bytes are in the blob store rather than the row's ``data`` column.
+    in_blob_store: bool = False
+
 
 def sanitise_original_filename(name: str) -> str:
     """Reduce an uploaded filename to a safe, readable, bounded basename.
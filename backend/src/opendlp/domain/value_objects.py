@@ -102,6 +102,7 @@ class SelectionTaskType(Enum):
     DELETE_OLD_TABS = "delete_old_tabs"
     SELECT_FROM_DB = "select_from_db"
     TEST_SELECT_FROM_DB = "test_select_from_db"
+    STABILITY_ANALYSIS_FROM_DB = "stability_analysis_from_db"
 
 
 class RespondentStatus(Enum):
@@ -171,6 +172,23 @@ class RespondentSourceType(Enum):
     MANUAL_ENTRY = "MANUAL_ENTRY"
 
 
+@dataclass(frozen=True)
+class PhaseTiming:
+    """Wall-clock and CPU seconds one phase of a selection run took.
+
+    CPU time is for the whole worker process, so it includes the solver's threads
+    and can be more than the wall-clock time.
+    """
+
+    phase: str
+    wall_seconds: float
+    cpu_seconds: float
+
+    @property
+    def label(self) -> str:
+        return self.phase.replace("_", " ").capitalize()
+
+
 @dataclass(frozen=True)
 class ProgressInfo:
     """Generic progress information for display in UI components.
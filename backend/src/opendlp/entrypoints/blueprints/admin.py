@@ -4,11 +4,12 @@ ABOUTME: Handles admin-only features like viewing and editing users, requires ad
 import uuid
 
 import structlog
-from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask import Blueprint, Response, abort, current_app, flash, redirect, render_template, request, url_for
 from flask.typing import ResponseReturnValue
 from flask_login import current_user, login_required
 
 from opendlp import bootstrap
+from opendlp.adapters.profiling import ProfileStore
 from opendlp.bootstrap import get_email_adapter, get_template_renderer, get_url_generator
 from opendlp.entrypoints.decorators import require_admin
 from opendlp.entrypoints.forms import CreateInviteForm, EditUserForm
@@ -26,6 +27,8 @@ from opendlp.service_layer.invite_service import (
     list_invites,
     revoke_invite,
 )
+from opendlp.service_layer.permissions import can_profile
+from opendlp.service_layer.selection_timings import build_timing_report, solver_seconds
 from opendlp.service_layer.two_factor_service import TwoFactorSetupError
 from opendlp.service_layer.user_service import get_user_by_id, get_user_stats, list_users_paginated, update_user
 from opendlp.translations import gettext as _
@@ -499,6 +502,34 @@ def cleanup_invites() -> ResponseReturnValue:
         return redirect(url_for("admin.list_invites_page"))
 
 
+@admin_bp.route("/selection-timings")
+@login_required
+@require_admin
+def selection_timings() -> ResponseReturnValue:
+    """How long selection runs take, per assembly and algorithm, and how that grows with pool size."""
+    uow = bootstrap.get_flask_uow()
+    with uow:
+        report = build_timing_report(uow, current_user.id)
+    return render_template("admin/selection_timings.html", report=report, solver_seconds=solver_seconds), 200
+
+
+@admin_bp.route("/profiles/<uuid:profile_id>.pstats")
+@login_required
+@require_admin
+def download_profile(profile_id: uuid.UUID) -> ResponseReturnValue:
+    """Download a request or selection run profile, for snakeviz or ``python -m pstats``."""
+    if not can_profile(current_user):
+        abort(403)
+    pstats_data = ProfileStore().get_pstats(str(profile_id))
+    if pstats_data is None:
+        abort(404)
+    return Response(
+        pstats_data,
+        mimetype="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.pstats"},
+    )
+
+
 def _send_invite_email(
     email_address: str,
     invite_code: str,
@@ -16,6 +16,7 @@ from opendlp.domain.registration_document import (
     PDF_FILE_EXTENSION,
     DocumentValidationError,
     RegistrationDocument,
+    RegistrationDocumentSummary,
     generate_document_html,
 )
 from opendlp.domain.registration_image import (
@@ -23,7 +24,9 @@ from opendlp.domain.registration_image import (
     IMAGE_FILE_EXTENSION,
     ImageValidationError,
     RegistrationImage,
+    RegistrationImageSummary,
     generate_image_html,
+    image_srcset,
 )
 from opendlp.domain.registration_page import (
     RegistrationPage,
@@ -116,7 +119,7 @@ def _editor_url(assembly_id: uuid.UUID, url_slug: str, **kwargs: Any) -> str:
     )
 
 
-def _image_to_dict(image: RegistrationImage, url_slug: str) -> dict[str, Any]:
+def _image_to_dict(image: RegistrationImage | RegistrationImageSummary, url_slug: str) -> dict[str, Any]:
     """Serialise an image for the Assets panel.
 
     ``public_url`` is the public ``/register/<slug>/assets/<sha>.png`` route. If the
@@ -140,7 +143,11 @@ def _image_to_dict(image: RegistrationImage, url_slug: str) -> dict[str, Any]:
         "file_name": file_name,
         "display_name": display_name,
         "public_url": public_url,
-        "img_snippet": generate_image_html(public_url, alt=image.alt) if public_url else "",
+        "img_snippet": (
+            generate_image_html(public_url, alt=image.alt, srcset=image_srcset(public_url, image.width))
+            if public_url
+            else ""
+        ),
         "width": image.width,
         "height": image.height,
         "byte_size": image.byte_size,
@@ -153,7 +160,7 @@ def _image_to_dict(image: RegistrationImage, url_slug: str) -> dict[str, Any]:
     }
 
 
-def _document_to_dict(document: RegistrationDocument, url_slug: str) -> dict[str, Any]:
+def _document_to_dict(document: RegistrationDocument | RegistrationDocumentSummary, url_slug: str) -> dict[str, Any]:
     """Serialise a PDF document for the Assets panel.
 
     ``public_url`` is the public ``/register/<slug>/documents/<sha>.pdf`` route. If the
@@ -21,6 +21,7 @@ from opendlp.service_layer.assembly_service import (
     update_csv_config,
     update_selection_settings,
 )
+from opendlp.service_layer.constants import DEFAULT_STABILITY_ANALYSIS_RUNS
 from opendlp.service_layer.exceptions import InsufficientPermissions, InvalidSelection, NotFoundError
 from opendlp.service_layer.report_translation import translate_run_report_to_html
 from opendlp.service_layer.respondent_service import get_respondent_attribute_columns, reset_selection_status
@@ -36,6 +37,7 @@ from opendlp.service_layer.sortition import (
     generate_selection_csvs,
     get_selection_run_status,
     start_db_select_task,
+    start_db_stability_analysis_task,
 )
 from opendlp.translations import gettext as _
 
@@ -95,6 +97,7 @@ def start_db_selection(assembly_id: uuid.UUID) -> ResponseReturnValue:
     """Start a database selection task."""
     try:
         test_mode = request.args.get("test") == "1"
+        profile = request.form.get("profile") == "1"
 
         uow = bootstrap.get_flask_uow()
         with uow:
@@ -104,7 +107,7 @@ def start_db_selection(assembly_id: uuid.UUID) -> ResponseReturnValue:
                 flash(_("Please review and save the selection settings before running selection."), "warning")
                 return redirect(url_for("backoffice.view_assembly_data", assembly_id=assembly_id, source="csv"))
 
-            task_id = start_db_select_task(uow, current_user.id, assembly_id, test_selection=test_mode)
+            task_id = start_db_select_task(uow, current_user.id, assembly_id, test_selection=test_mode, profile=profile)
 
         return redirect(
             url_for(
@@ -129,6 +132,47 @@ def start_db_selection(assembly_id: uuid.UUID) -> ResponseReturnValue:
         return redirect(url_for("gsheets.view_assembly_selection", assembly_id=assembly_id))
 
 
+@db_selection_backoffice_bp.route("/assembly/<uuid:assembly_id>/selection/db/stability", methods=["POST"])
+@login_required
+@require_assembly_management
+def start_db_stability_analysis(assembly_id: uuid.UUID) -> ResponseReturnValue:
+    """Start a stability analysis of many test selections on the database data."""
+    try:
+        num_runs = request.form.get("num_runs", DEFAULT_STABILITY_ANALYSIS_RUNS, type=int)
+
+        uow = bootstrap.get_flask_uow()
+        with uow:
+            csv_config = get_or_create_csv_config(uow, current_user.id, assembly_id)
+
+            if not csv_config.settings_confirmed:
+                flash(_("Please review and save the selection settings before running selection."), "warning")
+                return redirect(url_for("backoffice.view_assembly_data", assembly_id=assembly_id, source="csv"))
+
+            task_id = start_db_stability_analysis_task(uow, current_user.id, assembly_id, num_runs=num_runs)
+
+        return redirect(
+            url_for(
+                "gsheets.view_assembly_selection",
+                assembly_id=assembly_id,
+                current_selection=task_id,
+            )
+        )
+
+    except InvalidSelection as e:
+        flash(_("Could not start stability analysis: %(error)s", error=str(e)), "error")
+        return redirect(url_for("gsheets.view_assembly_selection", assembly_id=assembly_id))
+    except NotFoundError as e:
+        flash(_("Failed to start stability analysis: %(error)s", error=str(e)), "error")
+        return redirect(url_for("gsheets.view_assembly_selection", assembly_id=assembly_id))
+    except InsufficientPermissions:
+        flash(_("You don't have permission to manage this assembly"), "error")
+        return redirect(url_for("backoffice.dashboard"))
+    except Exception as e:
+        logger.exception("Error starting DB stability analysis", assembly_id=str(assembly_id), error=str(e))
+        flash(_("An unexpected error occurred while starting the stability analysis"), "error")
+        return redirect(url_for("gsheets.view_assembly_selection", assembly_id=assembly_id))
+
+
 @db_selection_backoffice_bp.route("/assembly/<uuid:assembly_id>/selection/db/modal-progress/<uuid:run_id>")
 @login_required
 def db_selection_progress_modal(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseReturnValue:
@@ -220,10 +264,12 @@ def cancel_db_selection(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseRe
 def download_db_selected(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseReturnValue:
     """Download the selected participants as CSV."""
     try:
-        uow = bootstrap.get_flask_uow()
+        uow = bootstrap.get_flask_read_uow()
         with uow:
             get_assembly_with_permissions(uow, assembly_id, current_user.id)
-            selected_csv, _remaining_csv = generate_selection_csvs(uow, assembly_id, run_id)
+            selected_csv, _remaining_csv = generate_selection_csvs(
+                uow, assembly_id, run_id, timing_uow=bootstrap.get_flask_uow()
+            )
 
         return Response(
             selected_csv,
@@ -253,10 +299,12 @@ def download_db_selected(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseR
 def download_db_remaining(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseReturnValue:
     """Download the remaining participants as CSV."""
     try:
-        uow = bootstrap.get_flask_uow()
+        uow = bootstrap.get_flask_read_uow()
         with uow:
             get_assembly_with_permissions(uow, assembly_id, current_user.id)
-            _selected_csv, remaining_csv = generate_selection_csvs(uow, assembly_id, run_id)
+            _selected_csv, remaining_csv = generate_selection_csvs(
+                uow, assembly_id, run_id, timing_uow=bootstrap.get_flask_uow()
+            )
 
         return Response(
             remaining_csv,
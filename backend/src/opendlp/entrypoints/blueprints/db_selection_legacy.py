@@ -273,10 +273,12 @@ def cancel_db_selection(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseRe
 @require_assembly_management
 def download_selected_csv(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseReturnValue:
     try:
-        uow = bootstrap.get_flask_uow()
+        uow = bootstrap.get_flask_read_uow()
         with uow:
             get_assembly_with_permissions(uow, assembly_id, current_user.id)
-            selected_csv, _remaining_csv = generate_selection_csvs(uow, assembly_id, run_id)
+            selected_csv, _remaining_csv = generate_selection_csvs(
+                uow, assembly_id, run_id, timing_uow=bootstrap.get_flask_uow()
+            )
 
         return Response(
             selected_csv,
@@ -303,10 +305,12 @@ def download_selected_csv(assembly_id: uuid.UUID, run_id: uuid.UUID) -> Response
 @require_assembly_management
 def download_remaining_csv(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseReturnValue:
     try:
-        uow = bootstrap.get_flask_uow()
+        uow = bootstrap.get_flask_read_uow()
         with uow:
             get_assembly_with_permissions(uow, assembly_id, current_user.id)
-            _selected_csv, remaining_csv = generate_selection_csvs(uow, assembly_id, run_id)
+            _selected_csv, remaining_csv = generate_selection_csvs(
+                uow, assembly_id, run_id, timing_uow=bootstrap.get_flask_uow()
+            )
 
         return Response(
             remaining_csv,
@@ -36,8 +36,18 @@ from flask.typing import ResponseReturnValue
 from flask_login import current_user, login_required
 
 from opendlp import bootstrap
-from opendlp.domain.registration_document import PDF_FILE_EXTENSION, DocumentValidationError, RegistrationDocument
-from opendlp.domain.registration_image import IMAGE_FILE_EXTENSION, ImageValidationError, RegistrationImage
+from opendlp.domain.registration_document import (
+    PDF_FILE_EXTENSION,
+    DocumentValidationError,
+    RegistrationDocument,
+    RegistrationDocumentSummary,
+)
+from opendlp.domain.registration_image import (
+    IMAGE_FILE_EXTENSION,
+    ImageValidationError,
+    RegistrationImage,
+    RegistrationImageSummary,
+)
 from opendlp.domain.registration_page import RegistrationPageNotReady
 from opendlp.domain.respondent_field_schema import (
     ChoiceOption,
@@ -990,7 +1000,7 @@ def _handle_add_field(uow: Any, params: dict[str, Any]) -> dict[str, Any]:
         return {"status": "error", "error": str(e), "error_type": "NotFoundError"}
 
 
-def _serialise_image(image: RegistrationImage) -> dict[str, Any]:
+def _serialise_image(image: RegistrationImage | RegistrationImageSummary) -> dict[str, Any]:
     return {
         "id": str(image.id),
         "assembly_id": str(image.assembly_id),
@@ -1116,7 +1126,7 @@ def _handle_list_image_snippets(uow: Any, params: dict[str, Any]) -> dict[str, A
         page = page_for_assembly(page_repo_uow, assembly_id)
     url_slug = page.url_slug if page else ""
 
-    def url_for_image(image: RegistrationImage) -> str:
+    def url_for_image(image: RegistrationImageSummary) -> str:
         if url_slug:
             return url_for(
                 "registration.serve_registration_image",
@@ -1158,7 +1168,7 @@ def _handle_get_registration_image_for_serving(uow: Any, params: dict[str, Any])
     return {"status": "success", "found": True, "image": _serialise_image(image)}
 
 
-def _serialise_document(document: RegistrationDocument) -> dict[str, Any]:
+def _serialise_document(document: RegistrationDocument | RegistrationDocumentSummary) -> dict[str, Any]:
     return {
         "id": str(document.id),
         "assembly_id": str(document.assembly_id),
@@ -1282,7 +1292,7 @@ def _handle_list_document_snippets(uow: Any, params: dict[str, Any]) -> dict[str
         page = page_for_assembly(page_repo_uow, assembly_id)
     url_slug = page.url_slug if page else ""
 
-    def url_for_document(document: RegistrationDocument) -> str:
+    def url_for_document(document: RegistrationDocumentSummary) -> str:
         if url_slug:
             return url_for(
                 "registration.serve_registration_document",
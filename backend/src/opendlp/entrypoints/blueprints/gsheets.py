@@ -229,9 +229,12 @@ def view_assembly_selection(assembly_id: uuid.UUID) -> ResponseReturnValue:
             except ServiceLayerError as gsheet_error:
                 logger.error("Error loading gsheet config for selection", error=str(gsheet_error))
 
-        # Fetch paginated selection history
-        with uow:
-            run_history, total_count = uow.selection_run_records.get_by_assembly_id_paginated(
+        # Fetch paginated selection history. Right after starting a run the page is
+        # opened on it, so the history must include it: only a caught-up replica will do.
+        just_started = current_selection is not None or current_replacement is not None
+        history_uow = bootstrap.get_flask_read_uow(max_lag_seconds=0 if just_started else None)
+        with history_uow:
+            run_history, total_count = history_uow.selection_run_records.get_by_assembly_id_paginated(
                 assembly_id, page, per_page
             )
             total_pages = (total_count + per_page - 1) // per_page
@@ -471,10 +474,13 @@ def start_selection_run(assembly_id: uuid.UUID) -> ResponseReturnValue:
     try:
         # Check if test mode
         test_mode = request.args.get("test") == "1"
+        profile = request.form.get("profile") == "1"
 
         uow = bootstrap.get_flask_uow()
         with uow:
-            task_id = start_gsheet_select_task(uow, current_user.id, assembly_id, test_selection=test_mode)
+            task_id = start_gsheet_select_task(
+                uow, current_user.id, assembly_id, test_selection=test_mode, profile=profile
+            )
 
         return redirect(
             url_for(
@@ -1411,7 +1411,11 @@ def view_gsheet_run(assembly_id: uuid.UUID, run_id: uuid.UUID) -> ResponseReturn
             return redirect(
                 url_for("gsheets_legacy.manage_assembly_gsheet_tabs_with_run", assembly_id=assembly_id, run_id=run_id)
             )
-        if task_type in (SelectionTaskType.SELECT_FROM_DB, SelectionTaskType.TEST_SELECT_FROM_DB):
+        if task_type in (
+            SelectionTaskType.SELECT_FROM_DB,
+            SelectionTaskType.TEST_SELECT_FROM_DB,
+            SelectionTaskType.STABILITY_ANALYSIS_FROM_DB,
+        ):
             return redirect(
                 url_for("db_selection_legacy.view_db_selection_with_run", assembly_id=assembly_id, run_id=run_id)
             )
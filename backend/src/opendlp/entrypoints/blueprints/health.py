@@ -1,16 +1,17 @@
 """ABOUTME: Health check endpoint for monitoring service status
 ABOUTME: Reports database, celery, and system configuration status as JSON"""
 
+import hmac
 import os
 from datetime import UTC, datetime
 
 import structlog
-from flask import Blueprint, current_app, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request
 from flask.typing import ResponseReturnValue
 
 from opendlp import bootstrap
-from opendlp.config import to_bool
-from opendlp.entrypoints.celery.app import app as celery_app
+from opendlp.adapters.metrics import MetricsRecorder, render_metrics
+from opendlp.config import get_metrics_token, to_bool
 from opendlp.entrypoints.context_processors import (
     get_opendlp_version,
     get_service_account_email,
@@ -51,6 +52,10 @@ def check_celery_worker() -> bool:
     Returns:
         True if at least one worker is active, False otherwise
     """
+    # Celery is imported on the first health check rather than at boot, so
+    # workers that only serve pages don't pay for it.
+    from opendlp.entrypoints.celery.app import app as celery_app  # noqa: PLC0415
+
     try:
         # Use celery inspect to check for active workers
         inspect = celery_app.control.inspect()
@@ -237,6 +242,34 @@ def monitor_selection_health() -> ResponseReturnValue:
     return jsonify(payload), status_code
 
 
+def _celery_queue_names() -> set[str]:
+    from opendlp.entrypoints.celery.app import app as celery_app  # noqa: PLC0415
+
+    names = {celery_app.conf.task_default_queue}
+    names.update(queue.name for queue in celery_app.conf.task_queues or ())
+    return names
+
+
+@health_bp.route("/metrics")
+def metrics() -> ResponseReturnValue:
+    """
+    Prometheus metrics in the text exposition format.
+
+    Requires ``Authorization: Bearer <METRICS_TOKEN>``. Returns 404 while
+    METRICS_TOKEN is not set, so the endpoint is not advertised, and 401 for
+    a missing or wrong token.
+    """
+    token = get_metrics_token()
+    if not token:
+        return jsonify({"error": "Not found"}), 404
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        return Response("Unauthorized\n", status=401, mimetype="text/plain", headers={"WWW-Authenticate": "Bearer"})
+
+    body = render_metrics(MetricsRecorder(), bootstrap.cached_engines(), _celery_queue_names())
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
+
 @health_bp.route("/health/bdd")
 def bdd_health_check() -> ResponseReturnValue:
     """
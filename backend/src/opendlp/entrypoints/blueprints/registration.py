@@ -1,19 +1,23 @@
 """ABOUTME: Public registration page routes for assembly registration forms
 ABOUTME: Handles form rendering, submission, and URL resolution without login"""
 
+import unicodedata
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime
-from io import BytesIO
+from urllib.parse import quote
 
 import structlog
-from flask import Blueprint, Response, abort, current_app, redirect, render_template, request, send_file, url_for
+from flask import Blueprint, Response, abort, current_app, g, redirect, render_template, request, url_for
 from flask.typing import ResponseReturnValue
 from flask_wtf.csrf import generate_csrf, validate_csrf
 from itsdangerous import BadSignature, SignatureExpired, TimestampSigner
 from wtforms import ValidationError
 
-from opendlp import bootstrap
-from opendlp.domain.registration_document import PDF_CONTENT_TYPE, PDF_FILE_EXTENSION, RegistrationDocument
-from opendlp.domain.registration_image import IMAGE_CONTENT_TYPE
+from opendlp import bootstrap, config
+from opendlp.adapters.blob_store import DOCUMENTS, IMAGE_VARIANTS, IMAGES, get_blob_store
+from opendlp.adapters.metrics import REGISTRATION_SUBMISSIONS, MetricsRecorder
+from opendlp.domain.registration_document import PDF_CONTENT_TYPE, PDF_FILE_EXTENSION
+from opendlp.domain.uploads import StoredUploadInfo
 from opendlp.entrypoints.decorators import require_feature
 from opendlp.entrypoints.extensions import csrf
 from opendlp.service_layer.email_send_service import send_registration_auto_reply
@@ -22,8 +26,15 @@ from opendlp.service_layer.registration_bot_protection_service import (
     check_registration_rate_limit,
     record_registration_submission,
 )
-from opendlp.service_layer.registration_document_service import get_registration_document_for_serving
-from opendlp.service_layer.registration_image_service import get_registration_image_for_serving
+from opendlp.service_layer.registration_document_service import (
+    get_registration_document_info_for_serving,
+    iter_registration_document_data,
+)
+from opendlp.service_layer.registration_image_service import (
+    get_registration_image_rendition_for_serving,
+    iter_registration_image_data,
+    iter_registration_image_variant_data,
+)
 from opendlp.service_layer.registration_page_service import (
     RegistrationPageVisibilityState,
     find_registration_page_by_short_url_slug,
@@ -259,6 +270,12 @@ def _record_submission(ip_address: str, email: str) -> None:
     )
 
 
+def _count_submission(outcome: str) -> None:
+    """Count the submission for the registration rate shown on ``/metrics``."""
+    if config.get_metrics_token():
+        MetricsRecorder().increment(REGISTRATION_SUBMISSIONS, {"outcome": outcome})
+
+
 @registration_bp.route("/register/<url_slug>", methods=["POST"])
 @csrf.exempt
 @require_feature("registration_page")
@@ -285,10 +302,12 @@ def submit_registration_form(url_slug: str) -> ResponseReturnValue:
                 slug=url_slug,
             )
             _record_submission(ip_address, email)
+            _count_submission("honeypot")
             return redirect(url_for("registration.thank_you", url_slug=url_slug), 302)
 
         token_error = _check_form_tokens(uow, url_slug, ip_address, email)
         if token_error is not None:
+            _count_submission("token_rejected")
             return token_error
 
         try:
@@ -302,6 +321,7 @@ def submit_registration_form(url_slug: str) -> ResponseReturnValue:
                 email_window_minutes=current_app.config["REGISTRATION_RATE_LIMIT_EMAIL_WINDOW_MINUTES"],
             )
         except RateLimitExceeded:
+            _count_submission("rate_limited")
             return _rerender_form_with_values(
                 uow,
                 url_slug,
@@ -318,12 +338,14 @@ def submit_registration_form(url_slug: str) -> ResponseReturnValue:
 
         if result.is_valid:
             _record_submission(ip_address, email)
+            _count_submission("accepted")
             _send_registration_auto_reply(result.respondent)
             return redirect(url_for("registration.thank_you", url_slug=url_slug), 302)
 
         # Validation failed - re-render form with errors. We deliberately do not
         # count this against the rate limit: members of the public may take several
         # tries over a tricky form and must not lock themselves out by mistyping.
+        _count_submission("invalid")
         return _rerender_form_with_values(
             uow,
             url_slug,
@@ -343,26 +365,126 @@ def _send_registration_auto_reply(respondent) -> None:  # type: ignore[no-untype
         logger.exception("Failed to send registration auto-reply")
 
 
+def _stream_upload(
+    uow_factory: Callable[[], AbstractUnitOfWork],
+    read: Callable[[AbstractUnitOfWork, int], Iterator[bytes]],
+    byte_size: int,
+) -> Iterator[bytes]:
+    """Yield the chunks of a file kept in Postgres, reading each in a short unit of work of its own.
+
+    A slow client can take minutes over the body, so no connection or transaction
+    is held while a chunk is being sent. Takes the factory rather than looking it
+    up, since the body is sent after the request context ends.
+    """
+    offset = 0
+    while offset < byte_size:
+        with uow_factory() as uow:
+            chunk = next(read(uow, offset), b"")
+        if not chunk:
+            return
+        yield chunk
+        offset += len(chunk)
+
+
+def _set_attachment(response: Response, download_name: str) -> None:
+    """Content-Disposition: attachment, with an RFC 5987 ``filename*`` for non-ASCII names (as send_file does)."""
+    try:
+        download_name.encode("ascii")
+    except UnicodeEncodeError:
+        ascii_name = unicodedata.normalize("NFKD", download_name).encode("ascii", "ignore").decode("ascii")
+        quoted = quote(download_name, safe="!#$&+-.^_`|~")
+        response.headers.set(
+            "Content-Disposition", "attachment", filename=ascii_name, **{"filename*": f"UTF-8''{quoted}"}
+        )
+    else:
+        response.headers.set("Content-Disposition", "attachment", filename=download_name)
+
+
+def _serve_stored_upload(
+    info: StoredUploadInfo,
+    read: Callable[[AbstractUnitOfWork, int], Iterator[bytes]],
+    mimetype: str,
+    blob_kind: str,
+) -> Response:
+    """Answer from the metadata alone when the client's ETag matches, else stream the bytes.
+
+    The sha256 in the URL is the ETag, so a revalidation never reads the stored
+    bytes, and a full response streams them in chunks instead of building one
+    ``bytes`` object. Bytes kept in a filesystem blob store are handed to the
+    fronting web server when ``BLOB_SENDFILE`` is set, else streamed from the
+    store without touching the database.
+    """
+    response = Response(mimetype=mimetype)
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    response.set_etag(info.sha256)
+    response.make_conditional(request)
+    if response.status_code != 200:
+        return response
+    store = get_blob_store() if info.in_blob_store else None
+    sendfile_headers = store.sendfile_headers(blob_kind, info.sha256) if store is not None else {}
+    if sendfile_headers:
+        response.headers.update(sendfile_headers)
+        return response
+    if store is not None:
+        response.response = store.iter_chunks(blob_kind, info.sha256)
+    else:
+        response.response = _stream_upload(bootstrap.get_flask_uow_factory(), read, info.byte_size)
+    response.content_length = info.byte_size
+    return response
+
+
+def _requested_image_width() -> int | None:
+    """The ``?w=`` width hint from an <img srcset>, or None when absent or not a positive number."""
+    width = request.args.get("w", type=int)
+    return width if width and width > 0 else None
+
+
+def _accepts_webp() -> bool:
+    """Only an explicit image/webp counts: older browsers send image/* without being able to decode WebP."""
+    return any(mimetype == "image/webp" and quality > 0 for mimetype, quality in request.accept_mimetypes)
+
+
 @registration_bp.route("/register/<url_slug>/assets/<image_name>", methods=["GET"])
 @require_feature("registration_page")
 def serve_registration_image(url_slug: str, image_name: str) -> ResponseReturnValue:
-    """Serve a registration page image from the database (public, image-only)."""
+    """Serve a registration page image from the database (public, image-only).
+
+    Sends the smallest pre-rendered variant that suits the client's Accept header
+    and ``?w=`` width hint, or the original PNG when none would be smaller.
+    """
     uow = bootstrap.get_flask_uow()
 
     with uow:
-        served = get_registration_image_for_serving(uow, url_slug, image_name)
-    if served is None:
+        rendition = get_registration_image_rendition_for_serving(
+            uow, url_slug, image_name, requested_width=_requested_image_width(), accepts_webp=_accepts_webp()
+        )
+    if rendition is None:
         abort(404)
 
-    response = Response(served.data, mimetype=IMAGE_CONTENT_TYPE)
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.set_etag(served.sha256)
-    return response.make_conditional(request)
+    info = rendition.info
+    if rendition.is_variant:
+        response = _serve_stored_upload(
+            info,
+            lambda read_uow, offset: iter_registration_image_variant_data(read_uow, info.id, offset),
+            rendition.content_type,
+            IMAGE_VARIANTS,
+        )
+    else:
+        response = _serve_stored_upload(
+            info,
+            lambda read_uow, offset: iter_registration_image_data(read_uow, info.id, offset),
+            rendition.content_type,
+            IMAGES,
+        )
+    response.vary.add("Accept")
+    # While the variants are being rendered, keep caches from holding on to the original for a year.
+    g.provisional_asset = rendition.provisional
+    return response
 
 
-def _document_download_name(document: RegistrationDocument) -> str:
+def _document_download_name(info: StoredUploadInfo) -> str:
     """The filename offered to the browser: the original name, else the content hash."""
-    return document.original_filename or f"{document.sha256}.{PDF_FILE_EXTENSION}"
+    return info.original_filename or f"{info.sha256}.{PDF_FILE_EXTENSION}"
 
 
 @registration_bp.route("/register/<url_slug>/documents/<document_name>", methods=["GET"])
@@ -372,20 +494,18 @@ def serve_registration_document(url_slug: str, document_name: str) -> ResponseRe
     uow = bootstrap.get_flask_uow()
 
     with uow:
-        served = get_registration_document_for_serving(uow, url_slug, document_name)
-    if served is None:
+        info = get_registration_document_info_for_serving(uow, url_slug, document_name)
+    if info is None:
         abort(404)
 
-    # send_file builds the Content-Disposition (attachment + RFC 5987 filename) for us.
-    response = send_file(
-        BytesIO(served.data),
-        mimetype=PDF_CONTENT_TYPE,
-        as_attachment=True,
-        download_name=_document_download_name(served),
+    response = _serve_stored_upload(
+        info,
+        lambda read_uow, offset: iter_registration_document_data(read_uow, info.id, offset),
+        PDF_CONTENT_TYPE,
+        DOCUMENTS,
     )
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.set_etag(served.sha256)
-    return response.make_conditional(request)
+    _set_attachment(response, _document_download_name(info))
+    return response
 
 
 @registration_bp.route("/register/<url_slug>/thank-you", methods=["GET"])
@@ -2,17 +2,22 @@
 ABOUTME: Provides respondent viewing, CSV upload, and deletion under /backoffice/assembly/*/respondents"""
 
 import contextlib
+import os
 import uuid
+from collections.abc import Iterable
 from datetime import UTC, datetime
 from typing import Any
 
 import structlog
-from flask import Blueprint, Response, current_app, flash, redirect, render_template, request, url_for
+from flask import Blueprint, Response, flash, make_response, redirect, render_template, request, url_for
 from flask.typing import ResponseReturnValue
 from flask_login import current_user, login_required
+from kombu.exceptions import KombuError
+from redis.exceptions import RedisError
+from werkzeug.datastructures import FileStorage
 
 from opendlp import bootstrap
-from opendlp.adapters.tabular_export import CsvExportTarget, ExportTargetError
+from opendlp.adapters.tabular_export import CsvExportTarget
 from opendlp.config import get_max_csv_upload_bytes, get_max_csv_upload_mb
 from opendlp.domain.respondent_field_schema import CHOICE_TYPES, GROUP_DISPLAY_ORDER, GROUP_LABELS, FieldType
 from opendlp.domain.respondents import _UNSET as _RESPONDENT_UNSET
@@ -49,13 +54,16 @@ from opendlp.service_layer.exceptions import (
 )
 from opendlp.service_layer.permissions import can_edit_respondent, can_manage_assembly
 from opendlp.service_layer.respondent_export_service import (
+    GSheetExportState,
+    dismiss_respondent_gsheet_export_state,
     export_respondents,
-    export_respondents_to_gsheet,
     get_respondent_gsheet_config,
+    get_respondent_gsheet_export_state,
     resolve_status_filter,
+    start_respondent_gsheet_export,
 )
 from opendlp.service_layer.respondent_field_schema_service import (
-    compute_diff_for_pending_csv,
+    compute_diff_for_pending_headers,
     get_schema,
     get_schema_grouped,
 )
@@ -64,7 +72,9 @@ from opendlp.service_layer.respondent_service import (
     get_respondent,
     get_respondent_with_comment_authors,
     get_respondents_for_assembly_paginated,
-    import_respondents_from_csv,
+    import_respondents_from_csv_rows,
+    read_csv_stream,
+    resolve_csv_id_column,
     transition_respondent_status,
     update_respondent,
 )
@@ -81,7 +91,8 @@ _MAX_FLASH_ERROR_LINES = 20
 
 def _run_csv_import(
     assembly_id: uuid.UUID,
-    csv_content: str,
+    headers: list[str],
+    rows: Iterable[list[str]],
     filename: str,
     id_column: str | None,
     replace_existing: bool,
@@ -93,11 +104,12 @@ def _run_csv_import(
     """
     uow = bootstrap.get_flask_uow()
     with uow:
-        respondents, errors, resolved_id_column = import_respondents_from_csv(
+        imported_count, errors, resolved_id_column = import_respondents_from_csv_rows(
             uow=uow,
             user_id=current_user.id,
             assembly_id=assembly_id,
-            csv_content=csv_content,
+            headers=headers,
+            rows=rows,
             replace_existing=replace_existing,
             id_column=id_column,
             filename=filename,
@@ -119,13 +131,13 @@ def _run_csv_import(
         logger.warning(
             "respondent CSV import completed with warnings",
             assembly_id=str(assembly_id),
-            imported=len(respondents),
+            imported=imported_count,
             error_count=len(errors),
             errors=errors,
         )
         summary = _(
             "Respondents uploaded with warnings: %(count)d imported, %(errors)d errors",
-            count=len(respondents),
+            count=imported_count,
             errors=len(errors),
         )
         # Render the summary and each per-row warning on its own line, capped so
@@ -144,12 +156,21 @@ def _run_csv_import(
         flash("\n".join(lines), "warning")
     else:
         flash(
-            _("Respondents uploaded successfully: %(count)d imported", count=len(respondents)),
+            _("Respondents uploaded successfully: %(count)d imported", count=imported_count),
             "success",
         )
     return redirect(url_for("backoffice.view_assembly_data", assembly_id=assembly_id, source="csv"))
 
 
+def _upload_size(file: FileStorage) -> int:
+    """Size of an uploaded file in bytes, found by seeking rather than reading it."""
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    return size
+
+
 @respondents_bp.route("/assembly/<uuid:assembly_id>/data/upload-respondents", methods=["POST"])
 @login_required
 def upload_respondents_csv(assembly_id: uuid.UUID) -> ResponseReturnValue:
@@ -168,13 +189,13 @@ def upload_respondents_csv(assembly_id: uuid.UUID) -> ResponseReturnValue:
                 url_for("backoffice.view_assembly_data", assembly_id=assembly_id, source="csv")
             )
 
-        raw = file.read()
+        size = _upload_size(file)
         max_bytes = get_max_csv_upload_bytes()
-        if len(raw) > max_bytes:
+        if size > max_bytes:
             logger.warning(
                 "Rejected oversized CSV upload",
                 assembly_id=str(assembly_id),
-                size_bytes=len(raw),
+                size_bytes=size,
                 limit_bytes=max_bytes,
             )
             flash(
@@ -185,29 +206,36 @@ def upload_respondents_csv(assembly_id: uuid.UUID) -> ResponseReturnValue:
                 "error",
             )
             return redirect(url_for("backoffice.view_assembly_data", assembly_id=assembly_id, source="csv"))
-        csv_content = raw.decode("utf-8")
 
         id_column = request.form.get("id_column", "").strip() or None
         filename = file.filename or "unknown.csv"
 
+        # Only the header row is read here; the rows are parsed as they are
+        # imported, so a bad header row is rejected before the rest of the file
+        # is read, and a large file is never held in memory whole.
+        headers, rows = read_csv_stream(file.stream)
+        resolve_csv_id_column(headers, id_column)
+
         # If a schema already exists, compute the diff against the new headers.
         # When the diff has changes the organiser sees a confirmation page first;
         # otherwise we proceed straight to the import as before.
         uow_diff = bootstrap.get_flask_uow()
         with uow_diff:
-            diff = compute_diff_for_pending_csv(
+            diff = compute_diff_for_pending_headers(
                 uow_diff,
                 current_user.id,
                 assembly_id,
-                csv_content,
+                headers,
                 id_column,
             )
         if diff is not None and diff.has_changes:
+            # The rows must outlive this request, so this path reads them all.
             stash_pending_upload(
                 user_id=current_user.id,
                 assembly_id=assembly_id,
                 upload=StashedUpload(
-                    csv_content=csv_content,
+                    headers=headers,
+                    rows=list(rows),
                     filename=filename,
                     id_column=id_column,
                     replace_existing=True,
@@ -220,7 +248,8 @@ def upload_respondents_csv(assembly_id: uuid.UUID) -> ResponseReturnValue:
 
         return _run_csv_import(
             assembly_id=assembly_id,
-            csv_content=csv_content,
+            headers=headers,
+            rows=rows,
             filename=filename,
             id_column=id_column,
             replace_existing=True,
@@ -272,11 +301,11 @@ def confirm_upload_diff(assembly_id: uuid.UUID) -> ResponseReturnValue:
     try:
         uow = bootstrap.get_flask_uow()
         with uow:
-            diff = compute_diff_for_pending_csv(
+            diff = compute_diff_for_pending_headers(
                 uow,
                 current_user.id,
                 assembly_id,
-                pending.csv_content,
+                pending.headers,
                 pending.id_column,
             )
     except InvalidSelection as e:
@@ -290,7 +319,8 @@ def confirm_upload_diff(assembly_id: uuid.UUID) -> ResponseReturnValue:
         clear_stashed_upload(user_id=current_user.id, assembly_id=assembly_id)
         return _run_csv_import(
             assembly_id=assembly_id,
-            csv_content=pending.csv_content,
+            headers=pending.headers,
+            rows=pending.rows,
             filename=pending.filename,
             id_column=pending.id_column,
             replace_existing=pending.replace_existing,
@@ -331,7 +361,8 @@ def apply_upload_diff(assembly_id: uuid.UUID) -> ResponseReturnValue:
     try:
         response = _run_csv_import(
             assembly_id=assembly_id,
-            csv_content=pending.csv_content,
+            headers=pending.headers,
+            rows=pending.rows,
             filename=pending.filename,
             id_column=pending.id_column,
             replace_existing=pending.replace_existing,
@@ -404,7 +435,7 @@ def export_respondents_csv(assembly_id: uuid.UUID) -> ResponseReturnValue:
     # instead, because exercising it means calling the real Google Sheets API.
     target = CsvExportTarget()
     try:
-        uow = bootstrap.get_flask_uow()
+        uow = bootstrap.get_flask_read_uow()
         with uow:
             export_respondents(
                 uow,
@@ -493,7 +524,7 @@ def run_export(assembly_id: uuid.UUID) -> ResponseReturnValue:
         if destination == "gsheet":
             return _run_gsheet_export(assembly_id, status_filter, respondents_url)
         target = CsvExportTarget()
-        uow = bootstrap.get_flask_uow()
+        uow = bootstrap.get_flask_read_uow()
         with uow:
             export_respondents(
                 uow,
@@ -516,64 +547,88 @@ def _run_gsheet_export(
     status_filter: list[RespondentStatus] | None,
     respondents_url: str,
 ) -> ResponseReturnValue:
-    """Export to Google Sheets, then flash the resulting sheet URL."""
+    """Start a background export to Google Sheets; the respondents page shows its progress."""
     spreadsheet_url = request.form.get("spreadsheet_url", "").strip()
     worksheet_name = request.form.get("worksheet_name", "").strip()
     if not spreadsheet_url:
         flash(_("A Google Sheet URL is required to export to Google Sheets"), "error")
         return redirect(respondents_url)
 
-    # The Google Sheets target is injected via an app factory (registered in
-    # flask_app.py, overridable in tests) because writing to it calls the real
-    # Google Sheets API, so tests substitute a fake. The CSV target needs no such
-    # seam — see the comment in export_respondents_csv.
-    factory = current_app.extensions["gsheet_export_target_factory"]
-    target = factory(spreadsheet_url)
     try:
         uow = bootstrap.get_flask_uow()
         with uow:
-            export_respondents_to_gsheet(
+            start_respondent_gsheet_export(
                 uow,
                 current_user.id,
                 assembly_id,
                 status_filter=status_filter,
                 spreadsheet_url=spreadsheet_url,
                 worksheet_name=worksheet_name,
-                target=target,
             )
     except ValueError as e:
         # A malformed spreadsheet URL is rejected by the domain validator.
         flash(_("Could not export to Google Sheets: %(error)s", error=str(e)), "error")
         return redirect(respondents_url)
-    except ExportTargetError as e:
-        # The sheet could not be written — typically it is not shared with the
-        # service account, or the URL points at a sheet that does not exist.
-        logger.warning(
-            "Google Sheets export failed",
-            assembly_id=str(assembly_id),
-            user_id=str(current_user.id),
-            error=str(e),
-        )
-        service_account_email = get_service_account_email()
-        if service_account_email:
-            flash(
-                _(
-                    "Could not write to the Google Sheet. Check the URL is correct and that "
-                    "the sheet is shared with %(email)s.",
-                    email=service_account_email,
-                ),
-                "error",
-            )
-        else:
-            flash(_("Could not write to the Google Sheet. Check the URL and sharing settings."), "error")
+    except (RedisError, KombuError) as e:
+        logger.exception("Could not start Google Sheets export", assembly_id=str(assembly_id), error=str(e))
+        flash(_("Could not start the export to Google Sheets. Please try again in a moment."), "error")
         return redirect(respondents_url)
 
     # The direct link to the exported worksheet is saved on the export config and
-    # shown next to the Respondents heading, so we no longer flash the raw URL.
-    flash(_("Respondents exported to Google Sheets."), "success")
+    # shown next to the Respondents heading once the export has finished.
+    flash(_("Exporting respondents to Google Sheets."), "success")
     return redirect(respondents_url)
 
 
+def _get_export_state(assembly_id: uuid.UUID) -> GSheetExportState | None:
+    """The latest background Google Sheets export for the assembly, if any."""
+    uow = bootstrap.get_flask_uow()
+    with uow:
+        state: GSheetExportState | None = get_respondent_gsheet_export_state(uow, current_user.id, assembly_id)
+    return state
+
+
+@respondents_bp.route("/assembly/<uuid:assembly_id>/respondents/export/dismiss", methods=["POST"])
+@login_required
+def dismiss_export(assembly_id: uuid.UUID) -> ResponseReturnValue:
+    """Forget a finished Google Sheets export once its outcome has been read."""
+    respondents_url = url_for("respondents.view_assembly_respondents", assembly_id=assembly_id)
+    try:
+        uow = bootstrap.get_flask_uow()
+        with uow:
+            dismiss_respondent_gsheet_export_state(uow, current_user.id, assembly_id, request.form.get("task_id", ""))
+    except NotFoundError as e:
+        flash(str(e), "error")
+    except InsufficientPermissions:
+        flash(_("You don't have permission to export respondents"), "error")
+    return redirect(respondents_url)
+
+
+@respondents_bp.route("/assembly/<uuid:assembly_id>/respondents/export/progress")
+@login_required
+def export_progress(assembly_id: uuid.UUID) -> ResponseReturnValue:
+    """HTMX polling endpoint for a background Google Sheets export.
+
+    Returns the progress fragment while the export runs. Once it has finished the
+    whole page is refreshed, so the link to the sheet (or the error) shows up.
+    """
+    try:
+        export_state = _get_export_state(assembly_id)
+    except (NotFoundError, InsufficientPermissions):
+        return "", 404
+
+    if export_state is None or export_state.has_finished:
+        response = make_response("", 200)
+        response.headers["HX-Refresh"] = "true"
+        return response
+
+    return render_template(
+        "backoffice/respondents/export_progress.html",
+        assembly_id=assembly_id,
+        export_state=export_state,
+    ), 200
+
+
 @respondents_bp.route("/assembly/<uuid:assembly_id>/respondents")
 @login_required
 def view_assembly_respondents(assembly_id: uuid.UUID) -> ResponseReturnValue:
@@ -608,6 +663,7 @@ def view_assembly_respondents(assembly_id: uuid.UUID) -> ResponseReturnValue:
             viewer = uow.users.get(current_user.id)
             assembly_obj = uow.assemblies.get(assembly_id)
             can_edit = bool(viewer and assembly_obj and can_edit_respondent(viewer, assembly_obj))
+            can_manage = bool(viewer and assembly_obj and can_manage_assembly(viewer, assembly_obj))
 
         # Calculate pagination info
         total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 1
@@ -634,6 +690,7 @@ def view_assembly_respondents(assembly_id: uuid.UUID) -> ResponseReturnValue:
             saved = uow.assembly_respondent_gsheets.get_by_assembly_id(assembly_id)
         if saved is not None:
             respondent_gsheet = saved.create_detached_copy()
+        export_state = _get_export_state(assembly_id) if can_manage else None
 
         # Determine data source
         data_source, _locked = determine_data_source(gsheet, csv_status, request.args.get("source", ""))
@@ -659,6 +716,7 @@ def view_assembly_respondents(assembly_id: uuid.UUID) -> ResponseReturnValue:
             status_filter=status_filter_str,
             can_edit=can_edit,
             respondent_gsheet=respondent_gsheet,
+            export_state=export_state,
         ), 200
     except NotFoundError as e:
         logger.warning("Assembly not found", assembly_id=str(assembly_id), user_id=str(current_user.id), error=str(e))
@@ -13,7 +13,9 @@ from opendlp import bootstrap
 from opendlp.entrypoints.scroll_utils import redirect_preserving_scroll
 from opendlp.service_layer.assembly_service import (
     CSVUploadStatus,
+    TargetValueChange,
     add_target_value,
+    apply_target_value_changes,
     create_target_category,
     delete_target_category,
     delete_target_value,
@@ -30,14 +32,20 @@ from opendlp.service_layer.assembly_service import (
 )
 from opendlp.service_layer.constants import MAX_DISTINCT_VALUES_FOR_AUTO_ADD
 from opendlp.service_layer.exceptions import (
+    AssemblyNotFoundError,
     InsufficientPermissions,
     InvalidSelection,
     NotFoundError,
     ServiceLayerError,
+    UserNotFoundError,
 )
 from opendlp.service_layer.permissions import can_manage_assembly
 from opendlp.service_layer.respondent_service import get_respondent_attribute_value_counts
-from opendlp.service_layer.target_checking import check_targets_detailed
+from opendlp.service_layer.target_checking import (
+    TargetCheckState,
+    get_targets_check_state,
+    start_targets_check,
+)
 from opendlp.service_layer.target_respondent_helpers import (
     build_respondent_counts,
     build_selected_counts,
@@ -95,6 +103,14 @@ def _get_assembly_context(assembly_id: uuid.UUID) -> dict:
     }
 
 
+def _get_check_state(assembly_id: uuid.UUID) -> TargetCheckState | None:
+    """The latest background target check for the assembly's current data, if any."""
+    uow = bootstrap.get_flask_uow()
+    with uow:
+        state: TargetCheckState | None = get_targets_check_state(uow, current_user.id, assembly_id)
+    return state
+
+
 @targets_bp.route("/assembly/<uuid:assembly_id>/targets")
 @login_required
 def view_assembly_targets(assembly_id: uuid.UUID) -> ResponseReturnValue:
@@ -122,6 +138,8 @@ def view_assembly_targets(assembly_id: uuid.UUID) -> ResponseReturnValue:
 
         column_distinct_counts = get_column_distinct_counts(assembly_id, attribute_columns)
 
+        check_state = _get_check_state(assembly_id) if can_manage else None
+
         context = _get_assembly_context(assembly_id)
 
         return render_template(
@@ -139,6 +157,8 @@ def view_assembly_targets(assembly_id: uuid.UUID) -> ResponseReturnValue:
             has_selected=has_selected,
             id_column=id_column,
             column_distinct_counts=column_distinct_counts,
+            check_state=check_state,
+            check_result=check_state.result if check_state else None,
             **context,
         ), 200
     except NotFoundError as e:
@@ -684,6 +704,94 @@ def remove_value(assembly_id: uuid.UUID, category_id: uuid.UUID, value_id: uuid.
         return redirect(url_for("targets.view_assembly_targets", assembly_id=assembly_id))
 
 
+def _parse_value_changes(data: object) -> list[TargetValueChange]:
+    """The changes in a batch edit request body, raising ValueError if it is malformed."""
+    if not isinstance(data, dict) or not isinstance(data.get("changes"), list):
+        raise ValueError("Expected a JSON object with a list of changes")
+    changes = []
+    for item in data["changes"]:
+        if not isinstance(item, dict):
+            raise ValueError("Each change must be a JSON object")
+        delete = item.get("delete", False)
+        if not isinstance(delete, bool):
+            raise ValueError(f"Invalid change, 'delete' must be true or false: {item}")
+        try:
+            value_id = item.get("value_id")
+            changes.append(
+                TargetValueChange(
+                    category_id=uuid.UUID(str(item["category_id"])),
+                    value_id=uuid.UUID(str(value_id)) if value_id else None,
+                    value=str(item.get("value", "")).strip(),
+                    min_count=int(item.get("min_count", 0)),
+                    max_count=int(item.get("max_count", 0)),
+                    delete=delete,
+                )
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid change: {item}") from e
+    return changes
+
+
+def _render_categories_table(
+    assembly_id: uuid.UUID, batch_error: str = "", pending_changes: list[TargetValueChange] | None = None
+) -> str:
+    """The #target-categories fragment, as the targets page renders it.
+
+    After a rejected batch, ``pending_changes`` keeps the organiser's edits in the inputs.
+    """
+    uow = bootstrap.get_flask_uow()
+    with uow:
+        target_categories = get_targets_for_assembly(uow, current_user.id, assembly_id)
+    attribute_columns = get_assembly_respondent_attribute_columns(assembly_id)
+    selected_counts = build_selected_counts(assembly_id, target_categories, attribute_columns)
+    check_state = _get_check_state(assembly_id)
+    return render_template(
+        "backoffice/targets/categories_table.html",
+        assembly_id=assembly_id,
+        target_categories=target_categories,
+        value_form=TargetValueForm(),
+        can_manage=True,
+        all_respondent_counts=build_respondent_counts(assembly_id, target_categories, attribute_columns),
+        all_selected_counts=selected_counts,
+        has_selected=any(selected_counts.values()),
+        check_result=check_state.result if check_state else None,
+        batch_error=batch_error,
+        pending_changes={change.value_id: change for change in pending_changes or [] if change.value_id},
+    )
+
+
+@targets_bp.route("/assembly/<uuid:assembly_id>/targets/values/batch", methods=["POST"])
+@login_required
+def batch_edit_values(assembly_id: uuid.UUID) -> ResponseReturnValue:
+    """Apply a set of target value edits in one transaction, returning the refreshed categories.
+
+    Expects a JSON body of ``{"changes": [...]}``, where each change has a
+    ``category_id`` and, as the single-value forms do, ``value``, ``min_count``
+    and ``max_count``. A change without a ``value_id`` adds a value, and one
+    with ``"delete": true`` removes it. Either every change is saved or, if
+    one is rejected, none are and the fragment shows why, with the edits still
+    in place; it is sent as a 422, which the backoffice has HTMX swap in.
+    """
+    try:
+        changes = _parse_value_changes(request.get_json(silent=True))
+    except ValueError as e:
+        return str(e), 400
+
+    try:
+        uow = bootstrap.get_flask_uow()
+        with uow:
+            apply_target_value_changes(uow, current_user.id, assembly_id, changes)
+    except InsufficientPermissions as e:
+        return str(e), 403
+    except (UserNotFoundError, AssemblyNotFoundError) as e:
+        return str(e), 404
+    except (ValueError, NotFoundError) as e:
+        logger.info("Batch target edit rejected", assembly_id=str(assembly_id), changes=len(changes), error=str(e))
+        return _render_categories_table(assembly_id, batch_error=str(e), pending_changes=changes), 422
+
+    return _render_categories_table(assembly_id)
+
+
 @targets_bp.route(
     "/assembly/<uuid:assembly_id>/targets/categories/<uuid:category_id>/values/add-missing",
     methods=["POST"],
@@ -867,54 +975,14 @@ def add_categories_from_columns(assembly_id: uuid.UUID) -> ResponseReturnValue:
         return redirect(url_for("targets.view_assembly_targets", assembly_id=assembly_id))
 
 
-@targets_bp.route("/assembly/<uuid:assembly_id>/targets/check", methods=["GET"])
+@targets_bp.route("/assembly/<uuid:assembly_id>/targets/check", methods=["POST"])
 @login_required
 def check_targets(assembly_id: uuid.UUID) -> ResponseReturnValue:
-    """Run detailed target validation and display results."""
+    """Start a detailed target check in the background; the targets page shows its progress."""
     try:
         uow = bootstrap.get_flask_uow()
         with uow:
-            assembly = get_assembly_with_permissions(uow, assembly_id, current_user.id)
-            check_result = check_targets_detailed(uow, current_user.id, assembly_id)
-            target_categories = get_targets_for_assembly(uow, current_user.id, assembly_id)
-
-        upload_form = UploadTargetsCsvForm()
-        add_category_form = AddTargetCategoryForm()
-        value_form = TargetValueForm()
-        can_manage = _can_manage(assembly_id)
-
-        attribute_columns = get_assembly_respondent_attribute_columns(assembly_id)
-        respondent_counts = build_respondent_counts(assembly_id, target_categories, attribute_columns)
-        selected_counts = build_selected_counts(assembly_id, target_categories, attribute_columns)
-        has_selected = any(selected_counts.values())
-
-        id_column = ""
-        if assembly.csv is not None:
-            id_column = assembly.csv.csv_id_column
-
-        column_distinct_counts = get_column_distinct_counts(assembly_id, attribute_columns)
-
-        context = _get_assembly_context(assembly_id)
-
-        return render_template(
-            "backoffice/assembly_targets.html",
-            assembly=assembly,
-            assembly_id=assembly_id,
-            target_categories=target_categories,
-            form=upload_form,
-            add_category_form=add_category_form,
-            value_form=value_form,
-            can_manage=can_manage,
-            respondent_attribute_columns=attribute_columns,
-            all_respondent_counts=respondent_counts,
-            all_selected_counts=selected_counts,
-            has_selected=has_selected,
-            id_column=id_column,
-            column_distinct_counts=column_distinct_counts,
-            check_result=check_result,
-            **context,
-        ), 200
-
+            start_targets_check(uow, current_user.id, assembly_id)
     except NotFoundError:
         flash(_("Assembly not found"), "error")
         return redirect(url_for("backoffice.dashboard"))
@@ -922,6 +990,31 @@ def check_targets(assembly_id: uuid.UUID) -> ResponseReturnValue:
         flash(_("You don't have permission to view this assembly"), "error")
         return redirect(url_for("backoffice.dashboard"))
     except Exception as e:
-        logger.exception("Error checking targets", assembly_id=str(assembly_id), error=str(e))
+        logger.exception("Error starting target check", assembly_id=str(assembly_id), error=str(e))
         flash(_("An unexpected error occurred while checking targets"), "error")
-        return redirect(url_for("targets.view_assembly_targets", assembly_id=assembly_id))
+    return redirect(url_for("targets.view_assembly_targets", assembly_id=assembly_id))
+
+
+@targets_bp.route("/assembly/<uuid:assembly_id>/targets/check/progress", methods=["GET"])
+@login_required
+def check_targets_progress(assembly_id: uuid.UUID) -> ResponseReturnValue:
+    """HTMX polling endpoint for a background target check.
+
+    Returns the progress fragment while the check runs. Once it has finished the
+    whole page is refreshed, as the results annotate every category block.
+    """
+    try:
+        check_state = _get_check_state(assembly_id)
+    except (NotFoundError, InsufficientPermissions):
+        return "", 404
+
+    if check_state is None or check_state.has_finished:
+        response = make_response("", 200)
+        response.headers["HX-Refresh"] = "true"
+        return response
+
+    return render_template(
+        "backoffice/targets/check_progress.html",
+        assembly_id=assembly_id,
+        check_state=check_state,
+    ), 200
@@ -1,10 +1,83 @@
 import logging
+import os
+import time
+from dataclasses import dataclass
 from typing import Any
 
 from celery import Celery, Task
-from celery.signals import worker_process_init
+from celery.signals import beat_init, task_postrun, task_prerun, worker_init, worker_process_init
+from kombu import Queue
 
 from opendlp import bootstrap, config
+from opendlp.adapters import database
+from opendlp.adapters.metrics import CELERY_TASK_DURATION, MetricsRecorder
+
+# Queues by kind of work. Solver tasks are CPU-bound and can run for hours, so
+# they get their own queue: a long leximin run then can't hold up Google Sheets
+# calls or housekeeping waiting behind it on the same worker processes.
+DEFAULT_QUEUE = "celery"
+SOLVER_QUEUE = "solver"
+GSHEET_IO_QUEUE = "gsheet-io"
+HOUSEKEEPING_QUEUE = "housekeeping"
+QUEUES = (DEFAULT_QUEUE, SOLVER_QUEUE, GSHEET_IO_QUEUE, HOUSEKEEPING_QUEUE)
+
+_TASKS_MODULE = "opendlp.entrypoints.celery.tasks"
+TASK_QUEUES_BY_NAME = {
+    f"{_TASKS_MODULE}.run_select_from_db": SOLVER_QUEUE,
+    f"{_TASKS_MODULE}.run_stability_analysis_from_db": SOLVER_QUEUE,
+    f"{_TASKS_MODULE}.run_stability_sample": SOLVER_QUEUE,
+    f"{_TASKS_MODULE}.finish_stability_analysis": SOLVER_QUEUE,
+    f"{_TASKS_MODULE}.run_select": SOLVER_QUEUE,
+    f"{_TASKS_MODULE}.check_targets": SOLVER_QUEUE,
+    f"{_TASKS_MODULE}.load_gsheet": GSHEET_IO_QUEUE,
+    f"{_TASKS_MODULE}.manage_old_tabs": GSHEET_IO_QUEUE,
+    f"{_TASKS_MODULE}.export_respondents_to_gsheet": GSHEET_IO_QUEUE,
+    f"{_TASKS_MODULE}.cleanup_old_password_reset_tokens": HOUSEKEEPING_QUEUE,
+    f"{_TASKS_MODULE}.cleanup_orphaned_tasks": HOUSEKEEPING_QUEUE,
+    f"{_TASKS_MODULE}.monitor_selection_periodic": HOUSEKEEPING_QUEUE,
+    f"{_TASKS_MODULE}.prune_monitor_run_records": HOUSEKEEPING_QUEUE,
+    f"{_TASKS_MODULE}.generate_registration_image_variants": HOUSEKEEPING_QUEUE,
+    f"{_TASKS_MODULE}.backfill_registration_image_variants": HOUSEKEEPING_QUEUE,
+}
+
+
+@dataclass(frozen=True)
+class WorkerRole:
+    """The queues a worker started with ``opendlp celery worker --role`` consumes, and how."""
+
+    queues: tuple[str, ...]
+    # None leaves it to Celery, which starts one process per CPU
+    concurrency: int | None
+    # Messages each process reserves ahead. Solver tasks run for minutes to hours,
+    # so a process must not sit on a second one that an idle process could start.
+    prefetch_multiplier: int
+
+
+WORKER_ROLES = {
+    "all": WorkerRole(queues=QUEUES, concurrency=None, prefetch_multiplier=1),
+    "solver": WorkerRole(queues=(SOLVER_QUEUE,), concurrency=2, prefetch_multiplier=1),
+    "gsheet-io": WorkerRole(queues=(GSHEET_IO_QUEUE,), concurrency=4, prefetch_multiplier=4),
+    "housekeeping": WorkerRole(queues=(HOUSEKEEPING_QUEUE, DEFAULT_QUEUE), concurrency=1, prefetch_multiplier=4),
+}
+
+
+def worker_argv(role: str, concurrency: int | None = None, loglevel: str = "info") -> list[str]:
+    """Arguments for ``Celery.worker_main`` that start a worker for ``role`` (see ``WORKER_ROLES``)."""
+    worker_role = WORKER_ROLES[role]
+    argv = [
+        "worker",
+        f"--loglevel={loglevel}",
+        f"--queues={','.join(worker_role.queues)}",
+        f"--prefetch-multiplier={worker_role.prefetch_multiplier}",
+        # hand each task to a free process rather than queueing it behind a busy one
+        "-O",
+        "fair",
+        f"--hostname={role}@%h",
+    ]
+    concurrency = concurrency or worker_role.concurrency
+    if concurrency:
+        argv.append(f"--concurrency={concurrency}")
+    return argv
 
 
 def get_celery_app(redis_host: str = "", redis_port: int = 0, old_app: Celery | None = None) -> Celery:
@@ -24,13 +97,25 @@ def get_celery_app(redis_host: str = "", redis_port: int = 0, old_app: Celery |
     )
     app.conf.update(
         timezone="UTC",
-        # use pickle across the board, so we can use rich objects, not just JSON
+        # pickle by default, so the Google Sheets tasks can pass rich objects; the
+        # database-backed tasks opt into JSON with serializer="json" (see tasks.py)
         event_serializer="pickle",
         task_serializer="pickle",
         result_serializer="pickle",
         accept_content=["application/json", "application/x-python-serialize"],
         # track when tasks are started
         task_track_started=True,
+        # A worker started without --queues (e.g. plain `celery worker`) consumes
+        # all of these, so a single worker still runs everything.
+        task_default_queue=DEFAULT_QUEUE,
+        task_queues=[Queue(name) for name in QUEUES],
+        task_routes={name: {"queue": queue} for name, queue in TASK_QUEUES_BY_NAME.items()},
+        worker_prefetch_multiplier=1,
+        # Solver tasks acknowledge their message only once finished (acks_late on
+        # the task), so one lost with its worker host is delivered again. Redis
+        # redelivers unacknowledged messages after this long, which must be
+        # longer than any task can run or a running task would be started twice.
+        broker_transport_options={"visibility_timeout": (config.get_task_timeout_hours() + 1) * 3600},
         # Configure periodic tasks (Celery Beat schedule)
         beat_schedule={
             "cleanup-old-password-reset-tokens": {
@@ -49,6 +134,10 @@ def get_celery_app(redis_host: str = "", redis_port: int = 0, old_app: Celery |
                 "task": "opendlp.entrypoints.celery.tasks.prune_monitor_run_records",
                 "schedule": 86400.0,  # daily
             },
+            "backfill-registration-image-variants": {
+                "task": "opendlp.entrypoints.celery.tasks.backfill_registration_image_variants",
+                "schedule": 3600.0,  # hourly
+            },
         },
     )
 
@@ -67,6 +156,21 @@ def reset_celery_app() -> None:
 app = get_celery_app()
 
 
+@worker_init.connect
+def mark_worker_process(**_: Any) -> None:
+    """Size database pools for a worker (DB_WORKER_* settings), unless OPENDLP_PROCESS_ROLE says otherwise.
+
+    Runs in the main worker process before it forks, so the pool processes inherit it.
+    """
+    os.environ.setdefault("OPENDLP_PROCESS_ROLE", "worker")
+
+
+@beat_init.connect
+def mark_beat_process(**_: Any) -> None:
+    """Size database pools for beat (DB_BEAT_* settings), unless OPENDLP_PROCESS_ROLE says otherwise."""
+    os.environ.setdefault("OPENDLP_PROCESS_ROLE", "beat")
+
+
 @worker_process_init.connect
 def reset_db_connections_after_fork(**_: Any) -> None:
     """Drop any SQLAlchemy engines inherited from the parent celery process.
@@ -79,6 +183,40 @@ def reset_db_connections_after_fork(**_: Any) -> None:
     bootstrap.dispose_cached_engines()
 
 
+@task_prerun.connect
+def start_counting_queries(**_: Any) -> None:
+    database.start_query_tracking()
+
+
+# perf_counter() at the start of each running task, by Celery task id
+_task_started: dict[str, float] = {}
+
+
+@task_prerun.connect
+def start_task_timer(task_id: str | None = None, **_: Any) -> None:
+    if task_id and config.get_metrics_token():
+        _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def record_task_duration(
+    task_id: str | None = None, task: Task | None = None, state: str | None = None, **_: Any
+) -> None:
+    started = _task_started.pop(task_id, None) if task_id else None
+    if started is None:
+        return
+    labels = {"task": task.name if task else "unknown", "state": state or "unknown"}
+    MetricsRecorder().observe(CELERY_TASK_DURATION, labels, time.perf_counter() - started)
+
+
+@task_postrun.connect
+def report_query_counts(task: Task | None = None, state: str | None = None, **_: Any) -> None:
+    """Log the SQL statements each task ran, flagging likely N+1 loops."""
+    stats = database.stop_query_tracking()
+    if stats is not None:
+        database.log_query_stats(stats, task=task.name if task else None, state=state)
+
+
 class CeleryContextHandler(logging.Handler):
     """
     A logger that sends the log messages through Celery to the AsyncResult
@@ -1,18 +1,22 @@
+import contextlib
 import logging
+import time
 import traceback
 import uuid
-from datetime import UTC, datetime
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+import attrs
 import gspread
-from celery import Task
+from celery import Task, chord
 from celery.signals import setup_logging
 from sortition_algorithms import (
     RunReport,
     adapters,
     errors,
     people,
-    run_stratification,
     selected_remaining_tables,
     settings,
 )
@@ -24,16 +28,30 @@ from sqlalchemy.orm.attributes import flag_modified
 
 import opendlp.logging
 from opendlp import config
+from opendlp.adapters.distribution_cache import DistributionCache
+from opendlp.adapters.gsheet_snapshot import SnapshotGSheetDataSource
+from opendlp.adapters.gsheet_tabs import delete_old_output_tabs
+from opendlp.adapters.metrics import SELECTION_TASK_DURATION, MetricsRecorder
+from opendlp.adapters.profiling import PhaseProfiler, ProfileStore, profiled_phase
+from opendlp.adapters.selection_data_cache import (
+    CachedSelectionData,
+    SelectionDataUnavailable,
+    get_data_version,
+    load_shared_selection_data,
+    share_selection_data,
+)
 from opendlp.adapters.sortition_algorithms import CSVGSheetDataSource
 from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
 from opendlp.adapters.sortition_progress import DatabaseProgressReporter
 from opendlp.bootstrap import bootstrap
-from opendlp.domain.value_objects import SelectionRunStatus
+from opendlp.domain.assembly import SelectionRunRecord
+from opendlp.domain.value_objects import RespondentStatus, SelectionRunStatus
 from opendlp.entrypoints.celery.app import app
 from opendlp.entrypoints.context_processors import get_service_account_email
 from opendlp.service_layer import password_reset_service
 from opendlp.service_layer.error_translation import translate_sortition_error, translate_sortition_error_to_html
 from opendlp.service_layer.exceptions import SelectionRunRecordNotFoundError
+from opendlp.service_layer.stability_analysis import stability_report, summarise_panels
 from opendlp.translations import gettext as _
 
 logger = logging.getLogger()
@@ -117,11 +135,38 @@ def _on_task_failure(self: Task | None, exc: Exception, task_id: str, args: tupl
                 record.log_messages.append(f"ERROR: {error_msg}")
                 record.completed_at = datetime.now(UTC)
                 flag_modified(record, "log_messages")
+                _record_selection_duration(record)
                 uow.commit()
     except Exception as update_exc:
         logger.error(f"Failed to update task record in failure callback: {update_exc}")
 
 
+_FINISHED_STATUSES = (SelectionRunStatus.COMPLETED, SelectionRunStatus.FAILED, SelectionRunStatus.CANCELLED)
+
+
+def _record_selection_duration(record: SelectionRunRecord) -> None:
+    if not (config.get_metrics_token() and record.created_at):
+        return
+    finished_at = record.completed_at or datetime.now(UTC)
+    MetricsRecorder().observe(
+        SELECTION_TASK_DURATION,
+        {"task_type": record.task_type.value, "status": record.status.value},
+        (finished_at - record.created_at).total_seconds(),
+    )
+
+
+def _clear_progress_when_finished(record: SelectionRunRecord, was_finished: bool) -> None:
+    record.progress = None
+    flag_modified(record, "progress")
+    if not was_finished:
+        _record_selection_duration(record)
+
+
+def _add_phase_timings(record: SelectionRunRecord, phase_timings: list[tuple[str, float, float]]) -> None:
+    for phase, wall_seconds, cpu_seconds in phase_timings:
+        record.add_phase_timing(phase, wall_seconds, cpu_seconds)
+
+
 def _update_selection_record(
     task_id: uuid.UUID,
     status: SelectionRunStatus,
@@ -132,6 +177,7 @@ def _update_selection_record(
     run_report: RunReport | None = None,
     selected_ids: list[list[str]] | None = None,
     remaining_ids: list[str] | None = None,
+    phase_timings: list[tuple[str, float, float]] | None = None,
     session_factory: sessionmaker | None = None,
 ) -> None:
     """Update an existing SelectionRunRecord with progress information."""
@@ -144,12 +190,10 @@ def _update_selection_record(
             raise SelectionRunRecordNotFoundError(f"SelectionRunRecord with task_id {task_id} not found")
 
         # Update existing record
+        was_finished = record.has_finished
         record.status = status
-        if log_message:
-            record.log_messages.append(log_message)
-            flag_modified(record, "log_messages")
-        if log_messages:
-            record.log_messages.extend(log_messages)
+        if log_message or log_messages:
+            record.log_messages.extend([log_message] if log_message else log_messages or [])
             flag_modified(record, "log_messages")
         if error_message:
             record.error_message = error_message
@@ -164,9 +208,9 @@ def _update_selection_record(
         if remaining_ids is not None:
             record.remaining_ids = remaining_ids
             flag_modified(record, "remaining_ids")
-        if status in (SelectionRunStatus.COMPLETED, SelectionRunStatus.FAILED, SelectionRunStatus.CANCELLED):
-            record.progress = None
-            flag_modified(record, "progress")
+        _add_phase_timings(record, phase_timings or [])
+        if status in _FINISHED_STATUSES:
+            _clear_progress_when_finished(record, was_finished)
 
         uow.commit()
 
@@ -178,6 +222,101 @@ def _append_run_log(task_id: uuid.UUID, log_messages: list[str], session_factory
     )
 
 
+def _record_phase_timing(
+    task_id: uuid.UUID, phase: str, wall_seconds: float, cpu_seconds: float, session_factory: sessionmaker | None = None
+) -> None:
+    with bootstrap(session_factory=session_factory) as uow:
+        record = uow.selection_run_records.get_by_task_id(task_id)
+        if record is None:
+            # deleted while the task was running, e.g. after a cancel
+            return
+        record.add_phase_timing(phase, wall_seconds, cpu_seconds)
+        uow.commit()
+
+
+@dataclass
+class _SampleLog:
+    """Log lines and phase timings of one stability sample.
+
+    The samples of a stability analysis run concurrently against one record, so
+    they collect their output here and return it in the chord result, for the
+    callback to write to the record once, rather than each read-modify-writing
+    the record's JSON columns and overwriting the others' additions.
+    """
+
+    log_messages: list[str] = field(default_factory=list)
+    phase_timings: list[tuple[str, float, float]] = field(default_factory=list)
+
+
+def _log_run(
+    task_id: uuid.UUID,
+    log_messages: list[str],
+    session_factory: sessionmaker | None = None,
+    sample_log: _SampleLog | None = None,
+) -> None:
+    """Add to the log of the run, or of the sample when running one."""
+    if sample_log is not None:
+        sample_log.log_messages.extend(log_messages)
+    else:
+        _append_run_log(task_id, log_messages, session_factory=session_factory)
+
+
+@contextlib.contextmanager
+def _timed_phase(
+    task_id: uuid.UUID,
+    phase: str,
+    session_factory: sessionmaker | None = None,
+    sample_log: _SampleLog | None = None,
+) -> Iterator[None]:
+    """Record the wall-clock and CPU time of the block on the SelectionRunRecord, even if it raises."""
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield
+    finally:
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() - cpu_start
+        if sample_log is not None:
+            sample_log.phase_timings.append((phase, wall_seconds, cpu_seconds))
+        else:
+            _record_phase_timing(task_id, phase, wall_seconds, cpu_seconds, session_factory=session_factory)
+
+
+def _record_run_shape(
+    task_id: uuid.UUID,
+    features: FeatureCollection,
+    loaded_people: people.People,
+    settings: settings.Settings,
+    session_factory: sessionmaker | None = None,
+) -> None:
+    """Record the size of the selection problem, so timings can be compared across runs."""
+    with bootstrap(session_factory=session_factory) as uow:
+        record = uow.selection_run_records.get_by_task_id(task_id)
+        if record is None:
+            return
+        record.pool_size = loaded_people.count
+        record.category_count = len(features)
+        record.selection_algorithm = settings.selection_algorithm
+        uow.commit()
+
+
+@contextlib.contextmanager
+def _task_profile(task_id: uuid.UUID, profile: bool) -> Iterator[PhaseProfiler | None]:
+    """Yield a profiler for the task's phases when asked for one, and store it under the task id afterwards.
+
+    The profile is stored even when a phase raises, as a failed run is often the one worth looking at.
+    """
+    if not profile:
+        yield None
+        return
+    profiler = PhaseProfiler()
+    try:
+        yield profiler
+    finally:
+        if ProfileStore().save(str(task_id), profiler):
+            logger.info(f"Saved profile for task {task_id}: {profiler.phase_seconds}")
+
+
 def _internal_load_gsheet(
     task_obj: Task,
     task_id: uuid.UUID,
@@ -190,7 +329,7 @@ def _internal_load_gsheet(
     reporter = progress_reporter or NullProgressReporter()
     reporter.start_phase("read_gsheet", total=None)
     data_source = select_data.data_source
-    assert isinstance(data_source, adapters.GSheetDataSource | CSVGSheetDataSource)
+    assert isinstance(data_source, adapters.GSheetDataSource | CSVGSheetDataSource | SnapshotGSheetDataSource)
     report = RunReport()
     # Update SelectionRunRecord to running status
     _update_selection_record(
@@ -202,7 +341,8 @@ def _internal_load_gsheet(
     # check if we can even get the title
     try:
         # TODO: use data_source.get_title() once we have sortition_algorithms>0.10.21
-        spreadsheet_title = data_source.spreadsheet.title
+        with _timed_phase(task_id, "open_spreadsheet", session_factory):
+            spreadsheet_title = data_source.spreadsheet.title
     except gspread.exceptions.SpreadsheetNotFound:
         msg = f"Spreadsheet not found, check URL: {data_source._g_sheet_name}"
         _update_selection_record(
@@ -242,7 +382,14 @@ def _internal_load_gsheet(
             session_factory=session_factory,
         )
 
-        features, f_report = select_data.load_features()
+        with _timed_phase(task_id, "load_targets", session_factory):
+            features, f_report = select_data.load_features()
+        if isinstance(data_source, SnapshotGSheetDataSource) and data_source.reused:
+            _append_run_log(
+                task_id,
+                [_("The spreadsheet has not changed since it was last loaded, so that data is reused.")],
+                session_factory=session_factory,
+            )
         # print(f_report.as_text())
         report.add_report(f_report)
         task_obj.update_state(
@@ -272,7 +419,8 @@ def _internal_load_gsheet(
             session_factory=session_factory,
         )
 
-        people, p_report = select_data.load_people(settings, features)
+        with _timed_phase(task_id, "load_people", session_factory):
+            people, p_report = select_data.load_people(settings, features)
         report.add_report(p_report)
         task_obj.update_state(
             state="PROGRESS",
@@ -299,7 +447,8 @@ def _internal_load_gsheet(
                 session_factory=session_factory,
             )
         # always do this, as it gives a safe default
-        already_selected, a_s_report = select_data.load_already_selected(settings)
+        with _timed_phase(task_id, "load_already_selected", session_factory):
+            already_selected, a_s_report = select_data.load_already_selected(settings)
         if data_source.already_selected_tab_name:
             report.add_report(a_s_report)
             task_obj.update_state(
@@ -314,6 +463,7 @@ def _internal_load_gsheet(
                 session_factory=session_factory,
             )
 
+        _record_run_shape(task_id, features, people, settings, session_factory)
         _update_selection_record(
             task_id=task_id,
             status=SelectionRunStatus.COMPLETED if final_task else SelectionRunStatus.RUNNING,
@@ -392,11 +542,20 @@ def _internal_run_select(
     final_task: bool = True,
     session_factory: sessionmaker | None = None,
     progress_reporter: ProgressReporter | None = None,
+    sample_log: _SampleLog | None = None,
 ) -> tuple[bool, list[frozenset[str]], RunReport]:
+    """Run one stratified selection, logging progress to the SelectionRunRecord.
+
+    Given a ``sample_log`` the record is not touched at all: the log lines and
+    timings go into the sample log and the record's status, report and selected
+    ids are left for the caller to set. This is for runs that are one of many
+    sharing a record, such as the stability analysis samples.
+    """
+    record_outcome = sample_log is None
     report = RunReport()
     # Update SelectionRunRecord to running status
     log_suffix = _(": TEST only, do not use for real selection") if test_selection else ""
-    _append_run_log(
+    _log_run(
         task_id,
         [
             _(
@@ -406,10 +565,11 @@ def _internal_run_select(
             )
         ],
         session_factory=session_factory,
+        sample_log=sample_log,
     )
 
     try:
-        _append_run_log(
+        _log_run(
             task_id,
             [
                 _(
@@ -420,19 +580,39 @@ def _internal_run_select(
                 )
             ],
             session_factory=session_factory,
+            sample_log=sample_log,
         )
 
-        success, selected_panels, report = run_stratification(
-            features=features,
-            people=people,
-            number_people_wanted=number_people_wanted,
-            settings=settings,
-            test_selection=test_selection,
-            already_selected=already_selected,
-            progress_reporter=progress_reporter,
-        )
+        with _timed_phase(task_id, "select", session_factory, sample_log=sample_log):
+            success, selected_panels, report, cache_outcome = DistributionCache().run_stratification(
+                features=features,
+                people=people,
+                number_people_wanted=number_people_wanted,
+                settings=settings,
+                test_selection=test_selection,
+                already_selected=already_selected,
+                progress_reporter=progress_reporter,
+            )
+        if cache_outcome.hit:
+            cache_msg = _(
+                "Reused the panel distribution already computed for identical targets, respondents and "
+                "settings - only the lottery was redrawn."
+            )
+            report.add_line(cache_msg, ReportLevel.IMPORTANT)
+            _log_run(task_id, [cache_msg], session_factory=session_factory, sample_log=sample_log)
 
-        if success:
+        if not record_outcome:
+            _log_run(
+                task_id,
+                [
+                    _("Selection completed successfully.%(suffix)s", suffix=log_suffix)
+                    if success
+                    else _("Selection algorithm failed to find suitable panels")
+                ],
+                session_factory=session_factory,
+                sample_log=sample_log,
+            )
+        elif success:
             # Convert frozensets to lists for JSON serialization
             selected_ids = [list(panel) for panel in selected_panels]
             _update_selection_record(
@@ -476,6 +656,9 @@ def _internal_run_select(
         report.add_line(error_msg, ReportLevel.IMPORTANT)
         report.add_lines(traceback_msg.split("\n"))
 
+        if not record_outcome:
+            _log_run(task_id, [error_msg], session_factory=session_factory, sample_log=sample_log)
+            return False, [], report
         _update_selection_record(
             task_id=task_id,
             status=SelectionRunStatus.FAILED,
@@ -515,12 +698,13 @@ def _internal_write_selected(
         )
 
         # Export to Google Sheets
-        dupes, report = select_data.output_selected_remaining(
-            people_selected_rows=selected_table,
-            people_remaining_rows=remaining_table,
-            settings=settings,
-            already_selected=already_selected,
-        )
+        with _timed_phase(task_id, "write_spreadsheet", session_factory):
+            dupes, report = select_data.output_selected_remaining(
+                people_selected_rows=selected_table,
+                people_remaining_rows=remaining_table,
+                settings=settings,
+                already_selected=already_selected,
+            )
         if dupes:
             # TODO: do something more with dupes? Maybe save to run record extra_info JSON???
             _append_run_log(
@@ -586,9 +770,10 @@ def _internal_load_db(
     try:
         with bootstrap(session_factory=session_factory) as uow:
             data_source = OpenDLPDataAdapter(uow, assembly_id)
-            select_data = adapters.SelectionData(data_source)
+            select_data = CachedSelectionData(adapters.SelectionData(data_source), assembly_id)
 
-            features, f_report = select_data.load_features()
+            with _timed_phase(task_id, "load_targets", session_factory):
+                features, f_report = select_data.load_features()
             report.add_report(f_report)
 
             num_features = len(features)
@@ -612,7 +797,8 @@ def _internal_load_db(
                 session_factory=session_factory,
             )
 
-            loaded_people, p_report = select_data.load_people(settings, features)
+            with _timed_phase(task_id, "load_people", session_factory):
+                loaded_people, p_report = select_data.load_people(settings, features)
             report.add_report(p_report)
 
             _append_run_log(
@@ -621,6 +807,7 @@ def _internal_load_db(
                 session_factory=session_factory,
             )
 
+        _record_run_shape(task_id, features, loaded_people, settings, session_factory)
         _update_selection_record(
             task_id=task_id,
             status=SelectionRunStatus.COMPLETED if final_task else SelectionRunStatus.RUNNING,
@@ -683,7 +870,10 @@ def _internal_write_db_results(
         selected_count = len(selected_ext_ids)
         remaining_count = len(remaining_ext_ids)
 
-        with bootstrap(session_factory=session_factory) as uow:
+        with (
+            _timed_phase(task_id, "write_database", session_factory),
+            bootstrap(session_factory=session_factory) as uow,
+        ):
             run_record = uow.selection_run_records.get_by_task_id(task_id)
             if run_record is None or run_record.user_id is None:
                 raise SelectionRunRecordNotFoundError(f"Selection run {task_id} not found or has no user_id")
@@ -722,59 +912,309 @@ def _internal_write_db_results(
         return report
 
 
-@app.task(bind=True, on_failure=_on_task_failure)
+def settings_to_payload(settings_obj: settings.Settings) -> dict[str, Any]:
+    """The plain-dict form of ``Settings`` sent in the JSON messages of the database-backed tasks."""
+    return attrs.asdict(settings_obj)
+
+
+def _settings_from_payload(payload: settings.Settings | dict[str, Any]) -> settings.Settings:
+    # Messages queued by an older release still carry a pickled Settings object.
+    if isinstance(payload, settings.Settings):
+        return payload
+    return settings.Settings(**payload)
+
+
+def _stability_data_unavailable_message(err: SelectionDataUnavailable) -> str:
+    if err.changed:
+        return _(
+            "The respondents or targets were edited while the stability analysis was running, "
+            "so it was stopped. Please run it again."
+        )
+    return _("The data loaded for the stability analysis expired before it finished. Please run it again.")
+
+
+def _run_has_finished(task_id: uuid.UUID, session_factory: sessionmaker | None) -> bool:
+    """Whether the run record is gone or finished, e.g. cancelled while its samples were queued."""
+    with bootstrap(session_factory=session_factory) as uow:
+        record = uow.selection_run_records.get_by_task_id(task_id)
+        return record is None or record.has_finished
+
+
+# The database-backed tasks below send JSON: ids, numbers and a settings dict, never
+# pickled objects. Their outcome (panels, report, log) is written to the run record,
+# so they only return a success flag - the result backend keeps nothing of substance.
+#
+# Solver tasks set acks_late: their message is only acknowledged once they finish,
+# so one lost with its worker host is run again (see broker visibility_timeout in app.py).
+# A redelivered message can also arrive after its run was given up on - marked failed
+# by cleanup_orphaned_tasks, or cancelled with a revoke the worker has since forgotten -
+# so they do nothing once the run has finished.
+@app.task(bind=True, acks_late=True, serializer="json", on_failure=_on_task_failure)
 def run_select_from_db(
     self: Task,
     task_id: uuid.UUID,
     assembly_id: uuid.UUID,
     number_people_wanted: int,
-    settings: settings.Settings,
+    settings: dict[str, Any] | settings.Settings,
     test_selection: bool = False,
     session_factory: sessionmaker | None = None,
-) -> tuple[bool, list[frozenset[str]], RunReport]:
+    profile: bool = False,
+) -> bool:
+    if _run_has_finished(task_id, session_factory):
+        logger.info(f"Selection run {task_id} has already finished, not running it again")
+        return False
     _set_up_celery_logging(task_id, session_factory=session_factory)
     reporter = DatabaseProgressReporter(task_id=task_id, session_factory=session_factory)
-    report = RunReport()
+    settings_obj = _settings_from_payload(settings)
 
-    success, features, loaded_people, load_report = _internal_load_db(
+    with _task_profile(task_id, profile) as profiler:
+        with profiled_phase(profiler, "load"):
+            success, features, loaded_people, _load_report = _internal_load_db(
+                task_id=task_id,
+                assembly_id=assembly_id,
+                settings=settings_obj,
+                final_task=False,
+                session_factory=session_factory,
+            )
+        if not success:
+            return False
+        assert features is not None
+        assert loaded_people is not None
+
+        with profiled_phase(profiler, "select"):
+            success, selected_panels, _select_report = _internal_run_select(
+                task_id=task_id,
+                features=features,
+                people=loaded_people,
+                settings=settings_obj,
+                number_people_wanted=number_people_wanted,
+                test_selection=test_selection,
+                already_selected=None,
+                final_task=False,
+                session_factory=session_factory,
+                progress_reporter=reporter,
+            )
+        if not success:
+            return False
+
+        with profiled_phase(profiler, "write"):
+            _internal_write_db_results(
+                task_id=task_id,
+                assembly_id=assembly_id,
+                full_people=loaded_people,
+                selected_panels=selected_panels,
+                session_factory=session_factory,
+            )
+
+    return success
+
+
+@app.task(bind=True, serializer="json", on_failure=_on_task_failure)
+def run_stability_analysis_from_db(
+    self: Task,
+    task_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    number_people_wanted: int,
+    settings: dict[str, Any] | settings.Settings,
+    num_runs: int,
+    session_factory: sessionmaker | None = None,
+) -> bool:
+    """Load the data once, then fan out ``num_runs`` test selections across the workers.
+
+    The selections run as a chord so they spread over every worker process, and
+    ``finish_stability_analysis`` aggregates them into the report on the run record.
+    The data parsed here is shared in Redis under the data version read before
+    loading it, and each selection is sent that version rather than the data, so
+    the messages stay small and every selection uses exactly the same pool.
+    """
+    _set_up_celery_logging(task_id, session_factory=session_factory)
+    settings_obj = _settings_from_payload(settings)
+
+    # Read before loading: an edit committed after this bumps the version, so the
+    # samples find it changed rather than use data that no longer matches it.
+    data_version = get_data_version(assembly_id)
+    success, features, loaded_people, _load_report = _internal_load_db(
         task_id=task_id,
         assembly_id=assembly_id,
-        settings=settings,
+        settings=settings_obj,
         final_task=False,
         session_factory=session_factory,
     )
-    report.add_report(load_report)
     if not success:
-        return False, [], report
+        return False
     assert features is not None
     assert loaded_people is not None
+    # Kept for as long as the analysis may run, even with the selection data cache disabled.
+    share_selection_data(
+        assembly_id,
+        data_version,
+        settings_obj,
+        features,
+        loaded_people,
+        ttl_seconds=config.get_task_timeout_hours() * 3600,
+    )
 
-    success, selected_panels, select_report = _internal_run_select(
+    _append_run_log(
+        task_id,
+        [_("Starting %(count)s test selections for stability analysis", count=num_runs)],
+        session_factory=session_factory,
+    )
+    sample_kwargs = {
+        "task_id": task_id,
+        "assembly_id": assembly_id,
+        "settings": settings_to_payload(settings_obj),
+        "number_people_wanted": number_people_wanted,
+        "data_version": data_version,
+        "session_factory": session_factory,
+    }
+    result = chord(run_stability_sample.s(**sample_kwargs) for _run in range(num_runs))(
+        finish_stability_analysis.s(**sample_kwargs, num_runs=num_runs)
+    )
+    header = result.parent
+    child_ids = [*(sample.id for sample in getattr(header, "results", [])), result.id]
+    _record_child_tasks(task_id, child_ids, session_factory)
+    return True
+
+
+def _record_child_tasks(task_id: uuid.UUID, child_ids: list[str], session_factory: sessionmaker | None) -> None:
+    """Store the Celery ids of the tasks a run fanned out to, so cancelling the run revokes them too."""
+    with bootstrap(session_factory=session_factory) as uow:
+        record = uow.selection_run_records.get_by_task_id(task_id)
+        if record is None:
+            return
+        record.child_celery_task_ids = child_ids
+        flag_modified(record, "child_celery_task_ids")
+        uow.commit()
+
+
+def _sample_result(panels: list[frozenset[str]], sample_log: _SampleLog) -> dict[str, Any]:
+    return {
+        "panels": [sorted(panel) for panel in panels],
+        "log_messages": sample_log.log_messages,
+        "phase_timings": sample_log.phase_timings,
+    }
+
+
+@app.task(acks_late=True, serializer="json")
+def run_stability_sample(
+    task_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    settings: dict[str, Any] | settings.Settings,
+    number_people_wanted: int,
+    data_version: str = "",
+    session_factory: sessionmaker | None = None,
+) -> dict[str, Any]:
+    """Run one test selection of a stability analysis on the data shared under ``data_version``.
+
+    Returns its panels (empty on failure) with its log lines and timings, which
+    ``finish_stability_analysis`` writes to the run record - the sample itself
+    never writes to the record, so it cannot undo a cancel. If the data has changed
+    or expired it selects nothing, and ``finish_stability_analysis`` says why.
+    """
+    sample_log = _SampleLog()
+    if _run_has_finished(task_id, session_factory):
+        return _sample_result([], sample_log)
+    settings_obj = _settings_from_payload(settings)
+    try:
+        features, loaded_people = load_shared_selection_data(assembly_id, data_version, settings_obj)
+    except Exception as err:
+        # a failed header task would stop the chord, so count this as a run without a panel
+        logger.error(f"Stability sample for {task_id} could not load its data: {err}")
+        return _sample_result([], sample_log)
+    _success, selected_panels, _report = _internal_run_select(
         task_id=task_id,
         features=features,
         people=loaded_people,
-        settings=settings,
+        settings=settings_obj,
         number_people_wanted=number_people_wanted,
-        test_selection=test_selection,
-        already_selected=None,
+        test_selection=True,
         final_task=False,
         session_factory=session_factory,
-        progress_reporter=reporter,
+        sample_log=sample_log,
     )
-    report.add_report(select_report)
-    if not success:
-        return False, [], report
+    return _sample_result(selected_panels, sample_log)
+
 
-    write_report = _internal_write_db_results(
+@app.task(serializer="json", on_failure=_on_task_failure)
+def finish_stability_analysis(
+    samples: list[dict[str, Any]],
+    task_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    settings: dict[str, Any] | settings.Settings,
+    number_people_wanted: int,
+    num_runs: int,
+    data_version: str = "",
+    session_factory: sessionmaker | None = None,
+) -> bool:
+    """Chord callback: write the samples' logs, timings and stability report to the run record in one go."""
+    if _run_has_finished(task_id, session_factory):
+        # cancelled while the samples were running - leave the record as it is
+        return False
+
+    log_messages = [message for sample in samples for message in sample["log_messages"]]
+    phase_timings = [
+        (phase, wall_seconds, cpu_seconds)
+        for sample in samples
+        for phase, wall_seconds, cpu_seconds in sample["phase_timings"]
+    ]
+    try:
+        features, loaded_people = load_shared_selection_data(
+            assembly_id, data_version, _settings_from_payload(settings)
+        )
+    except SelectionDataUnavailable as err:
+        logger.error(f"Stability analysis {task_id} could not reload its data: {err}")
+        error_message = _stability_data_unavailable_message(err)
+        _update_selection_record(
+            task_id=task_id,
+            status=SelectionRunStatus.FAILED,
+            log_messages=[*log_messages, error_message],
+            error_message=error_message,
+            completed_at=datetime.now(UTC),
+            phase_timings=phase_timings,
+            session_factory=session_factory,
+        )
+        return False
+    panels = [frozenset(panel) for sample in samples for panel in sample["panels"]]
+    report = stability_report(summarise_panels(features, loaded_people, panels, runs_requested=num_runs))
+    if not panels:
+        _update_selection_record(
+            task_id=task_id,
+            status=SelectionRunStatus.FAILED,
+            log_messages=[*log_messages, _("Stability analysis failed: no test selection found a panel")],
+            error_message=_("None of the %(count)s test selections found a panel", count=num_runs),
+            completed_at=datetime.now(UTC),
+            run_report=report,
+            phase_timings=phase_timings,
+            session_factory=session_factory,
+        )
+        return False
+
+    _update_selection_record(
         task_id=task_id,
-        assembly_id=assembly_id,
-        full_people=loaded_people,
-        selected_panels=selected_panels,
+        status=SelectionRunStatus.COMPLETED,
+        log_messages=[
+            *log_messages,
+            _(
+                "Stability analysis completed: %(succeeded)s of %(requested)s test selections found a panel.",
+                succeeded=len(panels),
+                requested=num_runs,
+            ),
+        ],
+        completed_at=datetime.now(UTC),
+        run_report=report,
+        phase_timings=phase_timings,
         session_factory=session_factory,
     )
-    report.add_report(write_report)
+    return True
 
-    return success, selected_panels, report
+
+def _with_gsheet_snapshot(
+    data_source: adapters.GSheetDataSource | CSVGSheetDataSource,
+) -> adapters.GSheetDataSource | CSVGSheetDataSource | SnapshotGSheetDataSource:
+    """Share the tabs one task downloads with the next task that reads the same, unedited sheet."""
+    if isinstance(data_source, adapters.GSheetDataSource) and config.get_gsheet_snapshot_ttl_seconds():
+        return SnapshotGSheetDataSource(data_source)
+    return data_source
 
 
 @app.task(bind=True, on_failure=_on_task_failure)
@@ -787,7 +1227,7 @@ def load_gsheet(
 ) -> tuple[bool, FeatureCollection | None, people.People | None, people.People | None, RunReport]:
     _set_up_celery_logging(task_id, session_factory=session_factory)
     reporter = DatabaseProgressReporter(task_id=task_id, session_factory=session_factory)
-    select_data = adapters.SelectionData(data_source)
+    select_data = adapters.SelectionData(_with_gsheet_snapshot(data_source))
     return _internal_load_gsheet(
         task_obj=self,
         task_id=task_id,
@@ -799,7 +1239,7 @@ def load_gsheet(
     )
 
 
-@app.task(bind=True, on_failure=_on_task_failure)
+@app.task(bind=True, acks_late=True, on_failure=_on_task_failure)
 def run_select(
     self: Task,
     task_id: uuid.UUID,
@@ -810,59 +1250,115 @@ def run_select(
     gen_rem_tab: bool = True,
     for_replacements: bool = False,
     session_factory: sessionmaker | None = None,
+    profile: bool = False,
 ) -> tuple[bool, list[frozenset[str]], RunReport]:
-    _set_up_celery_logging(task_id, session_factory=session_factory)
-    reporter = DatabaseProgressReporter(task_id=task_id, session_factory=session_factory)
     report = RunReport()
-    select_data = adapters.SelectionData(data_source, gen_rem_tab=gen_rem_tab)
-    success, features, people, already_selected, load_report = _internal_load_gsheet(
-        task_obj=self,
-        task_id=task_id,
-        select_data=select_data,
-        settings=settings,
-        final_task=False,
-        session_factory=session_factory,
-        progress_reporter=reporter,
-    )
-    report.add_report(load_report)
-    if not success:
+    if _run_has_finished(task_id, session_factory):
+        logger.info(f"Selection run {task_id} has already finished, not running it again")
         return False, [], report
-    assert features is not None
-    assert people is not None
+    _set_up_celery_logging(task_id, session_factory=session_factory)
+    reporter = DatabaseProgressReporter(task_id=task_id, session_factory=session_factory)
+    select_data = adapters.SelectionData(_with_gsheet_snapshot(data_source), gen_rem_tab=gen_rem_tab)
+    with _task_profile(task_id, profile) as profiler:
+        with profiled_phase(profiler, "load"):
+            success, features, people, already_selected, load_report = _internal_load_gsheet(
+                task_obj=self,
+                task_id=task_id,
+                select_data=select_data,
+                settings=settings,
+                final_task=False,
+                session_factory=session_factory,
+                progress_reporter=reporter,
+            )
+        report.add_report(load_report)
+        if not success:
+            return False, [], report
+        assert features is not None
+        assert people is not None
 
-    success, selected_panels, select_report = _internal_run_select(
-        task_id=task_id,
-        features=features,
-        people=people,
-        settings=settings,
-        number_people_wanted=number_people_wanted,
-        test_selection=test_selection,
-        already_selected=already_selected,
-        final_task=False,
-        session_factory=session_factory,
-        progress_reporter=reporter,
-    )
-    report.add_report(select_report)
-    if not success:
-        return False, [], report
+        with profiled_phase(profiler, "select"):
+            success, selected_panels, select_report = _internal_run_select(
+                task_id=task_id,
+                features=features,
+                people=people,
+                settings=settings,
+                number_people_wanted=number_people_wanted,
+                test_selection=test_selection,
+                already_selected=already_selected,
+                final_task=False,
+                session_factory=session_factory,
+                progress_reporter=reporter,
+            )
+        report.add_report(select_report)
+        if not success:
+            return False, [], report
 
-    # write back to the spreadsheet
-    write_report = _internal_write_selected(
-        task_id=task_id,
-        select_data=select_data,
-        features=features,
-        people=people,
-        already_selected=already_selected,
-        settings=settings,
-        selected_panels=selected_panels,
-        session_factory=session_factory,
-        progress_reporter=reporter,
-    )
-    report.add_report(write_report)
+        # write back to the spreadsheet
+        with profiled_phase(profiler, "write"):
+            write_report = _internal_write_selected(
+                task_id=task_id,
+                select_data=select_data,
+                features=features,
+                people=people,
+                already_selected=already_selected,
+                settings=settings,
+                selected_panels=selected_panels,
+                session_factory=session_factory,
+                progress_reporter=reporter,
+            )
+        report.add_report(write_report)
 
     return success, selected_panels, report
 
 
+@app.task(acks_late=True, serializer="json")
+def check_targets(
+    task_id: str,
+    assembly_id: uuid.UUID,
+    user_id: uuid.UUID,
+    inputs_key: str,
+    session_factory: sessionmaker | None = None,
+) -> bool:
+    """Run the detailed target check for the targets page and store the outcome in Redis."""
+    from opendlp.service_layer.target_checking import TargetCheckStatus, run_targets_check  # noqa: PLC0415
+
+    with bootstrap(session_factory=session_factory) as uow:
+        state = run_targets_check(uow, user_id, assembly_id, task_id=task_id, inputs_key=inputs_key)
+    return state.status == TargetCheckStatus.COMPLETED
+
+
+@app.task(acks_late=True, serializer="json")
+def export_respondents_to_gsheet(
+    task_id: str,
+    assembly_id: uuid.UUID,
+    user_id: uuid.UUID,
+    statuses: list[str] | None,
+    spreadsheet_url: str,
+    worksheet_name: str,
+    session_factory: sessionmaker | None = None,
+) -> bool:
+    """Write an assembly's respondents to a Google Sheet, storing progress and outcome in Redis."""
+    from opendlp.adapters.gsheet_export import GSheetExportTarget  # noqa: PLC0415
+    from opendlp.service_layer.respondent_export_service import (  # noqa: PLC0415
+        GSheetExportStatus,
+        run_respondent_gsheet_export,
+    )
+
+    status_filter = None if statuses is None else [RespondentStatus(status) for status in statuses]
+    with bootstrap(session_factory=session_factory) as uow:
+        state = run_respondent_gsheet_export(
+            uow,
+            user_id,
+            assembly_id,
+            task_id=task_id,
+            status_filter=status_filter,
+            spreadsheet_url=spreadsheet_url,
+            worksheet_name=worksheet_name,
+            target=GSheetExportTarget(spreadsheet_url=spreadsheet_url),
+        )
+    return state.status == GSheetExportStatus.COMPLETED
+
+
 @app.task
 def cleanup_old_password_reset_tokens(days_old: int = 30) -> int:
     """
@@ -917,21 +1413,36 @@ def manage_old_tabs(
     )
 
     try:
-        # Call delete_old_output_tabs method
-        tab_names = data_source.delete_old_output_tabs(dry_run=dry_run)
-
-        # Log what was found/deleted
-        if len(tab_names) == 0:
-            log_message = _("No old output tabs found")
+        outcome = delete_old_output_tabs(data_source, dry_run=dry_run)
+        tab_names = outcome.tab_names
+
+        # Record what happened to each tab, then a summary
+        log_messages: list[str] = []
+        if not dry_run:
+            log_messages.extend(_("Deleted tab %(tab_name)s", tab_name=tab_name) for tab_name in tab_names)
+            log_messages.extend(
+                _("Could not delete tab %(tab_name)s: %(error)s", tab_name=tab_name, error=error)
+                for tab_name, error in outcome.failures.items()
+            )
+        if outcome.failures:
+            log_messages.append(
+                _(
+                    "Deleted %(count)s old output tab(s); %(failed)s could not be deleted",
+                    count=len(tab_names),
+                    failed=len(outcome.failures),
+                )
+            )
+        elif len(tab_names) == 0:
+            log_messages.append(_("No old output tabs found"))
         elif dry_run:
-            log_message = _("Found %(count)s old output tab(s) that can be deleted", count=len(tab_names))
+            log_messages.append(_("Found %(count)s old output tab(s) that can be deleted", count=len(tab_names)))
         else:
-            log_message = _("Successfully deleted %(count)s old output tab(s)", count=len(tab_names))
+            log_messages.append(_("Successfully deleted %(count)s old output tab(s)", count=len(tab_names)))
 
         _update_selection_record(
             task_id=task_id,
             status=SelectionRunStatus.COMPLETED,
-            log_message=log_message,
+            log_messages=log_messages,
             completed_at=datetime.now(UTC),
             session_factory=session_factory,
         )
@@ -1081,3 +1592,43 @@ def prune_monitor_run_records(
         uow.commit()
     logger.info(f"prune_monitor_run_records: deleted {deleted} record(s)")
     return deleted
+
+
+@app.task(serializer="json")
+def generate_registration_image_variants(image_id: str, session_factory: sessionmaker | None = None) -> int:
+    """Render the resized WebP and PNG variants of a newly uploaded registration image."""
+    from opendlp.service_layer import registration_image_service  # noqa: PLC0415
+
+    with bootstrap(session_factory=session_factory) as uow:
+        created = registration_image_service.generate_registration_image_variants(uow, uuid.UUID(image_id))
+    logger.info(f"generate_registration_image_variants: {created} variant(s) for image {image_id}")
+    return created
+
+
+@app.task
+def backfill_registration_image_variants(
+    session_factory: sessionmaker | None = None, batch_size: int = 20, grace_minutes: int = 10
+) -> int:
+    """Render variants for images that have none: uploaded before variants existed, or whose task was lost.
+
+    Images from the last ``grace_minutes`` are left to the task queued by their upload.
+    Each image gets its own transaction; one that fails to render is marked, so
+    it neither rolls back the rest of the batch nor holds up later runs.
+    """
+    from opendlp.service_layer import registration_image_service  # noqa: PLC0415
+
+    created_before = datetime.now(UTC) - timedelta(minutes=grace_minutes)
+    with bootstrap(session_factory=session_factory) as uow:
+        image_ids = registration_image_service.list_image_ids_needing_variants(uow, created_before, batch_size)
+    rendered = 0
+    for image_id in image_ids:
+        try:
+            with bootstrap(session_factory=session_factory) as uow:
+                registration_image_service.generate_registration_image_variants(uow, image_id)
+            rendered += 1
+        except Exception:
+            logger.exception(f"Could not render variants for image_id={image_id}; skipping it from now on")
+            with bootstrap(session_factory=session_factory) as uow:
+                registration_image_service.mark_image_variants_failed(uow, image_id)
+    logger.info(f"backfill_registration_image_variants: rendered variants for {rendered} of {len(image_ids)} image(s)")
+    return rendered
@@ -25,12 +25,14 @@ def version() -> None:
 
 
 # Import subcommands to register them
+from .blobs import blobs  # noqa: E402
 from .celery import celery  # noqa: E402
 from .database import database  # noqa: E402
 from .invites import invites  # noqa: E402
 from .monitor import monitor  # noqa: E402
 from .users import users  # noqa: E402
 
+cli.add_command(blobs)
 cli.add_command(celery)
 cli.add_command(database)
 cli.add_command(invites)
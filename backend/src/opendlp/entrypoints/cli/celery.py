@@ -6,6 +6,7 @@ import time
 import click
 from click.exceptions import Exit
 
+from opendlp.entrypoints.celery.app import WORKER_ROLES, worker_argv
 from opendlp.entrypoints.celery.app import app as celery_app
 
 
@@ -137,3 +138,35 @@ def wait_tasks(ctx: click.Context, timeout: int) -> None:
     # Timeout reached
     click.echo(click.style(f"✗ Tasks still running after {timeout}s timeout (deployment blocked)", "red"))
     raise click.Abort()
+
+
+@celery.command("worker")
+@click.option(
+    "--role",
+    type=click.Choice(list(WORKER_ROLES)),
+    default="all",
+    show_default=True,
+    help="Which queues to consume: solver, gsheet-io, housekeeping, or all of them",
+)
+@click.option(
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=None,
+    envvar="CELERY_WORKER_CONCURRENCY",
+    help="Worker processes (default depends on the role)",
+)
+@click.option("--loglevel", default="info", show_default=True)
+@click.pass_context
+def worker(ctx: click.Context, role: str, concurrency: int | None, loglevel: str) -> None:
+    """Start a Celery worker for one kind of task.
+
+    Run a "solver" worker per few CPU cores for selections, and small "gsheet-io"
+    and "housekeeping" workers alongside, so long selections never hold up
+    Google Sheets calls or periodic clean-up. "all" runs everything in one worker.
+    """
+    # The tasks module registers the tasks with the app the worker runs.
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
+    argv = worker_argv(role, concurrency=concurrency, loglevel=loglevel)
+    click.echo(f"Starting {role} worker: celery {' '.join(argv)}")
+    tasks.app.worker_main(argv)
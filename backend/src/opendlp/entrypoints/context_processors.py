@@ -10,8 +10,12 @@ from functools import cache
 from pathlib import Path
 from typing import NamedTuple
 
+from flask_login import current_user
+
 from opendlp import config
+from opendlp.adapters.profiling import ProfileStore
 from opendlp.feature_flags import has_feature
+from opendlp.service_layer.permissions import can_profile
 
 
 @cache
@@ -181,3 +185,16 @@ def inject_template_globals() -> dict[str, str | Callable]:
         "help_site_cookies": help_site_urls.cookies,
         "knowledge_hub_url": help_site_urls.knowledge_hub,
     }
+
+
+def _run_profile_phases(run_id: object) -> dict[str, float] | None:
+    return ProfileStore().get_phase_seconds(str(run_id))
+
+
+def inject_profiling() -> dict[str, object]:
+    """Inject profiling helpers, for admins on the PROFILING_ADMIN_EMAILS list.
+
+    Templates can use: {% if user_can_profile %}{% set phases = run_profile_phases(run_id) %}{% endif %}
+    """
+    user_can_profile = current_user.is_authenticated and can_profile(current_user)
+    return {"user_can_profile": user_can_profile, "run_profile_phases": _run_profile_phases}
@@ -2,11 +2,11 @@
 ABOUTME: Creates and configures Flask app instance with all necessary extensions and routes"""
 
 import secrets
+import time
 import uuid
-from typing import TYPE_CHECKING
 
 import structlog
-from flask import Config, Flask, Response, g, render_template, request
+from flask import Config, Flask, Response, abort, g, render_template, request, url_for
 from flask_login import current_user
 from flask_wtf.csrf import CSRFError
 from secure import Secure, headers
@@ -15,11 +15,12 @@ from werkzeug.middleware.proxy_fix import ProxyFix
 
 import opendlp.logging
 from opendlp import bootstrap, config
-from opendlp.entrypoints.context_processors import inject_feature_flags, inject_template_globals
+from opendlp.adapters import database
+from opendlp.adapters.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS, MetricsRecorder
+from opendlp.adapters.profiling import PhaseProfiler, ProfileStore
+from opendlp.entrypoints.context_processors import inject_feature_flags, inject_profiling, inject_template_globals
 from opendlp.entrypoints.extensions import init_extensions
-
-if TYPE_CHECKING:
-    from opendlp.adapters.tabular_export import AbstractGSheetExportTarget
+from opendlp.service_layer.permissions import can_profile
 
 
 def generate_csp_nonce() -> str:
@@ -27,14 +28,12 @@ def generate_csp_nonce() -> str:
     return secrets.token_urlsafe(16)
 
 
-def default_gsheet_export_target_factory(spreadsheet_url: str) -> "AbstractGSheetExportTarget":
-    """Build a real gspread-backed export target for a spreadsheet URL."""
-    from opendlp.adapters.gsheet_export import GSheetExportTarget  # noqa: PLC0415
-
-    return GSheetExportTarget(spreadsheet_url=spreadsheet_url)
-
-
-def create_app(config_name: str = "", uow_factory: bootstrap.UowFactory | None = None) -> Flask:
+def create_app(
+    config_name: str = "",
+    uow_factory: bootstrap.UowFactory | None = None,
+    read_uow_factory: bootstrap.UowFactory | None = None,
+    surface: str = "",
+) -> Flask:
     """
     Flask application factory.
 
@@ -44,6 +43,11 @@ def create_app(config_name: str = "", uow_factory: bootstrap.UowFactory | None =
             instances via ``bootstrap.get_flask_uow()``, which reads this factory
             from the app. Defaults to ``bootstrap.default_uow_factory`` (a real
             SqlAlchemy-backed UnitOfWork); tests can inject a fake factory here.
+        read_uow_factory: Optional factory for ``bootstrap.get_flask_read_uow()``.
+            Defaults to ``uow_factory`` when that is given, so a fake store serves
+            both, else to ``bootstrap.default_read_uow_factory`` (the read replica).
+        surface: "all" or "public" - see ``register_blueprints``. Defaults to
+            ``config.get_web_surface()``.
 
     Returns:
         Configured Flask application instance
@@ -70,16 +74,13 @@ def create_app(config_name: str = "", uow_factory: bootstrap.UowFactory | None =
 
     # Register the UnitOfWork factory that get_flask_uow() resolves per request.
     app.extensions["uow_factory"] = uow_factory or bootstrap.default_uow_factory
-
-    # Factory building a Google Sheets export target from a spreadsheet URL.
-    # Tests override this to inject a fake target instead of talking to gspread.
-    app.extensions["gsheet_export_target_factory"] = default_gsheet_export_target_factory
+    app.extensions["read_uow_factory"] = read_uow_factory or uow_factory or bootstrap.default_read_uow_factory
 
     # Register context processors
     register_context_processors(app)
 
     # Register blueprints
-    register_blueprints(app)
+    register_blueprints(app, surface or config.get_web_surface())
 
     # Register error handlers
     register_error_handlers(app)
@@ -87,6 +88,9 @@ def create_app(config_name: str = "", uow_factory: bootstrap.UowFactory | None =
     # Register before/after request handlers
     register_before_request_handlers(app)
     register_after_request_handlers(app)
+    register_query_count_handlers(app)
+    register_profiling_handlers(app)
+    register_metrics_handlers(app)
 
     app.logger.info("OpenDLP application startup")
 
@@ -97,6 +101,7 @@ def register_context_processors(app: Flask) -> None:
     """Register template context processors."""
     app.context_processor(inject_template_globals)
     app.context_processor(inject_feature_flags)
+    app.context_processor(inject_profiling)
 
     @app.context_processor
     def inject_csp_nonce() -> dict[str, str]:
@@ -104,35 +109,60 @@ def register_context_processors(app: Flask) -> None:
         return {"csp_nonce": g.get("csp_nonce", "")}
 
 
-def register_blueprints(app: Flask) -> None:
-    """Register application blueprints."""
+# Blueprints whose routes a "public" surface serves. Anything else is 404 there.
+PUBLIC_BLUEPRINTS = frozenset({"registration", "health", "wellknown"})
+
+
+def register_blueprints(app: Flask, surface: str = "all") -> None:
+    """Register application blueprints.
+
+    With ``surface="public"`` only the blueprints the registration form needs are
+    imported: the backoffice, selection, targets and respondent blueprints (and
+    the services behind them) are never loaded. The blueprints that the shared
+    layout and error pages link to are still registered so ``url_for`` can build
+    those links, but their routes answer 404 - see ``PUBLIC_BLUEPRINTS``.
+    """
+    _register_public_blueprints(app)
+    if surface == "public":
+        _serve_public_blueprints_only(app)
+        return
+    _register_backoffice_blueprints(app)
+
+
+def _register_public_blueprints(app: Flask) -> None:
     from .blueprints.admin import admin_bp  # noqa: PLC0415
     from .blueprints.auth import auth_bp  # noqa: PLC0415
     from .blueprints.backoffice import backoffice_bp  # noqa: PLC0415
+    from .blueprints.health import health_bp  # noqa: PLC0415
+    from .blueprints.main import main_bp  # noqa: PLC0415
+    from .blueprints.profile import profile_bp  # noqa: PLC0415
+    from .blueprints.registration import registration_bp  # noqa: PLC0415
+    from .blueprints.wellknown import wellknown_bp  # noqa: PLC0415
+
+    app.register_blueprint(main_bp)
+    app.register_blueprint(auth_bp, url_prefix="/auth")
+    app.register_blueprint(admin_bp, url_prefix="/admin")
+    app.register_blueprint(profile_bp)
+    app.register_blueprint(health_bp)
+    app.register_blueprint(backoffice_bp, url_prefix="/backoffice")
+    app.register_blueprint(wellknown_bp)
+    app.register_blueprint(registration_bp)  # No url_prefix - routes define full paths
+
+
+def _register_backoffice_blueprints(app: Flask) -> None:
     from .blueprints.backoffice_registration import backoffice_registration_bp  # noqa: PLC0415
     from .blueprints.db_selection_backoffice import db_selection_backoffice_bp  # noqa: PLC0415
     from .blueprints.db_selection_legacy import db_selection_legacy_bp  # noqa: PLC0415
     from .blueprints.gsheets import gsheets_bp  # noqa: PLC0415
     from .blueprints.gsheets_legacy import gsheets_legacy_bp  # noqa: PLC0415
-    from .blueprints.health import health_bp  # noqa: PLC0415
-    from .blueprints.main import main_bp  # noqa: PLC0415
-    from .blueprints.profile import profile_bp  # noqa: PLC0415
-    from .blueprints.registration import registration_bp  # noqa: PLC0415
     from .blueprints.respondent_field_schema import respondent_field_schema_bp  # noqa: PLC0415
     from .blueprints.respondents import respondents_bp  # noqa: PLC0415
     from .blueprints.respondents_legacy import respondents_legacy_bp  # noqa: PLC0415
     from .blueprints.targets import targets_bp  # noqa: PLC0415
     from .blueprints.targets_legacy import targets_legacy_bp  # noqa: PLC0415
-    from .blueprints.wellknown import wellknown_bp  # noqa: PLC0415
 
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(gsheets_legacy_bp)
     app.register_blueprint(db_selection_legacy_bp)
-    app.register_blueprint(admin_bp, url_prefix="/admin")
-    app.register_blueprint(profile_bp)
-    app.register_blueprint(health_bp)
-    app.register_blueprint(backoffice_bp, url_prefix="/backoffice")
     app.register_blueprint(backoffice_registration_bp, url_prefix="/backoffice")
     if not config.is_production():
         from .blueprints.dev import dev_bp  # noqa: PLC0415
@@ -145,8 +175,13 @@ def register_blueprints(app: Flask) -> None:
     app.register_blueprint(respondent_field_schema_bp, url_prefix="/backoffice")
     app.register_blueprint(targets_legacy_bp)
     app.register_blueprint(respondents_legacy_bp)
-    app.register_blueprint(wellknown_bp)
-    app.register_blueprint(registration_bp)  # No url_prefix - routes define full paths
+
+
+def _serve_public_blueprints_only(app: Flask) -> None:
+    @app.before_request
+    def not_found_outside_public_blueprints() -> None:
+        if request.endpoint != "static" and request.blueprint not in PUBLIC_BLUEPRINTS:
+            abort(404)
 
 
 def register_error_handlers(app: Flask) -> None:
@@ -205,6 +240,86 @@ def register_before_request_handlers(app: Flask) -> None:
         )
 
 
+def register_query_count_handlers(app: Flask) -> None:
+    """Count the SQL statements each request runs, flagging likely N+1 loops in the logs."""
+
+    @app.before_request
+    def start_counting_queries() -> None:
+        database.start_query_tracking()
+
+    @app.after_request
+    def report_query_counts(response: Response) -> Response:
+        stats = database.stop_query_tracking()
+        if stats is None:
+            return response
+        database.log_query_stats(stats, endpoint=request.endpoint, status=response.status_code)
+        # Shown in the browser dev tools' network timing panel
+        if app.config.get("DEBUG", False):
+            response.headers.add("Server-Timing", stats.server_timing())
+        return response
+
+
+PROFILE_QUERY_ARG = "_profile"
+PROFILE_HEADER = "X-OpenDLP-Profile"
+
+
+def register_profiling_handlers(app: Flask) -> None:
+    """Profile requests that ask for it with ``?_profile=1`` or an ``X-OpenDLP-Profile`` header.
+
+    Only admins listed in PROFILING_ADMIN_EMAILS get profiled; anyone else's request runs
+    as normal. The response carries an ``X-OpenDLP-Profile-URL`` header to download the pstats from.
+    """
+
+    @app.before_request
+    def start_profiling() -> None:
+        if not (request.args.get(PROFILE_QUERY_ARG) or request.headers.get(PROFILE_HEADER)):
+            return
+        if not (current_user.is_authenticated and can_profile(current_user)):
+            return
+        g.request_profiler = PhaseProfiler()
+        g.request_profiler.start("request")
+
+    @app.after_request
+    def save_profile(response: Response) -> Response:
+        profiler: PhaseProfiler | None = g.pop("request_profiler", None)
+        if profiler is None:
+            return response
+        profiler.stop()
+        profile_id = uuid.uuid4()
+        if ProfileStore().save(str(profile_id), profiler):
+            profile_url = url_for("admin.download_profile", profile_id=profile_id)
+            response.headers["X-OpenDLP-Profile-URL"] = profile_url
+            structlog.get_logger(__name__).info(
+                "Request profiled",
+                endpoint=request.endpoint,
+                seconds=round(profiler.phase_seconds.get("request", 0.0), 3),
+                profile_url=profile_url,
+            )
+        return response
+
+
+def register_metrics_handlers(app: Flask) -> None:
+    """Record the latency and status of every request for ``/metrics``, when METRICS_TOKEN is set."""
+    if not config.get_metrics_token():
+        return
+    recorder = MetricsRecorder()
+
+    @app.before_request
+    def start_request_timer() -> None:
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response: Response) -> Response:
+        started: float | None = g.pop("request_started", None)
+        if started is None:
+            return response
+        # Unmatched URLs share one label so scanners cannot blow up the number of series
+        labels = {"endpoint": request.endpoint or "unmatched", "method": request.method}
+        recorder.observe(HTTP_REQUEST_DURATION, labels, time.perf_counter() - started)
+        recorder.increment(HTTP_REQUESTS, {**labels, "status": str(response.status_code)})
+        return response
+
+
 def get_secure_headers(config: Config) -> Secure:
     secure_headers = Secure(
         cache=headers.CacheControl().no_store(),
@@ -245,6 +360,23 @@ PUBLIC_IMMUTABLE_ASSET_ENDPOINTS = frozenset({
     "registration.serve_registration_document",
 })
 
+
+# How long an asset answered provisionally may be cached before the client asks again.
+PROVISIONAL_ASSET_MAX_AGE_SECONDS = 300
+
+
+def _is_immutable_asset_response(response: Response) -> bool:
+    """A found content-addressed asset; a 404 from the same route must not be cached for a year.
+
+    Nor must a provisional answer: an image sent while its variants are still being rendered.
+    """
+    return (
+        request.endpoint in PUBLIC_IMMUTABLE_ASSET_ENDPOINTS
+        and response.status_code in (200, 304)
+        and not g.get("provisional_asset", False)
+    )
+
+
 # Endpoints that the backoffice embeds in a same-origin iframe. The global policy is
 # frame-ancestors 'none' / X-Frame-Options DENY; these endpoints relax it to
 # same-origin only — they must never become framable cross-origin.
@@ -265,7 +397,7 @@ def register_after_request_handlers(app: Flask) -> None:
         when a user is logged in. Public pages (when not logged in) can still be cached normally.
         """
         # Public content-addressed assets are immutable and safe to cache regardless of auth.
-        if request.endpoint in PUBLIC_IMMUTABLE_ASSET_ENDPOINTS:
+        if _is_immutable_asset_response(response):
             return response
         # Check if user is authenticated
         if current_user.is_authenticated:
@@ -285,8 +417,10 @@ def register_after_request_handlers(app: Flask) -> None:
 
         # The global policy is Cache-Control: no-store. Content-addressed public assets
         # carry their content hash in the URL, so they are safe to cache immutably.
-        if request.endpoint in PUBLIC_IMMUTABLE_ASSET_ENDPOINTS:
+        if _is_immutable_asset_response(response):
             response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        elif g.get("provisional_asset", False):
+            response.headers["Cache-Control"] = f"public, max-age={PROVISIONAL_ASSET_MAX_AGE_SECONDS}"
 
         # Same-origin-framable endpoints relax the global no-framing policy just enough
         # for the backoffice to embed them (registration form preview).
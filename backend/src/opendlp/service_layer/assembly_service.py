@@ -3,7 +3,7 @@ ABOUTME: Provides functions for assembly creation, updates, permissions, and lif
 
 import csv as csv_module
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import UTC, date, datetime
 from io import StringIO
 from typing import Any, cast
@@ -12,6 +12,7 @@ from sortition_algorithms.adapters import SelectionData
 from sortition_algorithms.features import MAX_FLEX_UNSET, FeatureCollection, read_in_features
 from sqlalchemy.orm.attributes import flag_modified
 
+from opendlp.adapters.selection_data_cache import CachedSelectionData
 from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
 from opendlp.domain.assembly import Assembly, AssemblyGSheet
 from opendlp.domain.assembly_csv import AssemblyCSV
@@ -698,9 +699,10 @@ def import_targets_from_csv(
             )
             category.add_value(target_val)
 
-        uow.target_categories.add(category)
         categories.append(category)
 
+    # One multi-row INSERT rather than a statement per category.
+    uow.target_categories.bulk_add(categories)
     return [c.create_detached_copy() for c in categories]
 
 
@@ -803,8 +805,7 @@ def add_target_value(
     if not category or category.assembly_id != assembly_id:
         raise NotFoundError(f"Target category {category_id} not found")
 
-    target_val = TargetValue(value=value, min=min_count, max=max_count)
-    category.add_value(target_val)
+    _add_value(category, value, min_count, max_count)
     flag_modified(category, "values")
 
     return category.create_detached_copy()
@@ -842,22 +843,7 @@ def update_target_value(
     if not category or category.assembly_id != assembly_id:
         raise NotFoundError(f"Target category {category_id} not found")
 
-    existing = next((v for v in category.values if v.value_id == value_id), None)
-    if not existing:
-        raise NotFoundError(f"Target value {value_id} not found")
-
-    if value != existing.value and any(v.value == value for v in category.values):
-        raise ValueError(f"Value '{value}' already exists in category '{category.name}'")
-
-    existing.value = value.strip()
-    existing.min = min_count
-    existing.max = max_count
-    # Reset flex values since the form doesn't expose them;
-    # the sortition library recalculates safe defaults at selection time
-    existing.min_flex = 0
-    existing.max_flex = MAX_FLEX_UNSET
-    existing._validate()
-    category.updated_at = datetime.now(UTC)
+    _update_value(category, value_id, value, min_count, max_count)
     flag_modified(category, "values")
 
     return category.create_detached_copy()
@@ -892,13 +878,104 @@ def delete_target_value(
     if not category or category.assembly_id != assembly_id:
         raise NotFoundError(f"Target category {category_id} not found")
 
-    if not category.remove_value(value_id):
-        raise NotFoundError(f"Target value {value_id} not found")
+    _delete_value(category, value_id)
     flag_modified(category, "values")
 
     return category.create_detached_copy()
 
 
+@dataclass(kw_only=True)
+class TargetValueChange:
+    """One edit to a target value, for `apply_target_value_changes`.
+
+    A change without a `value_id` adds a new value; one with `delete` set removes
+    the value; any other change updates the value in place.
+    """
+
+    category_id: uuid.UUID
+    value_id: uuid.UUID | None = None
+    value: str = ""
+    min_count: int = 0
+    max_count: int = 0
+    delete: bool = False
+
+
+def apply_target_value_changes(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    changes: list[TargetValueChange],
+) -> list[TargetCategory]:
+    """Apply a set of target value edits together. Returns the assembly's categories.
+
+    Each affected category is loaded once and its values column written once,
+    however many of its values change, and the whole set is committed with the
+    caller's `uow` - so one failing change (a duplicate value, a min above its
+    max, an unknown id) leaves every category as it was.
+
+    The caller is expected to manage the `uow` context (`with uow: ...`).
+    """
+    user = uow.users.get(user_id)
+    if not user:
+        raise UserNotFoundError(f"User {user_id} not found")
+
+    assembly = uow.assemblies.get(assembly_id)
+    if not assembly:
+        raise AssemblyNotFoundError(f"Assembly {assembly_id} not found")
+
+    if not can_manage_assembly(user, assembly):
+        raise InsufficientPermissions(
+            action="update target values",
+            required_role="assembly-manager, global-organiser or admin",
+        )
+
+    categories = {c.id: c for c in uow.target_categories.get_by_assembly_id(assembly_id)}
+    changed: set[uuid.UUID] = set()
+    for change in changes:
+        category = categories.get(change.category_id)
+        if category is None:
+            raise NotFoundError(f"Target category {change.category_id} not found")
+        if change.value_id is None:
+            _add_value(category, change.value, change.min_count, change.max_count)
+        elif change.delete:
+            _delete_value(category, change.value_id)
+        else:
+            _update_value(category, change.value_id, change.value, change.min_count, change.max_count)
+        changed.add(category.id)
+
+    for category_id in changed:
+        flag_modified(categories[category_id], "values")
+
+    return [c.create_detached_copy() for c in categories.values()]
+
+
+def _add_value(category: TargetCategory, value: str, min_count: int, max_count: int) -> None:
+    category.add_value(TargetValue(value=value, min=min_count, max=max_count))
+
+
+def _update_value(category: TargetCategory, value_id: uuid.UUID, value: str, min_count: int, max_count: int) -> None:
+    index = next((i for i, v in enumerate(category.values) if v.value_id == value_id), None)
+    if index is None:
+        raise NotFoundError(f"Target value {value_id} not found")
+    existing = category.values[index]
+
+    if value != existing.value and any(v.value == value for v in category.values):
+        raise ValueError(f"Value '{value}' already exists in category '{category.name}'")
+
+    # Built (and so validated) before anything is changed, so a rejected edit leaves the value as it was.
+    # Reset flex values since the form doesn't expose them;
+    # the sortition library recalculates safe defaults at selection time
+    category.values[index] = replace(
+        existing, value=value.strip(), min=min_count, max=max_count, min_flex=0, max_flex=MAX_FLEX_UNSET
+    )
+    category.updated_at = datetime.now(UTC)
+
+
+def _delete_value(category: TargetCategory, value_id: uuid.UUID) -> None:
+    if not category.remove_value(value_id):
+        raise NotFoundError(f"Target value {value_id} not found")
+
+
 def get_feature_collection_for_assembly(
     uow: AbstractUnitOfWork,
     user_id: uuid.UUID,
@@ -928,7 +1005,7 @@ def get_feature_collection_for_assembly(
 
     # Use SelectionData with our custom adapter
     adapter = OpenDLPDataAdapter(uow, assembly_id)
-    select_data = SelectionData(adapter)
+    select_data = CachedSelectionData(SelectionData(adapter), assembly_id)
 
     # Load features using sortition-algorithms
     features, report = select_data.load_features(assembly.number_to_select)
@@ -7,3 +7,9 @@ ABOUTME: Neutral home for values used by multiple service modules."""
 # min and max. It is rare for the number of values for a single target category
 # to be over 20, so we use this as a rule of thumb for columns we suggest.
 MAX_DISTINCT_VALUES_FOR_AUTO_ADD = 20
+
+# A stability analysis runs this many test selections unless asked for another
+# number. Each run is a separate solver task, so the maximum keeps one request
+# from flooding the worker queue.
+DEFAULT_STABILITY_ANALYSIS_RUNS = 20
+MAX_STABILITY_ANALYSIS_RUNS = 100
@@ -1,12 +1,14 @@
 """ABOUTME: Redis-backed temporary stash for pending respondent CSV uploads.
-ABOUTME: Holds the raw CSV between the upload-begin and upload-confirm-diff steps."""
+ABOUTME: Holds the parsed, compressed CSV between the upload-begin and upload-confirm-diff steps."""
 
 from __future__ import annotations
 
 import json
+import zlib
 from dataclasses import asdict, dataclass
 from typing import TYPE_CHECKING
 
+import structlog
 from redis import Redis
 
 from opendlp.config import RedisCfg
@@ -14,6 +16,8 @@ from opendlp.config import RedisCfg
 if TYPE_CHECKING:
     import uuid
 
+logger = structlog.get_logger(__name__)
+
 _KEY_PREFIX = "csv_import_pending:"
 # TTL for a stashed upload — generous enough that an organiser can read the
 # diff page, take a coffee break, and still confirm; short enough that
@@ -23,9 +27,14 @@ _DEFAULT_TTL_SECONDS = 30 * 60
 
 @dataclass
 class StashedUpload:
-    """A CSV blob plus the metadata needed to resume the upload after a diff page."""
+    """A parsed CSV plus the metadata needed to resume the upload after a diff page.
+
+    ``headers`` and ``rows`` are the ``ParsedCsv`` the upload step produced, so
+    neither the diff page nor the import has to parse the file again.
+    """
 
-    csv_content: str
+    headers: list[str]
+    rows: list[list[str]]
     filename: str
     id_column: str | None
     replace_existing: bool
@@ -33,7 +42,7 @@ class StashedUpload:
 
 def _get_redis() -> Redis:
     cfg = RedisCfg.from_env()
-    # decode_responses=False because csv_content is opaque text we round-trip via JSON.
+    # decode_responses=False because the stashed upload is stored compressed.
     return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
 
 
@@ -48,9 +57,13 @@ def stash(
     ttl_seconds: int = _DEFAULT_TTL_SECONDS,
     redis_client: Redis | None = None,
 ) -> None:
-    """Stash a pending upload under (user_id, assembly_id) with a TTL."""
+    """Stash a pending upload under (user_id, assembly_id) with a TTL.
+
+    CSV rows are highly repetitive, so compressing them typically shrinks the
+    stash to a fraction of the uploaded file.
+    """
     r = redis_client or _get_redis()
-    payload = json.dumps(asdict(upload))
+    payload = zlib.compress(json.dumps(asdict(upload)).encode("utf-8"))
     r.set(_key(user_id, assembly_id), payload, ex=ttl_seconds)
 
 
@@ -61,13 +74,16 @@ def fetch(
 ) -> StashedUpload | None:
     """Read a stashed upload, or None if expired / missing."""
     r = redis_client or _get_redis()
-    raw: bytes | str | None = r.get(_key(user_id, assembly_id))
-    if raw is None:
+    raw = r.get(_key(user_id, assembly_id))
+    if not isinstance(raw, bytes):
+        return None
+    try:
+        data = json.loads(zlib.decompress(raw))
+        return StashedUpload(**data)
+    except (zlib.error, TypeError, ValueError) as exc:
+        # e.g. an upload stashed in an older format; the organiser re-uploads.
+        logger.warning("Discarding unreadable stashed CSV upload", assembly_id=str(assembly_id), error=str(exc))
         return None
-    if isinstance(raw, bytes):
-        raw = raw.decode("utf-8")
-    data = json.loads(raw)
-    return StashedUpload(**data)
 
 
 def clear(
@@ -1,5 +1,5 @@
 """ABOUTME: Image validation and re-encoding pipeline for registration images
-ABOUTME: Validates, strips metadata, downscales and re-encodes uploads to PNG"""
+ABOUTME: Validates, strips metadata, downscales and re-encodes uploads to PNG; renders resized WebP/PNG variants"""
 
 import hashlib
 import warnings
@@ -7,9 +7,11 @@ from io import BytesIO
 
 from PIL import Image, ImageOps, UnidentifiedImageError
 
-from opendlp.domain.registration_image import ALLOWED_INPUT_FORMATS, ImageValidationError, ProcessedImage
+from opendlp.domain.registration_image import ALLOWED_INPUT_FORMATS, WEBP, ImageValidationError, ProcessedImage
 from opendlp.translations import gettext as _
 
+WEBP_QUALITY = 80
+
 
 def process_image(raw: bytes, *, max_bytes: int, max_edge_px: int) -> ProcessedImage:
     if len(raw) > max_bytes:
@@ -24,14 +26,19 @@ def process_image(raw: bytes, *, max_bytes: int, max_edge_px: int) -> ProcessedI
             image = ImageOps.exif_transpose(opened)
             image.load()
             image.thumbnail((max_edge_px, max_edge_px), Image.Resampling.LANCZOS)
+            # No optimize=True here: its extra compression passes are the slow part of an
+            # upload, and visitors are served the smaller variants rendered in the background.
             buffer = BytesIO()
-            image.save(buffer, format="PNG", optimize=True)
+            image.save(buffer, format="PNG")
     except (Image.DecompressionBombError, Image.DecompressionBombWarning) as exc:
         raise ImageValidationError("too_many_pixels", _("The image has too many pixels")) from exc
     except (UnidentifiedImageError, OSError) as exc:
         raise ImageValidationError("decode_failed", _("The image could not be read")) from exc
 
-    data = buffer.getvalue()
+    return _processed(buffer.getvalue(), image)
+
+
+def _processed(data: bytes, image: Image.Image) -> ProcessedImage:
     return ProcessedImage(
         data=data,
         width=image.width,
@@ -39,3 +46,20 @@ def process_image(raw: bytes, *, max_bytes: int, max_edge_px: int) -> ProcessedI
         sha256=hashlib.sha256(data).hexdigest(),
         byte_size=len(data),
     )
+
+
+def render_variants(stored: bytes, sizes: list[tuple[str, int]]) -> list[tuple[str, ProcessedImage]]:
+    """Re-encode a stored (already validated) PNG at each (format, width), keeping its aspect ratio."""
+    with Image.open(BytesIO(stored)) as opened:
+        source = opened.convert("RGBA") if opened.mode not in ("RGB", "RGBA", "L", "LA") else opened.copy()
+    rendered = []
+    for image_format, width in sizes:
+        height = max(1, round(source.height * width / source.width))
+        image = source if width == source.width else source.resize((width, height), Image.Resampling.LANCZOS)
+        buffer = BytesIO()
+        if image_format == WEBP:
+            image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+        else:
+            image.save(buffer, format="PNG", optimize=True)
+        rendered.append((image_format, _processed(buffer.getvalue(), image)))
+    return rendered
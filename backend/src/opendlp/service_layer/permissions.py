@@ -5,6 +5,7 @@ from collections.abc import Callable
 from functools import wraps
 from typing import Any
 
+from opendlp import config
 from opendlp.domain.assembly import Assembly
 from opendlp.domain.users import User
 from opendlp.domain.value_objects import AssemblyRole, GlobalRole, get_role_level
@@ -107,6 +108,11 @@ def has_global_organiser(user: User) -> bool:
     return user.global_role in (GlobalRole.ADMIN, GlobalRole.GLOBAL_ORGANISER)
 
 
+def can_profile(user: User) -> bool:
+    """Check if user may profile requests and selection runs: an admin on the profiling allow list."""
+    return has_global_admin(user) and user.email.lower() in config.get_profiling_admin_emails()
+
+
 def require_global_role(required_role: GlobalRole) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
     """
     Decorator to require a specific global role for a service function.
@@ -4,11 +4,12 @@ ABOUTME: Wraps the `qrcode` library to produce data URLs and raw PNG bytes"""
 import base64
 import io
 
-import qrcode
-
 
 def _make_png_bytes(data: str) -> bytes:
     """Render arbitrary data as a QR code and return raw PNG bytes."""
+    # qrcode brings in PIL; only import them when a code is actually drawn.
+    import qrcode  # noqa: PLC0415
+
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
@@ -2,13 +2,17 @@
 ABOUTME: Validates and stores PDFs, builds <a> download snippets, resolves documents for the public route"""
 
 import uuid
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
 
 from opendlp.config import get_max_documents_per_assembly, get_max_pdf_upload_bytes
 from opendlp.domain.assembly import Assembly
-from opendlp.domain.registration_document import RegistrationDocument, generate_document_html
+from opendlp.domain.registration_document import (
+    RegistrationDocument,
+    RegistrationDocumentSummary,
+    generate_document_html,
+)
 from opendlp.domain.registration_page import RegistrationPage
-from opendlp.domain.uploads import human_size, sanitise_original_filename
+from opendlp.domain.uploads import StoredUploadInfo, human_size, sanitise_original_filename
 from opendlp.domain.users import User
 
 from .document_processing import validate_pdf
@@ -70,7 +74,8 @@ def add_registration_document(
         if existing.label != effective_label:
             existing.label = effective_label
             uow.commit()
-        return existing.create_detached_copy()
+        # Same hash, same bytes: hand back the upload rather than reading the stored copy.
+        return existing.create_detached_copy(data=validated.data)
 
     limit = get_max_documents_per_assembly()
     if uow.registration_documents.count_by_assembly_id(assembly_id) >= limit:
@@ -89,11 +94,11 @@ def add_registration_document(
 
 def list_registration_documents(
     uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly_id: uuid.UUID
-) -> list[RegistrationDocument]:
+) -> list[RegistrationDocumentSummary]:
     user, assembly = _load_user_and_assembly(uow, user_id, assembly_id)
     if not can_view_assembly(user, assembly):
         raise InsufficientPermissions(action="view registration documents", required_role=_VIEW_ROLE)
-    return [document.create_detached_copy() for document in uow.registration_documents.list_by_assembly_id(assembly_id)]
+    return uow.registration_documents.list_by_assembly_id(assembly_id)
 
 
 def delete_registration_document(
@@ -110,7 +115,7 @@ def delete_registration_document(
 
 def set_registration_document_label(
     uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly_id: uuid.UUID, document_id: uuid.UUID, label: str
-) -> RegistrationDocument:
+) -> RegistrationDocumentSummary:
     user, assembly = _load_user_and_assembly(uow, user_id, assembly_id)
     if not can_manage_assembly(user, assembly):
         raise InsufficientPermissions(action="edit registration document", required_role=_MANAGE_ROLE)
@@ -118,15 +123,15 @@ def set_registration_document_label(
     if document is None or document.assembly_id != assembly_id:
         raise RegistrationDocumentNotFoundError(f"Document {document_id} not found for this registration page")
     document.label = label
-    return document.create_detached_copy()
+    return document.summary()
 
 
 def list_document_snippets(
     uow: AbstractUnitOfWork,
     user_id: uuid.UUID,
     assembly_id: uuid.UUID,
-    url_for_document: Callable[[RegistrationDocument], str],
-) -> list[tuple[RegistrationDocument, str]]:
+    url_for_document: Callable[[RegistrationDocumentSummary], str],
+) -> list[tuple[RegistrationDocumentSummary, str]]:
     documents = list_registration_documents(uow, user_id, assembly_id)
     return [
         (document, generate_document_html(url_for_document(document), _snippet_text(document)))
@@ -134,16 +139,37 @@ def list_document_snippets(
     ]
 
 
-def _snippet_text(document: RegistrationDocument) -> str:
+def _snippet_text(document: RegistrationDocumentSummary) -> str:
     return f"{document.label} (PDF, {human_size(document.byte_size)})"
 
 
 def get_registration_document_for_serving(
     uow: AbstractUnitOfWork, url_slug: str, document_name: str
-) -> RegistrationDocument | None:
+) -> RegistrationDocumentSummary | None:
     sha256 = document_name.rsplit(".", 1)[0]
     page = uow.registration_pages.get_by_url_slug(url_slug)
     if page is None or not page.is_publicly_loadable():
         return None
     document = uow.registration_documents.get_by_assembly_and_sha(page.assembly_id, sha256)
-    return document.create_detached_copy() if document else None
+    return document.summary() if document else None
+
+
+def get_registration_document_info_for_serving(
+    uow: AbstractUnitOfWork, url_slug: str, document_name: str
+) -> StoredUploadInfo | None:
+    """Resolve a public document URL to the document's metadata, without loading its bytes.
+
+    Enough to answer a conditional request; stream the bytes with
+    ``iter_registration_document_data`` only when the client needs them.
+    """
+    sha256 = document_name.rsplit(".", 1)[0]
+    page = uow.registration_pages.get_by_url_slug(url_slug)
+    if page is None or not page.is_publicly_loadable():
+        return None
+    return uow.registration_documents.get_info_by_assembly_and_sha(page.assembly_id, sha256)
+
+
+def iter_registration_document_data(
+    uow: AbstractUnitOfWork, document_id: uuid.UUID, offset: int = 0
+) -> Iterator[bytes]:
+    return uow.registration_documents.iter_data(document_id, offset=offset)
@@ -1,8 +1,13 @@
 """ABOUTME: Service layer for registration image upload, listing, deletion and serving
-ABOUTME: Validates and stores images, builds <img> snippets, resolves images for the public route"""
+ABOUTME: Validates and stores images, renders their variants, builds <img> snippets, resolves the public route"""
 
 import uuid
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import structlog
+from sqlalchemy.exc import IntegrityError
 
 from opendlp.config import (
     get_max_image_upload_bytes,
@@ -11,11 +16,19 @@ from opendlp.config import (
 )
 from opendlp.domain.assembly import Assembly
 from opendlp.domain.registration_image import (
+    IMAGE_CONTENT_TYPE,
+    VARIANT_CONTENT_TYPES,
     RegistrationImage,
+    RegistrationImageSummary,
+    RegistrationImageVariant,
+    choose_variant,
     generate_image_html,
+    image_srcset,
     sanitise_original_filename,
+    variant_sizes,
 )
 from opendlp.domain.registration_page import RegistrationPage
+from opendlp.domain.uploads import StoredUploadInfo
 from opendlp.domain.users import User
 
 from .exceptions import (
@@ -26,11 +39,12 @@ from .exceptions import (
     RegistrationPageNotFoundError,
     UserNotFoundError,
 )
-from .image_processing import process_image
 from .permissions import can_manage_assembly, can_view_assembly
 from .registration_page_service import page_for_assembly
 from .unit_of_work import AbstractUnitOfWork
 
+logger = structlog.get_logger(__name__)
+
 _MANAGE_ROLE = "assembly-manager, global-organiser or admin"
 _VIEW_ROLE = "assembly role or global privileges"
 
@@ -66,6 +80,9 @@ def add_registration_image(
     if not can_manage_assembly(user, assembly):
         raise InsufficientPermissions(action="add registration image", required_role=_MANAGE_ROLE)
 
+    # Pillow is only needed on upload; serving images reads the stored bytes.
+    from .image_processing import process_image  # noqa: PLC0415
+
     processed = process_image(
         raw,
         max_bytes=get_max_image_upload_bytes(),
@@ -78,7 +95,8 @@ def add_registration_image(
         if existing.alt != alt:
             existing.alt = alt
             uow.commit()
-        return existing.create_detached_copy()
+        # Same hash, same bytes: hand back the upload rather than reading the stored copy.
+        return existing.create_detached_copy(data=processed.data)
 
     limit = get_max_images_per_assembly()
     if uow.registration_images.count_by_assembly_id(assembly_id) >= limit:
@@ -92,16 +110,81 @@ def add_registration_image(
         original_filename=sanitise_original_filename(original_filename),
     )
     uow.registration_images.add(image)
-    return image.create_detached_copy()
+    detached = image.create_detached_copy()
+    # Committed before enqueueing, so the worker finds the row.
+    uow.commit()
+    _enqueue_variants(image.id)
+    return detached
+
+
+def _enqueue_variants(image_id: uuid.UUID) -> None:
+    """Ask a worker to render the image's variants; the periodic backfill catches any that fail to enqueue."""
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
+    try:
+        tasks.generate_registration_image_variants.delay(image_id=str(image_id))
+    except Exception:
+        logger.exception("Could not enqueue image variants; the backfill will render them", image_id=str(image_id))
+
+
+def generate_registration_image_variants(uow: AbstractUnitOfWork, image_id: uuid.UUID) -> int:
+    """Render and store an image's resized WebP and PNG variants, returning how many were made.
+
+    Skips an image that already has variants or was deleted since it was queued,
+    so the task is safe to run twice - including at the same time, as the upload's
+    task and the backfill can: whichever commits second finds the variants there
+    and makes none.
+    """
+    image = uow.registration_images.get(image_id)
+    if image is None or uow.registration_image_variants.list_info_by_image_id(image_id):
+        return 0
+
+    from .image_processing import render_variants  # noqa: PLC0415
+
+    stored = b"".join(uow.registration_images.iter_data(image_id))
+    rendered = render_variants(stored, variant_sizes(image.width))
+    for image_format, processed in rendered:
+        uow.registration_image_variants.add(
+            RegistrationImageVariant(
+                image_id=image_id,
+                image_format=image_format,
+                width=processed.width,
+                height=processed.height,
+                sha256=processed.sha256,
+                data=processed.data,
+                byte_size=processed.byte_size,
+            )
+        )
+    try:
+        uow.commit()
+    except IntegrityError:
+        uow.rollback()
+        logger.info("Image variants were already stored by another task", image_id=str(image_id))
+        return 0
+    return len(rendered)
+
+
+def mark_image_variants_failed(uow: AbstractUnitOfWork, image_id: uuid.UUID) -> None:
+    """Record that an image's variants could not be rendered, so the backfill stops retrying it."""
+    image = uow.registration_images.get(image_id)
+    if image is None:
+        return
+    image.variants_failed_at = datetime.now(UTC)
+    uow.commit()
+
+
+def list_image_ids_needing_variants(uow: AbstractUnitOfWork, created_before: datetime, limit: int) -> list[uuid.UUID]:
+    """Images uploaded before ``created_before`` that still have no variants, for the periodic backfill."""
+    return uow.registration_image_variants.list_image_ids_without_variants(created_before=created_before, limit=limit)
 
 
 def list_registration_images(
     uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly_id: uuid.UUID
-) -> list[RegistrationImage]:
+) -> list[RegistrationImageSummary]:
     user, assembly = _load_user_and_assembly(uow, user_id, assembly_id)
     if not can_view_assembly(user, assembly):
         raise InsufficientPermissions(action="view registration images", required_role=_VIEW_ROLE)
-    return [image.create_detached_copy() for image in uow.registration_images.list_by_assembly_id(assembly_id)]
+    return uow.registration_images.list_by_assembly_id(assembly_id)
 
 
 def delete_registration_image(
@@ -118,7 +201,7 @@ def delete_registration_image(
 
 def set_registration_image_alt(
     uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly_id: uuid.UUID, image_id: uuid.UUID, alt: str
-) -> RegistrationImage:
+) -> RegistrationImageSummary:
     user, assembly = _load_user_and_assembly(uow, user_id, assembly_id)
     if not can_manage_assembly(user, assembly):
         raise InsufficientPermissions(action="edit registration image", required_role=_MANAGE_ROLE)
@@ -126,25 +209,97 @@ def set_registration_image_alt(
     if image is None or image.assembly_id != assembly_id:
         raise RegistrationImageNotFoundError(f"Image {image_id} not found for this registration page")
     image.alt = alt
-    return image.create_detached_copy()
+    return image.summary()
 
 
 def list_image_snippets(
     uow: AbstractUnitOfWork,
     user_id: uuid.UUID,
     assembly_id: uuid.UUID,
-    url_for_image: Callable[[RegistrationImage], str],
-) -> list[tuple[RegistrationImage, str]]:
+    url_for_image: Callable[[RegistrationImageSummary], str],
+) -> list[tuple[RegistrationImageSummary, str]]:
     images = list_registration_images(uow, user_id, assembly_id)
-    return [(image, generate_image_html(url_for_image(image), alt=image.alt)) for image in images]
+    return [(image, image_snippet(image, url_for_image(image))) for image in images]
+
+
+def image_snippet(image: RegistrationImageSummary, src_url: str) -> str:
+    """The <img> tag to paste into a page, offering the resized variants through ``srcset``."""
+    return generate_image_html(src_url, alt=image.alt, srcset=image_srcset(src_url, image.width))
 
 
 def get_registration_image_for_serving(
     uow: AbstractUnitOfWork, url_slug: str, image_name: str
-) -> RegistrationImage | None:
+) -> RegistrationImageSummary | None:
     sha256 = image_name.rsplit(".", 1)[0]
     page = uow.registration_pages.get_by_url_slug(url_slug)
     if page is None or not page.is_publicly_loadable():
         return None
     image = uow.registration_images.get_by_assembly_and_sha(page.assembly_id, sha256)
-    return image.create_detached_copy() if image else None
+    return image.summary() if image else None
+
+
+def get_registration_image_info_for_serving(
+    uow: AbstractUnitOfWork, url_slug: str, image_name: str
+) -> StoredUploadInfo | None:
+    """Resolve a public image URL to the image's metadata, without loading its bytes.
+
+    Enough to answer a conditional request; stream the bytes with
+    ``iter_registration_image_data`` only when the client needs them.
+    """
+    sha256 = image_name.rsplit(".", 1)[0]
+    page = uow.registration_pages.get_by_url_slug(url_slug)
+    if page is None or not page.is_publicly_loadable():
+        return None
+    return uow.registration_images.get_info_by_assembly_and_sha(page.assembly_id, sha256)
+
+
+def iter_registration_image_data(uow: AbstractUnitOfWork, image_id: uuid.UUID, offset: int = 0) -> Iterator[bytes]:
+    return uow.registration_images.iter_data(image_id, offset=offset)
+
+
+@dataclass(frozen=True)
+class ImageRendition:
+    """What the public image route sends: the original PNG or one of its variants."""
+
+    info: StoredUploadInfo
+    content_type: str
+    is_variant: bool
+    # True while the variants are still being rendered and one would have been sent.
+    provisional: bool
+
+
+def get_registration_image_rendition_for_serving(
+    uow: AbstractUnitOfWork, url_slug: str, image_name: str, requested_width: int | None, accepts_webp: bool
+) -> ImageRendition | None:
+    """Resolve a public image URL to the best variant for the client, or the original, without loading bytes."""
+    info = get_registration_image_info_for_serving(uow, url_slug, image_name)
+    if info is None:
+        return None
+    image = uow.registration_images.get(info.id)
+    if image is None:
+        return None
+    variants = uow.registration_image_variants.list_info_by_image_id(info.id)
+    variant = choose_variant(
+        variants,
+        original_width=image.width,
+        original_byte_size=image.byte_size,
+        requested_width=requested_width,
+        accepts_webp=accepts_webp,
+    )
+    if variant is None:
+        wants_smaller = accepts_webp or (requested_width is not None and requested_width < image.width)
+        return ImageRendition(info, IMAGE_CONTENT_TYPE, is_variant=False, provisional=not variants and wants_smaller)
+    variant_info = StoredUploadInfo(
+        id=variant.id,
+        sha256=variant.sha256,
+        byte_size=variant.byte_size,
+        original_filename="",
+        in_blob_store=variant.in_blob_store,
+    )
+    return ImageRendition(variant_info, VARIANT_CONTENT_TYPES[variant.image_format], is_variant=True, provisional=False)
+
+
+def iter_registration_image_variant_data(
+    uow: AbstractUnitOfWork, variant_id: uuid.UUID, offset: int = 0
+) -> Iterator[bytes]:
+    return uow.registration_image_variants.iter_data(variant_id, offset=offset)
@@ -6,11 +6,12 @@ from __future__ import annotations
 import abc
 from typing import TYPE_CHECKING, Any
 
+from opendlp.domain.uploads import UPLOAD_CHUNK_BYTES
 from opendlp.domain.value_objects import AssemblyStatus, RespondentStatus, SelectionTaskType
 
 if TYPE_CHECKING:
     import uuid
-    from collections.abc import Iterable
+    from collections.abc import Iterable, Iterator
     from datetime import datetime
 
     from opendlp.domain.assembly import Assembly, AssemblyGSheet, SelectionRunRecord
@@ -19,14 +20,19 @@ if TYPE_CHECKING:
     from opendlp.domain.email_send_record import RespondentEmailSendRecord
     from opendlp.domain.email_template import EmailTemplate
     from opendlp.domain.password_reset import PasswordResetToken
-    from opendlp.domain.registration_document import RegistrationDocument
-    from opendlp.domain.registration_image import RegistrationImage
+    from opendlp.domain.registration_document import RegistrationDocument, RegistrationDocumentSummary
+    from opendlp.domain.registration_image import (
+        ImageVariantInfo,
+        RegistrationImage,
+        RegistrationImageSummary,
+    )
     from opendlp.domain.registration_page import RegistrationPage, RegistrationPageHtml
     from opendlp.domain.respondent_field_schema import RespondentFieldDefinition
     from opendlp.domain.respondents import Respondent
     from opendlp.domain.targets import TargetCategory
     from opendlp.domain.totp_attempts import TotpVerificationAttempt
     from opendlp.domain.two_factor_audit import TwoFactorAuditLog
+    from opendlp.domain.uploads import StoredUploadInfo
     from opendlp.domain.user_backup_codes import UserBackupCode
     from opendlp.domain.user_invites import UserInvite
     from opendlp.domain.users import User, UserAssemblyRole
@@ -294,6 +300,14 @@ class SelectionRunRecordRepository(AbstractRepository):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def get_timed_runs(self, limit: int = 1000) -> list[SelectionRunRecord]:
+        """Get up to ``limit`` completed runs that recorded their pool size and phase timings, newest first.
+
+        The large JSON columns (ids, logs, report) may not be loaded.
+        """
+        raise NotImplementedError
+
 
 class PasswordResetTokenRepository(AbstractRepository):
     """Repository interface for PasswordResetToken domain objects."""
@@ -403,6 +417,11 @@ class TargetCategoryRepository(AbstractRepository):
         """Delete a target category from the repository."""
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def bulk_add(self, items: list[TargetCategory]) -> None:
+        """Add multiple target categories in bulk."""
+        raise NotImplementedError
+
     @abc.abstractmethod
     def delete_all_for_assembly(self, assembly_id: uuid.UUID) -> int:
         """Delete all target categories for an assembly. Returns count deleted."""
@@ -617,8 +636,18 @@ class RegistrationImageRepository(AbstractRepository):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationImage]:
-        """Get all images for a registration page, oldest first."""
+    def get_info_by_assembly_and_sha(self, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+        """Get the metadata of a page's image by its content hash, without loading its bytes."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of an image from ``offset`` on, in pieces of at most ``chunk_size``."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationImageSummary]:
+        """Get the metadata of all of an assembly's images, oldest first, without their bytes."""
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -632,6 +661,28 @@ class RegistrationImageRepository(AbstractRepository):
         raise NotImplementedError
 
 
+class RegistrationImageVariantRepository(AbstractRepository):
+    """Repository interface for RegistrationImageVariant domain objects."""
+
+    @abc.abstractmethod
+    def list_info_by_image_id(self, image_id: uuid.UUID) -> list[ImageVariantInfo]:
+        """Get the metadata of an image's variants, without their bytes."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of a variant from ``offset`` on, in pieces of at most ``chunk_size``."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list_image_ids_without_variants(self, created_before: datetime, limit: int) -> list[uuid.UUID]:
+        """Get the ids of up to ``limit`` images created before ``created_before`` with no variants, oldest first.
+
+        Images whose variants failed to render are left out.
+        """
+        raise NotImplementedError
+
+
 class RegistrationDocumentRepository(AbstractRepository):
     """Repository interface for RegistrationDocument domain objects."""
 
@@ -641,8 +692,18 @@ class RegistrationDocumentRepository(AbstractRepository):
         raise NotImplementedError
 
     @abc.abstractmethod
-    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationDocument]:
-        """Get all documents for a registration page, oldest first."""
+    def get_info_by_assembly_and_sha(self, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+        """Get the metadata of a page's document by its content hash, without loading its bytes."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of a document from ``offset`` on, in pieces of at most ``chunk_size``."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationDocumentSummary]:
+        """Get the metadata of all of an assembly's documents, oldest first, without their bytes."""
         raise NotImplementedError
 
     @abc.abstractmethod
@@ -1,23 +1,35 @@
 """ABOUTME: Service layer for exporting respondents to CSV or Google Sheets
 ABOUTME: Builds tabular data, resolves status filters, orchestrates the export"""
 
+import json
 import uuid
+from dataclasses import dataclass
+from enum import StrEnum
+
+import structlog
+from redis import Redis
+from redis.exceptions import RedisError
 
 from opendlp.adapters.tabular_export import (
     AbstractGSheetExportTarget,
     AbstractTabularExportTarget,
+    ExportTargetError,
     TabularData,
 )
+from opendlp.config import RedisCfg
 from opendlp.domain.assembly import Assembly
 from opendlp.domain.assembly_respondent_gsheet import AssemblyRespondentGSheet
 from opendlp.domain.respondent_field_schema import RespondentFieldDefinition
 from opendlp.domain.respondents import Respondent
+from opendlp.domain.validators import GoogleSpreadsheetURLValidator
 from opendlp.domain.value_objects import RespondentStatus
 from opendlp.service_layer.exceptions import AssemblyNotFoundError, InvalidSelection
 from opendlp.service_layer.permissions import can_manage_assembly, require_assembly_permission
 from opendlp.service_layer.unit_of_work import AbstractUnitOfWork
 from opendlp.translations import gettext as _
 
+logger = structlog.get_logger(__name__)
+
 DEFAULT_SHEET_TITLE = "Respondents"
 
 # UI filter tokens accepted by resolve_status_filter alongside plain status names.
@@ -248,3 +260,231 @@ def export_respondents_to_gsheet(
             worksheet_url=target.result_url,
         )
     uow.commit()
+
+
+# Background Google Sheets exports
+#
+# Writing a large pool to Google Sheets takes many API calls, so the export runs
+# in a Celery task rather than in the request. Its progress and outcome live in
+# Redis, keyed by assembly, for the respondents page to poll.
+
+_EXPORT_KEY_PREFIX = "respondent_gsheet_export:"
+# Long enough for the organiser to come back and see how the export went.
+_EXPORT_STATE_TTL_SECONDS = 24 * 60 * 60
+
+
+class GSheetExportStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class GSheetExportState:
+    """Progress and outcome of a background respondent export to Google Sheets."""
+
+    task_id: str
+    status: GSheetExportStatus
+    rows_written: int = 0
+    total_rows: int = 0
+    error_message: str = ""
+    # The sheet could not be written (missing, or not shared with the service account).
+    sharing_problem: bool = False
+
+    @property
+    def has_finished(self) -> bool:
+        return self.status in (GSheetExportStatus.COMPLETED, GSheetExportStatus.FAILED)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "task_id": self.task_id,
+            "status": self.status.value,
+            "rows_written": self.rows_written,
+            "total_rows": self.total_rows,
+            "error_message": self.error_message,
+            "sharing_problem": self.sharing_problem,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "GSheetExportState":
+        data = json.loads(raw)
+        return cls(
+            task_id=data["task_id"],
+            status=GSheetExportStatus(data["status"]),
+            rows_written=data["rows_written"],
+            total_rows=data["total_rows"],
+            error_message=data["error_message"],
+            sharing_problem=data.get("sharing_problem", False),
+        )
+
+
+def _get_redis() -> Redis:
+    cfg = RedisCfg.from_env()
+    return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+
+
+def _export_state_key(assembly_id: uuid.UUID) -> str:
+    return f"{_EXPORT_KEY_PREFIX}{assembly_id}"
+
+
+def _load_export_state(assembly_id: uuid.UUID, redis_client: Redis) -> GSheetExportState | None:
+    raw = redis_client.get(_export_state_key(assembly_id))
+    if not isinstance(raw, str | bytes):
+        return None
+    return GSheetExportState.from_json(raw)
+
+
+def _save_export_state(assembly_id: uuid.UUID, state: GSheetExportState, redis_client: Redis) -> None:
+    redis_client.set(_export_state_key(assembly_id), state.to_json(), ex=_EXPORT_STATE_TTL_SECONDS)
+
+
+@require_assembly_permission(can_manage_assembly)
+def start_respondent_gsheet_export(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    *,
+    status_filter: list[RespondentStatus] | None,
+    spreadsheet_url: str,
+    worksheet_name: str,
+    redis_client: Redis | None = None,
+) -> GSheetExportState:
+    """Submit a Google Sheets export to Celery and record it as pending.
+
+    A malformed spreadsheet URL is rejected here with a ValueError, before
+    anything is queued. Redis or the Celery broker being unavailable is left to
+    the caller (RedisError or kombu's OperationalError).
+
+    The caller is expected to manage the `uow` context (`with uow: ...`).
+    """
+    GoogleSpreadsheetURLValidator().validate_str(spreadsheet_url)
+    _load_assembly(uow, assembly_id)
+
+    r = redis_client or _get_redis()
+    state = GSheetExportState(task_id=uuid.uuid4().hex, status=GSheetExportStatus.PENDING)
+    _save_export_state(assembly_id, state, r)
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
+    tasks.export_respondents_to_gsheet.delay(
+        task_id=state.task_id,
+        assembly_id=assembly_id,
+        user_id=user_id,
+        statuses=None if status_filter is None else [status.value for status in status_filter],
+        spreadsheet_url=spreadsheet_url,
+        worksheet_name=worksheet_name,
+    )
+    return state
+
+
+@require_assembly_permission(can_manage_assembly)
+def get_respondent_gsheet_export_state(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    redis_client: Redis | None = None,
+) -> GSheetExportState | None:
+    """Return the latest Google Sheets export for the assembly, or None if there is none.
+
+    Redis being unavailable is treated as "no export" so the respondents page still renders.
+
+    The caller is expected to manage the `uow` context (`with uow: ...`).
+    """
+    _load_assembly(uow, assembly_id)
+    try:
+        return _load_export_state(assembly_id, redis_client or _get_redis())
+    except RedisError as e:
+        logger.warning("Could not read Google Sheets export state", assembly_id=str(assembly_id), error=str(e))
+        return None
+
+
+@require_assembly_permission(can_manage_assembly)
+def dismiss_respondent_gsheet_export_state(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    task_id: str,
+    redis_client: Redis | None = None,
+) -> None:
+    """Forget a finished export once its outcome has been shown, unless a newer one has been submitted.
+
+    The caller is expected to manage the `uow` context (`with uow: ...`).
+    """
+    _load_assembly(uow, assembly_id)
+    r = redis_client or _get_redis()
+    try:
+        latest = _load_export_state(assembly_id, r)
+        if latest is not None and latest.task_id == task_id and latest.has_finished:
+            r.delete(_export_state_key(assembly_id))
+    except RedisError as e:
+        logger.warning("Could not clear Google Sheets export state", assembly_id=str(assembly_id), error=str(e))
+
+
+def run_respondent_gsheet_export(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    *,
+    task_id: str,
+    status_filter: list[RespondentStatus] | None,
+    spreadsheet_url: str,
+    worksheet_name: str,
+    target: AbstractGSheetExportTarget,
+    redis_client: Redis | None = None,
+) -> GSheetExportState:
+    """Run a submitted export, recording progress and outcome. Called from the Celery task.
+
+    Progress and outcome are only stored while no newer export has been submitted.
+    """
+    r = redis_client or _get_redis()
+
+    def _save_if_current(state: GSheetExportState) -> None:
+        latest = _load_export_state(assembly_id, r)
+        if latest is None or latest.task_id == task_id:
+            _save_export_state(assembly_id, state, r)
+
+    progress = GSheetExportState(task_id=task_id, status=GSheetExportStatus.RUNNING)
+
+    def _on_progress(rows_written: int, total_rows: int) -> None:
+        progress.rows_written = rows_written
+        progress.total_rows = total_rows
+        _save_if_current(progress)
+
+    _save_if_current(progress)
+    target.on_progress = _on_progress
+    try:
+        export_respondents_to_gsheet(
+            uow,
+            user_id,
+            assembly_id,
+            status_filter=status_filter,
+            spreadsheet_url=spreadsheet_url,
+            worksheet_name=worksheet_name,
+            target=target,
+        )
+    except ExportTargetError as e:
+        # When access was denied the sheet is not shared with the service account, or
+        # the URL points at a sheet that does not exist; the page says how to fix that.
+        logger.warning("Google Sheets export failed", assembly_id=str(assembly_id), error=str(e))
+        state = GSheetExportState(
+            task_id=task_id,
+            status=GSheetExportStatus.FAILED,
+            error_message=str(e),
+            sharing_problem=e.access_denied,
+        )
+    except Exception as e:
+        logger.exception("Google Sheets export failed", assembly_id=str(assembly_id), error=str(e))
+        state = GSheetExportState(
+            task_id=task_id,
+            status=GSheetExportStatus.FAILED,
+            error_message=_("The export could not be completed: %(error)s", error=str(e)),
+        )
+    else:
+        state = GSheetExportState(
+            task_id=task_id,
+            status=GSheetExportStatus.COMPLETED,
+            rows_written=progress.rows_written,
+            total_rows=progress.total_rows,
+        )
+    _save_if_current(state)
+    return state
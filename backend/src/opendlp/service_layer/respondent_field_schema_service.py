@@ -694,15 +694,9 @@ def update_schema_from_headers(
 
 
 def _parse_csv_headers(csv_content: str) -> list[str]:
-    """Read the header row from a CSV and return the column names in order.
-
-    Raises ``InvalidSelection`` if the CSV has no header row at all.
-    """
+    """Read the header row from a CSV and return the column names in order."""
     reader = csv_module.DictReader(StringIO(csv_content))
-    headers = list(reader.fieldnames or [])
-    if not headers:
-        raise InvalidSelection("CSV file is empty or has no header row")
-    return headers
+    return list(reader.fieldnames or [])
 
 
 def _auto_detect_id_column(headers: list[str], explicit_id_column: str | None) -> str:
@@ -710,7 +704,7 @@ def _auto_detect_id_column(headers: list[str], explicit_id_column: str | None) -
 
     If the caller supplies a column name, use it verbatim; otherwise the first
     column wins. Returns the empty string only when ``headers`` is empty (in
-    practice that can't happen because ``_parse_csv_headers`` rejects it).
+    practice that can't happen because ``compute_diff_for_pending_headers`` rejects it).
     """
     if explicit_id_column:
         return explicit_id_column
@@ -724,18 +718,37 @@ def compute_diff_for_pending_csv(
     csv_content: str,
     explicit_id_column: str | None,
 ) -> ReconciliationDiff | None:
-    """Compute the reconciliation diff for a pending CSV upload.
+    """Compute the reconciliation diff for a pending CSV upload, given its raw text.
+
+    See ``compute_diff_for_pending_headers``, which this parses the header row for.
 
-    Read-only. Parses the CSV header row, resolves the id column via the same
-    auto-detect rule the importer uses, pulls the existing schema and target
-    categories, and compares. Returns ``None`` when the assembly has no schema
-    yet — the caller interprets that as "skip the confirmation page entirely".
+    The caller is expected to manage the `uow` context (`with uow: ...`).
+    """
+    return compute_diff_for_pending_headers(
+        uow, user_id, assembly_id, _parse_csv_headers(csv_content), explicit_id_column
+    )
+
+
+def compute_diff_for_pending_headers(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    headers: list[str],
+    explicit_id_column: str | None,
+) -> ReconciliationDiff | None:
+    """Compute the reconciliation diff for a pending CSV upload's header row.
+
+    Read-only. Resolves the id column via the same auto-detect rule the
+    importer uses, pulls the existing schema and target categories, and
+    compares. Returns ``None`` when the assembly has no schema yet — the
+    caller interprets that as "skip the confirmation page entirely".
 
     Raises ``InvalidSelection`` if the CSV has no header row.
 
     The caller is expected to manage the `uow` context (`with uow: ...`).
     """
-    headers = _parse_csv_headers(csv_content)
+    if not headers:
+        raise InvalidSelection("CSV file is empty or has no header row")
     id_column = _auto_detect_id_column(headers, explicit_id_column)
 
     _ensure_view_permission(uow, user_id, assembly_id)
@@ -2,9 +2,12 @@
 ABOUTME: Provides functions for respondent creation, CSV import, and validation"""
 
 import csv
+import io
 import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from io import StringIO
-from typing import Any
+from typing import IO, Any
 
 from opendlp.domain.respondents import _UNSET as _RESPONDENT_UNSET
 from opendlp.domain.respondents import Respondent, normalise_field_name, pop_normalised
@@ -85,6 +88,77 @@ def create_respondent(
     return respondent.create_detached_copy()
 
 
+# Rows handed to the respondent repository per bulk insert when importing. The
+# rows of one batch are the most an import holds in memory at once.
+CSV_IMPORT_BATCH_SIZE = 1000
+
+
+def _row_dict(headers: list[str], values: list[str]) -> dict[str, str]:
+    """Key one row's values by header, exactly as ``csv.DictReader`` would."""
+    row: dict[Any, Any] = dict(zip(headers, values, strict=False))
+    if len(values) > len(headers):
+        row[None] = values[len(headers) :]
+    else:
+        for header in headers[len(values) :]:
+            row[header] = None
+    return row
+
+
+@dataclass
+class ParsedCsv:
+    """A respondent CSV parsed once: the header row, and each data row's values in column order.
+
+    Keeping rows as value lists rather than dicts avoids repeating every header in
+    every row, which keeps the form small enough to stash between upload steps.
+    """
+
+    headers: list[str]
+    rows: list[list[str]]
+
+    def row_dicts(self) -> Iterator[dict[str, str]]:
+        """Yield each row keyed by header, exactly as ``csv.DictReader`` would."""
+        for values in self.rows:
+            yield _row_dict(self.headers, values)
+
+
+def _split_csv(lines: Iterable[str]) -> tuple[list[str], Iterator[list[str]]]:
+    reader = csv.reader(lines)
+    headers = next(reader, [])
+    # Blank lines are skipped, as csv.DictReader does.
+    rows = (values for values in reader if values) if headers else iter(())
+    return headers, rows
+
+
+def parse_csv(csv_content: str) -> ParsedCsv:
+    """Parse CSV text into its header row and data rows."""
+    headers, rows = _split_csv(StringIO(csv_content))
+    return ParsedCsv(headers=headers, rows=list(rows))
+
+
+def read_csv_stream(stream: IO[bytes]) -> tuple[list[str], Iterator[list[str]]]:
+    """Read a CSV's header row now, and its data rows lazily as the caller iterates.
+
+    The stream (such as an uploaded file) is decoded as UTF-8 as it is read, so
+    only the first chunk has been read when this returns: callers can reject a
+    file with unusable headers without reading the rest of it.
+    """
+    return _split_csv(io.TextIOWrapper(stream, encoding="utf-8", newline=""))
+
+
+def resolve_csv_id_column(headers: list[str], id_column: str | None) -> str:
+    """Check a CSV's header row and return the id column: ``id_column`` if given, else the first column.
+
+    Raises ``InvalidSelection`` if there is no header row or it lacks the id column.
+    """
+    if not headers:
+        raise InvalidSelection("CSV file is empty or has no header row")
+    if id_column is None:
+        id_column = headers[0]
+    if id_column not in headers:
+        raise InvalidSelection(f"CSV must have '{id_column}' column")
+    return id_column
+
+
 def import_respondents_from_csv(
     uow: AbstractUnitOfWork,
     user_id: uuid.UUID,
@@ -104,22 +178,54 @@ def import_respondents_from_csv(
 
     The caller is expected to manage the `uow` context (`with uow: ...`).
     """
-    reader = csv.DictReader(StringIO(csv_content))
-    headers = list(reader.fieldnames) if reader.fieldnames else []
-    rows = list(reader) if reader.fieldnames else []
+    parsed = parse_csv(csv_content)
     return import_respondents_from_rows(
+        uow,
+        user_id,
+        assembly_id,
+        parsed.headers,
+        list(parsed.row_dicts()),
+        replace_existing=replace_existing,
+        id_column=id_column,
+        filename=filename,
+    )
+
+
+def import_respondents_from_csv_rows(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    headers: list[str],
+    rows: Iterable[list[str]],
+    replace_existing: bool = False,
+    id_column: str | None = None,
+    filename: str = "",
+    batch_size: int = CSV_IMPORT_BATCH_SIZE,
+) -> tuple[int, list[str], str]:
+    """Import respondents from CSV rows as they are read, ``batch_size`` rows at a time.
+
+    ``rows`` holds each row's values in header order, as ``read_csv_stream`` or
+    ``ParsedCsv`` provide them. Rows are only read once the header row and
+    permissions have been checked, and each batch is handed to the repository
+    before the next is read, so a large file is never held in memory whole.
+    Returns: (number of respondents imported, list of error messages, resolved id_column name)
+
+    The caller is expected to manage the `uow` context (`with uow: ...`).
+    """
+    return _import_rows(
         uow,
         user_id,
         assembly_id,
         headers,
-        rows,
+        (_row_dict(headers, values) for values in rows),
         replace_existing=replace_existing,
         id_column=id_column,
         filename=filename,
+        batch_size=batch_size,
     )
 
 
-def import_respondents_from_rows(  # noqa: C901
+def import_respondents_from_rows(
     uow: AbstractUnitOfWork,
     user_id: uuid.UUID,
     assembly_id: uuid.UUID,
@@ -139,6 +245,36 @@ def import_respondents_from_rows(  # noqa: C901
 
     The caller is expected to manage the `uow` context (`with uow: ...`).
     """
+    imported: list[Respondent] = []
+    _count, errors, id_column = _import_rows(
+        uow,
+        user_id,
+        assembly_id,
+        headers,
+        rows,
+        replace_existing=replace_existing,
+        id_column=id_column,
+        filename=filename,
+        batch_size=CSV_IMPORT_BATCH_SIZE,
+        imported=imported,
+    )
+    return imported, errors, id_column
+
+
+def _import_rows(  # noqa: C901
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    headers: list[str],
+    rows: Iterable[dict[str, str]],
+    *,
+    replace_existing: bool,
+    id_column: str | None,
+    filename: str,
+    batch_size: int,
+    imported: list[Respondent] | None = None,
+) -> tuple[int, list[str], str]:
+    """Import rows in batches of ``batch_size``; detached copies are appended to ``imported`` if given."""
     user = uow.users.get(user_id)
     if not user:
         raise UserNotFoundError(f"User {user_id} not found")
@@ -153,15 +289,7 @@ def import_respondents_from_rows(  # noqa: C901
             required_role="assembly-manager, global-organiser or admin",
         )
 
-    if not headers:
-        raise InvalidSelection("CSV file is empty or has no header row")
-
-    # Auto-detect id_column from first column if not provided
-    if id_column is None:
-        id_column = headers[0]
-
-    if id_column not in headers:
-        raise InvalidSelection(f"CSV must have '{id_column}' column")
+    id_column = resolve_csv_id_column(headers, id_column)
 
     errors: list[str] = []
 
@@ -179,9 +307,19 @@ def import_respondents_from_rows(  # noqa: C901
     if replace_existing:
         uow.respondents.delete_all_for_assembly(assembly_id)
 
-    # Create respondents
-    respondents = []
+    # Create respondents, handing them to the repository a batch at a time
+    count = 0
+    batch: list[Respondent] = []
     seen_ids = set()  # Track IDs within this import to catch duplicates
+
+    def add_batch() -> None:
+        nonlocal count
+        uow.respondents.bulk_add(batch)
+        count += len(batch)
+        if imported is not None:
+            imported.extend(r.create_detached_copy() for r in batch)
+        batch.clear()
+
     # rows have had the header row stripped, so the first data row is line 2
     # of the file; start=2 makes row_number match what the user sees when
     # they open the file to fix a flagged row.
@@ -203,10 +341,11 @@ def import_respondents_from_rows(  # noqa: C901
             continue
         seen_ids.add(external_id)
 
-        respondents.append(respondent_from_row(assembly_id, user_id, row, external_id, id_column, filename))
-
-    # Bulk add for performance
-    uow.respondents.bulk_add(respondents)
+        batch.append(respondent_from_row(assembly_id, user_id, row, external_id, id_column, filename))
+        if len(batch) >= batch_size:
+            add_batch()
+    if batch:
+        add_batch()
 
     # Seed the field schema on first import; reconcile (add new keys,
     # preserve absent ones) on subsequent imports.
@@ -219,7 +358,7 @@ def import_respondents_from_rows(  # noqa: C901
         target_category_names=target_category_names,
     )
 
-    return [r.create_detached_copy() for r in respondents], errors, id_column
+    return count, errors, id_column
 
 
 def respondent_from_row(
@@ -3,13 +3,16 @@ ABOUTME: Provides functions for secure password handling and unique invite code
 
 from collections.abc import Iterable
 from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING
 
-from django.contrib.auth.password_validation import validate_password
-from django.core.exceptions import ValidationError
 from markupsafe import Markup
 from werkzeug.security import check_password_hash, generate_password_hash
 
-from opendlp.vendor import password_validation as pv
+if TYPE_CHECKING:
+    from opendlp.vendor import password_validation as pv
+
+# Django's password validation is imported when a password is validated, not at
+# boot: it loads a large part of Django, and most requests never check a password.
 
 
 def hash_password(password: str) -> str:
@@ -39,7 +42,9 @@ class TempUser:
     last_name: str = ""
 
 
-def get_password_validators() -> Iterable[pv.PasswordValidator]:
+def get_password_validators() -> Iterable["pv.PasswordValidator"]:
+    from opendlp.vendor import password_validation as pv  # noqa: PLC0415
+
     return (
         pv.SafeCommonPasswordValidator(),
         pv.MinimumLengthValidator(min_length=10),
@@ -57,6 +62,9 @@ def validate_password_strength(password: str, user: object) -> tuple[bool, str]:
     Returns tuple of (is_valid, error_message)
     """
     # We use the well maintained Django password validation
+    from django.contrib.auth.password_validation import validate_password  # noqa: PLC0415
+    from django.core.exceptions import ValidationError  # noqa: PLC0415
+
     try:
         validate_password(password, user=user, password_validators=get_password_validators())
     except ValidationError as error:
@@ -0,0 +1,92 @@
+"""ABOUTME: Aggregates the phase timings recorded on selection runs, per assembly and algorithm
+ABOUTME: Shows how solver time grows with pool size and category count, for planning worker capacity"""
+
+import uuid
+from dataclasses import dataclass
+from statistics import mean
+
+from opendlp.domain.assembly import SelectionRunRecord
+from opendlp.service_layer.exceptions import InsufficientPermissions, UserNotFoundError
+from opendlp.service_layer.permissions import has_global_admin
+from opendlp.service_layer.unit_of_work import AbstractUnitOfWork
+
+SOLVER_PHASE = "select"
+
+
+def solver_seconds(record: SelectionRunRecord) -> float | None:
+    timing = record.phase_timings.get(SOLVER_PHASE)
+    return timing["wall_seconds"] if timing else None
+
+
+@dataclass(frozen=True)
+class TimingSummary:
+    """Timings of the completed runs of one assembly with one selection algorithm."""
+
+    assembly_id: uuid.UUID
+    assembly_title: str
+    selection_algorithm: str
+    run_count: int
+    min_pool_size: int
+    max_pool_size: int
+    max_category_count: int
+    mean_solver_seconds: float | None
+    max_solver_seconds: float | None
+    mean_solver_cpu_seconds: float | None
+    mean_total_seconds: float
+
+
+@dataclass(frozen=True)
+class TimingReport:
+    summaries: list[TimingSummary]
+    # Individual runs, largest pool first, to see how time scales with size
+    runs: list[SelectionRunRecord]
+
+
+def _summarise(assembly_title: str, records: list[SelectionRunRecord]) -> TimingSummary:
+    pool_sizes = [record.pool_size or 0 for record in records]
+    solver_walls = [seconds for record in records if (seconds := solver_seconds(record)) is not None]
+    solver_cpus = [
+        record.phase_timings[SOLVER_PHASE]["cpu_seconds"] for record in records if SOLVER_PHASE in record.phase_timings
+    ]
+    return TimingSummary(
+        assembly_id=records[0].assembly_id,
+        assembly_title=assembly_title,
+        selection_algorithm=records[0].selection_algorithm,
+        run_count=len(records),
+        min_pool_size=min(pool_sizes),
+        max_pool_size=max(pool_sizes),
+        max_category_count=max(record.category_count or 0 for record in records),
+        mean_solver_seconds=round(mean(solver_walls), 3) if solver_walls else None,
+        max_solver_seconds=max(solver_walls) if solver_walls else None,
+        mean_solver_cpu_seconds=round(mean(solver_cpus), 3) if solver_cpus else None,
+        mean_total_seconds=round(mean(record.total_wall_seconds or 0.0 for record in records), 3),
+    )
+
+
+def build_timing_report(uow: AbstractUnitOfWork, admin_user_id: uuid.UUID, limit: int = 1000) -> TimingReport:
+    """Summarise the timings of the last ``limit`` completed runs across all assemblies (admin only).
+
+    Raises:
+        UserNotFoundError: If admin user not found
+        InsufficientPermissions: If requesting user is not admin
+    """
+    admin_user = uow.users.get(admin_user_id)
+    if not admin_user:
+        raise UserNotFoundError(f"Admin user {admin_user_id} not found")
+    if not has_global_admin(admin_user):
+        raise InsufficientPermissions(action="view selection timings", required_role="admin")
+
+    runs = [run for run in uow.selection_run_records.get_timed_runs(limit=limit) if run.phase_timings]
+    groups: dict[tuple[uuid.UUID, str], list[SelectionRunRecord]] = {}
+    for run in runs:
+        groups.setdefault((run.assembly_id, run.selection_algorithm), []).append(run)
+
+    titles: dict[uuid.UUID, str] = {}
+    for assembly_id in {assembly_id for assembly_id, _algorithm in groups}:
+        assembly = uow.assemblies.get(assembly_id)
+        titles[assembly_id] = assembly.title if assembly else str(assembly_id)
+
+    summaries = [_summarise(titles[assembly_id], records) for (assembly_id, _algorithm), records in groups.items()]
+    summaries.sort(key=lambda summary: (summary.assembly_title.lower(), summary.selection_algorithm))
+    runs.sort(key=lambda run: run.pool_size or 0, reverse=True)
+    return TimingReport(summaries=summaries, runs=runs)
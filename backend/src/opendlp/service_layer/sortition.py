@@ -3,14 +3,14 @@ ABOUTME: Provides high-level functions for starting and monitoring Celery-based
 
 import contextlib
 import csv
+import time
 import uuid
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from io import StringIO
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import structlog
-from celery.result import AsyncResult
 from sortition_algorithms import RunReport, adapters
 from sortition_algorithms import settings as sa_settings
 from sortition_algorithms.core import person_list_to_table
@@ -20,24 +20,33 @@ from sortition_algorithms.people import People
 from sqlalchemy.orm.attributes import flag_modified
 
 from opendlp import config
+from opendlp.adapters.selection_data_cache import CachedSelectionData
 from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
 from opendlp.domain.assembly import Assembly, SelectionRunRecord
 from opendlp.domain.selection_settings import SelectionSettings
 from opendlp.domain.targets import target_categories_to_snapshot
 from opendlp.domain.value_objects import ManageOldTabsState, ManageOldTabsStatus, SelectionRunStatus, SelectionTaskType
-from opendlp.entrypoints.celery import app, tasks
+from opendlp.service_layer.constants import DEFAULT_STABILITY_ANALYSIS_RUNS, MAX_STABILITY_ANALYSIS_RUNS
 from opendlp.service_layer.error_translation import translate_sortition_error
 from opendlp.service_layer.exceptions import (
     AssemblyNotFoundError,
     GoogleSheetConfigNotFoundError,
+    InsufficientPermissions,
     InvalidSelection,
     SelectionRunRecordNotFoundError,
 )
-from opendlp.service_layer.permissions import can_manage_assembly, require_assembly_permission
+from opendlp.service_layer.permissions import can_manage_assembly, can_profile, require_assembly_permission
 from opendlp.service_layer.report_translation import translate_run_report_to_html
 from opendlp.service_layer.unit_of_work import AbstractUnitOfWork
 from opendlp.translations import gettext as _
 
+if TYPE_CHECKING:
+    from celery.result import AsyncResult
+
+# Celery and the task modules are imported where a task is queued or inspected,
+# not at the top of this module: web processes load the service layer on every
+# boot but most never touch a task, and the task modules are slow to import.
+
 logger = structlog.get_logger(__name__)
 
 
@@ -121,6 +130,8 @@ def start_gsheet_load_task(uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly
     except SortitionBaseError as e:
         raise InvalidSelection(str(e)) from e
 
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
     result = tasks.load_gsheet.delay(
         task_id=task_id,
         data_source=data_source,
@@ -133,6 +144,12 @@ def start_gsheet_load_task(uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly
     return task_id
 
 
+def _check_can_profile(uow: AbstractUnitOfWork, user_id: uuid.UUID) -> None:
+    user = uow.users.get(user_id)
+    if user is None or not can_profile(user):
+        raise InsufficientPermissions(action="profile selection", required_role="admin on the profiling list")
+
+
 @require_assembly_permission(can_manage_assembly)
 def start_gsheet_select_task(
     uow: AbstractUnitOfWork,
@@ -140,7 +157,10 @@ def start_gsheet_select_task(
     assembly_id: uuid.UUID,
     test_selection: bool = False,
     celery_apply_kwargs: dict[str, Any] | None = None,
+    profile: bool = False,
 ) -> uuid.UUID:
+    if profile:
+        _check_can_profile(uow, user_id)
     # Get assembly and validate gsheet configuration exists
     assembly = uow.assemblies.get(assembly_id)
     if not assembly:
@@ -194,7 +214,10 @@ def start_gsheet_select_task(
         "settings": settings_obj,
         "test_selection": test_selection,
         "gen_rem_tab": gsheet.generate_remaining_tab,
+        "profile": profile,
     }
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
     result = tasks.run_select.apply_async(kwargs=celery_kwargs, **apply_kwargs)
     record.celery_task_id = str(result.id)
     uow.selection_run_records.add(record)
@@ -257,6 +280,8 @@ def start_gsheet_replace_load_task(uow: AbstractUnitOfWork, user_id: uuid.UUID,
     except SortitionBaseError as e:
         raise InvalidSelection(str(e)) from e
 
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
     result = tasks.load_gsheet.delay(
         task_id=task_id,
         data_source=data_source,
@@ -326,6 +351,8 @@ def start_gsheet_replace_task(
     except SortitionBaseError as e:
         raise InvalidSelection(str(e)) from e
 
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
     result = tasks.run_select.delay(
         task_id=task_id,
         data_source=data_source,
@@ -398,6 +425,8 @@ def start_gsheet_manage_tabs_task(
     except SortitionBaseError as e:
         raise InvalidSelection(str(e)) from e
 
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
     result = tasks.manage_old_tabs.delay(
         task_id=task_id,
         data_source=data_source,
@@ -458,7 +487,7 @@ def check_db_selection_data(
         )
 
     data_source = OpenDLPDataAdapter(uow, assembly_id)
-    select_data = adapters.SelectionData(data_source)
+    select_data = CachedSelectionData(adapters.SelectionData(data_source), assembly_id)
 
     try:
         features, f_report = select_data.load_features(assembly.number_to_select)
@@ -483,13 +512,9 @@ def check_db_selection_data(
     )
 
 
-@require_assembly_permission(can_manage_assembly)
-def start_db_select_task(
-    uow: AbstractUnitOfWork,
-    user_id: uuid.UUID,
-    assembly_id: uuid.UUID,
-    test_selection: bool = False,
-) -> uuid.UUID:
+def _db_settings_for_selection(
+    uow: AbstractUnitOfWork, assembly_id: uuid.UUID
+) -> tuple[Assembly, sa_settings.Settings]:
     assembly = uow.assemblies.get(assembly_id)
     if not assembly:
         raise AssemblyNotFoundError(f"Assembly {assembly_id} not found")
@@ -499,20 +524,24 @@ def start_db_select_task(
 
     sel_settings = _get_selection_settings(assembly)
     try:
-        settings_obj = sel_settings.to_settings()
+        return assembly, sel_settings.to_settings()
     except SortitionBaseError as e:
         raise InvalidSelection(str(e)) from e
 
-    task_id = uuid.uuid4()
-    task_type = SelectionTaskType.TEST_SELECT_FROM_DB if test_selection else SelectionTaskType.SELECT_FROM_DB
-    log_msg = (
-        "Task submitted for database TEST selection" if test_selection else "Task submitted for database selection"
-    )
 
+def _add_db_run_record(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    task_type: SelectionTaskType,
+    log_msg: str,
+    settings_obj: sa_settings.Settings,
+) -> SelectionRunRecord:
+    """Create and commit the PENDING run record for a database-backed selection task."""
     target_categories = uow.target_categories.get_by_assembly_id(assembly_id)
     record = SelectionRunRecord(
         assembly_id=assembly_id,
-        task_id=task_id,
+        task_id=uuid.uuid4(),
         task_type=task_type,
         status=SelectionRunStatus.PENDING,
         log_messages=[log_msg],
@@ -528,13 +557,83 @@ def start_db_select_task(
     )
     uow.selection_run_records.add(record)
     uow.commit()
+    return record
+
+
+@require_assembly_permission(can_manage_assembly)
+def start_db_select_task(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    test_selection: bool = False,
+    profile: bool = False,
+) -> uuid.UUID:
+    if profile:
+        _check_can_profile(uow, user_id)
+    assembly, settings_obj = _db_settings_for_selection(uow, assembly_id)
+    task_type = SelectionTaskType.TEST_SELECT_FROM_DB if test_selection else SelectionTaskType.SELECT_FROM_DB
+    log_msg = (
+        "Task submitted for database TEST selection" if test_selection else "Task submitted for database selection"
+    )
+    record = _add_db_run_record(uow, user_id, assembly_id, task_type, log_msg, settings_obj)
+    task_id = record.task_id
+
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
 
     result = tasks.run_select_from_db.delay(
         task_id=task_id,
         assembly_id=assembly_id,
         number_people_wanted=assembly.number_to_select,
-        settings=settings_obj,
+        settings=tasks.settings_to_payload(settings_obj),
         test_selection=test_selection,
+        profile=profile,
+    )
+    record.celery_task_id = str(result.id)
+    uow.selection_run_records.add(record)
+    uow.commit()
+
+    return task_id
+
+
+@require_assembly_permission(can_manage_assembly)
+def start_db_stability_analysis_task(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    num_runs: int = DEFAULT_STABILITY_ANALYSIS_RUNS,
+) -> uuid.UUID:
+    """Start a stability analysis: many test selections whose panels are compared in one report.
+
+    The report shows how often each respondent and each category value was selected,
+    so organisers can see how much the panel depends on the luck of the lottery.
+    Nothing is written to the respondents.
+    """
+    if not 2 <= num_runs <= MAX_STABILITY_ANALYSIS_RUNS:
+        raise InvalidSelection(
+            _(
+                "The number of runs for a stability analysis must be between 2 and %(max)s",
+                max=MAX_STABILITY_ANALYSIS_RUNS,
+            )
+        )
+    assembly, settings_obj = _db_settings_for_selection(uow, assembly_id)
+    record = _add_db_run_record(
+        uow,
+        user_id,
+        assembly_id,
+        SelectionTaskType.STABILITY_ANALYSIS_FROM_DB,
+        f"Task submitted for database stability analysis with {num_runs} test selections",
+        settings_obj,
+    )
+    task_id = record.task_id
+
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
+    result = tasks.run_stability_analysis_from_db.delay(
+        task_id=task_id,
+        assembly_id=assembly_id,
+        number_people_wanted=assembly.number_to_select,
+        settings=tasks.settings_to_payload(settings_obj),
+        num_runs=num_runs,
     )
     record.celery_task_id = str(result.id)
     uow.selection_run_records.add(record)
@@ -573,13 +672,21 @@ def generate_selection_csvs(
     uow: AbstractUnitOfWork,
     assembly_id: uuid.UUID,
     task_id: uuid.UUID,
+    timing_uow: AbstractUnitOfWork | None = None,
 ) -> tuple[str, str]:
+    """Build the selected and remaining CSVs for a finished run.
+
+    ``uow`` may be read-only; the time taken is then stored on the run through
+    ``timing_uow``, a short unit of work on the primary, when one is given.
+    """
     record = uow.selection_run_records.get_by_task_id(task_id)
     if not record:
         raise SelectionRunRecordNotFoundError(f"SelectionRunRecord {task_id} not found")
     if not record.selected_ids or record.remaining_ids is None:
         raise InvalidSelection(_("Selection has not completed — no results to download"))
 
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
     selected_ext_ids = list(record.selected_ids[0])
     remaining_ext_ids = list(record.remaining_ids)
 
@@ -596,7 +703,10 @@ def generate_selection_csvs(
     # We need to get ALL the people, so we can get all their data, so we can fetch data for
     # those who are already selected.
     data_source = OpenDLPDataAdapter(uow, assembly_id, eligible_only=False)
-    select_data = adapters.SelectionData(data_source)
+    # A lagging replica can return data older than the current version, so never cache what it parsed
+    select_data = CachedSelectionData(
+        adapters.SelectionData(data_source), assembly_id, eligible_only=False, fill_cache=not uow.using_replica
+    )
     features, _feat_report = select_data.load_features()
     full_people, _ppl_report = select_data.load_people(settings_obj, features)
 
@@ -610,7 +720,20 @@ def generate_selection_csvs(
         remaining_ext_ids, full_people, features, settings_obj, deleted_ext_ids
     )
 
-    return _table_to_csv(selected_table), _table_to_csv(remaining_table)
+    csvs = _table_to_csv(selected_table), _table_to_csv(remaining_table)
+
+    wall_seconds, cpu_seconds = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    if not uow.read_only:
+        record.add_phase_timing("csv_generation", wall_seconds, cpu_seconds, replace=True)
+    elif timing_uow is not None:
+        with timing_uow:
+            primary_record = timing_uow.selection_run_records.get_by_task_id(task_id)
+            if primary_record is not None:
+                primary_record.add_phase_timing("csv_generation", wall_seconds, cpu_seconds, replace=True)
+                timing_uow.commit()
+    else:
+        logger.info("Generated selection CSVs", task_id=str(task_id), wall_seconds=round(wall_seconds, 3))
+    return csvs
 
 
 @dataclass
@@ -637,7 +760,15 @@ class TabManagementResult(RunResult):
     tab_names: list[str] = field(default_factory=list)
 
 
-def _process_celery_final_result(celery_result: AsyncResult, run_record: SelectionRunRecord) -> RunResult:
+# Task types whose final result is read from the run record, never from Celery:
+# the database-backed tasks write their outcome there and only return a success
+# flag, and the stability analysis task finishes before the work does (it hands
+# off to other tasks).
+_DB_SELECTION_TASK_TYPES = frozenset({SelectionTaskType.SELECT_FROM_DB, SelectionTaskType.TEST_SELECT_FROM_DB})
+_RECORD_ONLY_RESULT_TASK_TYPES = _DB_SELECTION_TASK_TYPES | {SelectionTaskType.STABILITY_ANALYSIS_FROM_DB}
+
+
+def _process_celery_final_result(celery_result: "AsyncResult", run_record: SelectionRunRecord) -> RunResult:
     # Calls AsyncResult.get(), which Celery forbids inside a worker task — it
     # raises RuntimeError('Never call result.get() within a task!'). Callers
     # invoked from a Celery worker must read state from SelectionRunRecord
@@ -661,8 +792,6 @@ def _process_celery_final_result(celery_result: AsyncResult, run_record: Selecti
         SelectionTaskType.SELECT_GSHEET,
         SelectionTaskType.TEST_SELECT_GSHEET,
         SelectionTaskType.SELECT_REPLACEMENT_GSHEET,
-        SelectionTaskType.SELECT_FROM_DB,
-        SelectionTaskType.TEST_SELECT_FROM_DB,
     ):
         success, selected_ids, run_report = final_result
         return SelectionRunResult(
@@ -712,12 +841,24 @@ def get_selection_run_status(uow: AbstractUnitOfWork, task_id: uuid.UUID) -> Run
         # task whose final return value still lives in the result backend.
         result.log_messages = list(run_record.log_messages)
 
-        celery_result = app.app.AsyncResult(run_record.celery_task_id)
-        if celery_result.id and celery_result.successful():
+        from opendlp.entrypoints.celery.app import app  # noqa: PLC0415
+
+        celery_result = app.AsyncResult(run_record.celery_task_id)
+        if (
+            celery_result.id
+            and celery_result.successful()
+            and run_record.task_type not in _RECORD_ONLY_RESULT_TASK_TYPES
+        ):
             # Celery still has the result — pull the typed final value out so
             # the caller gets features/people/selected_ids etc.
             return _process_celery_final_result(celery_result, run_record)
 
+        if run_record.task_type in _DB_SELECTION_TASK_TYPES:
+            result = SelectionRunResult(
+                run_record=run_record,
+                log_messages=result.log_messages,
+                selected_ids=[frozenset(panel) for panel in run_record.selected_ids or []],
+            )
         if run_record.run_report:
             result.run_report = run_record.run_report
             # set success - the default is None, for not finished at all
@@ -763,8 +904,14 @@ def cancel_task(uow: AbstractUnitOfWork, user_id: uuid.UUID, assembly_id: uuid.U
 
     # Revoke the Celery task
     try:
-        app.app.control.revoke(run_record.celery_task_id, terminate=True)
+        from opendlp.entrypoints.celery.app import app  # noqa: PLC0415
+
+        app.control.revoke(run_record.celery_task_id, terminate=True)
         logger.info(f"Successfully revoked Celery task {run_record.celery_task_id}")
+        if run_record.child_celery_task_ids:
+            # e.g. the samples and callback of a stability analysis, which outlive the task that queued them
+            app.control.revoke(run_record.child_celery_task_ids, terminate=True)
+            logger.info(f"Successfully revoked {len(run_record.child_celery_task_ids)} child Celery tasks")
     except Exception as e:
         # Log the error but continue - we still want to mark as CANCELLED in DB
         logger.warning(f"Failed to revoke Celery task {run_record.celery_task_id}: {e}")
@@ -814,6 +961,7 @@ _INITIAL_SELECTION_TASK_TYPES = frozenset({
     SelectionTaskType.TEST_SELECT_GSHEET,
     SelectionTaskType.SELECT_FROM_DB,
     SelectionTaskType.TEST_SELECT_FROM_DB,
+    SelectionTaskType.STABILITY_ANALYSIS_FROM_DB,
 })
 
 
@@ -847,7 +995,7 @@ def get_latest_run_for_assembly(uow: AbstractUnitOfWork, assembly_id: uuid.UUID)
     return uow.selection_run_records.get_latest_for_assembly(assembly_id)
 
 
-def _extract_exception_info(celery_result: AsyncResult) -> str:
+def _extract_exception_info(celery_result: "AsyncResult") -> str:
     """Extract exception information from a failed Celery result."""
     try:
         if celery_result.info and isinstance(celery_result.info, Exception):
@@ -902,7 +1050,7 @@ def _mark_task_as_failed(
     uow.commit()
 
 
-def _get_celery_task_state(run_record: SelectionRunRecord, task_id: uuid.UUID) -> tuple[AsyncResult | None, str]:
+def _get_celery_task_state(run_record: SelectionRunRecord, task_id: uuid.UUID) -> tuple["AsyncResult | None", str]:
     # Check if celery_task_id is valid before querying Celery
     if not run_record.celery_task_id:
         # Task was created without a Celery task ID (shouldn't happen in production)
@@ -916,7 +1064,9 @@ def _get_celery_task_state(run_record: SelectionRunRecord, task_id: uuid.UUID) -
 
     # Query Celery for task state
     try:
-        celery_result = app.app.AsyncResult(run_record.celery_task_id)
+        from opendlp.entrypoints.celery.app import app  # noqa: PLC0415
+
+        celery_result = app.AsyncResult(run_record.celery_task_id)
         return celery_result, celery_result.state
     except (ValueError, Exception) as exc:
         # Handle invalid celery_task_id or other Celery errors
@@ -0,0 +1,109 @@
+"""ABOUTME: Aggregation of many independent test selections into a panel stability report
+ABOUTME: Computes per-respondent and per-category-value selection frequencies across the runs"""
+
+from dataclasses import dataclass, field
+
+from sortition_algorithms import RunReport
+from sortition_algorithms.features import FeatureCollection, iterate_feature_collection
+from sortition_algorithms.people import People
+
+from opendlp.translations import gettext as _
+
+
+@dataclass
+class ValueFrequency:
+    feature_name: str
+    value_name: str
+    min: int
+    max: int
+    mean_selected: float
+    lowest_selected: int
+    highest_selected: int
+
+
+@dataclass
+class StabilitySummary:
+    runs_requested: int
+    panels: list[frozenset[str]]
+    # respondent id -> number of panels they were selected in
+    respondent_counts: dict[str, int] = field(default_factory=dict)
+    value_frequencies: list[ValueFrequency] = field(default_factory=list)
+
+    @property
+    def runs_succeeded(self) -> int:
+        return len(self.panels)
+
+    @property
+    def always_selected(self) -> int:
+        return sum(1 for count in self.respondent_counts.values() if count == self.runs_succeeded)
+
+
+def summarise_panels(
+    features: FeatureCollection, people: People, panels: list[frozenset[str]], runs_requested: int
+) -> StabilitySummary:
+    """Count how often each respondent and each category value was selected across the panels."""
+    summary = StabilitySummary(runs_requested=runs_requested, panels=panels)
+    for panel in panels:
+        for person_key in panel:
+            summary.respondent_counts[person_key] = summary.respondent_counts.get(person_key, 0) + 1
+
+    for fname, fvalue, minmax in iterate_feature_collection(features):
+        per_panel = [
+            sum(1 for person_key in panel if people.get_person_dict(person_key)[fname].lower() == fvalue.lower())
+            for panel in panels
+        ]
+        summary.value_frequencies.append(
+            ValueFrequency(
+                feature_name=fname,
+                value_name=fvalue,
+                min=minmax.min,
+                max=minmax.max,
+                mean_selected=sum(per_panel) / len(per_panel) if per_panel else 0.0,
+                lowest_selected=min(per_panel, default=0),
+                highest_selected=max(per_panel, default=0),
+            )
+        )
+    return summary
+
+
+def stability_report(summary: StabilitySummary) -> RunReport:
+    """Render a stability summary as report tables for the SelectionRunRecord."""
+    report = RunReport()
+    report.add_line(
+        _(
+            "Stability analysis: %(succeeded)s of %(requested)s test selections succeeded.",
+            succeeded=summary.runs_succeeded,
+            requested=summary.runs_requested,
+        )
+    )
+    if not summary.runs_succeeded:
+        return report
+
+    report.add_line(
+        _(
+            "Respondents selected at least once: %(distinct)s. Selected in every run: %(always)s.",
+            distinct=len(summary.respondent_counts),
+            always=summary.always_selected,
+        )
+    )
+    report.add_table(
+        [_("Category"), _("Value"), _("Min"), _("Max"), _("Mean selected"), _("Lowest"), _("Highest")],
+        [
+            [
+                freq.feature_name,
+                freq.value_name,
+                freq.min,
+                freq.max,
+                round(freq.mean_selected, 2),
+                freq.lowest_selected,
+                freq.highest_selected,
+            ]
+            for freq in summary.value_frequencies
+        ],
+    )
+    ranked = sorted(summary.respondent_counts.items(), key=lambda item: (-item[1], item[0]))
+    report.add_table(
+        [_("Respondent"), _("Times selected"), _("Selection rate")],
+        [[person_key, count, f"{count / summary.runs_succeeded:.0%}"] for person_key, count in ranked],
+    )
+    return report
@@ -1,12 +1,17 @@
 """ABOUTME: Detailed target validation service for inline feedback on the targets page.
 ABOUTME: Runs structured checks and maps errors to specific categories/values for UI annotation."""
 
+import hashlib
+import json
 import uuid
 from collections import defaultdict
-from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from dataclasses import asdict, dataclass, field
+from enum import StrEnum
+from typing import TYPE_CHECKING, Any
 
 import structlog
+from redis import Redis
+from redis.exceptions import RedisError
 from sortition_algorithms import adapters
 from sortition_algorithms.committee_generation.common import setup_committee_generation
 from sortition_algorithms.errors import (
@@ -21,12 +26,11 @@ from sortition_algorithms.features import (
     report_min_max_against_number_to_select_structured,
     report_min_max_error_details_structured,
 )
-from sortition_algorithms.people import (
-    FeatureValueCountCheck,
-    check_people_per_feature_value,
-)
+from sortition_algorithms.people import FeatureValueCountCheck
 
+from opendlp.adapters.selection_data_cache import CachedSelectionData, get_data_version
 from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
+from opendlp.config import RedisCfg
 from opendlp.domain.selection_settings import SelectionSettings
 from opendlp.service_layer.exceptions import AssemblyNotFoundError
 from opendlp.service_layer.permissions import can_manage_assembly, require_assembly_permission
@@ -35,6 +39,9 @@ from opendlp.service_layer.unit_of_work import AbstractUnitOfWork
 if TYPE_CHECKING:
     from sortition_algorithms.people import People
     from sortition_algorithms.settings import Settings
+
+    from opendlp.domain.assembly import Assembly
+    from opendlp.service_layer.target_prescreen import CategoryCapacityIssue, JointCountIssue
 from opendlp.translations import gettext as _
 
 logger = structlog.get_logger(__name__)
@@ -63,6 +70,26 @@ class DetailedCheckResult:
     num_features: int = 0
     num_people: int = 0
 
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "DetailedCheckResult":
+        return cls(
+            success=data["success"],
+            global_errors=list(data["global_errors"]),
+            annotations={
+                category: {value: [TargetAnnotation(**a) for a in items] for value, items in values.items()}
+                for category, values in data["annotations"].items()
+            },
+            category_annotations={
+                category: [TargetAnnotation(**a) for a in items]
+                for category, items in data["category_annotations"].items()
+            },
+            num_features=data["num_features"],
+            num_people=data["num_people"],
+        )
+
 
 def _add_annotation(annotations: AnnotationsDict, category: str, value: str, annotation: TargetAnnotation) -> None:
     if category not in annotations:
@@ -184,6 +211,53 @@ def _annotations_from_people_checks(
         )
 
 
+def _annotations_from_joint_count_issues(
+    issues: "list[JointCountIssue]",
+    annotations: AnnotationsDict,
+) -> None:
+    for issue in issues:
+        if issue.field == "min":
+            message = _(
+                "At most %(count)s respondents with this value can be selected within the maximums "
+                "of category '%(other)s'",
+                count=issue.bound,
+                other=issue.other_feature_name,
+            )
+        else:
+            message = _(
+                "At least %(count)s respondents with this value are needed to fill the panel within "
+                "the maximums of category '%(other)s'",
+                count=issue.bound,
+                other=issue.other_feature_name,
+            )
+        _add_annotation(
+            annotations,
+            issue.feature_name,
+            issue.value_name,
+            TargetAnnotation(level="error", field=issue.field, message=message, suggested_value=issue.bound),
+        )
+
+
+def _annotations_from_capacity_issues(
+    issues: "list[CategoryCapacityIssue]",
+    category_annotations: CategoryAnnotationsDict,
+) -> None:
+    for issue in issues:
+        _add_category_annotation(
+            category_annotations,
+            issue.feature_name,
+            TargetAnnotation(
+                level="error",
+                message=_(
+                    "Only %(count)s respondents can be selected within the max values — "
+                    "fewer than the %(number)s to select",
+                    count=issue.capacity,
+                    number=issue.number_to_select,
+                ),
+            ),
+        )
+
+
 def _annotations_from_infeasible_quotas(
     original_features: FeatureCollection,
     error: InfeasibleQuotasError,
@@ -280,7 +354,7 @@ def check_targets_detailed(
         return result
 
     data_source = OpenDLPDataAdapter(uow, assembly_id)
-    select_data = adapters.SelectionData(data_source)
+    select_data = CachedSelectionData(adapters.SelectionData(data_source), assembly_id)
 
     # Load features without number_to_select check so we always get the FeatureCollection
     # back (check_min_max won't raise). We run the structured checks ourselves below.
@@ -315,14 +389,207 @@ def check_targets_detailed(
 
     result.num_people = people.count
 
-    # Check enough people per feature value
-    people_issues = check_people_per_feature_value(features, people)
-    if people_issues:
+    # Arithmetic checks on respondent counts: enough people per value, and pairwise
+    # joint counts between categories. Takes milliseconds even for large pools.
+    # Imported here so NumPy is only loaded by processes that actually check targets.
+    from opendlp.service_layer.target_prescreen import prescreen_targets  # noqa: PLC0415
+
+    prescreen = prescreen_targets(features, people, number_to_select)
+    if not prescreen.passed:
         result.success = False
-        _annotations_from_people_checks(people_issues, result.annotations)
+        _annotations_from_people_checks(prescreen.value_count_issues, result.annotations)
+        _annotations_from_joint_count_issues(prescreen.joint_count_issues, result.annotations)
+        _annotations_from_capacity_issues(prescreen.capacity_issues, result.category_annotations)
 
-    # Feasibility check (only if number_to_select is set)
-    if number_to_select > 0:
+    # Feasibility check (only if number_to_select is set). Setting up the ILP is slow,
+    # so only do it once every cheaper check has passed.
+    if number_to_select > 0 and result.success:
         _run_feasibility_check(features, people, number_to_select, settings_obj, result)
 
     return result
+
+
+# Background target checks
+#
+# The feasibility check sets up the committee generation ILP, which can take tens
+# of seconds for large pools, so the targets page runs check_targets_detailed in a
+# Celery task. The task's progress and result live in Redis, keyed by the
+# assembly's data version plus the inputs the check depends on, so re-opening
+# the page shows the last result straight away until respondents, targets,
+# number to select or selection settings change.
+
+_CHECK_KEY_PREFIX = "target_check:"
+# Results stay valid for as long as the inputs do; the TTL only stops results
+# for abandoned assemblies hanging around in Redis forever.
+_CHECK_STATE_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+class TargetCheckStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class TargetCheckState:
+    """Progress and (once completed) result of a background detailed target check."""
+
+    task_id: str
+    inputs_key: str
+    status: TargetCheckStatus
+    result: DetailedCheckResult | None = None
+    error_message: str = ""
+
+    @property
+    def has_finished(self) -> bool:
+        return self.status in (TargetCheckStatus.COMPLETED, TargetCheckStatus.FAILED)
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "task_id": self.task_id,
+            "inputs_key": self.inputs_key,
+            "status": self.status.value,
+            "result": self.result.to_dict() if self.result else None,
+            "error_message": self.error_message,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str | bytes) -> "TargetCheckState":
+        data = json.loads(raw)
+        return cls(
+            task_id=data["task_id"],
+            inputs_key=data["inputs_key"],
+            status=TargetCheckStatus(data["status"]),
+            result=DetailedCheckResult.from_dict(data["result"]) if data["result"] else None,
+            error_message=data["error_message"],
+        )
+
+
+def _get_redis() -> Redis:
+    cfg = RedisCfg.from_env()
+    return Redis(host=cfg.host, port=cfg.port, db=cfg.db)
+
+
+def _check_state_key(assembly_id: uuid.UUID) -> str:
+    return f"{_CHECK_KEY_PREFIX}{assembly_id}"
+
+
+def _check_inputs_key(assembly: "Assembly", redis_client: Redis) -> str:
+    """Identify everything a detailed check result depends on."""
+    sel_settings = assembly.selection_settings or SelectionSettings(assembly_id=assembly.id)
+    inputs = [
+        assembly.number_to_select,
+        sel_settings.id_column,
+        sel_settings.columns_to_keep,
+        sel_settings.check_same_address,
+        sel_settings.check_same_address_cols,
+        sel_settings.selection_algorithm,
+    ]
+    digest = hashlib.sha256(json.dumps(inputs).encode("utf-8")).hexdigest()[:16]
+    return f"{get_data_version(assembly.id, redis_client=redis_client)}:{digest}"
+
+
+def _load_check_state(assembly_id: uuid.UUID, redis_client: Redis) -> TargetCheckState | None:
+    raw = redis_client.get(_check_state_key(assembly_id))
+    if not isinstance(raw, str | bytes):
+        return None
+    return TargetCheckState.from_json(raw)
+
+
+def _save_check_state(assembly_id: uuid.UUID, state: TargetCheckState, redis_client: Redis) -> None:
+    redis_client.set(_check_state_key(assembly_id), state.to_json(), ex=_CHECK_STATE_TTL_SECONDS)
+
+
+@require_assembly_permission(can_manage_assembly)
+def start_targets_check(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    redis_client: Redis | None = None,
+) -> TargetCheckState:
+    """Submit a detailed target check to Celery and record it as pending."""
+    assembly = uow.assemblies.get(assembly_id)
+    if not assembly:
+        raise AssemblyNotFoundError(f"Assembly {assembly_id} not found")
+
+    r = redis_client or _get_redis()
+    state = TargetCheckState(
+        task_id=uuid.uuid4().hex,
+        inputs_key=_check_inputs_key(assembly, r),
+        status=TargetCheckStatus.PENDING,
+    )
+    _save_check_state(assembly_id, state, r)
+    from opendlp.entrypoints.celery import tasks  # noqa: PLC0415
+
+    tasks.check_targets.delay(
+        task_id=state.task_id,
+        assembly_id=assembly_id,
+        user_id=user_id,
+        inputs_key=state.inputs_key,
+    )
+    return state
+
+
+@require_assembly_permission(can_manage_assembly)
+def get_targets_check_state(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    redis_client: Redis | None = None,
+) -> TargetCheckState | None:
+    """Return the latest check for the assembly, or None if there is none for its current data.
+
+    Redis being unavailable is treated as "no check yet" so the targets page still renders.
+    """
+    assembly = uow.assemblies.get(assembly_id)
+    if not assembly:
+        raise AssemblyNotFoundError(f"Assembly {assembly_id} not found")
+
+    try:
+        r = redis_client or _get_redis()
+        state = _load_check_state(assembly_id, r)
+        if state is None or state.inputs_key != _check_inputs_key(assembly, r):
+            return None
+    except RedisError as e:
+        logger.warning("Could not read target check state", assembly_id=str(assembly_id), error=str(e))
+        return None
+    return state
+
+
+def run_targets_check(
+    uow: AbstractUnitOfWork,
+    user_id: uuid.UUID,
+    assembly_id: uuid.UUID,
+    task_id: str,
+    inputs_key: str,
+    redis_client: Redis | None = None,
+) -> TargetCheckState:
+    """Run a submitted check and store its outcome. Called from the Celery task.
+
+    The outcome is only stored if no newer check has been submitted in the meantime.
+    """
+    r = redis_client or _get_redis()
+
+    def _save_if_current(state: TargetCheckState) -> None:
+        latest = _load_check_state(assembly_id, r)
+        if latest is None or latest.task_id == task_id:
+            _save_check_state(assembly_id, state, r)
+
+    _save_if_current(TargetCheckState(task_id=task_id, inputs_key=inputs_key, status=TargetCheckStatus.RUNNING))
+    try:
+        result = check_targets_detailed(uow, user_id, assembly_id)
+    except Exception as e:
+        logger.exception("Target check failed", assembly_id=str(assembly_id), error=str(e))
+        state = TargetCheckState(
+            task_id=task_id,
+            inputs_key=inputs_key,
+            status=TargetCheckStatus.FAILED,
+            error_message=_("The target check could not be completed: %(error)s", error=str(e)),
+        )
+    else:
+        state = TargetCheckState(
+            task_id=task_id, inputs_key=inputs_key, status=TargetCheckStatus.COMPLETED, result=result
+        )
+    _save_if_current(state)
+    return state
@@ -0,0 +1,148 @@
+"""ABOUTME: Fast arithmetic pre-screen of targets against respondent counts, vectorised with NumPy
+ABOUTME: Catches obviously infeasible targets before the ILP-based feasibility check is set up"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+from sortition_algorithms.features import FeatureCollection, iterate_feature_collection
+from sortition_algorithms.people import FeatureValueCountCheck, People
+
+
+@dataclass
+class JointCountIssue:
+    """A value whose min or max cannot be met given the respondents and maximums of another category.
+
+    For ``field == "min"``, ``bound`` is the most respondents with the value that can be
+    selected. For ``field == "max"``, it is the fewest that must be selected to fill the panel.
+    """
+
+    feature_name: str
+    value_name: str
+    other_feature_name: str
+    field: str
+    bound: int
+
+
+@dataclass
+class CategoryCapacityIssue:
+    """A category whose values cannot supply ``number_to_select`` people within their maximums."""
+
+    feature_name: str
+    capacity: int
+    number_to_select: int
+
+
+@dataclass
+class PrescreenResult:
+    value_count_issues: list[FeatureValueCountCheck] = field(default_factory=list)
+    joint_count_issues: list[JointCountIssue] = field(default_factory=list)
+    capacity_issues: list[CategoryCapacityIssue] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not (self.value_count_issues or self.joint_count_issues or self.capacity_issues)
+
+
+def _incidence_matrix(features: FeatureCollection, people: People, columns: list[tuple[str, str]]) -> np.ndarray:
+    """Respondents x category-values matrix: 1.0 where the respondent has that value.
+
+    Values are compared case-insensitively, as ``People.count_feature_value`` does.
+    Floats so the joint counts below use BLAS; counts are exact well beyond any pool size.
+    """
+    persons = [person for _key, person in people.items()]
+    matrix = np.zeros((len(persons), len(columns)))
+    column_index = {column: i for i, column in enumerate(columns)}
+    for feature_name, values in features.items():
+        person_values = np.array([person[feature_name].lower() for person in persons], dtype=str)
+        for value_name in values:
+            matrix[:, column_index[(feature_name, value_name)]] = person_values == value_name.lower()
+    return matrix
+
+
+def prescreen_targets(features: FeatureCollection, people: People, number_to_select: int) -> PrescreenResult:
+    """Check targets against marginal and pairwise joint respondent counts.
+
+    Every issue reported here is a proof of infeasibility, so the much slower ILP
+    feasibility check only needs to run when this passes. The checks are:
+
+    - a value has fewer respondents than its min;
+    - a category cannot supply ``number_to_select`` people within its values' maximums;
+    - for each pair of categories A and B, a value ``a`` of A cannot reach its min because
+      the respondents with ``a`` are capped by B's maximums, or must exceed its max because
+      the respondents without ``a`` cannot fill the rest of the panel within B's maximums.
+
+    Only the tightest other category is reported for each value.
+    """
+    result = PrescreenResult()
+    columns_with_minmax = list(iterate_feature_collection(features))
+    if not columns_with_minmax:
+        return result
+
+    feature_names = list(features.keys())
+    columns = [(fname, fvalue) for fname, fvalue, _minmax in columns_with_minmax]
+    mins = np.array([minmax.min for _f, _v, minmax in columns_with_minmax], dtype=float)
+    maxs = np.array([minmax.max for _f, _v, minmax in columns_with_minmax], dtype=float)
+    column_feature = np.array([feature_names.index(fname) for fname, _value in columns])
+    # values x categories: 1.0 where the value belongs to the category
+    membership = (column_feature[:, None] == np.arange(len(feature_names))[None, :]).astype(float)
+    own_category = membership.astype(bool)
+
+    incidence = _incidence_matrix(features, people, columns)
+    marginal = incidence.sum(axis=0)
+    joint = incidence.T @ incidence
+
+    short = marginal < mins
+    for i in np.flatnonzero(short):
+        fname, fvalue = columns[i]
+        result.value_count_issues.append(
+            FeatureValueCountCheck(
+                feature_name=fname, value_name=fvalue, min_required=int(mins[i]), actual_count=int(marginal[i])
+            )
+        )
+
+    # reach[a, B]: the most people with value a that can be selected without breaking B's maximums.
+    reach = np.minimum(joint, maxs[None, :]) @ membership
+    reach[own_category] = np.inf
+    tightest = reach.argmin(axis=1)
+    for i in np.flatnonzero((reach.min(axis=1) < mins) & ~short):
+        fname, fvalue = columns[i]
+        result.joint_count_issues.append(
+            JointCountIssue(
+                feature_name=fname,
+                value_name=fvalue,
+                other_feature_name=feature_names[tightest[i]],
+                field="min",
+                bound=int(reach[i, tightest[i]]),
+            )
+        )
+
+    if number_to_select <= 0:
+        return result
+
+    capacity = np.minimum(marginal, maxs) @ membership
+    for f in np.flatnonzero(capacity < number_to_select):
+        result.capacity_issues.append(
+            CategoryCapacityIssue(
+                feature_name=feature_names[f], capacity=int(capacity[f]), number_to_select=number_to_select
+            )
+        )
+
+    # needed[a, B]: the fewest people with value a the panel needs, because the people
+    # without a can fill at most this many places without breaking B's maximums.
+    without = marginal[None, :] - joint
+    needed = number_to_select - np.minimum(without, maxs[None, :]) @ membership
+    needed[own_category] = -np.inf
+    loosest = needed.argmax(axis=1)
+    for i in np.flatnonzero(needed.max(axis=1) > maxs):
+        fname, fvalue = columns[i]
+        result.joint_count_issues.append(
+            JointCountIssue(
+                feature_name=fname,
+                value_name=fvalue,
+                other_feature_name=feature_names[loosest[i]],
+                field="max",
+                bound=int(needed[i, loosest[i]]),
+            )
+        )
+
+    return result
@@ -6,6 +6,11 @@ from __future__ import annotations
 import abc
 from typing import TYPE_CHECKING, Any, Self
 
+import structlog
+from sqlalchemy.exc import SQLAlchemyError
+
+from opendlp.adapters.blob_store import get_blob_store
+from opendlp.adapters.database import replica_lag_seconds
 from opendlp.adapters.sql_repository import (
     SqlAlchemyAssemblyGSheetRepository,
     SqlAlchemyAssemblyRepository,
@@ -15,6 +20,7 @@ from opendlp.adapters.sql_repository import (
     SqlAlchemyPasswordResetTokenRepository,
     SqlAlchemyRegistrationDocumentRepository,
     SqlAlchemyRegistrationImageRepository,
+    SqlAlchemyRegistrationImageVariantRepository,
     SqlAlchemyRegistrationPageHtmlRepository,
     SqlAlchemyRegistrationPageRepository,
     SqlAlchemyRespondentEmailSendRecordRepository,
@@ -44,6 +50,7 @@ if TYPE_CHECKING:
         PasswordResetTokenRepository,
         RegistrationDocumentRepository,
         RegistrationImageRepository,
+        RegistrationImageVariantRepository,
         RegistrationPageHtmlRepository,
         RegistrationPageRepository,
         RespondentEmailSendRecordRepository,
@@ -59,6 +66,8 @@ if TYPE_CHECKING:
         UserRepository,
     )
 
+logger = structlog.get_logger(__name__)
+
 
 class AbstractUnitOfWork(abc.ABC):
     """Abstract Unit of Work interface."""
@@ -81,10 +90,16 @@ class AbstractUnitOfWork(abc.ABC):
     registration_pages: RegistrationPageRepository
     registration_page_html_sources: RegistrationPageHtmlRepository
     registration_images: RegistrationImageRepository
+    registration_image_variants: RegistrationImageVariantRepository
     registration_documents: RegistrationDocumentRepository
     email_templates: EmailTemplateRepository
     respondent_email_send_records: RespondentEmailSendRecordRepository
 
+    # True for units of work that may be served by a read replica and must not write.
+    read_only = False
+    # True while a read-only unit of work is actually reading from the replica.
+    using_replica = False
+
     def __enter__(self) -> Self:
         return self
 
@@ -196,8 +211,10 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
         self.respondent_field_definitions = SqlAlchemyRespondentFieldDefinitionRepository(self.session)
         self.registration_pages = SqlAlchemyRegistrationPageRepository(self.session)
         self.registration_page_html_sources = SqlAlchemyRegistrationPageHtmlRepository(self.session)
-        self.registration_images = SqlAlchemyRegistrationImageRepository(self.session)
-        self.registration_documents = SqlAlchemyRegistrationDocumentRepository(self.session)
+        blob_store = get_blob_store()
+        self.registration_images = SqlAlchemyRegistrationImageRepository(self.session, blob_store)
+        self.registration_image_variants = SqlAlchemyRegistrationImageVariantRepository(self.session, blob_store)
+        self.registration_documents = SqlAlchemyRegistrationDocumentRepository(self.session, blob_store)
         self.email_templates = SqlAlchemyEmailTemplateRepository(self.session)
         self.respondent_email_send_records = SqlAlchemyRespondentEmailSendRecordRepository(self.session)
 
@@ -254,3 +271,69 @@ class SqlAlchemyUnitOfWork(AbstractUnitOfWork):
         processes (notably Celery workers updating SelectionRunRecord rows).
         """
         self.session.expire_all()
+
+
+class ReadOnlySqlAlchemyUnitOfWork(SqlAlchemyUnitOfWork):
+    """Unit of Work for heavy read-only work (exports, reports, histograms), served by a replica.
+
+    Reads go to the replica when one is configured and it is no more than
+    ``max_lag_seconds`` behind the primary; otherwise, or if the replica cannot
+    be reached, they go to the primary. Paths that must see data written moments
+    ago pass a small tolerance, or 0 to need a fully caught-up replica.
+
+    Writing is an error whichever database serves the reads, so code that works
+    against the primary in development cannot break against a replica in production.
+    """
+
+    read_only = True
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        replica_session_factory: sessionmaker | None = None,
+        max_lag_seconds: float = 30.0,
+    ) -> None:
+        super().__init__(session_factory)
+        self.primary_session_factory = session_factory
+        self.replica_session_factory = replica_session_factory
+        self.max_lag_seconds = max_lag_seconds
+        self.using_replica = False
+
+    def _replica_is_fresh_enough(self, replica_session_factory: sessionmaker) -> bool:
+        try:
+            with replica_session_factory() as session:
+                lag = replica_lag_seconds(session)
+        except SQLAlchemyError as exc:
+            logger.warning("Read replica unavailable, reading from the primary", error=str(exc))
+            return False
+        if lag > self.max_lag_seconds:
+            logger.info(
+                "Read replica lagging, reading from the primary",
+                lag_seconds=round(lag, 1),
+                max_lag_seconds=self.max_lag_seconds,
+            )
+            return False
+        return True
+
+    def __enter__(self) -> Self:
+        replica = self.replica_session_factory
+        if replica is not None and self._replica_is_fresh_enough(replica):
+            self.session_factory, self.using_replica = replica, True
+        else:
+            self.session_factory, self.using_replica = self.primary_session_factory, False
+        return super().__enter__()
+
+    def _check_nothing_to_write(self) -> None:
+        session = self.session
+        if session.new or session.dirty or session.deleted:
+            raise UnitOfWorkError("This UnitOfWork is read-only; use bootstrap.get_flask_uow() to write")
+
+    def commit(self) -> None:
+        self._check_nothing_to_write()
+        self.session.commit()
+
+    def commit_and_reset(self) -> None:
+        self.commit()
+
+    def flush(self) -> None:
+        self._check_nothing_to_write()
@@ -0,0 +1,194 @@
+"""ABOUTME: Fixtures for the benchmark suite: synthetic assemblies of each size in the test PostgreSQL
+ABOUTME: Data is built once per session and shared by every benchmark, which must leave it as they found it"""
+
+import os
+import uuid
+from dataclasses import dataclass
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from opendlp.domain.assembly import Assembly, SelectionRunRecord
+from opendlp.domain.assembly_csv import AssemblyCSV
+from opendlp.domain.selection_settings import SelectionSettings
+from opendlp.domain.targets import target_categories_to_snapshot
+from opendlp.domain.users import User
+from opendlp.domain.value_objects import GlobalRole, SelectionRunStatus, SelectionTaskType
+from opendlp.entrypoints.celery.app import reset_celery_app
+from opendlp.entrypoints.flask_app import create_app
+from opendlp.feature_flags import reload_flags
+from opendlp.service_layer.registration_page_service import (
+    create_registration_page_with_slugs,
+    publish_registration_page,
+    update_registration_page_html,
+)
+from opendlp.service_layer.respondent_service import import_respondents_from_rows
+from opendlp.service_layer.unit_of_work import SqlAlchemyUnitOfWork
+from opendlp.service_layer.user_service import create_user
+from tests.benchmarks.synthetic import (
+    ADDRESS_COLUMNS,
+    HEADERS,
+    ID_COLUMN,
+    number_to_select,
+    synthetic_rows,
+    synthetic_targets,
+)
+from tests.conftest import _delete_all_test_data
+
+#: Respondent counts every size-dependent benchmark runs at. Override with a comma
+#: separated list, e.g. ``BENCHMARK_RESPONDENT_COUNTS=1000`` for a quick run.
+DEFAULT_RESPONDENT_COUNTS = "1000,10000,100000"
+
+ADMIN_PASSWORD = "benchmark-pass-123"  # pragma: allowlist secret
+
+REGISTRATION_FORM_HTML = """
+<form method="post" action="{{ form_action }}">
+    {{ csrf_form_element }}
+    {{ form_errors() }}
+    <label class="govuk-label" for="first_name">First name</label>
+    {{ field_errors('first_name') }}
+    <input class="govuk-input" id="first_name" name="first_name" type="text" value="{{ value('first_name') }}">
+    <label class="govuk-label" for="email">Email</label>
+    {{ field_errors('email') }}
+    <input class="govuk-input" id="email" name="email" type="email" value="{{ value('email') }}">
+    <button type="submit" class="govuk-button">Register</button>
+</form>
+"""
+
+
+def respondent_counts() -> list[int]:
+    return [int(count) for count in os.environ.get("BENCHMARK_RESPONDENT_COUNTS", DEFAULT_RESPONDENT_COUNTS).split(",")]
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc) -> None:
+    if "respondent_count" in metafunc.fixturenames:
+        metafunc.parametrize("respondent_count", respondent_counts(), ids=lambda count: f"{count}-respondents")
+
+
+@dataclass
+class SyntheticAssembly:
+    assembly_id: uuid.UUID
+    respondent_count: int
+    number_to_select: int
+    selection_task_id: uuid.UUID
+    registration_slug: str
+
+
+@pytest.fixture(scope="session")
+def benchmark_session_factory(postgres_engine, _postgres_tables):
+    """A session factory whose data lives for the whole session, unlike ``postgres_session_factory``."""
+    session_factory = sessionmaker(bind=postgres_engine)
+    _delete_all_test_data(session_factory)
+    yield session_factory
+    _delete_all_test_data(session_factory)
+
+
+@pytest.fixture(scope="session")
+def benchmark_admin(benchmark_session_factory) -> User:
+    with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+        admin, _ = create_user(
+            uow=uow,
+            email="benchmark-admin@example.com",
+            password=ADMIN_PASSWORD,
+            global_role=GlobalRole.ADMIN,
+            accept_data_agreement=True,
+            auto_confirm_email=True,
+        )
+        return admin.create_detached_copy()
+
+
+def _build_assembly(session_factory: sessionmaker, admin: User, count: int) -> SyntheticAssembly:
+    panel_size = number_to_select(count)
+    assembly = Assembly(title=f"Benchmark assembly {count}", question="?", number_to_select=panel_size)
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        uow.assemblies.add(assembly)
+        assembly.csv = AssemblyCSV(assembly_id=assembly.id, csv_id_column=ID_COLUMN)
+        assembly.selection_settings = SelectionSettings(
+            assembly_id=assembly.id, id_column=ID_COLUMN, check_same_address_cols=ADDRESS_COLUMNS
+        )
+        for category in synthetic_targets(assembly.id, panel_size):
+            uow.target_categories.add(category)
+
+    rows = synthetic_rows(count)
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        import_respondents_from_rows(uow, admin.id, assembly.id, HEADERS, rows, id_column=ID_COLUMN)
+
+    # A finished run to build the selection report from: the first panel_size
+    # respondents selected, everyone else remaining.
+    task_id = uuid.uuid4()
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        uow.selection_run_records.add(
+            SelectionRunRecord(
+                assembly_id=assembly.id,
+                task_id=task_id,
+                status=SelectionRunStatus.COMPLETED,
+                task_type=SelectionTaskType.SELECT_FROM_DB,
+                user_id=admin.id,
+                selected_ids=[[row[ID_COLUMN] for row in rows[:panel_size]]],
+                remaining_ids=[row[ID_COLUMN] for row in rows[panel_size:]],
+                targets_used=target_categories_to_snapshot(synthetic_targets(assembly.id, panel_size)),
+            )
+        )
+
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        page = create_registration_page_with_slugs(uow, admin.id, assembly.id, name="Registration page")
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        update_registration_page_html(uow, admin.id, page.id, REGISTRATION_FORM_HTML)
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        page = publish_registration_page(uow, admin.id, page.id)
+
+    return SyntheticAssembly(
+        assembly_id=assembly.id,
+        respondent_count=count,
+        number_to_select=panel_size,
+        selection_task_id=task_id,
+        registration_slug=page.url_slug,
+    )
+
+
+@pytest.fixture(scope="session")
+def _synthetic_assemblies(benchmark_session_factory, benchmark_admin) -> dict[int, SyntheticAssembly]:
+    return {}
+
+
+@pytest.fixture
+def synthetic_assembly(
+    respondent_count: int, _synthetic_assemblies, benchmark_session_factory, benchmark_admin
+) -> SyntheticAssembly:
+    """An assembly with ``respondent_count`` respondents, targets, a finished run and a live registration page.
+
+    Built the first time a benchmark asks for that size, then reused.
+    """
+    if respondent_count not in _synthetic_assemblies:
+        _synthetic_assemblies[respondent_count] = _build_assembly(
+            benchmark_session_factory, benchmark_admin, respondent_count
+        )
+    return _synthetic_assemblies[respondent_count]
+
+
+@pytest.fixture(scope="session")
+def benchmark_app(worker_db_url, test_redis_client):
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setenv("DB_URI", worker_db_url)
+        monkeypatch.setenv("REDIS_PORT", "63792")
+        monkeypatch.setenv("REDIS_DB", str(test_redis_client.connection_pool.connection_kwargs["db"]))
+        monkeypatch.setenv("FF_REGISTRATION_PAGE", "true")
+        # Every benchmarked registration comes from the test client's one address.
+        monkeypatch.setenv("REGISTRATION_RATE_LIMIT_PER_IP", "1000000")
+        reload_flags()
+        reset_celery_app()
+        yield create_app("testing_postgres")
+    reload_flags()
+
+
+@pytest.fixture(scope="session")
+def admin_client(benchmark_app, benchmark_admin):
+    client = benchmark_app.test_client()
+    response = client.post("/auth/login", data={"email": benchmark_admin.email, "password": ADMIN_PASSWORD})
+    assert response.status_code == 302, "benchmark admin could not log in"
+    return client
+
+
+@pytest.fixture
+def public_client(benchmark_app):
+    return benchmark_app.test_client()
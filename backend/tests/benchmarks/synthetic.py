@@ -0,0 +1,95 @@
+"""ABOUTME: Deterministic generator of large synthetic assemblies for the benchmark suite
+ABOUTME: Builds respondent rows, CSV text and census-like targets for any number of respondents"""
+
+import csv
+import math
+import random
+import uuid
+from io import StringIO
+
+from opendlp.domain.targets import TargetCategory, TargetValue
+
+ID_COLUMN = "external_id"
+
+# Census-like proportions, so the targets and histograms look like a real assembly's.
+CATEGORY_WEIGHTS: dict[str, dict[str, float]] = {
+    "gender": {"Female": 0.51, "Male": 0.48, "Non-binary": 0.01},
+    "age_band": {"16-29": 0.22, "30-44": 0.25, "45-59": 0.25, "60-74": 0.18, "75+": 0.10},
+    "region": {
+        "North East": 0.04,
+        "North West": 0.11,
+        "Yorkshire": 0.08,
+        "East Midlands": 0.07,
+        "West Midlands": 0.09,
+        "East": 0.09,
+        "London": 0.13,
+        "South East": 0.14,
+        "South West": 0.08,
+        "Wales": 0.05,
+        "Scotland": 0.08,
+        "Northern Ireland": 0.04,
+    },
+    "education": {"No qualifications": 0.18, "GCSE": 0.30, "A-level": 0.17, "Degree": 0.35},
+    "ethnicity": {"White": 0.82, "Asian": 0.09, "Black": 0.04, "Mixed": 0.03, "Other": 0.02},
+}
+ADDRESS_COLUMNS = ["address_line_1", "postcode"]
+HEADERS = [ID_COLUMN, "first_name", "last_name", "email", *ADDRESS_COLUMNS, *CATEGORY_WEIGHTS]
+
+# Roughly one respondent in seven shares an address with the one before, so the
+# same-address check has households to work with.
+_SHARED_ADDRESS_RATE = 0.15
+_FIRST_NAMES = ["Ada", "Ben", "Chloe", "Dev", "Eve", "Femi", "Grace", "Hamza", "Isla", "Jon", "Kiran", "Lena"]
+_LAST_NAMES = ["Smith", "Jones", "Patel", "Williams", "Brown", "Khan", "Taylor", "Davies", "Evans", "Wilson"]
+_STREETS = ["High Street", "Station Road", "Church Lane", "Mill Road", "Park Avenue", "Victoria Road"]
+
+
+def synthetic_rows(count: int, seed: int = 0) -> list[dict[str, str]]:
+    """``count`` respondent rows, identical for the same ``count`` and ``seed``."""
+    rng = random.Random(seed)
+    choices = {name: (list(weights), list(weights.values())) for name, weights in CATEGORY_WEIGHTS.items()}
+    rows: list[dict[str, str]] = []
+    for i in range(count):
+        row = {
+            ID_COLUMN: f"R{i:06d}",
+            "first_name": rng.choice(_FIRST_NAMES),
+            "last_name": rng.choice(_LAST_NAMES),
+            "email": f"respondent{i}@example.com",
+        }
+        if rows and rng.random() < _SHARED_ADDRESS_RATE:
+            row.update({column: rows[-1][column] for column in ADDRESS_COLUMNS})
+        else:
+            row["address_line_1"] = f"{rng.randint(1, 250)} {rng.choice(_STREETS)}"
+            row["postcode"] = f"AB{rng.randint(1, 99)} {rng.randint(1, 9)}CD"
+        for name, (values, weights) in choices.items():
+            row[name] = rng.choices(values, weights)[0]
+        rows.append(row)
+    return rows
+
+
+def synthetic_csv(count: int, seed: int = 0) -> str:
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=HEADERS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(synthetic_rows(count, seed))
+    return buffer.getvalue()
+
+
+def number_to_select(count: int) -> int:
+    """A panel size in proportion to the pool, within the usual 30-150 range."""
+    return max(30, min(150, count // 200))
+
+
+def synthetic_targets(assembly_id: uuid.UUID, panel_size: int) -> list[TargetCategory]:
+    """Targets around each value's share of the panel, with some slack either side."""
+    categories = []
+    for sort_order, (name, weights) in enumerate(CATEGORY_WEIGHTS.items()):
+        values = [
+            TargetValue(
+                value=value,
+                min=max(0, math.floor(share * panel_size) - 2),
+                max=math.ceil(share * panel_size) + 2,
+            )
+            for value, share in weights.items()
+        ]
+        categories.append(TargetCategory(assembly_id=assembly_id, name=name, values=values, sort_order=sort_order))
+    return categories
@@ -0,0 +1,53 @@
+"""ABOUTME: Benchmarks of the hot pages through the Flask test client against synthetic assemblies
+ABOUTME: Targets page histograms, the respondents list and the public registration form GET and POST"""
+
+import itertools
+
+import pytest
+
+from opendlp.adapters import orm
+
+_registrant_numbers = itertools.count()
+
+
+@pytest.fixture
+def remove_registrations(benchmark_session_factory):
+    """Delete the benchmark's registrations, so the shared assemblies keep their size."""
+    yield
+    session = benchmark_session_factory()
+    try:
+        session.execute(orm.respondents.delete().where(orm.respondents.c.email.like("registrant-%@example.com")))
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_targets_page(benchmark, admin_client, synthetic_assembly):
+    url = f"/backoffice/assembly/{synthetic_assembly.assembly_id}/targets"
+
+    response = benchmark(admin_client.get, url)
+    assert response.status_code == 200
+
+
+def test_respondents_list(benchmark, admin_client, synthetic_assembly):
+    url = f"/backoffice/assembly/{synthetic_assembly.assembly_id}/respondents"
+
+    response = benchmark(admin_client.get, url)
+    assert response.status_code == 200
+
+
+def test_registration_form_get(benchmark, public_client, synthetic_assembly):
+    response = benchmark(public_client.get, f"/register/{synthetic_assembly.registration_slug}")
+    assert response.status_code == 200
+
+
+def test_registration_form_post(benchmark, public_client, synthetic_assembly, remove_registrations):
+    url = f"/register/{synthetic_assembly.registration_slug}"
+
+    def register():
+        number = next(_registrant_numbers)
+        return public_client.post(url, data={"first_name": "Ada", "email": f"registrant-{number}@example.com"})
+
+    response = benchmark(register)
+    assert response.status_code == 302
+    assert "/thank-you" in response.location
@@ -0,0 +1,124 @@
+"""ABOUTME: Benchmarks of the service-layer hot paths against synthetic assemblies in PostgreSQL
+ABOUTME: CSV import, respondent export, selection data loading, target checks, the selection report and task payloads"""
+
+from kombu.serialization import dumps
+from sortition_algorithms import RunReport, adapters
+
+from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
+from opendlp.adapters.tabular_export import CsvExportTarget
+from opendlp.adapters.url_generator import FlaskURLGenerator
+from opendlp.domain.assembly import Assembly
+from opendlp.entrypoints.celery.tasks import settings_to_payload
+from opendlp.service_layer.respondent_export_service import export_respondents
+from opendlp.service_layer.respondent_service import import_respondents_from_csv
+from opendlp.service_layer.selection_report import build_selection_report
+from opendlp.service_layer.target_checking import check_targets_detailed
+from opendlp.service_layer.unit_of_work import SqlAlchemyUnitOfWork
+from tests.benchmarks.synthetic import ID_COLUMN, synthetic_csv
+
+# Benchmarks that write data run a fixed few rounds rather than letting
+# pytest-benchmark calibrate, which would add tens of thousands of rows per round.
+WRITE_ROUNDS = 3
+
+
+def test_csv_import(benchmark, benchmark_session_factory, benchmark_admin, respondent_count):
+    csv_content = synthetic_csv(respondent_count, seed=1)
+
+    def fresh_assembly():
+        assembly = Assembly(title=f"Import benchmark {respondent_count}", question="?")
+        with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+            uow.assemblies.add(assembly)
+        return (assembly.id,), {}
+
+    def import_csv(assembly_id):
+        with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+            return import_respondents_from_csv(
+                uow, benchmark_admin.id, assembly_id, csv_content, id_column=ID_COLUMN, filename="benchmark.csv"
+            )
+
+    respondents, errors, _ = benchmark.pedantic(import_csv, setup=fresh_assembly, rounds=WRITE_ROUNDS)
+    assert not errors
+    assert len(respondents) == respondent_count
+
+
+def test_respondent_export(benchmark, benchmark_session_factory, benchmark_admin, synthetic_assembly):
+    def export() -> str:
+        target = CsvExportTarget()
+        with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+            export_respondents(
+                uow, benchmark_admin.id, synthetic_assembly.assembly_id, status_filter=None, target=target
+            )
+        return target.getvalue()
+
+    csv_text = benchmark(export)
+    assert csv_text.count("\n") == synthetic_assembly.respondent_count + 1
+
+
+def test_selection_data_load(benchmark, benchmark_session_factory, synthetic_assembly):
+    def load():
+        with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+            assembly = uow.assemblies.get(synthetic_assembly.assembly_id)
+            select_data = adapters.SelectionData(OpenDLPDataAdapter(uow, synthetic_assembly.assembly_id))
+            features, _ = select_data.load_features(synthetic_assembly.number_to_select)
+            people, _ = select_data.load_people(assembly.selection_settings.to_settings(), features)
+        return people
+
+    people = benchmark(load)
+    assert people.count == synthetic_assembly.respondent_count
+
+
+def test_check_targets_detailed(benchmark, benchmark_session_factory, benchmark_admin, synthetic_assembly):
+    def check():
+        with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+            return check_targets_detailed(uow, benchmark_admin.id, synthetic_assembly.assembly_id)
+
+    result = benchmark(check)
+    assert result.success, result.global_errors
+
+
+def test_build_selection_report(benchmark, benchmark_app, benchmark_session_factory, synthetic_assembly):
+    url_generator = FlaskURLGenerator(benchmark_app)
+
+    def build():
+        with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+            return build_selection_report(
+                uow, synthetic_assembly.assembly_id, synthetic_assembly.selection_task_id, url_generator
+            )
+
+    report = benchmark(build)
+    assert report.categories
+
+
+def test_stability_sample_payload(benchmark, benchmark_session_factory, synthetic_assembly):
+    """Size of one stability sample's message and one DB selection's stored result, pickled vs JSON.
+
+    The pickled sizes are what these tasks sent and stored when they carried the loaded
+    respondents and returned the report; the JSON ones are what they send and store now.
+    """
+    with SqlAlchemyUnitOfWork(benchmark_session_factory) as uow:
+        assembly = uow.assemblies.get(synthetic_assembly.assembly_id)
+        settings_obj = assembly.selection_settings.to_settings()
+        select_data = adapters.SelectionData(OpenDLPDataAdapter(uow, synthetic_assembly.assembly_id))
+        features, features_report = select_data.load_features(synthetic_assembly.number_to_select)
+        people, people_report = select_data.load_people(settings_obj, features)
+    report = RunReport()
+    report.add_report(features_report)
+    report.add_report(people_report)
+    panel = frozenset(list(people)[: synthetic_assembly.number_to_select])
+    ids = {"task_id": synthetic_assembly.selection_task_id, "assembly_id": synthetic_assembly.assembly_id}
+
+    def encode() -> bytes:
+        return dumps({**ids, "settings": settings_to_payload(settings_obj), "number_people_wanted": 1}, "json")[2]
+
+    json_message = benchmark(encode)
+
+    pickled_message = dumps(
+        {**ids, "features": features, "people": people, "settings": settings_obj, "number_people_wanted": 1},
+        "pickle",
+    )[2]
+    benchmark.extra_info["message_bytes"] = {"pickle": len(pickled_message), "json": len(json_message)}
+    benchmark.extra_info["result_bytes"] = {
+        "pickle": len(dumps((True, [panel], report), "pickle")[2]),
+        "json": len(dumps(True, "json")[2]),
+    }
+    assert len(json_message) < len(pickled_message)
@@ -0,0 +1,49 @@
+"""ABOUTME: Benchmarks of web process cold start: importing the app and building it, for each web surface
+ABOUTME: Each round is a fresh interpreter run with -X importtime; the slowest imports are saved with the results"""
+
+import subprocess
+import sys
+
+import pytest
+
+# Each round starts a new interpreter, so a few rounds are plenty.
+STARTUP_ROUNDS = 5
+SLOWEST_IMPORTS_KEPT = 25
+
+_BOOT_SCRIPT = """
+import sys
+from opendlp.entrypoints.flask_app import create_app
+create_app("testing", surface=sys.argv[1])
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int]]:
+    """``(module, cumulative microseconds)`` for each module in ``-X importtime`` output, slowest first."""
+    timings: list[tuple[str, int]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not cumulative_us.strip().isdigit():
+            continue  # the header line
+        timings.append((name.strip(), int(cumulative_us)))
+    return sorted(timings, key=lambda timing: timing[1], reverse=True)
+
+
+@pytest.mark.parametrize("surface", ["public", "all"])
+def test_cold_start(benchmark, surface):
+    def boot() -> str:
+        result = subprocess.run(  # noqa: S603
+            [sys.executable, "-X", "importtime", "-c", _BOOT_SCRIPT, surface],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stderr
+
+    stderr = benchmark.pedantic(boot, rounds=STARTUP_ROUNDS)
+
+    timings = parse_importtime(stderr)
+    benchmark.extra_info["module_count"] = len(timings)
+    benchmark.extra_info["slowest_imports_us"] = dict(timings[:SLOWEST_IMPORTS_KEPT])
+    assert any(name == "opendlp.entrypoints.flask_app" for name, _us in timings)
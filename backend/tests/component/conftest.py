@@ -9,8 +9,8 @@ from flask.testing import FlaskClient
 
 from opendlp.domain.users import User
 from opendlp.domain.value_objects import GlobalRole
+from opendlp.entrypoints.celery import app as celery_app_module
 from opendlp.entrypoints.flask_app import create_app
-from opendlp.service_layer import sortition
 from opendlp.service_layer.assembly_service import create_assembly
 from opendlp.service_layer.user_service import create_user
 from tests.fakes import FakeStore, FakeUnitOfWork
@@ -46,7 +46,7 @@ def stub_celery_async_result(monkeypatch):
     replaced with an inert stub. This keeps the progress/status routes driven
     by the seeded SelectionRunRecord and avoids dangling AsyncResult objects.
     """
-    monkeypatch.setattr(sortition.app.app, "AsyncResult", lambda *args, **kwargs: _NoCeleryResult())
+    monkeypatch.setattr(celery_app_module.app, "AsyncResult", lambda *args, **kwargs: _NoCeleryResult())
 
 
 @pytest.fixture(autouse=True)
@@ -66,6 +66,49 @@ def _mock_registration_rate_limit_redis(monkeypatch: pytest.MonkeyPatch) -> None
     )
 
 
+class _InMemoryRedis:
+    """Just enough of the Redis client for state stored as plain keys (get/set with nx/ex, delete)."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: str | bytes, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+    def delete(self, key: str) -> int:
+        return 1 if self.store.pop(key, None) is not None else 0
+
+
+@pytest.fixture(autouse=True)
+def target_check_redis(monkeypatch: pytest.MonkeyPatch) -> _InMemoryRedis:
+    """Keep background target check state in memory, as component tests have no Redis."""
+    fake = _InMemoryRedis()
+    monkeypatch.setattr("opendlp.service_layer.target_checking._get_redis", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def respondent_export_redis(monkeypatch: pytest.MonkeyPatch) -> _InMemoryRedis:
+    """Keep background Google Sheets export state in memory, as component tests have no Redis."""
+    fake = _InMemoryRedis()
+    monkeypatch.setattr("opendlp.service_layer.respondent_export_service._get_redis", lambda: fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def csv_upload_redis(monkeypatch: pytest.MonkeyPatch) -> _InMemoryRedis:
+    """Keep CSV uploads awaiting diff confirmation in memory, as component tests have no Redis."""
+    fake = _InMemoryRedis()
+    monkeypatch.setattr("opendlp.service_layer.csv_upload_stash._get_redis", lambda: fake)
+    return fake
+
+
 @pytest.fixture
 def fake_store():
     """A single in-memory store shared by every UnitOfWork in a test."""
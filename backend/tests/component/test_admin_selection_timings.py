@@ -0,0 +1,51 @@
+# ABOUTME: Component tests for the admin selection timings page over a FakeUnitOfWork
+# ABOUTME: Seeds timed run records and checks the per-assembly summary renders for admins only
+
+import uuid
+
+from flask.testing import FlaskClient
+
+from opendlp.domain.assembly import SelectionRunRecord
+from opendlp.domain.value_objects import SelectionRunStatus, SelectionTaskType
+from tests.fakes import FakeUnitOfWork
+
+
+def _add_timed_run(fake_store, assembly_id: uuid.UUID, pool_size: int, solver_seconds: float) -> None:
+    with FakeUnitOfWork(store=fake_store) as uow:
+        record = SelectionRunRecord(
+            assembly_id=assembly_id,
+            task_id=uuid.uuid4(),
+            status=SelectionRunStatus.COMPLETED,
+            task_type=SelectionTaskType.SELECT_FROM_DB,
+            pool_size=pool_size,
+            category_count=5,
+            selection_algorithm="maximin",
+        )
+        record.add_phase_timing("select", solver_seconds, solver_seconds)
+        uow.selection_run_records.add(record)
+        uow.commit()
+
+
+class TestSelectionTimingsPage:
+    def test_admin_sees_summary(self, logged_in_admin: FlaskClient, fake_store, existing_assembly) -> None:
+        _add_timed_run(fake_store, existing_assembly.id, 1200, 3.0)
+        _add_timed_run(fake_store, existing_assembly.id, 4800, 9.0)
+
+        response = logged_in_admin.get("/admin/selection-timings")
+
+        assert response.status_code == 200
+        html = response.data.decode()
+        assert "Existing Assembly" in html
+        assert "1200–4800" in html
+        assert "6.0s" in html
+        assert "9.0s" in html
+
+    def test_empty_state(self, logged_in_admin: FlaskClient) -> None:
+        response = logged_in_admin.get("/admin/selection-timings")
+
+        assert response.status_code == 200
+        assert b"No completed selections have recorded timings yet." in response.data
+
+    def test_not_accessible_to_regular_user(self, logged_in_user: FlaskClient) -> None:
+        response = logged_in_user.get("/admin/selection-timings")
+        assert response.status_code == 403
@@ -71,6 +71,26 @@ class TestBackofficeUploadRespondents:
         with FakeUnitOfWork(store=fake_store) as uow:
             assert uow.respondents.count_by_assembly_id(existing_assembly.id) == 0
 
+    def test_re_upload_with_invalid_id_column_is_rejected_before_the_diff_page(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, csv_upload_redis
+    ) -> None:
+        """The header row is checked first, so a bad re-upload is never stashed for confirmation."""
+        _upload(logged_in_admin, existing_assembly.id, "external_id,first_name\nR001,Alice\n")
+
+        response = _upload(
+            logged_in_admin,
+            existing_assembly.id,
+            "external_id,first_name,postcode\nR002,Bob,SW1\n",
+            id_column="nonexistent_column",
+        )
+
+        assert response.status_code == 302
+        assert "confirm-diff" not in response.location
+        assert csv_upload_redis.store == {}
+        with logged_in_admin.session_transaction() as session:
+            messages = [msg[1] for msg in session.get("_flashes", [])]
+        assert any("must have 'nonexistent_column' column" in m for m in messages)
+
     def test_upload_shows_success_message(self, logged_in_admin: FlaskClient, existing_assembly: Assembly) -> None:
         """A successful upload flashes a success message."""
         _upload(logged_in_admin, existing_assembly.id, "id,name\n1,Test User")
@@ -184,6 +204,30 @@ class TestUploadDiffConfirmation:
         assert response.status_code == 302
         assert "confirm-diff" not in response.location
 
+    def test_added_column_is_stashed_compressed_and_imported_on_confirm(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, csv_upload_redis
+    ) -> None:
+        """A re-upload with a new column waits on the diff page, then imports the stashed rows."""
+        _upload(logged_in_admin, existing_assembly.id, "external_id,first_name\nR001,Alice\n")
+        response = _upload(
+            logged_in_admin, existing_assembly.id, "external_id,first_name,postcode\nR002,Bob,SW1\nR003,Cy,\n"
+        )
+        assert response.status_code == 303
+        assert "confirm-diff" in response.location
+        (stashed,) = csv_upload_redis.store.values()
+        assert b"R002" not in stashed  # rows are stored compressed
+
+        page = logged_in_admin.get(response.location)
+        assert page.status_code == 200
+        assert b"postcode" in page.data
+
+        logged_in_admin.post(response.location, data={"action": "confirm"})
+
+        assert csv_upload_redis.store == {}
+        with FakeUnitOfWork(store=fake_store) as uow:
+            respondents = uow.respondents.get_by_assembly_id(existing_assembly.id)
+            assert {r.external_id: r.attributes.get("postcode") for r in respondents} == {"R002": "SW1", "R003": ""}
+
 
 class TestBackofficeViewRespondentsPage:
     """The respondents list page render variants."""
@@ -229,6 +229,48 @@ class TestCsvSelectionRun:
         assert "login" in response.location
 
 
+class TestCsvStabilityAnalysis:
+    """Tests for the CSV stability analysis endpoint, dispatching through the real service."""
+
+    def test_start_stability_analysis_creates_run(self, logged_in_admin, assembly_with_csv_config, fake_store):
+        assembly = assembly_with_csv_config
+
+        with patch("opendlp.entrypoints.celery.tasks.run_stability_analysis_from_db.delay") as mock_delay:
+            mock_delay.return_value.id = "celery-task-id"
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{assembly.id}/selection/db/stability", data={"num_runs": "5"}
+            )
+
+        assert response.status_code == 302
+        assert "current_selection=" in response.location
+        assert mock_delay.call_args.kwargs["num_runs"] == 5
+        task_id = mock_delay.call_args.kwargs["task_id"]
+        with FakeUnitOfWork(store=fake_store) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record.task_type == SelectionTaskType.STABILITY_ANALYSIS_FROM_DB
+            assert record.celery_task_id == "celery-task-id"
+
+    def test_start_stability_analysis_rejects_too_many_runs(self, logged_in_admin, assembly_with_csv_config):
+        assembly = assembly_with_csv_config
+
+        with patch("opendlp.entrypoints.celery.tasks.run_stability_analysis_from_db.delay") as mock_delay:
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{assembly.id}/selection/db/stability",
+                data={"num_runs": "1000"},
+                follow_redirects=True,
+            )
+
+        assert response.status_code == 200
+        assert b"Could not start stability analysis" in response.data
+        mock_delay.assert_not_called()
+
+    def test_start_stability_analysis_requires_auth(self, client, assembly_with_csv_config):
+        response = client.post(f"/backoffice/assembly/{assembly_with_csv_config.id}/selection/db/stability")
+
+        assert response.status_code == 302
+        assert "login" in response.location
+
+
 class TestCsvSelectionProgressModal:
     """Tests for the CSV selection progress modal endpoint."""
 
@@ -270,6 +312,36 @@ class TestCsvSelectionProgressModal:
         assert response.status_code == 200
         assert b"hx-get" not in response.data
 
+    def test_progress_modal_shows_phase_timings_when_completed(
+        self, logged_in_admin, assembly_with_csv_config, fake_store
+    ):
+        assembly = assembly_with_csv_config
+        run_id = uuid.uuid4()
+        _add_run_record(
+            fake_store,
+            assembly_id=assembly.id,
+            task_id=run_id,
+            status=SelectionRunStatus.COMPLETED,
+            task_type=SelectionTaskType.SELECT_FROM_DB,
+            completed_at=datetime.now(UTC),
+            phase_timings={
+                "load_people": {"wall_seconds": 1.5, "cpu_seconds": 1.25},
+                "select": {"wall_seconds": 12.0, "cpu_seconds": 40.5},
+            },
+            pool_size=2500,
+            category_count=3,
+            selection_algorithm="maximin",
+        )
+
+        response = logged_in_admin.get(f"/backoffice/assembly/{assembly.id}/selection/db/modal-progress/{run_id}")
+
+        assert response.status_code == 200
+        html = response.data.decode()
+        assert "13.5s" in html
+        assert "Load people" in html
+        assert "40.50s" in html
+        assert "2500 people, 3 categories, maximin algorithm" in html
+
     def test_progress_modal_returns_404_when_not_found(self, logged_in_admin, assembly_with_csv_config):
         """Progress modal returns 404 for non-existent task."""
         assembly = assembly_with_csv_config
@@ -0,0 +1,68 @@
+# ABOUTME: Component tests for the token-protected Prometheus /metrics endpoint
+# ABOUTME: Metrics are kept in an in-memory Redis stand-in; requests and registrations are counted into it
+
+import pytest
+from flask.testing import FlaskClient
+
+from tests.fakes import FakeMetricsRedis
+
+TOKEN = "scrape-me"
+
+
+@pytest.fixture
+def metrics_redis(monkeypatch: pytest.MonkeyPatch) -> FakeMetricsRedis:
+    fake = FakeMetricsRedis()
+    monkeypatch.setattr("opendlp.adapters.metrics._get_redis", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch: pytest.MonkeyPatch, metrics_redis) -> None:
+    monkeypatch.setenv("METRICS_TOKEN", TOKEN)
+
+
+def _scrape(client: FlaskClient, token: str = TOKEN):
+    return client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+
+
+class TestMetricsEndpoint:
+    def test_not_found_without_token_configured(self, client: FlaskClient, metrics_redis) -> None:
+        assert _scrape(client).status_code == 404
+
+    def test_rejects_wrong_token(self, metrics_enabled, client: FlaskClient) -> None:
+        response = _scrape(client, token="wrong")
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+
+    def test_rejects_missing_token(self, metrics_enabled, client: FlaskClient) -> None:
+        assert client.get("/metrics").status_code == 401
+
+    def test_serves_prometheus_text(self, metrics_enabled, client: FlaskClient) -> None:
+        response = _scrape(client)
+
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+        text = response.get_data(as_text=True)
+        assert 'opendlp_celery_queue_length{queue="celery"} 0' in text
+        assert "opendlp_metrics_redis_up 1" in text
+
+    def test_records_request_latency_and_status(self, metrics_enabled, client: FlaskClient) -> None:
+        client.get("/auth/login")
+
+        text = _scrape(client).get_data(as_text=True)
+
+        assert 'opendlp_http_requests_total{endpoint="auth.login",method="GET",status="200"} 1' in text
+        assert 'opendlp_http_request_duration_seconds_count{endpoint="auth.login",method="GET"} 1' in text
+
+    def test_unmatched_urls_share_a_label(self, metrics_enabled, client: FlaskClient) -> None:
+        client.get("/no-such-page")
+        client.get("/another-missing-page")
+
+        text = _scrape(client).get_data(as_text=True)
+
+        assert 'opendlp_http_requests_total{endpoint="unmatched",method="GET",status="404"} 2' in text
+
+    def test_nothing_recorded_when_disabled(self, client: FlaskClient, metrics_redis) -> None:
+        client.get("/auth/login")
+
+        assert metrics_redis.hashes == {}
@@ -0,0 +1,77 @@
+# ABOUTME: Component tests for opt-in request profiling and the admin profile download
+# ABOUTME: Profiles are kept in an in-memory Redis stand-in; only listed admins get profiled
+
+from typing import Any
+
+import pytest
+from flask.testing import FlaskClient
+
+
+class _ProfileRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> bool:
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+    def pipeline(self, transaction: bool = True) -> "_ProfileRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def profile_redis(monkeypatch: pytest.MonkeyPatch) -> _ProfileRedis:
+    fake = _ProfileRedis()
+    monkeypatch.setattr("opendlp.adapters.profiling._get_redis", lambda: fake)
+    return fake
+
+
+@pytest.fixture
+def profiling_admin(monkeypatch: pytest.MonkeyPatch, admin_user) -> None:
+    monkeypatch.setenv("PROFILING_ADMIN_EMAILS", admin_user.email)
+
+
+class TestRequestProfiling:
+    def test_listed_admin_gets_profile_url(self, logged_in_admin: FlaskClient, profiling_admin) -> None:
+        response = logged_in_admin.get("/admin/?_profile=1")
+
+        assert response.status_code == 200
+        profile_url = response.headers["X-OpenDLP-Profile-URL"]
+        assert profile_url.startswith("/admin/profiles/")
+
+        download = logged_in_admin.get(profile_url)
+        assert download.status_code == 200
+        assert download.mimetype == "application/octet-stream"
+        assert "attachment" in download.headers["Content-Disposition"]
+
+    def test_header_also_asks_for_profile(self, logged_in_admin: FlaskClient, profiling_admin) -> None:
+        response = logged_in_admin.get("/admin/", headers={"X-OpenDLP-Profile": "1"})
+        assert "X-OpenDLP-Profile-URL" in response.headers
+
+    def test_unlisted_admin_is_not_profiled(self, logged_in_admin: FlaskClient, profile_redis) -> None:
+        response = logged_in_admin.get("/admin/?_profile=1")
+
+        assert response.status_code == 200
+        assert "X-OpenDLP-Profile-URL" not in response.headers
+        assert profile_redis.store == {}
+
+    def test_regular_user_is_not_profiled(self, logged_in_user: FlaskClient, monkeypatch, regular_user) -> None:
+        monkeypatch.setenv("PROFILING_ADMIN_EMAILS", regular_user.email)
+        response = logged_in_user.get("/?_profile=1")
+        assert "X-OpenDLP-Profile-URL" not in response.headers
+
+
+class TestProfileDownload:
+    def test_missing_profile_is_404(self, logged_in_admin: FlaskClient, profiling_admin) -> None:
+        response = logged_in_admin.get("/admin/profiles/00000000-0000-0000-0000-000000000000.pstats")
+        assert response.status_code == 404
+
+    def test_unlisted_admin_cannot_download(self, logged_in_admin: FlaskClient) -> None:
+        response = logged_in_admin.get("/admin/profiles/00000000-0000-0000-0000-000000000000.pstats")
+        assert response.status_code == 403
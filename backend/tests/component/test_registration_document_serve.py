@@ -16,7 +16,7 @@ from opendlp.service_layer.registration_page_service import (
     publish_registration_page,
     update_registration_page_html,
 )
-from tests.fakes import FakeStore, FakeUnitOfWork
+from tests.fakes import FakeRegistrationDocumentRepository, FakeStore, FakeUnitOfWork
 
 
 def _page_id(uow, assembly_id):  # type: ignore[no-untyped-def]
@@ -128,6 +128,44 @@ class TestServeRegistrationDocument:
         )
         assert response.status_code == 304
 
+    def test_revalidation_never_reads_the_bytes(
+        self, client: FlaskClient, fake_store, admin_user: User, monkeypatch
+    ) -> None:
+        url_slug, document = _seed_page_with_document(fake_store, admin_user)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("the document bytes were read for a 304")
+
+        monkeypatch.setattr(FakeRegistrationDocumentRepository, "iter_data", fail)
+        monkeypatch.setattr(FakeRegistrationDocumentRepository, "get_by_assembly_and_sha", fail)
+
+        response = client.get(
+            f"/register/{url_slug}/documents/{document.sha256}.pdf",
+            headers={"If-None-Match": f'"{document.sha256}"'},
+        )
+        assert response.status_code == 304
+
+    def test_streams_the_document(self, client: FlaskClient, fake_store, admin_user: User) -> None:
+        url_slug, document = _seed_page_with_document(fake_store, admin_user)
+
+        response = client.get(f"/register/{url_slug}/documents/{document.sha256}.pdf")
+
+        assert response.is_streamed
+        assert response.content_length == document.byte_size
+        assert response.data == document.data
+
+    def test_non_ascii_filename_gets_an_rfc_5987_name(self, client: FlaskClient, fake_store, admin_user: User) -> None:
+        url_slug, document = _seed_page_with_document(fake_store, admin_user)
+        with FakeUnitOfWork(store=fake_store) as uow:
+            stored = uow.registration_documents.get(document.id)
+            stored.original_filename = "información.pdf"
+
+        response = client.get(f"/register/{url_slug}/documents/{document.sha256}.pdf")
+
+        disposition = response.headers["Content-Disposition"]
+        assert "filename=informacion.pdf" in disposition
+        assert "filename*=UTF-8''informaci%C3%B3n.pdf" in disposition
+
     def test_404_when_feature_disabled(self, client: FlaskClient, fake_store, admin_user: User, monkeypatch) -> None:
         url_slug, document = _seed_page_with_document(fake_store, admin_user)
         monkeypatch.setenv("FF_REGISTRATION_PAGE", "false")
@@ -1,5 +1,5 @@
 # ABOUTME: Component tests for serving registration images from the repository
-# ABOUTME: Seeds a page + image in a FakeStore then GETs the public asset route — no PostgreSQL
+# ABOUTME: Seeds a page + image (and its variants) in a FakeStore then GETs the public asset route — no PostgreSQL
 
 from io import BytesIO
 
@@ -7,11 +7,15 @@ import pytest
 from flask.testing import FlaskClient
 from PIL import Image
 
+from opendlp.adapters.blob_store import IMAGES, FilesystemBlobStore
 from opendlp.domain.registration_image import RegistrationImage
 from opendlp.domain.users import User
 from opendlp.feature_flags import reload_flags
 from opendlp.service_layer.assembly_service import create_assembly
-from opendlp.service_layer.registration_image_service import add_registration_image
+from opendlp.service_layer.registration_image_service import (
+    add_registration_image,
+    generate_registration_image_variants,
+)
 from opendlp.service_layer.registration_page_service import (
     close_registration_page,
     create_registration_page_with_slugs,
@@ -19,7 +23,7 @@ from opendlp.service_layer.registration_page_service import (
     publish_registration_page,
     update_registration_page_html,
 )
-from tests.fakes import FakeStore, FakeUnitOfWork
+from tests.fakes import FakeRegistrationImageRepository, FakeStore, FakeUnitOfWork
 
 
 def _page_id(uow, assembly_id):  # type: ignore[no-untyped-def]
@@ -44,7 +48,15 @@ def _png() -> bytes:
     return buffer.getvalue()
 
 
-def _seed_page_with_image(store: FakeStore, admin: User, *, status: str = "published") -> tuple[str, RegistrationImage]:
+def _wide_png() -> bytes:
+    buffer = BytesIO()
+    Image.linear_gradient("L").resize((800, 400)).convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _seed_page_with_image(
+    store: FakeStore, admin: User, *, status: str = "published", raw: bytes | None = None
+) -> tuple[str, RegistrationImage]:
     with FakeUnitOfWork(store=store) as uow:
         assembly = create_assembly(
             uow=uow,
@@ -69,7 +81,7 @@ def _seed_page_with_image(store: FakeStore, admin: User, *, status: str = "publi
             close_registration_page(uow, admin.id, _page_id(uow, assembly_id))
 
     with FakeUnitOfWork(store=store) as uow:
-        image = add_registration_image(uow, admin.id, assembly_id, _png())
+        image = add_registration_image(uow, admin.id, assembly_id, raw or _png())
 
     return url_slug, image
 
@@ -118,6 +130,95 @@ class TestServeRegistrationImage:
         )
         assert response.status_code == 304
 
+    def test_revalidation_never_reads_the_bytes(
+        self, client: FlaskClient, fake_store, admin_user: User, monkeypatch
+    ) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("the image bytes were read for a 304")
+
+        monkeypatch.setattr(FakeRegistrationImageRepository, "iter_data", fail)
+        monkeypatch.setattr(FakeRegistrationImageRepository, "get_by_assembly_and_sha", fail)
+
+        response = client.get(
+            f"/register/{url_slug}/assets/{image.sha256}.png",
+            headers={"If-None-Match": f'"{image.sha256}"'},
+        )
+        assert response.status_code == 304
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_streams_the_bytes_in_chunks(self, client: FlaskClient, fake_store, admin_user: User, monkeypatch) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user)
+        offsets: list[int] = []
+        original_iter_data = FakeRegistrationImageRepository.iter_data
+
+        def recording_iter_data(repo, item_id, chunk_size=16, offset=0):
+            offsets.append(offset)
+            return original_iter_data(repo, item_id, chunk_size=chunk_size, offset=offset)
+
+        monkeypatch.setattr(FakeRegistrationImageRepository, "iter_data", recording_iter_data)
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png")
+
+        assert response.is_streamed
+        assert response.data == image.data
+        assert response.content_length == image.byte_size
+        # each chunk is read by a fresh call, in a unit of work of its own
+        assert offsets == list(range(0, image.byte_size, 16))
+
+    def test_streams_blob_store_bytes_without_the_database(
+        self, client: FlaskClient, fake_store, admin_user: User, monkeypatch, tmp_path
+    ) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user)
+        with FakeUnitOfWork(store=fake_store) as uow:
+            stored = uow.registration_images.get(image.id)
+            assert stored is not None and stored.data is not None
+            original = stored.data
+            FilesystemBlobStore(tmp_path).put(IMAGES, image.sha256, original)
+            stored.data = None  # as the SQL repository leaves it when a blob store is configured
+        monkeypatch.setenv("BLOB_STORE", "filesystem")
+        monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path))
+
+        def fail(*args, **kwargs):
+            raise AssertionError("blob store bytes were read through the repository")
+
+        monkeypatch.setattr(FakeRegistrationImageRepository, "iter_data", fail)
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png")
+
+        assert response.status_code == 200
+        assert response.data == original
+        assert response.content_length == len(original)
+
+    def test_hands_blob_store_bytes_to_the_web_server(
+        self, client: FlaskClient, fake_store, admin_user: User, monkeypatch, tmp_path
+    ) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user)
+        with FakeUnitOfWork(store=fake_store) as uow:
+            stored = uow.registration_images.get(image.id)
+            assert stored is not None
+            stored.data = None  # as the SQL repository leaves it when a blob store is configured
+        monkeypatch.setenv("BLOB_STORE", "filesystem")
+        monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path))
+        monkeypatch.setenv("BLOB_SENDFILE", "x-accel-redirect")
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png")
+
+        assert response.status_code == 200
+        assert response.headers["X-Accel-Redirect"] == f"/_blobs/images/{image.sha256[:2]}/{image.sha256}"
+        assert response.data == b""
+        assert response.mimetype == "image/png"
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_404_is_not_cached_as_immutable(self, client: FlaskClient, fake_store, admin_user: User) -> None:
+        url_slug, _image = _seed_page_with_image(fake_store, admin_user)
+
+        response = client.get(f"/register/{url_slug}/assets/0000000000000000.png")
+
+        assert response.status_code == 404
+        assert "immutable" not in response.headers.get("Cache-Control", "")
+
     def test_404_when_feature_disabled(self, client: FlaskClient, fake_store, admin_user: User, monkeypatch) -> None:
         url_slug, image = _seed_page_with_image(fake_store, admin_user)
         monkeypatch.setenv("FF_REGISTRATION_PAGE", "false")
@@ -127,6 +228,68 @@ class TestServeRegistrationImage:
         assert response.status_code == 404
 
 
+def _seed_variants(store: FakeStore, image: RegistrationImage) -> None:
+    with FakeUnitOfWork(store=store) as uow:
+        generate_registration_image_variants(uow, image.id)
+
+
+# What Chrome and Firefox send for an <img>.
+WEBP_ACCEPT = {"Accept": "image/avif,image/webp,image/*,*/*;q=0.8"}
+
+
+class TestServeImageVariants:
+    def test_sends_webp_to_browsers_that_accept_it(self, client: FlaskClient, fake_store, admin_user: User) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user, raw=_wide_png())
+        _seed_variants(fake_store, image)
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png", headers=WEBP_ACCEPT)
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/webp"
+        assert Image.open(BytesIO(response.data)).width == image.width
+        assert response.get_etag()[0] != image.sha256
+        assert "Accept" in response.headers["Vary"]
+        assert "immutable" in response.headers["Cache-Control"]
+
+    def test_width_hint_picks_a_narrower_png(self, client: FlaskClient, fake_store, admin_user: User) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user, raw=_wide_png())
+        _seed_variants(fake_store, image)
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png?w=300", headers={"Accept": "image/*"})
+
+        assert response.mimetype == "image/png"
+        assert Image.open(BytesIO(response.data)).width == 320
+
+    def test_original_is_not_cached_for_a_year_before_variants_exist(
+        self, client: FlaskClient, fake_store, admin_user: User
+    ) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user, raw=_wide_png())
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png", headers=WEBP_ACCEPT)
+
+        assert response.status_code == 200
+        assert response.mimetype == "image/png"
+        assert response.data == image.data
+        assert response.headers["Cache-Control"] == "public, max-age=300"
+
+    def test_hands_blob_store_variants_to_the_web_server(
+        self, client: FlaskClient, fake_store, admin_user: User, monkeypatch, tmp_path
+    ) -> None:
+        url_slug, image = _seed_page_with_image(fake_store, admin_user, raw=_wide_png())
+        _seed_variants(fake_store, image)
+        with FakeUnitOfWork(store=fake_store) as uow:
+            for variant in uow.registration_image_variants.all():
+                variant.data = None
+        monkeypatch.setenv("BLOB_STORE", "filesystem")
+        monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path))
+        monkeypatch.setenv("BLOB_SENDFILE", "x-accel-redirect")
+
+        response = client.get(f"/register/{url_slug}/assets/{image.sha256}.png", headers=WEBP_ACCEPT)
+
+        assert response.headers["X-Accel-Redirect"].startswith("/_blobs/image-variants/")
+        assert response.mimetype == "image/webp"
+
+
 class TestAssetsAreSharedAcrossPages:
     def test_image_uploaded_once_serves_from_every_page_of_the_assembly(
         self, client: FlaskClient, fake_store: FakeStore, admin_user: User
@@ -2,15 +2,19 @@
 # ABOUTME: Drives the real export route + service against a seeded fake store, no PostgreSQL
 
 import csv
+import re
 from io import StringIO
+from unittest.mock import patch
 
 from flask.testing import FlaskClient
+from redis.exceptions import RedisError
 
 from opendlp.adapters.tabular_export import ExportTargetError
 from opendlp.domain.assembly import Assembly
 from opendlp.domain.assembly_respondent_gsheet import AssemblyRespondentGSheet
 from opendlp.domain.respondents import Respondent
 from opendlp.domain.value_objects import RespondentStatus
+from opendlp.service_layer.respondent_export_service import run_respondent_gsheet_export
 from tests.fakes import FakeGSheetExportTarget, FakeStore, FakeUnitOfWork
 
 
@@ -24,6 +28,27 @@ def _export(client: FlaskClient, assembly_id, status: str = ""):
     return client.get(f"/backoffice/assembly/{assembly_id}/respondents/export?status={status}")
 
 
+def _run_export_inline(fake_store: FakeStore, redis, target: FakeGSheetExportTarget):
+    """Run the submitted Celery export in-process against the shared store, writing to ``target``."""
+
+    def run(**kwargs):
+        statuses = kwargs["statuses"]
+        with FakeUnitOfWork(store=fake_store) as uow:
+            run_respondent_gsheet_export(
+                uow,
+                kwargs["user_id"],
+                kwargs["assembly_id"],
+                task_id=kwargs["task_id"],
+                status_filter=None if statuses is None else [RespondentStatus(status) for status in statuses],
+                spreadsheet_url=kwargs["spreadsheet_url"],
+                worksheet_name=kwargs["worksheet_name"],
+                target=target,
+                redis_client=redis,
+            )
+
+    return patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay", side_effect=run)
+
+
 def _parse(response) -> list[dict[str, str]]:
     body = response.get_data(as_text=True).lstrip("﻿")
     return list(csv.DictReader(StringIO(body)))
@@ -194,31 +219,25 @@ class TestRunExport:
         assert response.mimetype == "text/csv"
 
     def test_run_gsheet_writes_and_saves_config(
-        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, respondent_export_redis
     ) -> None:
-        captured: list = []
-
-        def factory(url: str) -> FakeGSheetExportTarget:
-            target = FakeGSheetExportTarget()
-            captured.append((url, target))
-            return target
-
-        logged_in_admin.application.extensions["gsheet_export_target_factory"] = factory
+        target = FakeGSheetExportTarget()
         _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
 
-        response = logged_in_admin.post(
-            f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
-            data={
-                "destination": "gsheet",
-                "status": "",
-                "spreadsheet_url": _SHEET_URL,
-                "worksheet_name": "Export tab",
-            },
-        )
+        with _run_export_inline(fake_store, respondent_export_redis, target) as delay:
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={
+                    "destination": "gsheet",
+                    "status": "",
+                    "spreadsheet_url": _SHEET_URL,
+                    "worksheet_name": "Export tab",
+                },
+            )
 
         assert response.status_code == 302
-        assert captured and captured[0][0] == _SHEET_URL
-        assert captured[0][1].writes  # something was written
+        assert delay.call_args.kwargs["spreadsheet_url"] == _SHEET_URL
+        assert target.writes  # something was written
         with FakeUnitOfWork(store=fake_store) as uow:
             config = uow.assembly_respondent_gsheets.get_by_assembly_id(existing_assembly.id)
             assert config is not None
@@ -226,23 +245,21 @@ class TestRunExport:
             assert config.worksheet_name == "Export tab"
 
     def test_run_gsheet_flashes_success_without_url(
-        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, respondent_export_redis
     ) -> None:
-        def factory(url: str) -> FakeGSheetExportTarget:
-            return FakeGSheetExportTarget(result_url="https://docs.google.com/spreadsheets/d/fake#gid=0")
-
-        logged_in_admin.application.extensions["gsheet_export_target_factory"] = factory
+        target = FakeGSheetExportTarget(result_url="https://docs.google.com/spreadsheets/d/fake#gid=0")
         _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
 
-        logged_in_admin.post(
-            f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
-            data={
-                "destination": "gsheet",
-                "status": "",
-                "spreadsheet_url": _SHEET_URL,
-                "worksheet_name": "Export tab",
-            },
-        )
+        with _run_export_inline(fake_store, respondent_export_redis, target):
+            logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={
+                    "destination": "gsheet",
+                    "status": "",
+                    "spreadsheet_url": _SHEET_URL,
+                    "worksheet_name": "Export tab",
+                },
+            )
 
         with logged_in_admin.session_transaction() as sess:
             flashes = sess.get("_flashes", [])
@@ -264,30 +281,142 @@ class TestRunExport:
 
         assert response.status_code == 302
 
-    def test_run_gsheet_write_failure_flashes_error_and_saves_nothing(
+    def test_run_gsheet_with_malformed_url_queues_nothing(
         self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore
+    ) -> None:
+        _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
+
+        with patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay") as delay:
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={"destination": "gsheet", "status": "", "spreadsheet_url": "not a url", "worksheet_name": "T"},
+                follow_redirects=True,
+            )
+
+        delay.assert_not_called()
+        assert "Could not export to Google Sheets" in response.get_data(as_text=True)
+
+    def test_run_gsheet_write_failure_shows_error_and_saves_nothing(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, respondent_export_redis
     ) -> None:
         # Simulate the sheet not being shared with the service account: the target
         # raises ExportTargetError (as the real gspread adapter does on failure).
-        def factory(url: str) -> FakeGSheetExportTarget:
-            return FakeGSheetExportTarget(error=ExportTargetError("no access"))
+        target = FakeGSheetExportTarget(error=ExportTargetError("no access", access_denied=True))
+        _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
 
-        logged_in_admin.application.extensions["gsheet_export_target_factory"] = factory
+        with _run_export_inline(fake_store, respondent_export_redis, target):
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={
+                    "destination": "gsheet",
+                    "status": "",
+                    "spreadsheet_url": _SHEET_URL,
+                    "worksheet_name": "Export tab",
+                },
+                follow_redirects=True,
+            )
+
+        assert response.status_code == 200
+        page = response.get_data(as_text=True)
+        assert "Could not write to the Google Sheet" in page
+        assert "no access" in page
+        # The write failed before commit, so no config row should have been saved.
+        with FakeUnitOfWork(store=fake_store) as uow:
+            assert uow.assembly_respondent_gsheets.get_by_assembly_id(existing_assembly.id) is None
+
+    def test_run_gsheet_unexpected_failure_shows_its_error_without_the_sharing_hint(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, respondent_export_redis
+    ) -> None:
+        target = FakeGSheetExportTarget(error=RuntimeError("quota exceeded"))
         _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
 
+        with _run_export_inline(fake_store, respondent_export_redis, target):
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={"destination": "gsheet", "status": "", "spreadsheet_url": _SHEET_URL, "worksheet_name": ""},
+                follow_redirects=True,
+            )
+
+        page = response.get_data(as_text=True)
+        assert "quota exceeded" in page
+        assert "Could not write to the Google Sheet" not in page
+
+    def test_failed_export_is_shown_until_dismissed(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, respondent_export_redis
+    ) -> None:
+        target = FakeGSheetExportTarget(error=ExportTargetError("no access", access_denied=True))
+        _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
+        with _run_export_inline(fake_store, respondent_export_redis, target):
+            logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={"destination": "gsheet", "status": "", "spreadsheet_url": _SHEET_URL, "worksheet_name": ""},
+                follow_redirects=True,
+            )
+        respondents_url = f"/backoffice/assembly/{existing_assembly.id}/respondents"
+
+        # viewing the page, in any number of tabs, leaves the outcome in place
+        assert "no access" in logged_in_admin.get(respondents_url).get_data(as_text=True)
+        page = logged_in_admin.get(respondents_url).get_data(as_text=True)
+        assert "no access" in page
+        task_id = re.search(r'name="task_id" value="([^"]+)"', page)
+        assert task_id is not None
+
         response = logged_in_admin.post(
-            f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
-            data={
-                "destination": "gsheet",
-                "status": "",
-                "spreadsheet_url": _SHEET_URL,
-                "worksheet_name": "Export tab",
-            },
+            f"/backoffice/assembly/{existing_assembly.id}/respondents/export/dismiss",
+            data={"task_id": task_id.group(1)},
             follow_redirects=True,
         )
 
         assert response.status_code == 200
-        assert "Could not write to the Google Sheet" in response.get_data(as_text=True)
-        # The write failed before commit, so no config row should have been saved.
-        with FakeUnitOfWork(store=fake_store) as uow:
-            assert uow.assembly_respondent_gsheets.get_by_assembly_id(existing_assembly.id) is None
+        assert "no access" not in response.get_data(as_text=True)
+
+    def test_run_gsheet_with_redis_down_flashes_error(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore
+    ) -> None:
+        _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
+
+        with patch(
+            "opendlp.service_layer.respondent_export_service._get_redis", side_effect=RedisError("connection refused")
+        ):
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={"destination": "gsheet", "status": "", "spreadsheet_url": _SHEET_URL, "worksheet_name": ""},
+                follow_redirects=True,
+            )
+
+        assert response.status_code == 200
+        assert "Could not start the export to Google Sheets" in response.get_data(as_text=True)
+
+
+class TestGSheetExportProgress:
+    def test_queued_export_shows_polling_progress(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore
+    ) -> None:
+        _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
+
+        with patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay") as delay:
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={"destination": "gsheet", "status": "POOL", "spreadsheet_url": _SHEET_URL, "worksheet_name": ""},
+                follow_redirects=True,
+            )
+
+        assert delay.call_args.kwargs["statuses"] == ["POOL"]
+        assert b'id="gsheet-export-progress"' in response.data
+        progress = logged_in_admin.get(f"/backoffice/assembly/{existing_assembly.id}/respondents/export/progress")
+        assert progress.status_code == 200
+        assert b'data-status="pending"' in progress.data
+
+    def test_finished_export_refreshes_the_page(
+        self, logged_in_admin: FlaskClient, existing_assembly: Assembly, fake_store: FakeStore, respondent_export_redis
+    ) -> None:
+        _add_respondent(fake_store, existing_assembly.id, "R1", RespondentStatus.POOL)
+        with _run_export_inline(fake_store, respondent_export_redis, FakeGSheetExportTarget()):
+            logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={"destination": "gsheet", "status": "", "spreadsheet_url": _SHEET_URL, "worksheet_name": ""},
+            )
+
+        progress = logged_in_admin.get(f"/backoffice/assembly/{existing_assembly.id}/respondents/export/progress")
+
+        assert progress.headers["HX-Refresh"] == "true"
@@ -2,6 +2,7 @@
 # ABOUTME: Drives the real targets routes + services (render, validation, HTMX fragments, auth, permissions)
 
 import io
+from unittest.mock import patch
 
 import pytest
 
@@ -16,6 +17,7 @@ from opendlp.service_layer.assembly_service import (
     create_target_category,
     import_targets_from_csv,
 )
+from opendlp.service_layer.target_checking import run_targets_check
 from tests.fakes import FakeUnitOfWork
 
 
@@ -232,6 +234,135 @@ class TestDeleteValue:
         assert b"<!DOCTYPE" not in response.data
 
 
+class TestBatchEditValues:
+    def test_applies_changes_across_categories_and_returns_table(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store
+    ):
+        gender = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
+        _add_value(fake_store, admin_user, existing_assembly.id, gender.id, "Male", 5, 10)
+        gender = _add_value(fake_store, admin_user, existing_assembly.id, gender.id, "Female", 5, 10)
+        age = _create_category(fake_store, admin_user, existing_assembly.id, "Age")
+        male_id, female_id = (v.value_id for v in gender.values)
+
+        response = logged_in_admin.post(
+            _targets_url(existing_assembly.id, "/values/batch"),
+            json={
+                "changes": [
+                    {
+                        "category_id": str(gender.id),
+                        "value_id": str(male_id),
+                        "value": "Male",
+                        "min_count": 4,
+                        "max_count": 8,
+                    },
+                    {"category_id": str(gender.id), "value_id": str(female_id), "delete": True},
+                    {"category_id": str(age.id), "value": "16-29", "min_count": 2, "max_count": 6},
+                ]
+            },
+            headers={"HX-Request": "true"},
+        )
+
+        assert response.status_code == 200
+        assert b'id="target-categories"' in response.data
+        assert b"16-29" in response.data
+        assert b"<!DOCTYPE" not in response.data
+        with FakeUnitOfWork(store=fake_store) as uow:
+            by_name = {c.name: c for c in uow.target_categories.get_by_assembly_id(existing_assembly.id)}
+        assert [(v.value, v.min, v.max) for v in by_name["Gender"].values] == [("Male", 4, 8)]
+        assert [(v.value, v.min, v.max) for v in by_name["Age"].values] == [("16-29", 2, 6)]
+
+    def test_rejected_change_returns_table_with_error(self, logged_in_admin, existing_assembly, admin_user, fake_store):
+        gender = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
+
+        response = logged_in_admin.post(
+            _targets_url(existing_assembly.id, "/values/batch"),
+            json={"changes": [{"category_id": str(gender.id), "value": "Male", "min_count": 10, "max_count": 5}]},
+            headers={"HX-Request": "true"},
+        )
+
+        assert response.status_code == 422
+        assert b'id="target-categories"' in response.data
+        assert b"Gender" in response.data
+
+    def test_rejected_change_keeps_the_edits_in_the_inputs(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store
+    ):
+        gender = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
+        gender = _add_value(fake_store, admin_user, existing_assembly.id, gender.id, "Male", 5, 10)
+        male_id = gender.values[0].value_id
+
+        response = logged_in_admin.post(
+            _targets_url(existing_assembly.id, "/values/batch"),
+            json={
+                "changes": [
+                    {
+                        "category_id": str(gender.id),
+                        "value_id": str(male_id),
+                        "value": "Male",
+                        "min_count": 12,
+                        "max_count": 3,
+                    }
+                ]
+            },
+            headers={"HX-Request": "true"},
+        )
+
+        assert response.status_code == 422
+        page = response.get_data(as_text=True)
+        assert f'id="batch-min_count-{male_id}"' in page
+        assert 'value="12"' in page
+        assert 'data-original="5"' in page
+        assert "batchEditing: true" in page
+
+    def test_malformed_body_is_rejected(self, logged_in_admin, existing_assembly):
+        response = logged_in_admin.post(
+            _targets_url(existing_assembly.id, "/values/batch"),
+            json={"changes": [{"value": "Male"}]},
+        )
+        assert response.status_code == 400
+
+    def test_delete_must_be_a_json_boolean(self, logged_in_admin, existing_assembly, admin_user, fake_store):
+        gender = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
+        gender = _add_value(fake_store, admin_user, existing_assembly.id, gender.id, "Male", 5, 10)
+        male_id = gender.values[0].value_id
+
+        response = logged_in_admin.post(
+            _targets_url(existing_assembly.id, "/values/batch"),
+            json={"changes": [{"category_id": str(gender.id), "value_id": str(male_id), "delete": "false"}]},
+        )
+
+        assert response.status_code == 400
+        with FakeUnitOfWork(store=fake_store) as uow:
+            assert [v.value for v in uow.target_categories.get(gender.id).values] == ["Male"]
+
+    def test_targets_page_posts_edited_counts_to_the_batch_endpoint(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store
+    ):
+        gender = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
+        gender = _add_value(fake_store, admin_user, existing_assembly.id, gender.id, "Male", 5, 10)
+        male_id = gender.values[0].value_id
+
+        response = logged_in_admin.get(_targets_url(existing_assembly.id))
+
+        page = response.get_data(as_text=True)
+        assert f'hx-post="{_targets_url(existing_assembly.id, "/values/batch")}"' in page
+        assert 'hx-ext="target-batch-edit"' in page
+        assert f'data-value-id="{male_id}"' in page
+        assert 'form="target-batch-form"' in page
+
+    def test_viewer_cannot_batch_edit(self, logged_in_user, existing_assembly, admin_user, fake_store):
+        gender = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
+
+        response = logged_in_user.post(
+            _targets_url(existing_assembly.id, "/values/batch"),
+            json={"changes": [{"category_id": str(gender.id), "value": "Male", "min_count": 1, "max_count": 2}]},
+        )
+
+        assert response.status_code == 403
+        with FakeUnitOfWork(store=fake_store) as uow:
+            assert uow.target_categories.get(gender.id).values == []
+
+
 class TestEditCategory:
     def test_rename_category_htmx_returns_fragment(self, logged_in_admin, existing_assembly, admin_user, fake_store):
         category = _create_category(fake_store, admin_user, existing_assembly.id, "Gender")
@@ -329,38 +460,108 @@ class TestCheckTargets:
         assert response.status_code == 200
         assert b"Check targets in detail" not in response.data
 
-    def test_check_with_insufficient_respondents_shows_error(
-        self, logged_in_admin, existing_assembly, admin_user, fake_store
-    ):
+    def _seed_infeasible_check(self, fake_store, admin_user, assembly_id):
         _import_targets(
-            fake_store, admin_user, existing_assembly.id, "feature,value,min,max\nGender,Male,5,7\nGender,Female,5,7\n"
+            fake_store, admin_user, assembly_id, "feature,value,min,max\nGender,Male,5,7\nGender,Female,5,7\n"
         )
 
         # Only 1 female, but min is 5
         _add_respondents(
             fake_store,
-            existing_assembly.id,
+            assembly_id,
             [("p0", {"Gender": "Female"})] + [(f"p{i}", {"Gender": "Male"}) for i in range(1, 20)],
         )
 
         with FakeUnitOfWork(store=fake_store) as uow:
-            assembly = uow.assemblies.get(existing_assembly.id)
+            assembly = uow.assemblies.get(assembly_id)
             assembly.number_to_select = 10
             assembly.csv = AssemblyCSV(assembly_id=assembly.id)
             assembly.selection_settings = SelectionSettings(assembly_id=assembly.id, check_same_address=False)
             uow.commit()
 
-        response = logged_in_admin.get(
-            _targets_url(existing_assembly.id, "/check"),
-            follow_redirects=True,
-        )
+    @staticmethod
+    def _run_task_inline(fake_store, target_check_redis):
+        """Run the submitted Celery task in-process against the shared store."""
+
+        def run(**kwargs):
+            with FakeUnitOfWork(store=fake_store) as uow:
+                run_targets_check(
+                    uow,
+                    kwargs["user_id"],
+                    kwargs["assembly_id"],
+                    task_id=kwargs["task_id"],
+                    inputs_key=kwargs["inputs_key"],
+                    redis_client=target_check_redis,
+                )
+
+        return patch("opendlp.entrypoints.celery.tasks.check_targets.delay", side_effect=run)
+
+    def test_check_with_insufficient_respondents_shows_error(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store, target_check_redis
+    ):
+        self._seed_infeasible_check(fake_store, admin_user, existing_assembly.id)
+
+        with self._run_task_inline(fake_store, target_check_redis):
+            response = logged_in_admin.post(_targets_url(existing_assembly.id, "/check"), follow_redirects=True)
+
         assert response.status_code == 200
         assert b"Target check found problems" in response.data
         # Should have inline error annotation for "female"
         assert b"respondents match" in response.data
 
+    def test_result_is_shown_again_when_page_is_reopened(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store, target_check_redis
+    ):
+        self._seed_infeasible_check(fake_store, admin_user, existing_assembly.id)
+        with self._run_task_inline(fake_store, target_check_redis):
+            logged_in_admin.post(_targets_url(existing_assembly.id, "/check"))
+
+        response = logged_in_admin.get(_targets_url(existing_assembly.id))
+
+        assert b"Target check found problems" in response.data
+
+    def test_result_is_dropped_when_number_to_select_changes(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store, target_check_redis
+    ):
+        self._seed_infeasible_check(fake_store, admin_user, existing_assembly.id)
+        with self._run_task_inline(fake_store, target_check_redis):
+            logged_in_admin.post(_targets_url(existing_assembly.id, "/check"))
+
+        with FakeUnitOfWork(store=fake_store) as uow:
+            uow.assemblies.get(existing_assembly.id).number_to_select = 12
+            uow.commit()
+        response = logged_in_admin.get(_targets_url(existing_assembly.id))
+
+        assert b"Target check found problems" not in response.data
+
+    def test_pending_check_shows_polling_progress(self, logged_in_admin, existing_assembly, admin_user, fake_store):
+        self._seed_infeasible_check(fake_store, admin_user, existing_assembly.id)
+
+        with patch("opendlp.entrypoints.celery.tasks.check_targets.delay") as delay:
+            response = logged_in_admin.post(_targets_url(existing_assembly.id, "/check"), follow_redirects=True)
+
+        delay.assert_called_once()
+        assert b'id="target-check-progress"' in response.data
+        assert b"/targets/check/progress" in response.data
+
+        progress = logged_in_admin.get(_targets_url(existing_assembly.id, "/check/progress"))
+        assert progress.status_code == 200
+        assert b'data-status="pending"' in progress.data
+        assert "HX-Refresh" not in progress.headers
+
+    def test_progress_refreshes_page_once_finished(
+        self, logged_in_admin, existing_assembly, admin_user, fake_store, target_check_redis
+    ):
+        self._seed_infeasible_check(fake_store, admin_user, existing_assembly.id)
+        with self._run_task_inline(fake_store, target_check_redis):
+            logged_in_admin.post(_targets_url(existing_assembly.id, "/check"))
+
+        response = logged_in_admin.get(_targets_url(existing_assembly.id, "/check/progress"))
+
+        assert response.headers["HX-Refresh"] == "true"
+
     def test_check_requires_login(self, client, existing_assembly):
-        response = client.get(_targets_url(existing_assembly.id, "/check"))
+        response = client.post(_targets_url(existing_assembly.id, "/check"))
         assert response.status_code == 302
         assert "login" in response.location
 
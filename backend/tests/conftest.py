@@ -1,6 +1,7 @@
 """ABOUTME: Pytest configuration and fixtures for OpenDLP tests
 ABOUTME: Provides test fixtures and configuration for unit, integration, and e2e tests"""
 
+import contextlib
 import io
 import logging
 import os
@@ -10,6 +11,7 @@ import subprocess
 import time
 import urllib.request
 from pathlib import Path
+from unittest.mock import Mock
 
 import pytest
 import redis
@@ -39,8 +41,11 @@ pytest_plugins = [
 # applied automatically by directory (pytest_collection_modifyitems) so that
 # `pytest -m "not requires_db"` runs the fast tier (unit + component) without
 # editing every test file.
-_REQUIRES_DB_DIRS = ("/tests/e2e/", "/tests/integration/", "/tests/contract/", "/tests/bdd/")
-_REQUIRES_REDIS_DIRS = ("/tests/e2e/", "/tests/bdd/")
+_REQUIRES_DB_DIRS = ("/tests/e2e/", "/tests/integration/", "/tests/contract/", "/tests/bdd/", "/tests/benchmarks/")
+_REQUIRES_REDIS_DIRS = ("/tests/e2e/", "/tests/bdd/", "/tests/benchmarks/")
+# Benchmarks build assemblies of up to 100k respondents, so they only run when
+# asked for with pytest-benchmark's --benchmark-only (see `just benchmark`).
+_BENCHMARK_DIR = "/tests/benchmarks/"
 
 # A disguised route test patches a blueprint's UnitOfWork seam to fake out a
 # route while driving the Flask app. Such tests belong in tests/component/ on the
@@ -52,8 +57,12 @@ def pytest_collection_modifyitems(config, items):
     """Auto-apply infra markers by directory and enforce test placement."""
     placement_errors = []
     source_cache: dict[str, str] = {}
+    skip_benchmarks = pytest.mark.skip(reason="benchmarks only run with --benchmark-only")
+    run_benchmarks = config.getoption("benchmark_only", default=False)
     for item in items:
         path = str(item.path)
+        if _BENCHMARK_DIR in path and not run_benchmarks:
+            item.add_marker(skip_benchmarks)
         if any(directory in path for directory in _REQUIRES_DB_DIRS):
             item.add_marker(pytest.mark.requires_db)
         if any(directory in path for directory in _REQUIRES_REDIS_DIRS):
@@ -79,6 +88,47 @@ def pytest_collection_modifyitems(config, items):
         raise pytest.UsageError("Test placement errors:\n" + "\n".join(sorted(set(placement_errors))))
 
 
+def _query_budget_failure(stats: database.QueryStats, max_queries: int) -> str:
+    lines = [f"Ran {stats.count} SQL statements, over the budget of {max_queries}. Most repeated:"]
+    lines += [f"  {count} x {statement[:200]}" for statement, count in stats.statements.most_common(5)]
+    return "\n".join(lines)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    """Enforce ``@pytest.mark.query_budget(n)``: the test body may run at most n SQL statements.
+
+    Only the test function is counted, not the fixtures that set up its data.
+    """
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+    max_queries = marker.args[0]
+    with database.track_queries() as stats:
+        result = yield
+    if stats.count > max_queries:
+        pytest.fail(_query_budget_failure(stats, max_queries))
+    return result
+
+
+@pytest.fixture
+def query_budget():
+    """Fail the test if the code inside the block runs more SQL statements than allowed.
+
+    with query_budget(3):
+        repo.get_by_assembly_id(assembly_id)
+    """
+
+    @contextlib.contextmanager
+    def _budget(max_queries: int):
+        with database.track_queries() as stats:
+            yield stats
+        if stats.count > max_queries:
+            pytest.fail(_query_budget_failure(stats, max_queries))
+
+    return _budget
+
+
 @pytest.fixture(autouse=True)
 def reset_logging_handlers():
     """Reset sortition_algorithms logging handlers to avoid database writes in unit tests.
@@ -437,6 +487,17 @@ def patch_password_hashing(monkeypatch):
     monkeypatch.setattr(totp_service, "generate_password_hash", mock_generate)
 
 
+@pytest.fixture(autouse=True)
+def stub_image_variant_task(monkeypatch) -> Mock:
+    """Image uploads queue a Celery task to render variants; don't reach for a broker from tests.
+
+    Tests that check the task was queued can ask for this fixture and inspect the mock.
+    """
+    delay = Mock()
+    monkeypatch.setattr("opendlp.entrypoints.celery.tasks.generate_registration_image_variants.delay", delay)
+    return delay
+
+
 def _get_worker_redis_db(worker_id: str) -> int:
     """Return a Redis database number unique to each xdist worker.
 
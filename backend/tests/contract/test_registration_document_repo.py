@@ -7,10 +7,12 @@ import uuid
 from datetime import UTC, datetime
 
 import pytest
+from sqlalchemy import inspect
 from sqlalchemy.exc import IntegrityError
 
 from opendlp.adapters import orm
 from opendlp.adapters.sql_repository import SqlAlchemyRegistrationDocumentRepository
+from opendlp.domain.registration_document import RegistrationDocumentSummary
 from tests.contract.conftest import (
     ContractBackend,
     make_assembly,
@@ -77,6 +79,37 @@ class TestGetByAssemblyAndSha:
         assert registration_document_backend.repo.get_by_assembly_and_sha(uuid.uuid4(), "abc") is None
 
 
+class TestStoredUploadReads:
+    def test_info_has_metadata_without_bytes(self, registration_document_backend: ContractBackend):
+        assembly_id = registration_document_backend.make_assembly().id
+        document = registration_document_backend.make_registration_document(
+            assembly_id=assembly_id, sha256="abc", byte_size=8, original_filename="a file"
+        )
+
+        info = registration_document_backend.repo.get_info_by_assembly_and_sha(assembly_id, "abc")
+        assert info is not None
+        assert (info.id, info.sha256, info.byte_size, info.original_filename) == (document.id, "abc", 8, "a file")
+        assert registration_document_backend.repo.get_info_by_assembly_and_sha(uuid.uuid4(), "abc") is None
+
+    def test_iter_data_yields_the_bytes_in_chunks(self, registration_document_backend: ContractBackend):
+        data = bytes(range(256)) * 4 + b"\x00tail"
+        document = registration_document_backend.make_registration_document(data=data, byte_size=len(data))
+
+        chunks = list(registration_document_backend.repo.iter_data(document.id, chunk_size=256))
+        assert [len(chunk) for chunk in chunks] == [256, 256, 256, 256, 5]
+        assert b"".join(chunks) == data
+
+    def test_iter_data_for_an_exact_multiple_of_the_chunk_size(self, registration_document_backend: ContractBackend):
+        document = registration_document_backend.make_registration_document(data=b"abcdef", byte_size=6)
+
+        assert list(registration_document_backend.repo.iter_data(document.id, chunk_size=3)) == [b"abc", b"def"]
+
+    def test_iter_data_from_an_offset(self, registration_document_backend: ContractBackend):
+        document = registration_document_backend.make_registration_document(data=b"abcdefg", byte_size=7)
+
+        assert list(registration_document_backend.repo.iter_data(document.id, chunk_size=3, offset=3)) == [b"def", b"g"]
+
+
 class TestListAndCountByAssemblyId:
     def test_lists_only_that_assembly_oldest_first(self, registration_document_backend: ContractBackend):
         assembly_id = registration_document_backend.make_assembly().id
@@ -92,6 +125,17 @@ class TestListAndCountByAssemblyId:
         listed = registration_document_backend.repo.list_by_assembly_id(assembly_id)
         assert [doc.id for doc in listed] == [older.id, newer.id]
 
+    def test_lists_metadata_without_bytes(self, registration_document_backend: ContractBackend):
+        item = registration_document_backend.make_registration_document(original_filename="poster.x")
+
+        [summary] = registration_document_backend.repo.list_by_assembly_id(item.assembly_id)
+
+        assert isinstance(summary, RegistrationDocumentSummary)
+        assert not hasattr(summary, "data")
+        assert (summary.id, summary.sha256, summary.byte_size) == (item.id, item.sha256, item.byte_size)
+        assert summary.original_filename == "poster.x"
+        assert summary.label == item.label
+
     def test_count_by_assembly_id(self, registration_document_backend: ContractBackend):
         assembly_id = registration_document_backend.make_assembly().id
         registration_document_backend.make_registration_document(assembly_id=assembly_id)
@@ -139,3 +183,19 @@ class TestSqlConstraints:
         postgres_session.expire_all()
 
         assert repo.count_by_assembly_id(assembly_id) == 0
+
+
+class TestSqlDeferredData:
+    def test_loading_a_document_leaves_its_bytes_unread(self, postgres_session):
+        assembly_id = _persisted_assembly(postgres_session)
+        repo = SqlAlchemyRegistrationDocumentRepository(postgres_session)
+        item = make_registration_document(assembly_id)
+        repo.add(item)
+        postgres_session.commit()
+        postgres_session.expunge_all()
+
+        loaded = repo.get(item.id)
+
+        assert loaded is not None
+        assert "data" in inspect(loaded).unloaded
+        assert loaded.data == item.data  # still loads on access
@@ -7,10 +7,13 @@ import uuid
 from datetime import UTC, datetime
 
 import pytest
+from sqlalchemy import inspect, select
 from sqlalchemy.exc import IntegrityError
 
 from opendlp.adapters import orm
+from opendlp.adapters.blob_store import IMAGES, BlobStoreError, FilesystemBlobStore
 from opendlp.adapters.sql_repository import SqlAlchemyRegistrationImageRepository
+from opendlp.domain.registration_image import RegistrationImageSummary
 from tests.contract.conftest import (
     ContractBackend,
     make_assembly,
@@ -77,6 +80,37 @@ class TestGetByAssemblyAndSha:
         assert registration_image_backend.repo.get_by_assembly_and_sha(uuid.uuid4(), "abc") is None
 
 
+class TestStoredUploadReads:
+    def test_info_has_metadata_without_bytes(self, registration_image_backend: ContractBackend):
+        assembly_id = registration_image_backend.make_assembly().id
+        image = registration_image_backend.make_registration_image(
+            assembly_id=assembly_id, sha256="abc", byte_size=8, original_filename="a file"
+        )
+
+        info = registration_image_backend.repo.get_info_by_assembly_and_sha(assembly_id, "abc")
+        assert info is not None
+        assert (info.id, info.sha256, info.byte_size, info.original_filename) == (image.id, "abc", 8, "a file")
+        assert registration_image_backend.repo.get_info_by_assembly_and_sha(uuid.uuid4(), "abc") is None
+
+    def test_iter_data_yields_the_bytes_in_chunks(self, registration_image_backend: ContractBackend):
+        data = bytes(range(256)) * 4 + b"\x00tail"
+        image = registration_image_backend.make_registration_image(data=data, byte_size=len(data))
+
+        chunks = list(registration_image_backend.repo.iter_data(image.id, chunk_size=256))
+        assert [len(chunk) for chunk in chunks] == [256, 256, 256, 256, 5]
+        assert b"".join(chunks) == data
+
+    def test_iter_data_for_an_exact_multiple_of_the_chunk_size(self, registration_image_backend: ContractBackend):
+        image = registration_image_backend.make_registration_image(data=b"abcdef", byte_size=6)
+
+        assert list(registration_image_backend.repo.iter_data(image.id, chunk_size=3)) == [b"abc", b"def"]
+
+    def test_iter_data_from_an_offset(self, registration_image_backend: ContractBackend):
+        image = registration_image_backend.make_registration_image(data=b"abcdefg", byte_size=7)
+
+        assert list(registration_image_backend.repo.iter_data(image.id, chunk_size=3, offset=3)) == [b"def", b"g"]
+
+
 class TestListAndCountByAssemblyId:
     def test_lists_only_that_assembly_oldest_first(self, registration_image_backend: ContractBackend):
         assembly_id = registration_image_backend.make_assembly().id
@@ -92,6 +126,17 @@ class TestListAndCountByAssemblyId:
         listed = registration_image_backend.repo.list_by_assembly_id(assembly_id)
         assert [image.id for image in listed] == [older.id, newer.id]
 
+    def test_lists_metadata_without_bytes(self, registration_image_backend: ContractBackend):
+        item = registration_image_backend.make_registration_image(original_filename="poster.x")
+
+        [summary] = registration_image_backend.repo.list_by_assembly_id(item.assembly_id)
+
+        assert isinstance(summary, RegistrationImageSummary)
+        assert not hasattr(summary, "data")
+        assert (summary.id, summary.sha256, summary.byte_size) == (item.id, item.sha256, item.byte_size)
+        assert summary.original_filename == "poster.x"
+        assert (summary.width, summary.height, summary.alt) == (item.width, item.height, item.alt)
+
     def test_count_by_assembly_id(self, registration_image_backend: ContractBackend):
         assembly_id = registration_image_backend.make_assembly().id
         registration_image_backend.make_registration_image(assembly_id=assembly_id)
@@ -139,3 +184,60 @@ class TestSqlConstraints:
         postgres_session.expire_all()
 
         assert repo.count_by_assembly_id(assembly_id) == 0
+
+
+class TestSqlBlobStore:
+    def test_add_writes_the_bytes_to_the_blob_store_and_leaves_the_column_null(self, postgres_session, tmp_path):
+        assembly_id = _persisted_assembly(postgres_session)
+        store = FilesystemBlobStore(tmp_path)
+        repo = SqlAlchemyRegistrationImageRepository(postgres_session, store)
+        image = make_registration_image(assembly_id, data=b"pngbytes")
+        repo.add(image)
+        postgres_session.flush()
+
+        stored = postgres_session.execute(
+            select(orm.registration_images.c.data).where(orm.registration_images.c.id == image.id)
+        ).scalar_one()
+        assert stored is None
+        assert b"".join(store.iter_chunks(IMAGES, image.sha256)) == b"pngbytes"
+
+        info = repo.get_info_by_assembly_and_sha(assembly_id, image.sha256)
+        assert info is not None
+        assert info.in_blob_store is True
+        assert b"".join(repo.iter_data(image.id, chunk_size=3)) == b"pngbytes"
+
+    def test_rows_in_the_table_still_read_with_a_blob_store(self, postgres_session, tmp_path):
+        assembly_id = _persisted_assembly(postgres_session)
+        image = make_registration_image(assembly_id, data=b"pngbytes")
+        SqlAlchemyRegistrationImageRepository(postgres_session).add(image)
+        postgres_session.flush()
+
+        repo = SqlAlchemyRegistrationImageRepository(postgres_session, FilesystemBlobStore(tmp_path))
+
+        assert repo.get_info_by_assembly_and_sha(assembly_id, image.sha256).in_blob_store is False
+        assert b"".join(repo.iter_data(image.id)) == b"pngbytes"
+
+    def test_blob_rows_without_a_blob_store_raise(self, postgres_session, tmp_path):
+        assembly_id = _persisted_assembly(postgres_session)
+        image = make_registration_image(assembly_id)
+        SqlAlchemyRegistrationImageRepository(postgres_session, FilesystemBlobStore(tmp_path)).add(image)
+        postgres_session.flush()
+
+        with pytest.raises(BlobStoreError):
+            list(SqlAlchemyRegistrationImageRepository(postgres_session).iter_data(image.id))
+
+
+class TestSqlDeferredData:
+    def test_loading_a_image_leaves_its_bytes_unread(self, postgres_session):
+        assembly_id = _persisted_assembly(postgres_session)
+        repo = SqlAlchemyRegistrationImageRepository(postgres_session)
+        item = make_registration_image(assembly_id)
+        repo.add(item)
+        postgres_session.commit()
+        postgres_session.expunge_all()
+
+        loaded = repo.get(item.id)
+
+        assert loaded is not None
+        assert "data" in inspect(loaded).unloaded
+        assert loaded.data == item.data  # still loads on access
@@ -0,0 +1,172 @@
+"""ABOUTME: Contract tests for RegistrationImageVariantRepository.
+ABOUTME: Runs against both fake and SQL backends, plus SQL-only cascade and blob store checks."""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from opendlp.adapters import orm
+from opendlp.adapters.blob_store import IMAGE_VARIANTS, FilesystemBlobStore
+from opendlp.adapters.sql_repository import (
+    SqlAlchemyRegistrationImageRepository,
+    SqlAlchemyRegistrationImageVariantRepository,
+)
+from opendlp.domain.registration_image import RegistrationImage, RegistrationImageVariant
+from tests.contract.conftest import make_assembly, make_registration_image
+from tests.fakes import FakeRegistrationImageRepository, FakeRegistrationImageVariantRepository
+
+if TYPE_CHECKING:
+    import uuid
+
+
+@dataclass
+class VariantBackend:
+    images: FakeRegistrationImageRepository | SqlAlchemyRegistrationImageRepository
+    variants: FakeRegistrationImageVariantRepository | SqlAlchemyRegistrationImageVariantRepository
+    persist_assembly: bool
+    session: object = None
+
+    def make_image(self, **kwargs) -> RegistrationImage:
+        assembly = make_assembly()
+        if self.persist_assembly:
+            self.session.add(assembly)
+            self.session.flush()
+        image = make_registration_image(assembly_id=assembly.id, **kwargs)
+        self.images.add(image)
+        if self.persist_assembly:
+            self.session.flush()
+        return image
+
+    def make_variant(self, image: RegistrationImage, image_format: str = "webp", width: int = 320, data=b"variant"):
+        variant = _variant(image.id, image_format, width, data)
+        self.variants.add(variant)
+        if self.persist_assembly:
+            self.session.flush()
+        return variant
+
+
+def _variant(image_id: uuid.UUID, image_format: str, width: int, data: bytes) -> RegistrationImageVariant:
+    return RegistrationImageVariant(
+        image_id=image_id,
+        image_format=image_format,
+        width=width,
+        height=width // 2,
+        sha256=hashlib.sha256(data + image_format.encode() + str(width).encode()).hexdigest(),
+        data=data,
+        byte_size=len(data),
+    )
+
+
+@pytest.fixture(params=["fake", "sql"], ids=["fake", "sql"])
+def variant_backend(request, postgres_session) -> VariantBackend:
+    if request.param == "fake":
+        images = FakeRegistrationImageRepository()
+        return VariantBackend(images, FakeRegistrationImageVariantRepository(images=images), persist_assembly=False)
+    return VariantBackend(
+        SqlAlchemyRegistrationImageRepository(postgres_session),
+        SqlAlchemyRegistrationImageVariantRepository(postgres_session),
+        persist_assembly=True,
+        session=postgres_session,
+    )
+
+
+class TestVariantReads:
+    def test_lists_only_that_images_variants_without_bytes(self, variant_backend: VariantBackend):
+        image, other = variant_backend.make_image(), variant_backend.make_image()
+        webp = variant_backend.make_variant(image, "webp", 320)
+        variant_backend.make_variant(image, "png", 320)
+        variant_backend.make_variant(other, "webp", 320)
+
+        infos = variant_backend.variants.list_info_by_image_id(image.id)
+
+        assert sorted(info.image_format for info in infos) == ["png", "webp"]
+        [webp_info] = [info for info in infos if info.image_format == "webp"]
+        assert (webp_info.id, webp_info.width, webp_info.byte_size, webp_info.sha256) == (
+            webp.id,
+            320,
+            webp.byte_size,
+            webp.sha256,
+        )
+        assert webp_info.in_blob_store is False
+
+    def test_iter_data_yields_the_bytes_in_chunks(self, variant_backend: VariantBackend):
+        variant = variant_backend.make_variant(variant_backend.make_image(), data=b"0123456789")
+
+        chunks = list(variant_backend.variants.iter_data(variant.id, chunk_size=4))
+
+        assert chunks == [b"0123", b"4567", b"89"]
+
+
+class TestListImageIdsWithoutVariants:
+    def test_oldest_images_without_variants_before_the_cutoff(self, variant_backend: VariantBackend):
+        now = datetime.now(UTC)
+        old = variant_backend.make_image(created_at=now - timedelta(hours=2))
+        older = variant_backend.make_image(created_at=now - timedelta(hours=3))
+        done = variant_backend.make_image(created_at=now - timedelta(hours=4))
+        variant_backend.make_image(created_at=now)
+        variant_backend.make_variant(done)
+
+        ids = variant_backend.variants.list_image_ids_without_variants(
+            created_before=now - timedelta(hours=1), limit=10
+        )
+
+        assert [i for i in ids if i in {old.id, older.id, done.id}] == [older.id, old.id]
+
+    def test_limit(self, variant_backend: VariantBackend):
+        now = datetime.now(UTC)
+        for hours in (2, 3):
+            variant_backend.make_image(created_at=now - timedelta(hours=hours))
+
+        assert len(variant_backend.variants.list_image_ids_without_variants(created_before=now, limit=1)) == 1
+
+
+def _sql_image(session) -> RegistrationImage:
+    assembly = make_assembly()
+    session.add(assembly)
+    session.flush()
+    image = make_registration_image(assembly.id)
+    SqlAlchemyRegistrationImageRepository(session).add(image)
+    session.flush()
+    return image
+
+
+class TestSqlVariantStorage:
+    def test_one_variant_per_image_format_and_width(self, postgres_session):
+        image = _sql_image(postgres_session)
+        repo = SqlAlchemyRegistrationImageVariantRepository(postgres_session)
+        repo.add(_variant(image.id, "webp", 320, b"a"))
+        postgres_session.flush()
+        repo.add(_variant(image.id, "webp", 320, b"b"))
+
+        with pytest.raises(IntegrityError):
+            postgres_session.flush()
+
+    def test_deleting_the_image_cascades_to_its_variants(self, postgres_session):
+        image = _sql_image(postgres_session)
+        repo = SqlAlchemyRegistrationImageVariantRepository(postgres_session)
+        repo.add(_variant(image.id, "webp", 320, b"a"))
+        postgres_session.flush()
+
+        postgres_session.execute(orm.registration_images.delete().where(orm.registration_images.c.id == image.id))
+        postgres_session.expire_all()
+
+        assert repo.list_info_by_image_id(image.id) == []
+
+    def test_bytes_go_to_the_blob_store(self, postgres_session, tmp_path):
+        image = _sql_image(postgres_session)
+        store = FilesystemBlobStore(tmp_path)
+        repo = SqlAlchemyRegistrationImageVariantRepository(postgres_session, store)
+        variant = _variant(image.id, "webp", 320, b"webpbytes")
+        repo.add(variant)
+        postgres_session.flush()
+
+        [info] = repo.list_info_by_image_id(image.id)
+        assert info.in_blob_store is True
+        assert b"".join(store.iter_chunks(IMAGE_VARIANTS, variant.sha256)) == b"webpbytes"
+        assert b"".join(repo.iter_data(variant.id)) == b"webpbytes"
@@ -137,7 +137,7 @@ class TestDbSelectionSmoke:
 class TestDbSelectionCelery:
     """Tests that dispatch Celery tasks (run_select_from_db.delay / control.revoke)."""
 
-    @patch("opendlp.service_layer.sortition.tasks.run_select_from_db.delay")
+    @patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay")
     def test_start_db_selection_success(
         self, mock_celery, logged_in_admin, assembly_for_db_selection, postgres_session_factory
     ):
@@ -159,7 +159,7 @@ class TestDbSelectionCelery:
             assert len(records) == 1
             assert records[0].task_type == SelectionTaskType.SELECT_FROM_DB
 
-    @patch("opendlp.service_layer.sortition.tasks.run_select_from_db.delay")
+    @patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay")
     def test_start_db_test_selection_success(
         self, mock_celery, logged_in_admin, assembly_for_db_selection, postgres_session_factory
     ):
@@ -180,7 +180,7 @@ class TestDbSelectionCelery:
             assert len(records) == 1
             assert records[0].task_type == SelectionTaskType.TEST_SELECT_FROM_DB
 
-    @patch("opendlp.service_layer.sortition.tasks.run_select_from_db.delay")
+    @patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay")
     def test_start_db_selection_unexpected_error(self, mock_celery, logged_in_admin, assembly_for_db_selection):
         assembly = assembly_for_db_selection
         mock_celery.side_effect = RuntimeError("Celery down")
@@ -208,7 +208,7 @@ class TestDbSelectionCelery:
             uow.selection_run_records.add(record)
             uow.commit()
 
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke"):
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke"):
             response = logged_in_admin.post(
                 f"/assemblies/{assembly.id}/db_select/{task_id}/cancel",
             )
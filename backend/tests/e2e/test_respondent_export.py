@@ -3,7 +3,9 @@ ABOUTME: Real Flask + PostgreSQL round trip for the export download"""
 
 import csv
 from io import StringIO
+from unittest.mock import patch
 
+from opendlp.service_layer.respondent_export_service import run_respondent_gsheet_export
 from opendlp.service_layer.respondent_service import import_respondents_from_csv
 from opendlp.service_layer.unit_of_work import SqlAlchemyUnitOfWork
 from tests.fakes import FakeGSheetExportTarget
@@ -49,32 +51,43 @@ class TestGSheetExportSmoke:
                 csv_content=_CSV,
             )
 
+        target = FakeGSheetExportTarget(
+            result_url="https://docs.google.com/spreadsheets/d/1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgVE2upms/edit#gid=3",
+            result_title="Assembly Data",
+        )
         captured = []
 
-        def factory(url):
-            target = FakeGSheetExportTarget(
-                result_url="https://docs.google.com/spreadsheets/d/1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgVE2upms/edit#gid=3",
-                result_title="Assembly Data",
-            )
-            captured.append((url, target))
-            return target
+        def run_inline(**kwargs):
+            # Stand in for the Celery worker: run the export against the real database.
+            captured.append(kwargs["spreadsheet_url"])
+            with SqlAlchemyUnitOfWork(postgres_session_factory) as uow:
+                run_respondent_gsheet_export(
+                    uow,
+                    kwargs["user_id"],
+                    kwargs["assembly_id"],
+                    task_id=kwargs["task_id"],
+                    status_filter=None,
+                    spreadsheet_url=kwargs["spreadsheet_url"],
+                    worksheet_name=kwargs["worksheet_name"],
+                    target=target,
+                )
 
-        logged_in_admin.application.extensions["gsheet_export_target_factory"] = factory
         sheet_url = "https://docs.google.com/spreadsheets/d/1BxiMVs0XRA5nFMdKvBdBZjgmUUqptlbs74OgVE2upms/edit"
 
-        response = logged_in_admin.post(
-            f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
-            data={
-                "destination": "gsheet",
-                "status": "",
-                "spreadsheet_url": sheet_url,
-                "worksheet_name": "Respondents",
-            },
-        )
+        with patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay", side_effect=run_inline):
+            response = logged_in_admin.post(
+                f"/backoffice/assembly/{existing_assembly.id}/respondents/export/run",
+                data={
+                    "destination": "gsheet",
+                    "status": "",
+                    "spreadsheet_url": sheet_url,
+                    "worksheet_name": "Respondents",
+                },
+            )
 
         assert response.status_code == 302
-        assert captured and captured[0][0] == sheet_url
-        assert captured[0][1].writes
+        assert captured == [sheet_url]
+        assert target.writes
 
         with SqlAlchemyUnitOfWork(postgres_session_factory) as uow:
             config = uow.assembly_respondent_gsheets.get_by_assembly_id(existing_assembly.id)
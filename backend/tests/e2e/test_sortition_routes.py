@@ -62,7 +62,7 @@ class TestSortitionRoutes:
         assert b"hx-swap" in response.data
         assert b"every 1s" in response.data
 
-    @patch("opendlp.service_layer.sortition.tasks.load_gsheet.delay")
+    @patch("opendlp.entrypoints.celery.tasks.load_gsheet.delay")
     def test_gsheet_load_success(self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory):
         """Test POST request to start loading task succeeds."""
         assembly, _ = assembly_with_gsheet
@@ -84,7 +84,7 @@ class TestSortitionRoutes:
             assert records[0].task_type == SelectionTaskType.LOAD_GSHEET
             assert "Task submitted for Google Sheets loading" in records[0].log_messages
 
-    @patch("opendlp.service_layer.sortition.tasks.run_select.apply_async")
+    @patch("opendlp.entrypoints.celery.tasks.run_select.apply_async")
     def test_gsheet_select_success(self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory):
         """Test POST request to start loading task succeeds."""
         assembly, _ = assembly_with_gsheet
@@ -106,7 +106,7 @@ class TestSortitionRoutes:
             assert records[0].task_type == SelectionTaskType.SELECT_GSHEET
             assert "Task submitted for Google Sheets selection" in records[0].log_messages
 
-    @patch("opendlp.service_layer.sortition.tasks.run_select.apply_async")
+    @patch("opendlp.entrypoints.celery.tasks.run_select.apply_async")
     def test_gsheet_test_select_success(
         self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory
     ):
@@ -143,7 +143,7 @@ class TestReplacementRoutes:
         assert b"Replacements for" in response.data
         assert b"Check Spreadsheet" in response.data
 
-    @patch("opendlp.service_layer.sortition.tasks.load_gsheet.delay")
+    @patch("opendlp.entrypoints.celery.tasks.load_gsheet.delay")
     def test_gsheet_replace_load_success(
         self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory
     ):
@@ -167,7 +167,7 @@ class TestReplacementRoutes:
             assert records[0].task_type == SelectionTaskType.LOAD_REPLACEMENT_GSHEET
             assert "Task submitted for Google Sheets replacement data loading" in records[0].log_messages
 
-    @patch("opendlp.service_layer.sortition.tasks.run_select.delay")
+    @patch("opendlp.entrypoints.celery.tasks.run_select.delay")
     def test_start_gsheet_replace_success(
         self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory
     ):
@@ -211,7 +211,7 @@ class TestSortitionRoutesWithAssemblyRole:
             uow.commit()
         return assembly.id
 
-    @patch("opendlp.service_layer.sortition.tasks.load_gsheet.delay")
+    @patch("opendlp.entrypoints.celery.tasks.load_gsheet.delay")
     def test_assembly_manager_can_start_task(self, mock_celery, logged_in_user, assembly_managed_by_user):
         """Test user with assembly manager role can start task."""
         mock_result = Mock()
@@ -239,7 +239,7 @@ class TestManageTabsRoutes:
         assert b"Manage Generated Tabs" in response.data or b"manage" in response.data.lower()
         assert b"List Old Tabs" in response.data
 
-    @patch("opendlp.service_layer.sortition.tasks.manage_old_tabs.delay")
+    @patch("opendlp.entrypoints.celery.tasks.manage_old_tabs.delay")
     def test_list_tabs_success(self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory):
         """Test POST request to start listing task succeeds."""
         assembly, _ = assembly_with_gsheet
@@ -261,7 +261,7 @@ class TestManageTabsRoutes:
             assert records[0].task_type == SelectionTaskType.LIST_OLD_TABS
             assert "Task submitted for listing old output tabs" in records[0].log_messages
 
-    @patch("opendlp.service_layer.sortition.tasks.manage_old_tabs.delay")
+    @patch("opendlp.entrypoints.celery.tasks.manage_old_tabs.delay")
     def test_delete_tabs_success(self, mock_celery, logged_in_admin, assembly_with_gsheet, postgres_session_factory):
         """Test POST request to start deletion task succeeds."""
         assembly, _ = assembly_with_gsheet
@@ -390,7 +390,7 @@ class TestCancelTaskRoutes:
             uow.commit()
 
         # POST to cancel endpoint
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke"):
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke"):
             response = logged_in_admin.post(f"/assemblies/{assembly.id}/gsheet_select/{task_id}/cancel")
 
         # Should redirect back to task page
@@ -456,7 +456,7 @@ class TestCancelTaskRoutes:
             uow.commit()
 
         # POST to cancel endpoint
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke"):
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke"):
             response = logged_in_admin.post(f"/assemblies/{assembly.id}/gsheet_replace/{task_id}/cancel")
 
         # Should redirect back to task page
@@ -487,7 +487,7 @@ class TestCancelTaskRoutes:
             uow.commit()
 
         # POST to cancel endpoint
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke"):
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke"):
             response = logged_in_admin.post(f"/assemblies/{assembly.id}/gsheet_manage_tabs/{task_id}/cancel")
 
         # Should redirect back to task page
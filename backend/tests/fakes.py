@@ -2,7 +2,7 @@
 ABOUTME: In-memory repositories that implement the same interfaces as real ones"""
 
 import uuid
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
 from datetime import datetime
 from typing import Any
 
@@ -13,8 +13,12 @@ from opendlp.domain.email_confirmation import EmailConfirmationToken
 from opendlp.domain.email_send_record import RespondentEmailSendRecord
 from opendlp.domain.email_template import EmailTemplate
 from opendlp.domain.password_reset import PasswordResetToken
-from opendlp.domain.registration_document import RegistrationDocument
-from opendlp.domain.registration_image import RegistrationImage
+from opendlp.domain.registration_document import RegistrationDocument, RegistrationDocumentSummary
+from opendlp.domain.registration_image import (
+    ImageVariantInfo,
+    RegistrationImage,
+    RegistrationImageSummary,
+)
 from opendlp.domain.registration_page import RegistrationPage, RegistrationPageHtml
 from opendlp.domain.respondent_field_schema import (
     GROUP_DISPLAY_ORDER,
@@ -24,6 +28,7 @@ from opendlp.domain.respondents import Respondent
 from opendlp.domain.targets import TargetCategory
 from opendlp.domain.totp_attempts import TotpVerificationAttempt
 from opendlp.domain.two_factor_audit import TwoFactorAuditLog
+from opendlp.domain.uploads import UPLOAD_CHUNK_BYTES, StoredUploadInfo
 from opendlp.domain.user_backup_codes import UserBackupCode
 from opendlp.domain.user_invites import UserInvite
 from opendlp.domain.users import User, UserAssemblyRole
@@ -44,6 +49,7 @@ from opendlp.service_layer.repositories import (
     PasswordResetTokenRepository,
     RegistrationDocumentRepository,
     RegistrationImageRepository,
+    RegistrationImageVariantRepository,
     RegistrationPageHtmlRepository,
     RegistrationPageRepository,
     RespondentEmailSendRecordRepository,
@@ -409,10 +415,30 @@ class FakeRegistrationImageRepository(FakeRepository, RegistrationImageRepositor
                 return item
         return None
 
-    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationImage]:
-        """Get all images for a registration page, oldest first."""
+    def get_info_by_assembly_and_sha(self, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+        """Get the metadata of a page's image by its content hash, without loading its bytes."""
+        for item in self._items:
+            if item.assembly_id == assembly_id and item.sha256 == sha256:
+                return StoredUploadInfo(
+                    id=item.id,
+                    sha256=item.sha256,
+                    byte_size=item.byte_size,
+                    original_filename=item.original_filename,
+                    in_blob_store=item.data is None,
+                )
+        return None
+
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of an image from ``offset`` on, in pieces of at most ``chunk_size``."""
+        item = self.get(item_id)
+        data = item.data if item else b""
+        for start in range(offset, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationImageSummary]:
+        """Get the metadata of all of an assembly's images, oldest first, without their bytes."""
         items = [item for item in self._items if item.assembly_id == assembly_id]
-        return sorted(items, key=lambda item: item.created_at)
+        return [item.summary() for item in sorted(items, key=lambda item: item.created_at)]
 
     def count_by_assembly_id(self, assembly_id: uuid.UUID) -> int:
         """Count images for a registration page."""
@@ -424,6 +450,38 @@ class FakeRegistrationImageRepository(FakeRepository, RegistrationImageRepositor
             self._items.remove(item)
 
 
+class FakeRegistrationImageVariantRepository(FakeRepository, RegistrationImageVariantRepository):
+    """Fake implementation of RegistrationImageVariantRepository.
+
+    Holds the store's image repository to find images without variants, as the SQL version joins the tables.
+    """
+
+    def __init__(self, images: FakeRegistrationImageRepository, items: list[Any] | None = None):
+        super().__init__(items)
+        self._images = images
+
+    def list_info_by_image_id(self, image_id: uuid.UUID) -> list[ImageVariantInfo]:
+        """Get the metadata of an image's variants, without their bytes."""
+        return [item.info() for item in self._items if item.image_id == image_id]
+
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of a variant from ``offset`` on, in pieces of at most ``chunk_size``."""
+        item = self.get(item_id)
+        data = item.data if item else b""
+        for start in range(offset, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    def list_image_ids_without_variants(self, created_before: datetime, limit: int) -> list[uuid.UUID]:
+        """Get the ids of up to ``limit`` images created before ``created_before`` with no variants, oldest first."""
+        with_variants = {item.image_id for item in self._items}
+        images = sorted(self._images.all(), key=lambda image: image.created_at)
+        return [
+            image.id
+            for image in images
+            if image.id not in with_variants and image.variants_failed_at is None and image.created_at < created_before
+        ][:limit]
+
+
 class FakeRegistrationDocumentRepository(FakeRepository, RegistrationDocumentRepository):
     """Fake implementation of RegistrationDocumentRepository."""
 
@@ -434,10 +492,30 @@ class FakeRegistrationDocumentRepository(FakeRepository, RegistrationDocumentRep
                 return item
         return None
 
-    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationDocument]:
-        """Get all documents for a registration page, oldest first."""
+    def get_info_by_assembly_and_sha(self, assembly_id: uuid.UUID, sha256: str) -> StoredUploadInfo | None:
+        """Get the metadata of a page's document by its content hash, without loading its bytes."""
+        for item in self._items:
+            if item.assembly_id == assembly_id and item.sha256 == sha256:
+                return StoredUploadInfo(
+                    id=item.id,
+                    sha256=item.sha256,
+                    byte_size=item.byte_size,
+                    original_filename=item.original_filename,
+                    in_blob_store=item.data is None,
+                )
+        return None
+
+    def iter_data(self, item_id: uuid.UUID, chunk_size: int = UPLOAD_CHUNK_BYTES, offset: int = 0) -> Iterator[bytes]:
+        """Yield the stored bytes of a document from ``offset`` on, in pieces of at most ``chunk_size``."""
+        item = self.get(item_id)
+        data = item.data if item else b""
+        for start in range(offset, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+
+    def list_by_assembly_id(self, assembly_id: uuid.UUID) -> list[RegistrationDocumentSummary]:
+        """Get the metadata of all of an assembly's documents, oldest first, without their bytes."""
         items = [item for item in self._items if item.assembly_id == assembly_id]
-        return sorted(items, key=lambda item: item.created_at)
+        return [item.summary() for item in sorted(items, key=lambda item: item.created_at)]
 
     def count_by_assembly_id(self, assembly_id: uuid.UUID) -> int:
         """Count documents for a registration page."""
@@ -549,6 +627,12 @@ class FakeSelectionRunRecordRepository(FakeRepository, SelectionRunRecordReposit
         # Return tuples of (record, None) to match the real repository signature
         return [(record, None) for record in page_records], total_count
 
+    def get_timed_runs(self, limit: int = 1000) -> list[SelectionRunRecord]:
+        """Get up to ``limit`` completed runs with a recorded pool size, newest first."""
+        timed = [item for item in self._items if item.is_completed and item.pool_size is not None]
+        timed.sort(key=lambda r: r.created_at or datetime.min, reverse=True)
+        return timed[:limit]
+
 
 class FakeUserBackupCodeRepository(FakeRepository, UserBackupCodeRepository):
     """Fake implementation of UserBackupCodeRepository."""
@@ -679,6 +763,9 @@ class FakeTargetCategoryRepository(FakeRepository, TargetCategoryRepository):
     def delete(self, item: TargetCategory) -> None:
         self._items = [c for c in self._items if c.id != item.id]
 
+    def bulk_add(self, items: list[TargetCategory]) -> None:
+        self._items.extend(items)
+
     def delete_all_for_assembly(self, assembly_id: uuid.UUID) -> int:
         before = len(self._items)
         self._items = [c for c in self._items if c.assembly_id != assembly_id]
@@ -912,6 +999,7 @@ _REPO_NAMES = (
     "registration_pages",
     "registration_page_html_sources",
     "registration_images",
+    "registration_image_variants",
     "registration_documents",
     "email_templates",
     "respondent_email_send_records",
@@ -946,6 +1034,7 @@ class FakeStore:
         self.registration_pages = FakeRegistrationPageRepository()
         self.registration_page_html_sources = FakeRegistrationPageHtmlRepository()
         self.registration_images = FakeRegistrationImageRepository()
+        self.registration_image_variants = FakeRegistrationImageVariantRepository(images=self.registration_images)
         self.registration_documents = FakeRegistrationDocumentRepository()
         self.email_templates = FakeEmailTemplateRepository()
         self.respondent_email_send_records = FakeRespondentEmailSendRecordRepository()
@@ -1151,3 +1240,35 @@ class FakeGSheetExportTarget(AbstractGSheetExportTarget):
         if self._error is not None:
             raise self._error
         self.writes.append((title, table))
+        if self.on_progress is not None:
+            self.on_progress(len(table.rows), len(table.rows))
+
+
+class FakeMetricsRedis:
+    """Just enough of the Redis client for the hashes and queue lengths behind /metrics."""
+
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.lists: dict[str, int] = {}
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, "0")) + amount)
+        return int(fields[field])
+
+    def hincrbyfloat(self, key: str, field: str, amount: float = 1.0) -> float:
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(float(fields.get(field, "0")) + amount)
+        return float(fields[field])
+
+    def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.hashes.get(key, {}))
+
+    def llen(self, key: str) -> int:
+        return self.lists.get(key, 0)
+
+    def pipeline(self, transaction: bool = True) -> "FakeMetricsRedis":
+        return self
+
+    def execute(self) -> list[Any]:
+        return []
@@ -496,6 +496,88 @@ class TestDeleteTargetValue:
             assembly_service.delete_target_value(uow2, admin_user.id, test_assembly.id, category.id, uuid.uuid4())
 
 
+class TestApplyTargetValueChanges:
+    def _seed_categories(self, admin_user: User, test_assembly: Assembly, postgres_session_factory):
+        uow = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow:
+            assembly_service.import_targets_from_csv(
+                uow=uow,
+                user_id=admin_user.id,
+                assembly_id=test_assembly.id,
+                csv_content="feature,value,min,max\nGender,Male,3,7\nGender,Female,3,7\nAge,Young,2,5\n",
+            )
+        uow2 = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow2:
+            return {
+                c.name: c.create_detached_copy() for c in uow2.target_categories.get_by_assembly_id(test_assembly.id)
+            }
+
+    def test_applies_every_change(self, admin_user: User, test_assembly: Assembly, postgres_session_factory):
+        categories = self._seed_categories(admin_user, test_assembly, postgres_session_factory)
+        gender, age = categories["Gender"], categories["Age"]
+        male, female = gender.values
+
+        uow = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow:
+            assembly_service.apply_target_value_changes(
+                uow,
+                admin_user.id,
+                test_assembly.id,
+                [
+                    assembly_service.TargetValueChange(
+                        category_id=gender.id, value_id=male.value_id, value="Male", min_count=4, max_count=8
+                    ),
+                    assembly_service.TargetValueChange(category_id=gender.id, value_id=female.value_id, delete=True),
+                    assembly_service.TargetValueChange(category_id=age.id, value="Old", min_count=1, max_count=3),
+                ],
+            )
+
+        uow2 = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow2:
+            saved = {c.name: c for c in uow2.target_categories.get_by_assembly_id(test_assembly.id)}
+            assert [(v.value, v.min, v.max) for v in saved["Gender"].values] == [("Male", 4, 8)]
+            assert [v.value for v in saved["Age"].values] == ["Young", "Old"]
+
+    def test_one_rejected_change_saves_none(self, admin_user: User, test_assembly: Assembly, postgres_session_factory):
+        categories = self._seed_categories(admin_user, test_assembly, postgres_session_factory)
+        gender, age = categories["Gender"], categories["Age"]
+        male = gender.values[0]
+
+        uow = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow, pytest.raises(ValueError, match="already exists"):
+            assembly_service.apply_target_value_changes(
+                uow,
+                admin_user.id,
+                test_assembly.id,
+                [
+                    assembly_service.TargetValueChange(
+                        category_id=gender.id, value_id=male.value_id, value="Male", min_count=4, max_count=8
+                    ),
+                    assembly_service.TargetValueChange(category_id=age.id, value="Young", min_count=1, max_count=3),
+                ],
+            )
+
+        uow2 = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow2:
+            saved = uow2.target_categories.get(gender.id)
+            assert saved is not None
+            assert next(v for v in saved.values if v.value == "Male").min == 3
+
+    def test_category_of_another_assembly_is_not_found(
+        self, admin_user: User, test_assembly: Assembly, other_assembly: Assembly, postgres_session_factory
+    ):
+        categories = self._seed_categories(admin_user, test_assembly, postgres_session_factory)
+
+        uow = SqlAlchemyUnitOfWork(postgres_session_factory)
+        with uow, pytest.raises(NotFoundError):
+            assembly_service.apply_target_value_changes(
+                uow,
+                admin_user.id,
+                other_assembly.id,
+                [assembly_service.TargetValueChange(category_id=categories["Age"].id, value="Old", max_count=1)],
+            )
+
+
 class TestDeleteTargetsForAssembly:
     def test_delete_all_targets(self, admin_user: User, test_assembly: Assembly, postgres_session_factory):
         """Test deleting all target categories for an assembly."""
@@ -0,0 +1,110 @@
+"""ABOUTME: Integration tests for `opendlp blobs migrate|restore|prune` against PostgreSQL
+ABOUTME: Moves image and document bytes between their tables and a filesystem blob store in tmp_path"""
+
+import hashlib
+import os
+import time
+
+import pytest
+from sqlalchemy import select
+
+from opendlp.adapters import orm
+from opendlp.adapters.blob_store import DOCUMENTS, IMAGES, FilesystemBlobStore
+from opendlp.domain.assembly import Assembly
+from opendlp.domain.registration_document import RegistrationDocument
+from opendlp.domain.registration_image import RegistrationImage
+from opendlp.entrypoints.cli import cli
+from opendlp.service_layer.unit_of_work import SqlAlchemyUnitOfWork
+
+IMAGE_BYTES = b"\x89PNG image bytes"
+DOCUMENT_BYTES = b"%PDF-1.7 document bytes"
+
+
+@pytest.fixture
+def blob_store(monkeypatch: pytest.MonkeyPatch, tmp_path) -> FilesystemBlobStore:
+    monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path))
+    return FilesystemBlobStore(tmp_path)
+
+
+def _seed(session_factory) -> tuple[RegistrationImage, RegistrationDocument]:
+    with SqlAlchemyUnitOfWork(session_factory) as uow:
+        assembly = Assembly(title="Blob assembly", question="Test question?")
+        uow.assemblies.add(assembly)
+        uow.session.flush()
+        image = RegistrationImage(
+            assembly_id=assembly.id,
+            byte_size=len(IMAGE_BYTES),
+            width=1,
+            height=1,
+            sha256=hashlib.sha256(IMAGE_BYTES).hexdigest(),
+            data=IMAGE_BYTES,
+        )
+        document = RegistrationDocument(
+            assembly_id=assembly.id,
+            byte_size=len(DOCUMENT_BYTES),
+            sha256=hashlib.sha256(DOCUMENT_BYTES).hexdigest(),
+            data=DOCUMENT_BYTES,
+        )
+        uow.registration_images.add(image)
+        uow.registration_documents.add(document)
+        uow.commit()
+        return image.create_detached_copy(), document.create_detached_copy()
+
+
+def _column(session_factory, table, item_id) -> bytes | None:
+    with session_factory() as session:
+        return session.execute(select(table.c.data).where(table.c.id == item_id)).scalar_one()
+
+
+class TestBlobsCli:
+    def test_migrate_moves_bytes_out_of_the_tables(
+        self, postgres_session_factory, cli_with_session_factory, blob_store
+    ) -> None:
+        image, document = _seed(postgres_session_factory)
+
+        result = cli_with_session_factory(cli, ["blobs", "migrate"])
+
+        assert result.exit_code == 0, result.output
+        assert "1 images, 1 documents" in result.output
+        assert _column(postgres_session_factory, orm.registration_images, image.id) is None
+        assert _column(postgres_session_factory, orm.registration_documents, document.id) is None
+        assert b"".join(blob_store.iter_chunks(IMAGES, image.sha256)) == IMAGE_BYTES
+        assert b"".join(blob_store.iter_chunks(DOCUMENTS, document.sha256)) == DOCUMENT_BYTES
+
+    def test_restore_puts_the_bytes_back(self, postgres_session_factory, cli_with_session_factory, blob_store) -> None:
+        image, document = _seed(postgres_session_factory)
+        cli_with_session_factory(cli, ["blobs", "migrate"])
+
+        result = cli_with_session_factory(cli, ["blobs", "restore"])
+
+        assert result.exit_code == 0, result.output
+        assert _column(postgres_session_factory, orm.registration_images, image.id) == IMAGE_BYTES
+        assert _column(postgres_session_factory, orm.registration_documents, document.id) == DOCUMENT_BYTES
+
+    def test_prune_keeps_referenced_and_recent_blobs(
+        self, postgres_session_factory, cli_with_session_factory, blob_store
+    ) -> None:
+        image, _document = _seed(postgres_session_factory)
+        cli_with_session_factory(cli, ["blobs", "migrate"])
+        orphan = hashlib.sha256(b"deleted image").hexdigest()
+        recent = hashlib.sha256(b"upload in progress").hexdigest()
+        blob_store.put(IMAGES, orphan, b"deleted image")
+        blob_store.put(IMAGES, recent, b"upload in progress")
+        two_hours_ago = time.time() - 7200
+        for sha256 in (orphan, image.sha256):
+            os.utime(blob_store.path(IMAGES, sha256), (two_hours_ago, two_hours_ago))
+
+        result = cli_with_session_factory(cli, ["blobs", "prune"])
+
+        assert result.exit_code == 0, result.output
+        assert not blob_store.exists(IMAGES, orphan)
+        assert blob_store.exists(IMAGES, recent)
+        assert blob_store.exists(IMAGES, image.sha256)
+
+    def test_needs_a_blob_store_path(self, cli_with_session_factory, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("BLOB_STORE_PATH", raising=False)
+
+        result = cli_with_session_factory(cli, ["blobs", "migrate"])
+
+        assert result.exit_code != 0
+        assert "BLOB_STORE_PATH" in result.output
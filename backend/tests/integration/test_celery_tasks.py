@@ -724,6 +724,7 @@ class TestManageOldTabsTask:
             assert updated_record is not None
             assert updated_record.status == SelectionRunStatus.COMPLETED
             assert any("Successfully deleted 2 old output tab(s)" in msg for msg in updated_record.log_messages)
+            assert "Deleted tab Remaining - output - 2024-01-01" in updated_record.log_messages
 
     def test_manage_old_tabs_empty_list(self, postgres_session_factory, csv_gsheet_data_source):
         """Test managing old tabs when there are none."""
@@ -925,7 +926,7 @@ class TestCleanupOrphanedTasks:
             uow.commit()
 
         # Mock Celery AsyncResult to simulate dead task
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
 
             def mock_result_factory(celery_task_id):
                 mock_result = Mock()
@@ -5,6 +5,7 @@ import uuid
 
 import pytest
 
+from opendlp.adapters import database
 from opendlp.domain.assembly import Assembly
 from opendlp.domain.users import User
 from opendlp.domain.value_objects import AssemblyRole, GlobalRole, RespondentStatus
@@ -413,6 +414,20 @@ NB002,Male"""
         with pytest.raises(InsufficientPermissions):
             respondent_service.get_respondents_for_assembly(uow, user_id, test_assembly.id)
 
+    def test_paginated_listing_query_count_does_not_grow_with_rows(
+        self, uow, admin_user: User, test_assembly: Assembly
+    ):
+        """Listing a page of respondents must not issue a query per respondent."""
+        csv_content = "external_id,Gender\n" + "\n".join(f"NB{i:03},Female" for i in range(30))
+        respondent_service.import_respondents_from_csv(uow, admin_user.id, test_assembly.id, csv_content)
+
+        with database.track_queries() as two:
+            respondent_service.get_respondents_for_assembly_paginated(uow, admin_user.id, test_assembly.id, per_page=2)
+        with database.track_queries() as thirty:
+            respondent_service.get_respondents_for_assembly_paginated(uow, admin_user.id, test_assembly.id, per_page=30)
+
+        assert thirty.count == two.count
+
 
 class TestTransitionRespondentStatus:
     def _create(self, uow, admin_user, assembly, status=RespondentStatus.POOL):
@@ -2,12 +2,16 @@
 ABOUTME: Tests _internal_load_db, _internal_write_db_results, and generate_selection_csvs with a real database"""
 
 import uuid
-from unittest.mock import patch
+from typing import Any
+from unittest.mock import MagicMock, patch
 
 import pytest
+from sortition_algorithms import adapters
 from sortition_algorithms.settings import Settings
 
 from opendlp import config
+from opendlp.adapters.selection_data_cache import bump_data_versions, get_data_version, share_selection_data
+from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
 from opendlp.bootstrap import bootstrap
 from opendlp.domain.assembly import Assembly, SelectionRunRecord
 from opendlp.domain.respondents import Respondent
@@ -18,10 +22,14 @@ from opendlp.entrypoints.celery.tasks import (
     _internal_load_db,
     _internal_run_select,
     _internal_write_db_results,
+    finish_stability_analysis,
     run_select_from_db,
+    run_stability_analysis_from_db,
+    run_stability_sample,
+    settings_to_payload,
 )
 from opendlp.service_layer.sortition import generate_selection_csvs
-from opendlp.service_layer.unit_of_work import SqlAlchemyUnitOfWork
+from opendlp.service_layer.unit_of_work import ReadOnlySqlAlchemyUnitOfWork, SqlAlchemyUnitOfWork
 
 
 @pytest.fixture
@@ -83,6 +91,46 @@ def assembly_with_data(postgres_session_factory):
     return assembly_id
 
 
+class _FakeRedis:
+    """Just enough of Redis for the data a stability analysis shares between its tasks."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+    def pipeline(self, transaction: bool = True) -> "_FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+
+@pytest.fixture
+def shared_redis():
+    redis = _FakeRedis()
+    with patch("opendlp.adapters.selection_data_cache._get_redis", return_value=redis):
+        yield redis
+
+
+def _share_data(assembly_id: uuid.UUID, test_settings: Settings, postgres_session_factory) -> str:
+    """Share the assembly's data as run_stability_analysis_from_db does, returning its version."""
+    data_version = get_data_version(assembly_id)
+    with bootstrap(session_factory=postgres_session_factory) as uow:
+        select_data = adapters.SelectionData(OpenDLPDataAdapter(uow, assembly_id))
+        features, _features_report = select_data.load_features()
+        loaded_people, _people_report = select_data.load_people(test_settings, features)
+    share_selection_data(assembly_id, data_version, test_settings, features, loaded_people, ttl_seconds=60)
+    return data_version
+
+
 def _make_run_record(assembly_id: uuid.UUID, postgres_session_factory) -> uuid.UUID:
     """Create a SelectionRunRecord in the DB and return its task_id."""
     task_id = uuid.uuid4()
@@ -192,6 +240,8 @@ class TestInternalWriteDbResults:
             record = uow.selection_run_records.get_by_task_id(task_id)
             assert record is not None
             assert record.status == SelectionRunStatus.COMPLETED
+            assert record.selected_ids is not None
+            assert [len(panel) for panel in record.selected_ids] == [2]
             assert record.remaining_ids is not None
             assert len(record.remaining_ids) == 2
 
@@ -254,6 +304,46 @@ class TestGenerateSelectionCsvs:
             all_ids.add(line.split(",")[0])
         assert all_ids == {"NB001", "NB002", "NB003", "NB004"}
 
+    def test_generates_csvs_through_read_only_uow(self, postgres_session_factory, assembly_with_data, test_settings):
+        """The download routes use a read-only UnitOfWork; generating the CSVs must not write."""
+        assembly_id = assembly_with_data
+        task_id = _make_run_record(assembly_id, postgres_session_factory)
+        success, features, loaded_people, _ = _internal_load_db(
+            task_id=task_id,
+            assembly_id=assembly_id,
+            settings=test_settings,
+            final_task=False,
+            session_factory=postgres_session_factory,
+        )
+        assert success and features is not None and loaded_people is not None
+        success, selected_panels, _ = _internal_run_select(
+            task_id=task_id,
+            features=features,
+            people=loaded_people,
+            settings=test_settings,
+            number_people_wanted=2,
+            test_selection=False,
+            final_task=False,
+            session_factory=postgres_session_factory,
+        )
+        assert success
+        _internal_write_db_results(
+            task_id=task_id,
+            assembly_id=assembly_id,
+            full_people=loaded_people,
+            selected_panels=selected_panels,
+            session_factory=postgres_session_factory,
+        )
+
+        with ReadOnlySqlAlchemyUnitOfWork(postgres_session_factory) as uow:
+            selected_csv, _remaining_csv = generate_selection_csvs(uow, assembly_id, task_id)
+
+        assert len([line for line in selected_csv.strip().split("\n") if line]) == 3
+        with SqlAlchemyUnitOfWork(postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            assert "csv_generation" not in record.phase_timings
+
     def test_includes_deleted_respondents_with_blanked_values(
         self, postgres_session_factory, assembly_with_data, test_settings
     ):
@@ -321,18 +411,17 @@ class TestRunSelectFromDb:
         task_id = _make_run_record(assembly_id, postgres_session_factory)
 
         with patch.object(run_select_from_db, "update_state"):
-            success, selected_panels, _ = run_select_from_db(
+            success = run_select_from_db(
                 task_id=task_id,
                 assembly_id=assembly_id,
                 number_people_wanted=2,
-                settings=test_settings,
+                settings=settings_to_payload(test_settings),
                 test_selection=False,
                 session_factory=postgres_session_factory,
             )
 
+        # the outcome lives on the run record - the Celery result is just the flag
         assert success is True
-        assert len(selected_panels) == 1
-        assert len(selected_panels[0]) == 2
 
         # Verify respondent statuses updated
         with bootstrap(session_factory=postgres_session_factory) as uow:
@@ -345,5 +434,161 @@ class TestRunSelectFromDb:
             record = uow.selection_run_records.get_by_task_id(task_id)
             assert record is not None
             assert record.status == SelectionRunStatus.COMPLETED
+            assert record.selected_ids is not None
+            assert [len(panel) for panel in record.selected_ids] == [2]
             assert record.remaining_ids is not None
             assert len(record.remaining_ids) == 2
+            assert set(record.phase_timings) == {"load_targets", "load_people", "select", "write_database"}
+            assert record.pool_size == 4
+            assert record.category_count == 1
+            assert record.selection_algorithm == test_settings.selection_algorithm
+
+
+@pytest.mark.usefixtures("shared_redis")
+class TestStabilityAnalysis:
+    def test_dispatches_one_sample_per_run(self, postgres_session_factory, assembly_with_data, test_settings):
+        assembly_id = assembly_with_data
+        task_id = _make_run_record(assembly_id, postgres_session_factory)
+
+        with (
+            patch.object(run_stability_analysis_from_db, "update_state"),
+            patch("opendlp.entrypoints.celery.tasks.chord") as mock_chord,
+        ):
+            header = MagicMock(results=[MagicMock(id=f"sample-{n}") for n in range(3)])
+            mock_chord.return_value.return_value = MagicMock(id="callback", parent=header)
+            success = run_stability_analysis_from_db(
+                task_id=task_id,
+                assembly_id=assembly_id,
+                number_people_wanted=2,
+                settings=settings_to_payload(test_settings),
+                num_runs=3,
+                session_factory=postgres_session_factory,
+            )
+
+        assert success is True
+        header = list(mock_chord.call_args.args[0])
+        assert len(header) == 3
+        assert header[0].kwargs["task_id"] == task_id
+        # samples are sent the assembly id and data version to reload from, not the loaded respondents
+        assert header[0].kwargs["assembly_id"] == assembly_id
+        assert header[0].kwargs["data_version"] == get_data_version(assembly_id)
+        assert "people" not in header[0].kwargs
+        # stored so that cancelling the run revokes the samples and callback too
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            assert record.child_celery_task_ids == ["sample-0", "sample-1", "sample-2", "callback"]
+
+    def test_samples_and_aggregation_write_the_report(
+        self, postgres_session_factory, assembly_with_data, test_settings
+    ):
+        assembly_id = assembly_with_data
+        task_id = _make_run_record(assembly_id, postgres_session_factory)
+        sample_kwargs = {
+            "task_id": task_id,
+            "assembly_id": assembly_id,
+            "settings": settings_to_payload(test_settings),
+            "number_people_wanted": 2,
+            "data_version": _share_data(assembly_id, test_settings, postgres_session_factory),
+            "session_factory": postgres_session_factory,
+        }
+
+        samples = [run_stability_sample(**sample_kwargs) for _ in range(3)]
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            # the samples leave the shared record alone; the callback writes their output
+            assert record.status == SelectionRunStatus.PENDING
+            assert record.phase_timings == {}
+        success = finish_stability_analysis(samples, num_runs=3, **sample_kwargs)
+
+        assert success is True
+        assert all(len(sample["panels"]) == 1 for sample in samples)
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            assert record.status == SelectionRunStatus.COMPLETED
+            assert set(record.phase_timings) == {"select"}
+            started = [line for line in record.log_messages if line.startswith("Starting selection algorithm")]
+            assert len(started) == 3
+            # test selections never mark respondents as selected
+            assert not record.selected_ids
+            all_resp = uow.respondents.get_by_assembly_id(assembly_id)
+            assert all(r.selection_status == RespondentStatus.POOL for r in all_resp)
+
+    def test_cancelled_run_stays_cancelled(self, postgres_session_factory, assembly_with_data, test_settings):
+        assembly_id = assembly_with_data
+        task_id = _make_run_record(assembly_id, postgres_session_factory)
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            record.status = SelectionRunStatus.CANCELLED
+            uow.commit()
+        sample_kwargs = {
+            "task_id": task_id,
+            "assembly_id": assembly_id,
+            "settings": settings_to_payload(test_settings),
+            "number_people_wanted": 2,
+            "session_factory": postgres_session_factory,
+        }
+
+        sample = run_stability_sample(**sample_kwargs)
+        success = finish_stability_analysis([sample], num_runs=1, **sample_kwargs)
+
+        assert success is False
+        assert sample["panels"] == []
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            assert record.status == SelectionRunStatus.CANCELLED
+
+    def test_edit_during_the_analysis_fails_it(self, postgres_session_factory, assembly_with_data, test_settings):
+        assembly_id = assembly_with_data
+        task_id = _make_run_record(assembly_id, postgres_session_factory)
+        sample_kwargs = {
+            "task_id": task_id,
+            "assembly_id": assembly_id,
+            "settings": settings_to_payload(test_settings),
+            "number_people_wanted": 2,
+            "data_version": _share_data(assembly_id, test_settings, postgres_session_factory),
+            "session_factory": postgres_session_factory,
+        }
+        bump_data_versions([assembly_id])
+
+        sample = run_stability_sample(**sample_kwargs)
+        success = finish_stability_analysis([sample], num_runs=1, **sample_kwargs)
+
+        assert success is False
+        assert sample["panels"] == []
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            assert record.status == SelectionRunStatus.FAILED
+            assert "edited" in record.error_message
+
+    def test_expired_data_fails_the_analysis(
+        self, postgres_session_factory, assembly_with_data, test_settings, shared_redis
+    ):
+        assembly_id = assembly_with_data
+        task_id = _make_run_record(assembly_id, postgres_session_factory)
+        data_version = _share_data(assembly_id, test_settings, postgres_session_factory)
+        for key in [key for key in shared_redis.store if ":shared:" in key]:
+            del shared_redis.store[key]
+
+        success = finish_stability_analysis(
+            [],
+            task_id=task_id,
+            assembly_id=assembly_id,
+            settings=settings_to_payload(test_settings),
+            number_people_wanted=2,
+            num_runs=1,
+            data_version=data_version,
+            session_factory=postgres_session_factory,
+        )
+
+        assert success is False
+        with bootstrap(session_factory=postgres_session_factory) as uow:
+            record = uow.selection_run_records.get_by_task_id(task_id)
+            assert record is not None
+            assert record.status == SelectionRunStatus.FAILED
+            assert "expired" in record.error_message
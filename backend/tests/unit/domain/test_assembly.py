@@ -337,3 +337,46 @@ class TestSelectionRunRecordTargetsUsed:
 
         assert copy.targets_used == snapshot
         assert copy.targets_used is not record.targets_used
+
+
+class TestSelectionRunRecordPhaseTimings:
+    def _record(self) -> SelectionRunRecord:
+        return SelectionRunRecord(
+            assembly_id=uuid.uuid4(),
+            task_id=uuid.uuid4(),
+            status=SelectionRunStatus.RUNNING,
+            task_type=SelectionTaskType.SELECT_FROM_DB,
+        )
+
+    def test_no_timings_by_default(self):
+        record = self._record()
+        assert record.timings == []
+        assert record.total_wall_seconds is None
+
+    def test_timings_keep_the_order_phases_ran_in(self):
+        record = self._record()
+        record.add_phase_timing("load_people", 1.5, 1.25)
+        record.add_phase_timing("select", 10.0, 30.0)
+
+        assert [(t.phase, t.wall_seconds, t.cpu_seconds) for t in record.timings] == [
+            ("load_people", 1.5, 1.25),
+            ("select", 10.0, 30.0),
+        ]
+        assert record.timings[0].label == "Load people"
+        assert record.total_wall_seconds == 11.5
+
+    def test_repeated_phase_adds_up(self):
+        record = self._record()
+        record.add_phase_timing("select", 2.0, 3.0)
+        record.add_phase_timing("select", 1.0, 1.0)
+
+        assert record.phase_timings["select"] == {"wall_seconds": 3.0, "cpu_seconds": 4.0}
+
+    def test_replace_drops_the_earlier_time(self):
+        record = self._record()
+        record.add_phase_timing("csv_generation", 2.0, 2.0)
+        record.add_phase_timing("select", 1.0, 1.0)
+        record.add_phase_timing("csv_generation", 0.5, 0.5, replace=True)
+
+        assert record.phase_timings["csv_generation"] == {"wall_seconds": 0.5, "cpu_seconds": 0.5}
+        assert [t.phase for t in record.timings] == ["select", "csv_generation"]
@@ -1,15 +1,19 @@
 """ABOUTME: Unit tests for the RegistrationImage domain model
-ABOUTME: Covers the value object, entity, and pure <img> HTML generation"""
+ABOUTME: Covers the value object, entity, variant choice and pure <img> HTML generation"""
 
 import uuid
 
 from opendlp.domain.registration_image import (
     IMAGE_CONTENT_TYPE,
     MAX_ORIGINAL_FILENAME_LENGTH,
+    ImageVariantInfo,
     ProcessedImage,
     RegistrationImage,
+    choose_variant,
     generate_image_html,
+    image_srcset,
     sanitise_original_filename,
+    variant_sizes,
 )
 
 
@@ -117,3 +121,70 @@ class TestGenerateImageHtml:
         html = generate_image_html('/x.png" onerror="alert(1)')
         assert 'onerror="alert(1)"' not in html
         assert "&quot;" in html
+
+    def test_srcset_and_sizes(self):
+        html = generate_image_html("/x.png", alt="Logo", srcset="/x.png?w=320 320w, /x.png 800w")
+        assert html == '<img src="/x.png" srcset="/x.png?w=320 320w, /x.png 800w" sizes="100vw" alt="Logo">'
+
+
+class TestImageSrcset:
+    def test_offers_each_narrower_width_then_the_original(self):
+        assert image_srcset("/x.png", 1200) == "/x.png?w=320 320w, /x.png?w=640 640w, /x.png?w=1024 1024w, /x.png 1200w"
+
+    def test_empty_for_a_small_image(self):
+        assert image_srcset("/x.png", 300) == ""
+
+
+class TestVariantSizes:
+    def test_webp_at_every_width_png_only_below_the_original(self):
+        assert variant_sizes(700) == [("webp", 320), ("webp", 640), ("webp", 700), ("png", 320), ("png", 640)]
+
+    def test_small_image_gets_a_full_width_webp_only(self):
+        assert variant_sizes(200) == [("webp", 200)]
+
+
+def _info(image_format: str, width: int, byte_size: int) -> ImageVariantInfo:
+    return ImageVariantInfo(
+        id=uuid.uuid4(), image_format=image_format, width=width, byte_size=byte_size, sha256="0" * 64
+    )
+
+
+class TestChooseVariant:
+    VARIANTS = (
+        _info("webp", 320, 100),
+        _info("webp", 640, 300),
+        _info("webp", 1200, 900),
+        _info("png", 320, 400),
+        _info("png", 640, 1200),
+    )
+
+    def _choose(self, requested_width=None, accepts_webp=True, original_byte_size=5000):
+        return choose_variant(
+            self.VARIANTS,
+            original_width=1200,
+            original_byte_size=original_byte_size,
+            requested_width=requested_width,
+            accepts_webp=accepts_webp,
+        )
+
+    def test_smallest_width_covering_the_request(self):
+        chosen = self._choose(requested_width=500)
+        assert (chosen.image_format, chosen.width) == ("webp", 640)
+
+    def test_full_width_webp_without_a_hint(self):
+        chosen = self._choose()
+        assert (chosen.image_format, chosen.width) == ("webp", 1200)
+
+    def test_png_when_webp_is_not_accepted(self):
+        chosen = self._choose(requested_width=300, accepts_webp=False)
+        assert (chosen.image_format, chosen.width) == ("png", 320)
+
+    def test_original_when_nothing_is_wide_enough(self):
+        assert self._choose(requested_width=900, accepts_webp=False) is None
+
+    def test_original_when_it_is_already_smaller(self):
+        assert self._choose(requested_width=300, original_byte_size=50) is None
+
+    def test_requests_wider_than_the_original_are_capped(self):
+        chosen = self._choose(requested_width=4000)
+        assert chosen.width == 1200
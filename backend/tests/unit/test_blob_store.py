@@ -0,0 +1,134 @@
+"""ABOUTME: Unit tests for the filesystem blob store of registration images and documents
+ABOUTME: Covers content-addressed paths, atomic idempotent writes, chunked reads, pruning ages and sendfile headers"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from opendlp.adapters.blob_store import (
+    DOCUMENTS,
+    IMAGES,
+    BlobStoreError,
+    FilesystemBlobStore,
+    get_blob_store,
+)
+
+DATA = b"%PDF-1.7 some document bytes"
+SHA = hashlib.sha256(DATA).hexdigest()
+
+
+class TestFilesystemBlobStore:
+    def test_put_writes_under_kind_and_hash_prefix(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+
+        store.put(DOCUMENTS, SHA, DATA)
+
+        path = tmp_path / "documents" / SHA[:2] / SHA
+        assert path.read_bytes() == DATA
+        assert path.stat().st_mode & 0o777 == 0o644
+        assert [p.name for p in path.parent.iterdir()] == [SHA]  # no temp file left behind
+
+    def test_put_of_existing_hash_keeps_the_first_file(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+        store.put(IMAGES, SHA, DATA)
+
+        store.put(IMAGES, SHA, b"something else")
+
+        assert b"".join(store.iter_chunks(IMAGES, SHA)) == DATA
+
+    def test_iter_chunks_reads_in_pieces(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+        store.put(IMAGES, SHA, DATA)
+
+        chunks = list(store.iter_chunks(IMAGES, SHA, chunk_size=8))
+
+        assert b"".join(chunks) == DATA
+        assert max(len(chunk) for chunk in chunks) == 8
+
+    def test_iter_chunks_from_an_offset(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+        store.put(IMAGES, SHA, DATA)
+
+        assert b"".join(store.iter_chunks(IMAGES, SHA, offset=5)) == DATA[5:]
+
+    def test_missing_blob_raises(self, tmp_path: Path) -> None:
+        with pytest.raises(BlobStoreError):
+            list(FilesystemBlobStore(tmp_path).iter_chunks(IMAGES, SHA))
+
+    @pytest.mark.parametrize(("kind", "sha256"), [(IMAGES, "../../etc/passwd"), (IMAGES, SHA.upper()), ("css", SHA)])
+    def test_rejects_keys_that_are_not_a_kind_and_hash(self, tmp_path: Path, kind: str, sha256: str) -> None:
+        with pytest.raises(ValueError, match="Not a blob key"):
+            FilesystemBlobStore(tmp_path).put(kind, sha256, DATA)
+
+    def test_delete_is_idempotent(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+        store.put(IMAGES, SHA, DATA)
+
+        store.delete(IMAGES, SHA)
+        store.delete(IMAGES, SHA)
+
+        assert not store.exists(IMAGES, SHA)
+
+    def test_list_hashes_leaves_out_recent_blobs(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+        old_sha = hashlib.sha256(b"old").hexdigest()
+        store.put(IMAGES, old_sha, b"old")
+        store.put(IMAGES, SHA, DATA)
+        an_hour_ago = time.time() - 3601
+        os.utime(store.path(IMAGES, old_sha), (an_hour_ago, an_hour_ago))
+
+        assert store.list_hashes(IMAGES) == sorted([old_sha, SHA])
+        assert store.list_hashes(IMAGES, older_than_seconds=3600) == [old_sha]
+        assert store.list_hashes(DOCUMENTS) == []
+
+    def test_putting_an_existing_blob_again_makes_it_recent(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path)
+        store.put(IMAGES, SHA, DATA)
+        an_hour_ago = time.time() - 3601
+        os.utime(store.path(IMAGES, SHA), (an_hour_ago, an_hour_ago))
+
+        store.put(IMAGES, SHA, DATA)
+
+        assert store.list_hashes(IMAGES, older_than_seconds=3600) == []
+
+
+class TestSendfileHeaders:
+    def test_none_by_default(self, tmp_path: Path) -> None:
+        assert FilesystemBlobStore(tmp_path).sendfile_headers(IMAGES, SHA) == {}
+
+    def test_x_accel_redirect_points_at_the_internal_location(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path, sendfile_mode="x-accel-redirect", accel_redirect_prefix="/_blobs/")
+
+        assert store.sendfile_headers(IMAGES, SHA) == {"X-Accel-Redirect": f"/_blobs/images/{SHA[:2]}/{SHA}"}
+
+    def test_x_sendfile_gives_the_absolute_path(self, tmp_path: Path) -> None:
+        store = FilesystemBlobStore(tmp_path, sendfile_mode="x-sendfile")
+
+        assert store.sendfile_headers(DOCUMENTS, SHA) == {"X-Sendfile": str(tmp_path / "documents" / SHA[:2] / SHA)}
+
+
+class TestGetBlobStore:
+    def test_postgres_by_default(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.delenv("BLOB_STORE", raising=False)
+        assert get_blob_store() is None
+
+    def test_filesystem_needs_a_path(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("BLOB_STORE", "filesystem")
+        monkeypatch.delenv("BLOB_STORE_PATH", raising=False)
+        with pytest.raises(ValueError, match="BLOB_STORE_PATH"):
+            get_blob_store()
+
+    def test_filesystem_store_from_env(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+        monkeypatch.setenv("BLOB_STORE", "filesystem")
+        monkeypatch.setenv("BLOB_STORE_PATH", str(tmp_path))
+        monkeypatch.setenv("BLOB_SENDFILE", "x-accel-redirect")
+        monkeypatch.setenv("BLOB_ACCEL_REDIRECT_PREFIX", "/protected")
+
+        store = get_blob_store()
+
+        assert isinstance(store, FilesystemBlobStore)
+        assert store.root == tmp_path
+        assert store.sendfile_headers(IMAGES, SHA)["X-Accel-Redirect"].startswith("/protected/images/")
@@ -0,0 +1,98 @@
+"""ABOUTME: Unit tests for Celery queue routing and role-specific worker settings
+ABOUTME: Checks every task has a queue, solver tasks ack late, and `opendlp celery worker` builds the right arguments"""
+
+import pytest
+from click.testing import CliRunner
+
+from opendlp.entrypoints.celery import app as celery_app_module
+from opendlp.entrypoints.celery import tasks
+from opendlp.entrypoints.celery.app import (
+    GSHEET_IO_QUEUE,
+    HOUSEKEEPING_QUEUE,
+    QUEUES,
+    SOLVER_QUEUE,
+    TASK_QUEUES_BY_NAME,
+    worker_argv,
+)
+from opendlp.entrypoints.cli import cli
+
+
+def _routed_queue(task_name: str) -> str:
+    return tasks.app.amqp.router.route({}, task_name)["queue"].name
+
+
+class TestTaskRouting:
+    def test_every_task_has_a_queue(self) -> None:
+        task_names = {name for name in tasks.app.tasks if name.startswith("opendlp.")}
+        assert task_names
+        assert task_names == set(TASK_QUEUES_BY_NAME)
+
+    @pytest.mark.parametrize(
+        ("task", "queue"),
+        [
+            (tasks.run_select_from_db, SOLVER_QUEUE),
+            (tasks.run_stability_sample, SOLVER_QUEUE),
+            (tasks.load_gsheet, GSHEET_IO_QUEUE),
+            (tasks.manage_old_tabs, GSHEET_IO_QUEUE),
+            (tasks.cleanup_orphaned_tasks, HOUSEKEEPING_QUEUE),
+        ],
+    )
+    def test_routes_task_to_its_queue(self, task, queue: str) -> None:
+        assert _routed_queue(task.name) == queue
+
+    def test_a_plain_worker_consumes_every_queue(self) -> None:
+        assert {queue.name for queue in tasks.app.conf.task_queues} == set(QUEUES)
+
+    def test_long_solver_tasks_ack_late(self) -> None:
+        assert tasks.run_select_from_db.acks_late is True
+        assert tasks.run_select.acks_late is True
+        assert tasks.load_gsheet.acks_late is False
+
+    def test_database_backed_tasks_send_json(self) -> None:
+        for task in (
+            tasks.run_select_from_db,
+            tasks.run_stability_analysis_from_db,
+            tasks.run_stability_sample,
+            tasks.finish_stability_analysis,
+            tasks.check_targets,
+        ):
+            assert task.serializer == "json", task.name
+        # the gsheet tasks still carry data sources and loaded respondents
+        assert tasks.run_select.serializer == "pickle"
+
+    def test_redelivery_waits_longer_than_the_task_timeout(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setenv("TASK_TIMEOUT_HOURS", "6")
+        app = celery_app_module.get_celery_app(redis_port=1)
+        assert app.conf.broker_transport_options["visibility_timeout"] == 7 * 3600
+
+
+class TestWorkerArgv:
+    def test_solver_worker_takes_one_task_at_a_time(self) -> None:
+        argv = worker_argv("solver")
+        assert "--queues=solver" in argv
+        assert "--prefetch-multiplier=1" in argv
+        assert "--concurrency=2" in argv
+        assert "--hostname=solver@%h" in argv
+
+    def test_concurrency_can_be_overridden(self) -> None:
+        assert "--concurrency=8" in worker_argv("solver", concurrency=8)
+
+    def test_all_role_consumes_every_queue_with_default_concurrency(self) -> None:
+        argv = worker_argv("all")
+        assert f"--queues={','.join(QUEUES)}" in argv
+        assert not any(arg.startswith("--concurrency") for arg in argv)
+
+
+class TestWorkerCommand:
+    def test_starts_a_worker_for_the_role(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        started: list[list[str]] = []
+        monkeypatch.setattr(tasks.app, "worker_main", started.append)
+
+        result = CliRunner().invoke(cli, ["celery", "worker", "--role", "gsheet-io", "--concurrency", "3"])
+
+        assert result.exit_code == 0, result.output
+        assert started == [worker_argv("gsheet-io", concurrency=3)]
+
+    def test_rejects_unknown_role(self) -> None:
+        result = CliRunner().invoke(cli, ["celery", "worker", "--role", "email"])
+        assert result.exit_code != 0
@@ -8,6 +8,7 @@ import pytest
 from sortition_algorithms import settings
 from sortition_algorithms.utils import RunReport
 
+from opendlp.adapters.distribution_cache import DistributionCacheOutcome
 from opendlp.bootstrap import bootstrap as bootstrap_uow
 from opendlp.domain.assembly import Assembly, SelectionRunRecord
 from opendlp.domain.value_objects import SelectionRunStatus, SelectionTaskType
@@ -62,8 +63,8 @@ class TestInternalRunSelectForwardsReporter:
         people = MagicMock(name="People")
         people.count = 0
 
-        with patch.object(tasks, "run_stratification") as mock_run:
-            mock_run.return_value = (True, [frozenset()], RunReport())
+        with patch.object(tasks.DistributionCache, "run_stratification") as mock_run:
+            mock_run.return_value = (True, [frozenset()], RunReport(), DistributionCacheOutcome())
             tasks._internal_run_select(
                 task_id=task_id,
                 features=features,
@@ -98,8 +99,8 @@ class TestInternalRunSelectForwardsReporter:
         people = MagicMock(name="People")
         people.count = 0
 
-        with patch.object(tasks, "run_stratification") as mock_run:
-            mock_run.return_value = (True, [frozenset()], RunReport())
+        with patch.object(tasks.DistributionCache, "run_stratification") as mock_run:
+            mock_run.return_value = (True, [frozenset()], RunReport(), DistributionCacheOutcome())
             tasks._internal_run_select(
                 task_id=task_id,
                 features=features,
@@ -295,6 +296,32 @@ class TestCeleryTasksInstantiateReporter:
         reporter_instance = mock_reporter_cls.return_value
         assert mock_select.call_args.kwargs["progress_reporter"] is reporter_instance
 
+    def test_run_select_from_db_with_profile_saves_phases(self, postgres_session_factory):
+        task_id, assembly_id = self._seed(postgres_session_factory, SelectionTaskType.SELECT_FROM_DB)
+
+        with (
+            patch.object(tasks, "ProfileStore") as mock_store_cls,
+            patch.object(tasks, "_internal_load_db") as mock_load,
+            patch.object(tasks, "_internal_run_select") as mock_select,
+            patch.object(tasks, "_internal_write_db_results") as mock_write,
+        ):
+            mock_load.return_value = (True, MagicMock(), MagicMock(), RunReport())
+            mock_select.return_value = (True, [frozenset({"id1"})], RunReport())
+            mock_write.return_value = RunReport()
+
+            tasks.run_select_from_db(
+                task_id=task_id,
+                assembly_id=assembly_id,
+                number_people_wanted=1,
+                settings=_empty_settings(),
+                session_factory=postgres_session_factory,
+                profile=True,
+            )
+
+        profile_id, profiler = mock_store_cls.return_value.save.call_args.args
+        assert profile_id == str(task_id)
+        assert set(profiler.phase_seconds) == {"load", "select", "write"}
+
     def test_load_gsheet_instantiates_reporter_and_forwards_it(self, postgres_session_factory):
         task_id, _assembly_id = self._seed(postgres_session_factory, SelectionTaskType.LOAD_GSHEET)
         data_source = MagicMock(name="data_source")
@@ -316,3 +343,57 @@ class TestCeleryTasksInstantiateReporter:
         mock_reporter_cls.assert_called_once()
         reporter_instance = mock_reporter_cls.return_value
         assert mock_load.call_args.kwargs["progress_reporter"] is reporter_instance
+
+
+class TestRedeliveredSelectionTasks:
+    """A message redelivered after its run was failed or cancelled must not select again."""
+
+    def _seed(self, session_factory, task_type, status):
+        task_id = uuid.uuid4()
+        assembly_id = uuid.uuid4()
+        with bootstrap_uow(session_factory=session_factory) as uow:
+            uow.assemblies.add(Assembly(assembly_id=assembly_id, title="Test Assembly"))
+            uow.selection_run_records.add(
+                SelectionRunRecord(assembly_id=assembly_id, task_id=task_id, task_type=task_type, status=status)
+            )
+            uow.commit()
+        return task_id, assembly_id
+
+    def _status(self, session_factory, task_id):
+        with bootstrap_uow(session_factory=session_factory) as uow:
+            return uow.selection_run_records.get_by_task_id(task_id).status
+
+    @pytest.mark.parametrize("status", [SelectionRunStatus.FAILED, SelectionRunStatus.CANCELLED])
+    def test_run_select_from_db_does_nothing_once_finished(self, postgres_session_factory, status):
+        task_id, assembly_id = self._seed(postgres_session_factory, SelectionTaskType.SELECT_FROM_DB, status)
+
+        with patch.object(tasks, "_internal_load_db") as mock_load:
+            success = tasks.run_select_from_db(
+                task_id=task_id,
+                assembly_id=assembly_id,
+                number_people_wanted=1,
+                settings=_empty_settings(),
+                session_factory=postgres_session_factory,
+            )
+
+        assert success is False
+        mock_load.assert_not_called()
+        assert self._status(postgres_session_factory, task_id) == status
+
+    def test_run_select_does_nothing_once_finished(self, postgres_session_factory):
+        task_id, _assembly_id = self._seed(
+            postgres_session_factory, SelectionTaskType.SELECT_GSHEET, SelectionRunStatus.FAILED
+        )
+
+        with patch.object(tasks, "_internal_load_gsheet") as mock_load:
+            success, panels, _report = tasks.run_select(
+                task_id=task_id,
+                data_source=MagicMock(name="data_source"),
+                number_people_wanted=1,
+                settings=_empty_settings(),
+                session_factory=postgres_session_factory,
+            )
+
+        assert (success, panels) == (False, [])
+        mock_load.assert_not_called()
+        assert self._status(postgres_session_factory, task_id) == SelectionRunStatus.FAILED
@@ -7,6 +7,7 @@ from typing import ClassVar
 import pytest
 
 from opendlp.config import (
+    DBPoolCfg,
     FlaskConfig,
     FlaskProductionConfig,
     FlaskTestConfig,
@@ -24,11 +25,13 @@ from opendlp.config import (
     get_monitor_assembly_id,
     get_monitor_health_max_age_minutes,
     get_monitor_user_id,
+    get_process_role,
     get_registration_form_html_max_bytes,
     get_registration_image_max_edge_px,
     get_registration_thank_you_html_max_bytes,
     get_secret_key,
     get_task_timeout_hours,
+    get_web_surface,
     to_bool,
 )
 
@@ -581,3 +584,62 @@ class TestGetSecretKey:
     def test_get_secret_key_default(self, clear_env_vars):
         clear_env_vars("SECRET_KEY")
         assert get_secret_key() == "dev-secret-key-change-in-production"  # pragma: allowlist secret
+
+
+_POOL_ENV_VARS = (
+    "OPENDLP_PROCESS_ROLE",
+    "DB_PGBOUNCER",
+    *(f"DB_{prefix}{name}" for prefix in ("", "WEB_", "WORKER_", "BEAT_") for name in ("POOL_SIZE", "MAX_OVERFLOW")),
+    "DB_POOL_TIMEOUT",
+    "DB_POOL_RECYCLE",
+)
+
+
+class TestDBPoolCfg:
+    def test_defaults_to_web_role(self, clear_env_vars):
+        clear_env_vars(*_POOL_ENV_VARS)
+        assert get_process_role() == "web"
+        assert DBPoolCfg.from_env() == DBPoolCfg(
+            role="web", pool_size=3, max_overflow=7, pool_timeout=30, pool_recycle=3600, pgbouncer=False
+        )
+
+    def test_invalid_role_falls_back_to_web(self, temp_env_vars):
+        temp_env_vars(OPENDLP_PROCESS_ROLE="scheduler")
+        assert get_process_role() == "web"
+
+    def test_beat_gets_a_small_pool(self, clear_env_vars, temp_env_vars):
+        clear_env_vars(*_POOL_ENV_VARS)
+        temp_env_vars(OPENDLP_PROCESS_ROLE="beat")
+        cfg = DBPoolCfg.from_env()
+        assert (cfg.role, cfg.pool_size, cfg.max_overflow) == ("beat", 1, 1)
+
+    def test_role_setting_overrides_shared_setting(self, clear_env_vars, temp_env_vars):
+        clear_env_vars(*_POOL_ENV_VARS)
+        temp_env_vars(DB_POOL_SIZE="5", DB_WORKER_POOL_SIZE="2", DB_MAX_OVERFLOW="4")
+        assert DBPoolCfg.from_env("worker").pool_size == 2
+        assert DBPoolCfg.from_env("worker").max_overflow == 4
+        assert DBPoolCfg.from_env("web").pool_size == 5
+
+    def test_clamps_pool_size(self, clear_env_vars, temp_env_vars):
+        clear_env_vars(*_POOL_ENV_VARS)
+        temp_env_vars(DB_WEB_POOL_SIZE="0")
+        assert DBPoolCfg.from_env("web").pool_size == 1
+
+    def test_pgbouncer_mode(self, clear_env_vars, temp_env_vars):
+        clear_env_vars(*_POOL_ENV_VARS)
+        temp_env_vars(DB_PGBOUNCER="true")
+        assert DBPoolCfg.from_env().pgbouncer is True
+
+
+class TestGetWebSurface:
+    def test_defaults_to_all(self, clear_env_vars):
+        clear_env_vars("OPENDLP_WEB_SURFACE")
+        assert get_web_surface() == "all"
+
+    def test_public(self, temp_env_vars):
+        temp_env_vars(OPENDLP_WEB_SURFACE=" Public ")
+        assert get_web_surface() == "public"
+
+    def test_invalid_value_falls_back_to_all(self, temp_env_vars):
+        temp_env_vars(OPENDLP_WEB_SURFACE="backoffice")
+        assert get_web_surface() == "all"
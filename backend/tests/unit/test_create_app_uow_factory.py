@@ -27,3 +27,15 @@ class TestCreateAppUowFactory:
 
         with app.app_context():
             assert bootstrap.get_flask_uow() is sentinel_uow
+
+    def test_read_factory_defaults_to_replica_aware_factory(self) -> None:
+        app = create_app("testing")
+        assert app.extensions["read_uow_factory"] is bootstrap.default_read_uow_factory
+
+    def test_read_factory_follows_injected_factory(self) -> None:
+        """A fake store injected for writes serves the read-only paths too."""
+        sentinel_uow = object()
+        app = create_app("testing", uow_factory=lambda: sentinel_uow)
+
+        with app.app_context():
+            assert bootstrap.get_flask_read_uow() is sentinel_uow
@@ -0,0 +1,72 @@
+"""ABOUTME: Unit tests for the Redis stash holding CSV uploads that await diff confirmation
+ABOUTME: Uses an in-memory fake Redis to check the parsed upload round-trips compressed"""
+
+import json
+import uuid
+
+from opendlp.service_layer import csv_upload_stash
+from opendlp.service_layer.csv_upload_stash import StashedUpload
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        self.store[key] = value
+        return True
+
+    def delete(self, key: str) -> int:
+        return 1 if self.store.pop(key, None) is not None else 0
+
+
+def _upload(rows: int = 3) -> StashedUpload:
+    return StashedUpload(
+        headers=["external_id", "first_name", "postcode"],
+        rows=[[f"R{i}", "Alice", "SW1A 1AA"] for i in range(rows)],
+        filename="respondents.csv",
+        id_column=None,
+        replace_existing=True,
+    )
+
+
+class TestCsvUploadStash:
+    def test_round_trip(self):
+        redis = _FakeRedis()
+        user_id, assembly_id = uuid.uuid4(), uuid.uuid4()
+
+        csv_upload_stash.stash(user_id, assembly_id, _upload(), redis_client=redis)  # type: ignore[arg-type]
+
+        assert csv_upload_stash.fetch(user_id, assembly_id, redis_client=redis) == _upload()  # type: ignore[arg-type]
+
+    def test_stored_compressed(self):
+        redis = _FakeRedis()
+        upload = _upload(rows=1000)
+
+        csv_upload_stash.stash(uuid.uuid4(), uuid.uuid4(), upload, redis_client=redis)  # type: ignore[arg-type]
+
+        (stored,) = redis.store.values()
+        assert len(stored) < len(json.dumps(upload.rows)) / 5
+
+    def test_missing_upload_is_none(self):
+        assert csv_upload_stash.fetch(uuid.uuid4(), uuid.uuid4(), redis_client=_FakeRedis()) is None  # type: ignore[arg-type]
+
+    def test_upload_in_an_older_format_is_treated_as_expired(self):
+        redis = _FakeRedis()
+        user_id, assembly_id = uuid.uuid4(), uuid.uuid4()
+        legacy = {"csv_content": "id\nR1\n", "filename": "a.csv", "id_column": None, "replace_existing": True}
+        redis.store[csv_upload_stash._key(user_id, assembly_id)] = json.dumps(legacy).encode()
+
+        assert csv_upload_stash.fetch(user_id, assembly_id, redis_client=redis) is None  # type: ignore[arg-type]
+
+    def test_clear(self):
+        redis = _FakeRedis()
+        user_id, assembly_id = uuid.uuid4(), uuid.uuid4()
+        csv_upload_stash.stash(user_id, assembly_id, _upload(), redis_client=redis)  # type: ignore[arg-type]
+
+        csv_upload_stash.clear(user_id, assembly_id, redis_client=redis)  # type: ignore[arg-type]
+
+        assert redis.store == {}
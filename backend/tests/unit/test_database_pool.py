@@ -0,0 +1,35 @@
+"""ABOUTME: Unit tests for the connection pool arguments the database adapter passes to create_engine
+ABOUTME: Checks the per-role pool settings and the pool-less PgBouncer transaction mode"""
+
+from sqlalchemy.pool import NullPool
+
+from opendlp.adapters.database import engine_pool_args
+from opendlp.config import DBPoolCfg
+
+
+def _cfg(pgbouncer: bool = False) -> DBPoolCfg:
+    return DBPoolCfg(role="worker", pool_size=2, max_overflow=4, pool_timeout=10, pool_recycle=600, pgbouncer=pgbouncer)
+
+
+def test_pool_settings_are_passed_through():
+    args = engine_pool_args("postgresql://u:p@db/opendlp", _cfg())
+
+    assert args == {
+        "pool_pre_ping": True,
+        "pool_size": 2,
+        "max_overflow": 4,
+        "pool_timeout": 10,
+        "pool_recycle": 600,
+    }
+
+
+def test_pgbouncer_mode_uses_no_pool():
+    args = engine_pool_args("postgresql://u:p@pgbouncer/opendlp", _cfg(pgbouncer=True))
+
+    assert args == {"poolclass": NullPool}
+
+
+def test_pgbouncer_mode_turns_off_psycopg3_prepared_statements():
+    args = engine_pool_args("postgresql+psycopg://u:p@pgbouncer/opendlp", _cfg(pgbouncer=True))
+
+    assert args["connect_args"] == {"prepare_threshold": None}
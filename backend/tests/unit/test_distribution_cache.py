@@ -0,0 +1,201 @@
+"""ABOUTME: Unit tests for the Redis-backed cache of maximin/leximin/nash panel distributions
+ABOUTME: Runs real stratifications against an in-memory fake Redis to check hits, misses and redraws"""
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sortition_algorithms import committee_generation, core, run_stratification
+from sortition_algorithms.features import FeatureValueMinMax
+from sortition_algorithms.people import People
+from sortition_algorithms.settings import Settings
+
+from opendlp import config
+from opendlp.adapters import distribution_cache
+from opendlp.adapters.distribution_cache import DistributionCache
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        self.store[key] = value
+        return True
+
+
+class _BrokenRedis:
+    def get(self, key: str) -> None:
+        raise RedisConnectionError("down")
+
+    def set(self, *args: Any, **kwargs: Any) -> None:
+        raise RedisConnectionError("down")
+
+
+def _features() -> dict:
+    return {"gender": {"male": FeatureValueMinMax(min=2, max=2), "female": FeatureValueMinMax(min=2, max=2)}}
+
+
+def _people(features: dict, count: int = 8) -> People:
+    people = People(columns_to_keep=[])
+    for i in range(count):
+        people.add(f"p{i}", {"gender": "male" if i % 2 else "female"}, features, row_number=i + 2)
+    return people
+
+
+def _settings(**kwargs: Any) -> Settings:
+    kwargs.setdefault("selection_algorithm", "maximin")
+    return Settings(
+        id_column="id",
+        columns_to_keep=[],
+        check_same_address=False,
+        solver_backend=config.get_solver_backend(),
+        **kwargs,
+    )
+
+
+def _select(
+    cache: DistributionCache, people: People | None = None, **kwargs: Any
+) -> tuple[bool, list[frozenset[str]], bool]:
+    features = _features()
+    success, panels, _report, outcome = cache.run_stratification(
+        features, people or _people(features), number_people_wanted=4, settings=_settings(), **kwargs
+    )
+    return success, panels, outcome.hit
+
+
+class TestDistributionCache:
+    def test_repeat_selection_reuses_distribution(self):
+        cache = DistributionCache(redis_client=_FakeRedis(), ttl_seconds=60)
+
+        success, _panels, hit = _select(cache)
+        assert success
+        assert not hit
+
+        with patch.dict(distribution_cache._DISTRIBUTION_FUNCTIONS, {"maximin": _fail_if_called}):
+            success, panels, hit = _select(cache)
+
+        assert success
+        assert hit
+        assert len(panels) == 1
+        assert len(panels[0]) == 4
+
+    def test_different_respondents_miss(self):
+        redis = _FakeRedis()
+        cache = DistributionCache(redis_client=redis, ttl_seconds=60)
+        _select(cache)
+
+        _success, _panels, hit = _select(cache, people=_people(_features(), count=10))
+
+        assert not hit
+        assert len(redis.store) == 2
+
+    def test_respondent_order_does_not_change_key(self):
+        features = _features()
+        forwards = _people(features)
+        backwards = People(columns_to_keep=[])
+        for key, person in reversed(list(forwards.items())):
+            backwards.add(key, dict(person), features, row_number=2)
+        cache = DistributionCache(redis_client=_FakeRedis(), ttl_seconds=60)
+        _select(cache, people=forwards)
+
+        _success, _panels, hit = _select(cache, people=backwards)
+
+        assert hit
+
+    def test_miss_selects_and_reports_as_the_library_does(self):
+        features = _features()
+        settings = _settings(random_number_seed=42)
+        cache = DistributionCache(redis_client=_FakeRedis(), ttl_seconds=60)
+
+        success, panels, report, _outcome = cache.run_stratification(features, _people(features), 4, settings)
+        expected_success, expected_panels, expected_report = run_stratification(
+            features, _people(features), 4, settings
+        )
+
+        assert (success, panels) == (expected_success, expected_panels)
+        assert report.as_text() == expected_report.as_text()
+
+    def test_zero_ttl_goes_straight_to_the_library(self):
+        redis = _FakeRedis()
+        cache = DistributionCache(redis_client=redis, ttl_seconds=0)
+
+        with patch.object(distribution_cache, "run_stratification", wraps=run_stratification) as library:
+            success, _panels, hit = _select(cache)
+
+        library.assert_called_once()
+        assert success
+        assert not hit
+        assert redis.store == {}
+
+    def test_legacy_is_not_cached(self):
+        redis = _FakeRedis()
+        cache = DistributionCache(redis_client=redis, ttl_seconds=60)
+        features = _features()
+
+        success, _panels, _report, _outcome = cache.run_stratification(
+            features, _people(features), 4, _settings(selection_algorithm="legacy")
+        )
+
+        assert success
+        assert redis.store == {}
+
+    def test_test_selection_is_cached(self):
+        cache = DistributionCache(redis_client=_FakeRedis(), ttl_seconds=60)
+        success, first_panels, hit = _select(cache, test_selection=True)
+        assert success
+        assert not hit
+
+        with patch.object(distribution_cache, "find_any_committee", _fail_if_called):
+            success, panels, hit = _select(cache, test_selection=True)
+
+        assert success
+        assert hit
+        assert panels == first_panels
+
+    def test_failed_pre_checks_are_reported_not_raised(self):
+        cache = DistributionCache(redis_client=_FakeRedis(), ttl_seconds=60)
+        features = _features()
+
+        success, panels, report, outcome = cache.run_stratification(
+            features, _people(features, count=3), 4, _settings()
+        )
+
+        assert not success
+        assert panels == []
+        assert report.last_error() is not None
+        assert outcome.key == ""
+
+    def test_redis_errors_fall_back_to_solving(self):
+        success, panels, hit = _select(DistributionCache(redis_client=_BrokenRedis(), ttl_seconds=60))
+
+        assert success
+        assert not hit
+        assert len(panels[0]) == 4
+
+
+@pytest.mark.parametrize(
+    ("module", "name"),
+    [
+        (core, "_initial_category_info_table"),
+        (core, "_category_info_table"),
+        (core, "_distribution_stats"),
+        (core, "lottery_rounding"),
+        (committee_generation, "find_any_committee"),
+        (committee_generation, "find_distribution_maximin"),
+        (committee_generation, "find_distribution_leximin"),
+        (committee_generation, "find_distribution_nash"),
+        (committee_generation, "standardize_distribution"),
+    ],
+)
+def test_library_functions_the_cache_relies_on_still_exist(module: Any, name: str):
+    """The cache reruns run_stratification's steps itself, some of them private to the library."""
+    assert callable(getattr(module, name, None))
+
+
+def _fail_if_called(*args: Any, **kwargs: Any) -> Any:
+    raise AssertionError("the solver should not run on a cache hit")
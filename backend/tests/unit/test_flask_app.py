@@ -1,7 +1,10 @@
 """ABOUTME: Unit tests for Flask application factory and routing
 ABOUTME: Tests Flask app creation, configuration, blueprints, and error handlers"""
 
+import json
 import os
+import subprocess
+import sys
 import uuid
 from datetime import timedelta
 
@@ -115,6 +118,16 @@ class TestFlaskApp:
             assert "frame-src 'self' https://www.youtube-nocookie.com" in csp
             assert "https://www.youtube.com" not in csp
 
+    def test_server_timing_header_only_when_debugging(self) -> None:
+        """The SQL query count is exposed to browser dev tools in development only."""
+        app = create_app("testing")
+
+        with app.test_client() as client:
+            assert "Server-Timing" not in client.get("/").headers
+
+            app.config["DEBUG"] = True
+            assert client.get("/").headers["Server-Timing"].startswith('db;desc="')
+
 
 class TestMainBlueprint:
     """Test main blueprint routes."""
@@ -306,6 +319,66 @@ class TestErrorHandlers:
         assert b"Form Expired" in response.data
 
 
+# Imported on first use, so no web process pays for them at boot.
+DEFERRED_MODULES = (
+    "opendlp.entrypoints.celery.tasks",
+    "celery",
+    "django.contrib.auth.password_validation",
+    "numpy",
+    "PIL",
+    "qrcode",
+)
+
+_BOOT_SCRIPT = """
+import json, sys
+from opendlp.entrypoints.flask_app import create_app
+create_app("testing", surface=sys.argv[1])
+print(json.dumps(sorted(name for name in json.loads(sys.argv[2]) if name in sys.modules)))
+"""
+
+
+def _modules_loaded_at_boot(surface: str) -> list[str]:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", _BOOT_SCRIPT, surface, json.dumps(DEFERRED_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestPublicSurface:
+    """A "public" app serves only the registration form, health checks and well-known files."""
+
+    @pytest.fixture
+    def client(self) -> FlaskClient:
+        return create_app("testing", surface="public").test_client()
+
+    def test_backoffice_blueprints_are_not_registered(self) -> None:
+        app = create_app("testing", surface="public")
+        assert "registration" in app.blueprints
+        assert "targets" not in app.blueprints
+        assert "db_selection_backoffice" not in app.blueprints
+
+    def test_serves_public_routes(self, client: FlaskClient) -> None:
+        assert client.get("/robots.txt").status_code == 200
+
+    def test_other_registered_routes_are_not_found(self, client: FlaskClient) -> None:
+        response = client.get("/auth/login")
+        assert response.status_code == 404
+        assert b"Page Not Found" in response.data or b"404" in response.data
+        assert client.get("/backoffice/dashboard").status_code == 404
+
+    def test_all_surface_serves_everything(self) -> None:
+        app = create_app("testing", surface="all")
+        assert "targets" in app.blueprints
+        assert app.test_client().get("/auth/login").status_code == 200
+
+    @pytest.mark.parametrize("surface", ["public", "all"])
+    def test_boot_does_not_import_heavy_dependencies(self, surface: str) -> None:
+        assert _modules_loaded_at_boot(surface) == []
+
+
 class TestConfiguration:
     """Test application configuration handling."""
 
@@ -1,22 +1,51 @@
 """ABOUTME: Unit tests for the gspread-backed GSheetExportTarget
 ABOUTME: Uses a fake gspread client so no real Google Sheets access is needed"""
 
+from typing import Any
+
+import pytest
+from gspread.exceptions import APIError, SpreadsheetNotFound
+
 from opendlp.adapters.gsheet_export import GSheetExportTarget, WorksheetNotFound
-from opendlp.adapters.tabular_export import TabularData
+from opendlp.adapters.tabular_export import ExportTargetError, TabularData
+
+
+class _FakeResponse:
+    def __init__(self, code: int) -> None:
+        self.status_code = code
+        self.text = "error"
+
+    def json(self) -> dict[str, Any]:
+        return {"error": {"code": self.status_code, "message": "error", "status": "ERROR"}}
+
+
+def _api_error(code: int) -> APIError:
+    return APIError(_FakeResponse(code))  # type: ignore[arg-type]
 
 
 class _FakeWorksheet:
     def __init__(self, title: str) -> None:
         self.title = title
-        self.updated: list[list[str]] | None = None
+        self.batches: list[list[dict[str, Any]]] = []
         self.cleared = False
+        self.size: tuple[int, int] | None = None
+        self.failures: list[APIError] = []
         self.url = f"https://docs.google.com/spreadsheets/d/fake#{title}"
 
     def clear(self) -> None:
         self.cleared = True
 
-    def update(self, values: list[list[str]]) -> None:
-        self.updated = values
+    def resize(self, rows: int, cols: int) -> None:
+        self.size = (rows, cols)
+
+    def batch_update(self, data: list[dict[str, Any]]) -> None:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.batches.append(data)
+
+    @property
+    def values(self) -> list[list[str]]:
+        return [row for batch in self.batches for update in batch for row in update["values"]]
 
 
 class _FakeSpreadsheet:
@@ -33,6 +62,7 @@ class _FakeSpreadsheet:
     def add_worksheet(self, title: str, rows: int, cols: int) -> _FakeWorksheet:
         self.added.append(title)
         ws = _FakeWorksheet(title)
+        ws.size = (rows, cols)
         self.worksheets_by_title[title] = ws
         return ws
 
@@ -62,7 +92,11 @@ class TestGSheetExportTarget:
         assert client.opened_url == _URL
         assert "Respondents" in spreadsheet.added
         ws = spreadsheet.worksheets_by_title["Respondents"]
-        assert ws.updated == [["id", "name"], ["R1", "Alice"]]
+        assert ws.values == [["id", "name"], ["R1", "Alice"]]
+        assert ws.size == (2, 2)
+        assert ws.batches == [
+            [{"range": "A1", "values": [["id", "name"]]}, {"range": "A2:B2", "values": [["R1", "Alice"]]}]
+        ]
         assert target.result_url == ws.url
         assert target.result_title == spreadsheet.title
 
@@ -76,5 +110,103 @@ class TestGSheetExportTarget:
         target.write_sheet("Respondents", TabularData(headers=["id"], rows=[["R1"]]))
 
         assert existing.cleared is True
-        assert existing.updated == [["id"], ["R1"]]
+        assert existing.size == (2, 1)
+        assert existing.values == [["id"], ["R1"]]
         assert spreadsheet.added == []
+
+    def test_writes_rows_in_batches_bounded_by_cells(self):
+        spreadsheet = _FakeSpreadsheet()
+        progress: list[tuple[int, int]] = []
+        target = GSheetExportTarget(
+            spreadsheet_url=_URL, client_factory=lambda: _FakeClient(spreadsheet), cells_per_batch=4
+        )
+        target.on_progress = lambda written, total: progress.append((written, total))
+        rows = [[f"R{i}", f"Name {i}"] for i in range(5)]
+
+        target.write_sheet("Respondents", TabularData(headers=["id", "name"], rows=rows))
+
+        ws = spreadsheet.worksheets_by_title["Respondents"]
+        assert [[update["range"] for update in batch] for batch in ws.batches] == [
+            ["A1", "A2:B3"],
+            ["A4:B5"],
+            ["A6:B6"],
+        ]
+        assert ws.values == [["id", "name"], *rows]
+        assert progress == [(2, 5), (4, 5), (5, 5)]
+
+    def test_header_is_written_for_an_empty_table(self):
+        spreadsheet = _FakeSpreadsheet()
+        target = GSheetExportTarget(spreadsheet_url=_URL, client_factory=lambda: _FakeClient(spreadsheet))
+
+        target.write_sheet("Respondents", TabularData(headers=["id"], rows=[]))
+
+        assert spreadsheet.worksheets_by_title["Respondents"].values == [["id"]]
+
+    def test_retries_rate_limited_writes_with_backoff(self):
+        spreadsheet = _FakeSpreadsheet()
+        existing = _FakeWorksheet("Respondents")
+        existing.failures = [_api_error(429), _api_error(503)]
+        spreadsheet.worksheets_by_title["Respondents"] = existing
+        sleeps: list[float] = []
+        target = GSheetExportTarget(
+            spreadsheet_url=_URL, client_factory=lambda: _FakeClient(spreadsheet), sleep=sleeps.append
+        )
+
+        target.write_sheet("Respondents", TabularData(headers=["id"], rows=[["R1"]]))
+
+        assert sleeps == [1.0, 2.0]
+        assert existing.values == [["id"], ["R1"]]
+
+    def test_gives_up_after_max_retries(self):
+        spreadsheet = _FakeSpreadsheet()
+        existing = _FakeWorksheet("Respondents")
+        existing.failures = [_api_error(429)] * 3
+        spreadsheet.worksheets_by_title["Respondents"] = existing
+        sleeps: list[float] = []
+        target = GSheetExportTarget(
+            spreadsheet_url=_URL, client_factory=lambda: _FakeClient(spreadsheet), max_retries=2, sleep=sleeps.append
+        )
+
+        with pytest.raises(ExportTargetError):
+            target.write_sheet("Respondents", TabularData(headers=["id"], rows=[["R1"]]))
+        assert sleeps == [1.0, 2.0]
+
+    def test_other_api_errors_are_not_retried(self):
+        spreadsheet = _FakeSpreadsheet()
+        existing = _FakeWorksheet("Respondents")
+        existing.failures = [_api_error(403)]
+        spreadsheet.worksheets_by_title["Respondents"] = existing
+        sleeps: list[float] = []
+        target = GSheetExportTarget(
+            spreadsheet_url=_URL, client_factory=lambda: _FakeClient(spreadsheet), sleep=sleeps.append
+        )
+
+        with pytest.raises(ExportTargetError):
+            target.write_sheet("Respondents", TabularData(headers=["id"], rows=[["R1"]]))
+        assert sleeps == []
+
+    @pytest.mark.parametrize(("code", "access_denied"), [(403, True), (404, True), (400, False), (500, False)])
+    def test_only_forbidden_and_not_found_count_as_access_denied(self, code: int, access_denied: bool):
+        spreadsheet = _FakeSpreadsheet()
+        existing = _FakeWorksheet("Respondents")
+        existing.failures = [_api_error(code)]
+        spreadsheet.worksheets_by_title["Respondents"] = existing
+        target = GSheetExportTarget(spreadsheet_url=_URL, client_factory=lambda: _FakeClient(spreadsheet))
+
+        with pytest.raises(ExportTargetError) as excinfo:
+            target.write_sheet("Respondents", TabularData(headers=["id"], rows=[["R1"]]))
+
+        assert excinfo.value.access_denied is access_denied
+
+    def test_missing_spreadsheet_counts_as_access_denied(self):
+        def missing(url: str) -> None:
+            raise SpreadsheetNotFound(url)
+
+        client = _FakeClient(_FakeSpreadsheet())
+        client.open_by_url = missing  # type: ignore[method-assign]
+        target = GSheetExportTarget(spreadsheet_url=_URL, client_factory=lambda: client)
+
+        with pytest.raises(ExportTargetError) as excinfo:
+            target.write_sheet("Respondents", TabularData(headers=["id"], rows=[["R1"]]))
+
+        assert excinfo.value.access_denied
@@ -0,0 +1,211 @@
+"""ABOUTME: Unit tests for the Redis snapshot of Google Sheet tabs shared by the load and select tasks
+ABOUTME: Uses a fake gspread client and an in-memory fake Redis to count how often the tabs are downloaded"""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from gspread.exceptions import GSpreadException
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sortition_algorithms import GSheetDataSource, RunReport, errors
+
+from opendlp.adapters.gsheet_snapshot import SnapshotGSheetDataSource
+
+HEAD = ["id", "first_name", "last_name", "gender", "age", "postcode"]
+ROWS = [
+    HEAD,
+    ["1", "Ada", "Lovelace", "female", "36", "AB1"],
+    ["2", "Alan", "Turing", "male", "41", "CD2"],
+]
+TARGETS = [["feature", "value", "min", "max"], ["gender", "female", "1", "1"], ["gender", "male", "1", "1"]]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        self.store[key] = value
+        return True
+
+
+class _BrokenRedis:
+    def get(self, key: str) -> None:
+        raise RedisConnectionError("down")
+
+    def set(self, *args: Any, **kwargs: Any) -> None:
+        raise RedisConnectionError("down")
+
+
+class _FakeWorksheet:
+    def __init__(self, title: str, rows: list[list[str]], downloads: list[str]) -> None:
+        self.title = title
+        self.rows = rows
+        self.downloads = downloads
+
+    def row_values(self, row: int) -> list[str]:
+        return self.rows[row - 1]
+
+    def get_all_records(self, **kwargs: Any) -> list[dict[str, str]]:
+        self.downloads.append(self.title)
+        return [dict(zip(self.rows[0], row, strict=False)) for row in self.rows[1:]]
+
+    def get(self, **kwargs: Any) -> list[list[str]]:
+        self.downloads.append(self.title)
+        return self.rows
+
+
+class _FakeSpreadsheet:
+    id = "sheet-id"
+    title = "Assembly data"
+
+    def __init__(self, downloads: list[str]) -> None:
+        self.tabs = [
+            _FakeWorksheet("Categories", TARGETS, downloads),
+            _FakeWorksheet("Respondents", ROWS, downloads),
+            _FakeWorksheet("Selected", ROWS, downloads),
+        ]
+
+    def worksheets(self) -> list[_FakeWorksheet]:
+        return self.tabs
+
+    def worksheet(self, title: str) -> _FakeWorksheet:
+        return next(tab for tab in self.tabs if tab.title == title)
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict[str, str]) -> None:
+        self.payload = payload
+
+    def json(self) -> dict[str, str]:
+        return self.payload
+
+
+class _FakeHttpClient:
+    def __init__(self) -> None:
+        self.modified_time = "2026-10-01T09:00:00.000Z"
+        self.fail_modified_time = False
+
+    def request(self, method: str, url: str, params: dict[str, Any]) -> _FakeResponse:
+        if params["fields"] == "modifiedTime":
+            if self.fail_modified_time:
+                raise GSpreadException("quota exceeded")
+            return _FakeResponse({"modifiedTime": self.modified_time})
+        return _FakeResponse({"mimeType": "application/vnd.google-apps.spreadsheet", "name": "Assembly data"})
+
+
+class _FakeGspreadClient:
+    def __init__(self) -> None:
+        self.downloads: list[str] = []
+        self.http_client = _FakeHttpClient()
+
+    def open_by_url(self, url: str) -> _FakeSpreadsheet:
+        return _FakeSpreadsheet(self.downloads)
+
+
+def _gsheet(client: _FakeGspreadClient, already_selected_tab_name: str = "Selected") -> GSheetDataSource:
+    data_source = GSheetDataSource(
+        feature_tab_name="Categories",
+        people_tab_name="Respondents",
+        already_selected_tab_name=already_selected_tab_name,
+        id_column="id",
+        auth_json_path=Path("unused.json"),
+    )
+    data_source._client = client  # type: ignore[assignment]
+    data_source.set_g_sheet_name("https://docs.google.com/spreadsheets/d/sheet-id/edit")
+    return data_source
+
+
+def _read_all(data_source: SnapshotGSheetDataSource) -> list[tuple[list[str], list[dict[str, str]]]]:
+    tabs = []
+    for read in (
+        data_source.read_feature_data,
+        data_source.read_people_data,
+        data_source.read_already_selected_data,
+    ):
+        with read(RunReport()) as (head, body):
+            tabs.append((list(head), list(body)))
+    return tabs
+
+
+@pytest.fixture
+def client() -> _FakeGspreadClient:
+    return _FakeGspreadClient()
+
+
+class TestSnapshotGSheetDataSource:
+    def test_second_read_of_an_unchanged_sheet_skips_the_download(self, client: _FakeGspreadClient) -> None:
+        redis = _FakeRedis()
+        load = SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=60)
+        loaded = _read_all(load)
+        assert client.downloads == ["Categories", "Respondents", "Selected"]
+
+        select = SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=60)
+        selected = _read_all(select)
+
+        assert selected == loaded
+        assert select.reused
+        assert not load.reused
+        assert client.downloads == ["Categories", "Respondents", "Selected"]
+        assert loaded[1] == (HEAD, [dict(zip(HEAD, row, strict=False)) for row in ROWS[1:]])
+
+    def test_editing_the_sheet_downloads_it_again(self, client: _FakeGspreadClient) -> None:
+        redis = _FakeRedis()
+        _read_all(SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=60))
+        client.http_client.modified_time = "2026-10-01T09:05:00.000Z"
+
+        select = SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=60)
+        _read_all(select)
+
+        assert not select.reused
+        assert client.downloads == ["Categories", "Respondents", "Selected"] * 2
+
+    def test_other_tab_names_do_not_share_a_snapshot(self, client: _FakeGspreadClient) -> None:
+        redis = _FakeRedis()
+        _read_all(SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=60))
+
+        replacements = SnapshotGSheetDataSource(
+            _gsheet(client, already_selected_tab_name=""), redis_client=redis, ttl_seconds=60
+        )
+        _read_all(replacements)
+
+        assert not replacements.reused
+        assert len(redis.store) == 2
+
+    def test_zero_ttl_is_a_pass_through(self, client: _FakeGspreadClient) -> None:
+        redis = _FakeRedis()
+        _read_all(SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=0))
+
+        assert redis.store == {}
+        assert client.downloads == ["Categories", "Respondents", "Selected"]
+
+    def test_unreachable_redis_still_reads_the_sheet(self, client: _FakeGspreadClient) -> None:
+        data_source = SnapshotGSheetDataSource(_gsheet(client), redis_client=_BrokenRedis(), ttl_seconds=60)  # type: ignore[arg-type]
+
+        tabs = _read_all(data_source)
+
+        assert tabs[0][0] == TARGETS[0]
+        assert not data_source.reused
+
+    def test_failed_modified_time_lookup_is_a_pass_through(self, client: _FakeGspreadClient) -> None:
+        client.http_client.fail_modified_time = True
+        redis = _FakeRedis()
+
+        _read_all(SnapshotGSheetDataSource(_gsheet(client), redis_client=redis, ttl_seconds=60))
+
+        assert redis.store == {}
+        assert client.downloads == ["Categories", "Respondents", "Selected"]
+
+    def test_a_failed_load_stores_nothing(self, client: _FakeGspreadClient) -> None:
+        redis = _FakeRedis()
+        data_source = SnapshotGSheetDataSource(
+            _gsheet(client, already_selected_tab_name="Missing"), redis_client=redis, ttl_seconds=60
+        )
+
+        with pytest.raises(errors.SelectionError, match="no tab called 'Missing'"):
+            _read_all(data_source)
+
+        assert redis.store == {}
@@ -0,0 +1,160 @@
+"""ABOUTME: Unit tests for batched deletion of old selection output tabs in a Google Sheet
+ABOUTME: Uses a fake gspread client that counts API calls and can reject a batch or a single tab"""
+
+from pathlib import Path
+from typing import Any
+
+from gspread.exceptions import APIError
+from sortition_algorithms import GSheetDataSource
+
+from opendlp.adapters.gsheet_tabs import delete_old_output_tabs
+
+
+class _FakeResponse:
+    def __init__(self, payload: dict[str, Any], status_code: int = 200) -> None:
+        self.payload = payload
+        self.status_code = status_code
+        self.text = "error"
+
+    def json(self) -> dict[str, Any]:
+        return self.payload
+
+
+def _api_error(message: str, code: int = 400) -> APIError:
+    return APIError(_FakeResponse({"error": {"code": code, "message": message, "status": "INVALID_ARGUMENT"}}, code))  # type: ignore[arg-type]
+
+
+class _FakeWorksheet:
+    def __init__(self, title: str, sheet_id: int) -> None:
+        self.title = title
+        self.id = sheet_id
+
+
+class _FakeSpreadsheet:
+    id = "sheet-id"
+    title = "Assembly data"
+
+    def __init__(self, titles: list[str]) -> None:
+        self.tabs = [_FakeWorksheet(title, sheet_id) for sheet_id, title in enumerate(titles)]
+        self.calls: list[str] = []
+        self.reject_batches = False
+        self.batch_failures: list[APIError] = []
+        self.undeletable: set[str] = set()
+
+    def worksheets(self) -> list[_FakeWorksheet]:
+        self.calls.append("worksheets")
+        return list(self.tabs)
+
+    def batch_update(self, body: dict[str, Any]) -> None:
+        self.calls.append("batch_update")
+        ids = {request["deleteSheet"]["sheetId"] for request in body["requests"]}
+        if self.batch_failures:
+            raise self.batch_failures.pop(0)
+        if self.reject_batches:
+            raise _api_error("No grid with id")
+        self.tabs = [tab for tab in self.tabs if tab.id not in ids]
+
+    def del_worksheet(self, worksheet: _FakeWorksheet) -> None:
+        self.calls.append("del_worksheet")
+        if worksheet.title in self.undeletable:
+            raise _api_error("No grid with id")
+        self.tabs.remove(worksheet)
+
+
+class _FakeHttpClient:
+    def request(self, method: str, url: str, params: dict[str, Any]) -> _FakeResponse:
+        return _FakeResponse({"mimeType": "application/vnd.google-apps.spreadsheet", "name": "Assembly data"})
+
+
+class _FakeGspreadClient:
+    def __init__(self, spreadsheet: _FakeSpreadsheet) -> None:
+        self.spreadsheet = spreadsheet
+        self.http_client = _FakeHttpClient()
+
+    def open_by_url(self, url: str) -> _FakeSpreadsheet:
+        return self.spreadsheet
+
+
+def _gsheet(spreadsheet: _FakeSpreadsheet) -> GSheetDataSource:
+    data_source = GSheetDataSource(
+        feature_tab_name="Categories",
+        people_tab_name="Respondents",
+        auth_json_path=Path("unused.json"),
+    )
+    data_source._client = _FakeGspreadClient(spreadsheet)  # type: ignore[assignment]
+    data_source.set_g_sheet_name("https://docs.google.com/spreadsheets/d/sheet-id/edit")
+    return data_source
+
+
+_OLD_TABS = [f"Original Selected - output - {n}" for n in range(3)] + [f"Remaining - output - {n}" for n in range(3)]
+
+
+class TestDeleteOldOutputTabs:
+    def test_dry_run_lists_without_deleting(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", "Respondents", *_OLD_TABS])
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=True)
+
+        assert outcome.tab_names == _OLD_TABS
+        assert spreadsheet.calls == ["worksheets"]
+        assert len(spreadsheet.tabs) == 8
+
+    def test_deletes_every_old_tab_in_one_batch(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", "Respondents", *_OLD_TABS])
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=False)
+
+        assert outcome.tab_names == _OLD_TABS
+        assert outcome.failures == {}
+        assert spreadsheet.calls == ["worksheets", "batch_update"]
+        assert [tab.title for tab in spreadsheet.tabs] == ["Categories", "Respondents"]
+
+    def test_large_numbers_of_tabs_are_chunked(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", *_OLD_TABS])
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=False, chunk_size=4)
+
+        assert outcome.tab_names == _OLD_TABS
+        assert spreadsheet.calls == ["worksheets", "batch_update", "batch_update"]
+
+    def test_rejected_batch_is_retried_tab_by_tab(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", *_OLD_TABS])
+        spreadsheet.reject_batches = True
+        spreadsheet.undeletable = {"Remaining - output - 1"}
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=False)
+
+        assert outcome.tab_names == [tab for tab in _OLD_TABS if tab != "Remaining - output - 1"]
+        assert list(outcome.failures) == ["Remaining - output - 1"]
+        assert "No grid with id" in outcome.failures["Remaining - output - 1"]
+        assert [tab.title for tab in spreadsheet.tabs] == ["Categories", "Remaining - output - 1"]
+
+    def test_no_old_tabs_makes_no_delete_calls(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", "Respondents"])
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=False)
+
+        assert outcome.tab_names == []
+        assert spreadsheet.calls == ["worksheets"]
+
+    def test_rate_limited_batch_is_retried_whole(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", *_OLD_TABS])
+        spreadsheet.batch_failures = [_api_error("Quota exceeded", code=429)]
+        sleeps: list[float] = []
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=False, sleep=sleeps.append)
+
+        assert outcome.tab_names == _OLD_TABS
+        assert spreadsheet.calls == ["worksheets", "batch_update", "batch_update"]
+        assert sleeps == [1.0]
+
+    def test_unavailable_sheets_api_does_not_fall_back_to_single_deletes(self):
+        spreadsheet = _FakeSpreadsheet(["Categories", *_OLD_TABS])
+        spreadsheet.batch_failures = [_api_error("Unavailable", code=503) for _ in range(10)]
+
+        outcome = delete_old_output_tabs(_gsheet(spreadsheet), dry_run=False, chunk_size=4, sleep=lambda _: None)
+
+        assert "del_worksheet" not in spreadsheet.calls
+        assert outcome.tab_names == []
+        assert list(outcome.failures) == _OLD_TABS
+        assert len(spreadsheet.tabs) == 7
@@ -1,5 +1,5 @@
 """ABOUTME: Unit tests for the registration image processing pipeline
-ABOUTME: Uses real Pillow-generated images to exercise validation and re-encoding"""
+ABOUTME: Uses real Pillow-generated images to exercise validation, re-encoding and variant rendering"""
 
 from io import BytesIO
 
@@ -7,7 +7,7 @@ import pytest
 from PIL import Image
 
 from opendlp.domain.registration_image import ImageValidationError
-from opendlp.service_layer.image_processing import process_image
+from opendlp.service_layer.image_processing import process_image, render_variants
 
 _BIG = 10 * 1024 * 1024
 _EDGE = 2048
@@ -103,3 +103,32 @@ class TestProcessImage:
         red = process_image(_png(color=(255, 0, 0)), max_bytes=_BIG, max_edge_px=_EDGE)
         blue = process_image(_png(color=(0, 0, 255)), max_bytes=_BIG, max_edge_px=_EDGE)
         assert red.sha256 != blue.sha256
+
+
+class TestRenderVariants:
+    def test_renders_each_format_and_width_keeping_aspect_ratio(self):
+        stored = _png(800, 400)
+
+        rendered = render_variants(stored, [("webp", 320), ("webp", 800), ("png", 320)])
+
+        assert [(fmt, v.width, v.height) for fmt, v in rendered] == [
+            ("webp", 320, 160),
+            ("webp", 800, 400),
+            ("png", 320, 160),
+        ]
+        assert [_opened(v.data).format for _, v in rendered] == ["WEBP", "WEBP", "PNG"]
+        assert all(v.byte_size == len(v.data) and len(v.sha256) == 64 for _, v in rendered)
+
+    def test_keeps_transparency(self):
+        stored = _png(400, 400, color=(0, 0, 0, 0), mode="RGBA")
+
+        [(_, webp)] = render_variants(stored, [("webp", 320)])
+
+        assert _opened(webp.data).mode == "RGBA"
+
+    def test_palette_images_are_resized_smoothly(self):
+        stored = _encode(Image.new("RGB", (400, 200), (200, 10, 10)).convert("P"), "PNG")
+
+        [(_, png)] = render_variants(stored, [("png", 320)])
+
+        assert (png.width, png.height) == (320, 160)
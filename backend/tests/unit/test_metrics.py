@@ -0,0 +1,112 @@
+"""ABOUTME: Unit tests for the Redis-backed Prometheus metrics recorder and text renderer
+ABOUTME: Uses an in-memory fake Redis to check counters, histogram buckets, pool gauges and Redis outages"""
+
+from typing import Any
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+
+from opendlp.adapters import metrics
+from opendlp.adapters.metrics import (
+    HTTP_REQUEST_DURATION,
+    REDIS_TIMEOUT_SECONDS,
+    REGISTRATION_SUBMISSIONS,
+    MetricsRecorder,
+    format_labels,
+    render_metrics,
+)
+from tests.fakes import FakeMetricsRedis
+
+
+class _BrokenRedis:
+    def __getattr__(self, name: str) -> Any:
+        def fail(*args: Any, **kwargs: Any) -> None:
+            raise RedisConnectionError("down")
+
+        return fail
+
+
+class TestFormatLabels:
+    def test_escapes_quotes_backslashes_and_newlines(self):
+        assert format_labels({"a": 'say "hi"\\\n'}) == 'a="say \\"hi\\"\\\\\\n"'
+
+
+class TestMetricsRecorder:
+    def test_counter_renders_per_label_set(self):
+        recorder = MetricsRecorder(redis_client=FakeMetricsRedis())  # type: ignore[arg-type]
+        recorder.increment(REGISTRATION_SUBMISSIONS, {"outcome": "accepted"})
+        recorder.increment(REGISTRATION_SUBMISSIONS, {"outcome": "accepted"})
+        recorder.increment(REGISTRATION_SUBMISSIONS, {"outcome": "invalid"})
+
+        text = render_metrics(recorder, [], [])
+
+        assert "# TYPE opendlp_registration_submissions_total counter" in text
+        assert 'opendlp_registration_submissions_total{outcome="accepted"} 2' in text
+        assert 'opendlp_registration_submissions_total{outcome="invalid"} 1' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        recorder = MetricsRecorder(redis_client=FakeMetricsRedis())  # type: ignore[arg-type]
+        labels = {"endpoint": "main.index", "method": "GET"}
+        recorder.observe(HTTP_REQUEST_DURATION, labels, 0.003)
+        recorder.observe(HTTP_REQUEST_DURATION, labels, 0.2)
+        recorder.observe(HTTP_REQUEST_DURATION, labels, 60.0)
+
+        text = render_metrics(recorder, [], [])
+
+        series = 'endpoint="main.index",method="GET"'
+        assert f'opendlp_http_request_duration_seconds_bucket{{{series},le="0.005"}} 1' in text
+        assert f'opendlp_http_request_duration_seconds_bucket{{{series},le="0.1"}} 1' in text
+        assert f'opendlp_http_request_duration_seconds_bucket{{{series},le="0.25"}} 2' in text
+        assert f'opendlp_http_request_duration_seconds_bucket{{{series},le="30"}} 2' in text
+        assert f'opendlp_http_request_duration_seconds_bucket{{{series},le="+Inf"}} 3' in text
+        assert f"opendlp_http_request_duration_seconds_count{{{series}}} 3" in text
+        assert f"opendlp_http_request_duration_seconds_sum{{{series}}} 60.203" in text
+
+    def test_recording_survives_redis_outage(self):
+        recorder = MetricsRecorder(redis_client=_BrokenRedis())  # type: ignore[arg-type]
+
+        recorder.increment(REGISTRATION_SUBMISSIONS, {"outcome": "accepted"})
+        recorder.observe(HTTP_REQUEST_DURATION, {"endpoint": "x", "method": "GET"}, 0.1)
+
+
+class TestRenderMetrics:
+    def test_reports_queue_lengths(self):
+        redis = FakeMetricsRedis()
+        redis.lists["celery"] = 4
+        recorder = MetricsRecorder(redis_client=redis)  # type: ignore[arg-type]
+
+        text = render_metrics(recorder, [], ["celery"])
+
+        assert 'opendlp_celery_queue_length{queue="celery"} 4' in text
+        assert "opendlp_metrics_redis_up 1" in text
+
+    def test_reports_pool_usage_of_queue_pools(self):
+        engine = create_engine("sqlite:///:memory:", poolclass=QueuePool, pool_size=3)
+        recorder = MetricsRecorder(redis_client=FakeMetricsRedis())  # type: ignore[arg-type]
+        with engine.connect():
+            text = render_metrics(recorder, [engine], [])
+
+        assert 'opendlp_db_pool_size{database=":memory:",pid="' in text
+        checked_out = next(line for line in text.splitlines() if line.startswith("opendlp_db_pool_checked_out{"))
+        assert checked_out.endswith(" 1")
+
+    def test_still_renders_pool_stats_when_redis_is_down(self):
+        engine = create_engine("sqlite:///:memory:", poolclass=QueuePool)
+        recorder = MetricsRecorder(redis_client=_BrokenRedis())  # type: ignore[arg-type]
+
+        text = render_metrics(recorder, [engine], ["celery"])
+
+        assert "opendlp_db_pool_size{" in text
+        assert "opendlp_celery_queue_length{" not in text
+        assert "opendlp_metrics_redis_up 0" in text
+
+
+def test_redis_client_gives_up_quickly(monkeypatch):
+    monkeypatch.setattr(metrics, "_redis_client", None)
+
+    connection_kwargs = metrics._get_redis().connection_pool.connection_kwargs
+
+    assert REDIS_TIMEOUT_SECONDS < 1
+    assert connection_kwargs["socket_timeout"] == REDIS_TIMEOUT_SECONDS
+    assert connection_kwargs["socket_connect_timeout"] == REDIS_TIMEOUT_SECONDS
@@ -248,7 +248,7 @@ class TestPollLoopAvoidsCeleryResultBackend:
         # letting the regression slip through silently.
         with (
             patch(
-                "opendlp.service_layer.sortition.app.app.AsyncResult",
+                "opendlp.entrypoints.celery.app.app.AsyncResult",
                 side_effect=AssertionError("monitor must not call AsyncResult"),
             ),
             patch(
@@ -0,0 +1,141 @@
+"""ABOUTME: Unit tests for the opt-in cProfile phase profiler and its Redis-backed store
+ABOUTME: Uses an in-memory fake Redis to check phases, pstats round trips, expiry and Redis failures"""
+
+import pstats
+from typing import Any
+
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from opendlp.adapters.profiling import PhaseProfiler, ProfileStore, profiled_phase
+from opendlp.domain.users import User
+from opendlp.domain.value_objects import GlobalRole
+from opendlp.service_layer.permissions import can_profile
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self.redis = redis
+        self.ops: list[tuple[str, Any, int | None]] = []
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self.ops.append((key, value, ex))
+
+    def execute(self) -> None:
+        for key, value, ex in self.ops:
+            self.redis.set(key, value, ex=ex)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+        self.expiry: dict[str, int | None] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> bool:
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        self.expiry[key] = ex
+        return True
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+class _BrokenRedis:
+    def get(self, key: str) -> None:
+        raise RedisConnectionError("down")
+
+    def pipeline(self, transaction: bool = True) -> None:
+        raise RedisConnectionError("down")
+
+
+def _busy_work() -> int:
+    return sum(i * i for i in range(1000))
+
+
+class TestPhaseProfiler:
+    def test_records_time_for_each_phase(self):
+        profiler = PhaseProfiler()
+        with profiler.phase("load"):
+            _busy_work()
+        with profiler.phase("select"):
+            _busy_work()
+
+        assert set(profiler.phase_seconds) == {"load", "select"}
+        assert all(seconds > 0 for seconds in profiler.phase_seconds.values())
+
+    def test_repeated_phase_accumulates(self):
+        profiler = PhaseProfiler()
+        with profiler.phase("load"):
+            _busy_work()
+        first = profiler.phase_seconds["load"]
+        with profiler.phase("load"):
+            _busy_work()
+
+        assert profiler.phase_seconds["load"] > first
+
+    def test_pstats_bytes_load_as_stats(self, tmp_path):
+        profiler = PhaseProfiler()
+        with profiler.phase("load"):
+            _busy_work()
+
+        path = tmp_path / "profile.pstats"
+        path.write_bytes(profiler.pstats_bytes())
+        stats = pstats.Stats(str(path))
+
+        assert any(func_name == "_busy_work" for _, _, func_name in stats.stats)  # type: ignore[attr-defined]
+
+    def test_profiled_phase_without_profiler_just_runs_the_block(self):
+        ran = []
+        with profiled_phase(None, "load"):
+            ran.append(True)
+        assert ran == [True]
+
+
+class TestProfileStore:
+    def test_round_trip(self):
+        redis = _FakeRedis()
+        profiler = PhaseProfiler()
+        with profiler.phase("solve"):
+            _busy_work()
+
+        store = ProfileStore(redis_client=redis, ttl_seconds=120)  # type: ignore[arg-type]
+        assert store.save("abc", profiler)
+
+        assert store.get_phase_seconds("abc") == profiler.phase_seconds
+        assert store.get_pstats("abc") == profiler.pstats_bytes()
+        assert set(redis.expiry.values()) == {120}
+
+    def test_missing_profile_returns_none(self):
+        store = ProfileStore(redis_client=_FakeRedis(), ttl_seconds=120)  # type: ignore[arg-type]
+        assert store.get_pstats("missing") is None
+        assert store.get_phase_seconds("missing") is None
+
+    def test_redis_failures_are_not_raised(self):
+        store = ProfileStore(redis_client=_BrokenRedis(), ttl_seconds=120)  # type: ignore[arg-type]
+        assert store.save("abc", PhaseProfiler()) is False
+        assert store.get_pstats("abc") is None
+        assert store.get_phase_seconds("abc") is None
+
+
+class TestCanProfile:
+    def test_listed_admin_can_profile(self, monkeypatch):
+        monkeypatch.setenv("PROFILING_ADMIN_EMAILS", "Admin@Example.com, other@example.com")
+        admin = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        assert can_profile(admin)
+
+    def test_unlisted_admin_cannot_profile(self, monkeypatch):
+        monkeypatch.setenv("PROFILING_ADMIN_EMAILS", "other@example.com")
+        admin = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        assert not can_profile(admin)
+
+    def test_listed_non_admin_cannot_profile(self, monkeypatch):
+        monkeypatch.setenv("PROFILING_ADMIN_EMAILS", "organiser@example.com")
+        organiser = User(email="organiser@example.com", global_role=GlobalRole.GLOBAL_ORGANISER, password_hash="hash")
+        assert not can_profile(organiser)
+
+    def test_nobody_can_profile_by_default(self, monkeypatch):
+        monkeypatch.delenv("PROFILING_ADMIN_EMAILS", raising=False)
+        admin = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        assert not can_profile(admin)
@@ -0,0 +1,81 @@
+"""ABOUTME: Unit tests for counting SQL statements per request, task or test block
+ABOUTME: Uses an in-memory SQLite engine; covers N+1 detection, nesting and the query budget helpers"""
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from opendlp.adapters import database
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+def _run(engine, *statements: str) -> None:
+    with engine.connect() as conn:
+        for statement in statements:
+            conn.execute(text(statement))
+
+
+class TestQueryTracking:
+    def test_counts_statements_and_time(self, engine):
+        with database.track_queries() as stats:
+            _run(engine, "SELECT 1", "SELECT 2")
+
+        assert stats.count == 2
+        assert stats.duration_ms >= 0
+        assert stats.statements == {"SELECT 1": 1, "SELECT 2": 1}
+
+    def test_nothing_counted_outside_tracking(self, engine):
+        with database.track_queries() as stats:
+            pass
+        _run(engine, "SELECT 1")
+
+        assert stats.count == 0
+
+    def test_nested_tracking_restores_outer(self, engine):
+        with database.track_queries() as outer:
+            _run(engine, "SELECT 1")
+            with database.track_queries() as inner:
+                _run(engine, "SELECT 2")
+            _run(engine, "SELECT 3")
+
+        assert inner.count == 1
+        assert outer.count == 2
+
+    def test_start_and_stop(self, engine):
+        database.start_query_tracking()
+        _run(engine, "SELECT 1")
+        stats = database.stop_query_tracking()
+
+        assert stats is not None
+        assert stats.count == 1
+        assert database.stop_query_tracking() is None
+
+    def test_repeated_statements_flag_n_plus_one(self, engine):
+        with database.track_queries() as stats:
+            _run(engine, *["SELECT 1"] * database.N_PLUS_ONE_THRESHOLD, "SELECT 2")
+
+        assert stats.repeated_statements() == [("SELECT 1", database.N_PLUS_ONE_THRESHOLD)]
+
+    def test_server_timing_header_value(self):
+        stats = database.QueryStats(count=3, duration_ms=12.345)
+
+        assert stats.server_timing() == 'db;desc="3 queries";dur=12.3'
+
+
+class TestQueryBudget:
+    def test_within_budget(self, engine, query_budget):
+        with query_budget(2):
+            _run(engine, "SELECT 1", "SELECT 2")
+
+    def test_over_budget_fails(self, engine, query_budget):
+        with pytest.raises(pytest.fail.Exception, match="over the budget of 1"), query_budget(1):
+            _run(engine, "SELECT 1", "SELECT 2")
+
+    @pytest.mark.query_budget(1)
+    def test_marker_allows_test_within_budget(self, engine):
+        _run(engine, "SELECT 1")
@@ -6,7 +6,11 @@ import uuid
 import pytest
 
 from opendlp.domain.assembly import Assembly
-from opendlp.domain.registration_document import DocumentValidationError, RegistrationDocument
+from opendlp.domain.registration_document import (
+    DocumentValidationError,
+    RegistrationDocument,
+    RegistrationDocumentSummary,
+)
 from opendlp.domain.registration_page import RegistrationPage, RegistrationPageStatus
 from opendlp.domain.users import User, UserAssemblyRole
 from opendlp.domain.value_objects import AssemblyRole, AssemblyStatus, GlobalRole
@@ -190,6 +194,7 @@ class TestListRegistrationDocuments:
 
         listed = service.list_registration_documents(uow, admin.id, assembly.id)
         assert len(listed) == 2
+        assert all(isinstance(item, RegistrationDocumentSummary) for item in listed)
 
     def test_empty_when_no_page(self, uow):
         admin, assembly = _admin(uow), _assembly(uow)
@@ -315,3 +320,27 @@ class TestGetRegistrationDocumentForServing:
 
         served = service.get_registration_document_for_serving(uow, "live", document.sha256)
         assert served is not None
+
+
+class TestGetRegistrationDocumentInfoForServing:
+    def test_resolves_metadata_and_streams_the_bytes(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly, url_slug="live")
+        document = _stored_document(uow, page)
+
+        info = service.get_registration_document_info_for_serving(uow, "live", f"{document.sha256}.pdf")
+        assert info is not None
+        assert (info.id, info.sha256, info.byte_size) == (document.id, document.sha256, document.byte_size)
+        assert b"".join(service.iter_registration_document_data(uow, info.id)) == document.data
+
+    def test_none_when_closed(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly, url_slug="closed", status=RegistrationPageStatus.CLOSED)
+        document = _stored_document(uow, page)
+
+        assert service.get_registration_document_info_for_serving(uow, "closed", f"{document.sha256}.pdf") is None
+
+    def test_none_for_unknown_sha(self, uow):
+        assembly = _assembly(uow)
+        _page(uow, assembly, url_slug="live")
+        assert service.get_registration_document_info_for_serving(uow, "live", "deadbeef.pdf") is None
@@ -1,17 +1,25 @@
 """ABOUTME: Unit tests for the registration image service layer
-ABOUTME: Covers add/list/delete, quota, dedup, snippet building and public serving"""
+ABOUTME: Covers add/list/delete, quota, dedup, snippets, variant rendering and public serving"""
 
 import uuid
+from datetime import UTC, datetime, timedelta
 from io import BytesIO
 
 import pytest
 from PIL import Image
+from sqlalchemy.exc import IntegrityError
 
 from opendlp.domain.assembly import Assembly
-from opendlp.domain.registration_image import ImageValidationError, RegistrationImage
+from opendlp.domain.registration_image import (
+    ImageValidationError,
+    RegistrationImage,
+    RegistrationImageSummary,
+    RegistrationImageVariant,
+)
 from opendlp.domain.registration_page import RegistrationPage, RegistrationPageStatus
 from opendlp.domain.users import User, UserAssemblyRole
 from opendlp.domain.value_objects import AssemblyRole, AssemblyStatus, GlobalRole
+from opendlp.entrypoints.celery import tasks
 from opendlp.service_layer import registration_image_service as service
 from opendlp.service_layer.exceptions import (
     AssemblyNotFoundError,
@@ -21,7 +29,7 @@ from opendlp.service_layer.exceptions import (
     UserNotFoundError,
 )
 from opendlp.service_layer.image_processing import process_image
-from tests.fakes import FakeUnitOfWork
+from tests.fakes import FakeStore, FakeUnitOfWork
 
 _BIG = 10 * 1024 * 1024
 _EDGE = 2048
@@ -197,6 +205,7 @@ class TestListRegistrationImages:
 
         listed = service.list_registration_images(uow, admin.id, assembly.id)
         assert len(listed) == 2
+        assert all(isinstance(item, RegistrationImageSummary) for item in listed)
 
     def test_empty_when_no_page(self, uow):
         admin, assembly = _admin(uow), _assembly(uow)
@@ -322,3 +331,207 @@ class TestGetRegistrationImageForServing:
 
         served = service.get_registration_image_for_serving(uow, "live", image.sha256)
         assert served is not None
+
+
+class TestGetRegistrationImageInfoForServing:
+    def test_resolves_metadata_and_streams_the_bytes(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly, url_slug="live")
+        image = _stored_image(uow, page)
+
+        info = service.get_registration_image_info_for_serving(uow, "live", f"{image.sha256}.png")
+        assert info is not None
+        assert (info.id, info.sha256, info.byte_size) == (image.id, image.sha256, image.byte_size)
+        assert b"".join(service.iter_registration_image_data(uow, info.id)) == image.data
+
+    def test_none_when_closed(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly, url_slug="closed", status=RegistrationPageStatus.CLOSED)
+        image = _stored_image(uow, page)
+
+        assert service.get_registration_image_info_for_serving(uow, "closed", f"{image.sha256}.png") is None
+
+    def test_none_for_unknown_sha(self, uow):
+        assembly = _assembly(uow)
+        _page(uow, assembly, url_slug="live")
+        assert service.get_registration_image_info_for_serving(uow, "live", "deadbeef.png") is None
+
+
+def _wide_png(width: int = 800, height: int = 400) -> bytes:
+    buffer = BytesIO()
+    Image.linear_gradient("L").resize((width, height)).convert("RGB").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _variant(image: RegistrationImage, image_format: str, width: int, byte_size: int) -> RegistrationImageVariant:
+    return RegistrationImageVariant(
+        image_id=image.id,
+        image_format=image_format,
+        width=width,
+        height=width // 2,
+        sha256=f"{image_format}{width}".ljust(64, "0"),
+        data=b"v" * byte_size,
+        byte_size=byte_size,
+    )
+
+
+class TestImageVariants:
+    def test_upload_queues_the_variants_after_committing(self, uow, stub_image_variant_task):
+        admin, assembly = _admin(uow), _assembly(uow)
+        _page(uow, assembly)
+
+        image = service.add_registration_image(uow, admin.id, assembly.id, _png())
+
+        assert uow.committed
+        stub_image_variant_task.assert_called_once_with(image_id=str(image.id))
+
+    def test_dedup_does_not_queue_again(self, uow, stub_image_variant_task):
+        admin, assembly = _admin(uow), _assembly(uow)
+        _page(uow, assembly)
+        service.add_registration_image(uow, admin.id, assembly.id, _png())
+
+        service.add_registration_image(uow, admin.id, assembly.id, _png())
+
+        assert stub_image_variant_task.call_count == 1
+
+    def test_generates_webp_and_narrower_png_once(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly)
+        processed = process_image(_wide_png(), max_bytes=_BIG, max_edge_px=_EDGE)
+        image = RegistrationImage.from_processed(page.assembly_id, processed)
+        uow.registration_images.add(image)
+
+        created = service.generate_registration_image_variants(uow, image.id)
+
+        variants = uow.registration_image_variants.list_info_by_image_id(image.id)
+        assert created == 5
+        assert sorted((v.image_format, v.width) for v in variants) == [
+            ("png", 320),
+            ("png", 640),
+            ("webp", 320),
+            ("webp", 640),
+            ("webp", 800),
+        ]
+        assert service.generate_registration_image_variants(uow, image.id) == 0
+
+    def test_generating_for_a_deleted_image_is_a_no_op(self, uow):
+        assert service.generate_registration_image_variants(uow, uuid.uuid4()) == 0
+
+    def test_backfill_lists_only_older_images_without_variants(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly)
+        done, pending, recent = (_stored_image(uow, page, color) for color in ((1, 0, 0), (2, 0, 0), (3, 0, 0)))
+        uow.registration_image_variants.add(_variant(done, "webp", 20, 10))
+        cutoff = recent.created_at
+        recent.created_at = cutoff + timedelta(minutes=1)
+
+        assert service.list_image_ids_needing_variants(uow, cutoff + timedelta(seconds=1), limit=10) == [pending.id]
+
+    def test_variants_stored_meanwhile_by_another_task_count_as_done(self, uow, monkeypatch):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly)
+        processed = process_image(_wide_png(), max_bytes=_BIG, max_edge_px=_EDGE)
+        image = RegistrationImage.from_processed(page.assembly_id, processed)
+        uow.registration_images.add(image)
+
+        def duplicate_variant() -> None:
+            raise IntegrityError("INSERT INTO registration_image_variants", {}, Exception("duplicate key"))
+
+        monkeypatch.setattr(uow, "commit", duplicate_variant)
+
+        assert service.generate_registration_image_variants(uow, image.id) == 0
+
+    def test_backfill_skips_images_whose_variants_failed(self, uow):
+        assembly = _assembly(uow)
+        page = _page(uow, assembly)
+        failed, pending = (_stored_image(uow, page, color) for color in ((1, 0, 0), (2, 0, 0)))
+
+        service.mark_image_variants_failed(uow, failed.id)
+
+        assert failed.variants_failed_at is not None
+        assert service.list_image_ids_needing_variants(uow, datetime.now(UTC), limit=10) == [pending.id]
+
+
+class TestBackfillRegistrationImageVariants:
+    def test_one_broken_image_does_not_stop_the_batch_or_later_runs(self, monkeypatch):
+        store = FakeStore()
+        monkeypatch.setattr(tasks, "bootstrap", lambda session_factory=None: FakeUnitOfWork(store=store))
+        with FakeUnitOfWork(store=store) as uow:
+            page = _page(uow, _assembly(uow))
+            broken = RegistrationImage(page.assembly_id, 9, 800, 400, "0" * 64, b"not a png")
+            broken.created_at -= timedelta(hours=1)
+            uow.registration_images.add(broken)
+            processed = process_image(_wide_png(), max_bytes=_BIG, max_edge_px=_EDGE)
+            image = RegistrationImage.from_processed(page.assembly_id, processed)
+            image.created_at -= timedelta(minutes=30)
+            uow.registration_images.add(image)
+            uow.commit()
+
+        assert tasks.backfill_registration_image_variants() == 1
+        assert tasks.backfill_registration_image_variants() == 0
+
+        with FakeUnitOfWork(store=store) as uow:
+            assert uow.registration_image_variants.list_info_by_image_id(image.id)
+            assert uow.registration_images.get(broken.id).variants_failed_at is not None
+
+
+class TestGetRegistrationImageRenditionForServing:
+    def _image(self, uow) -> RegistrationImage:
+        assembly = _assembly(uow)
+        page = _page(uow, assembly, url_slug="live")
+        image = RegistrationImage(
+            assembly_id=page.assembly_id, byte_size=10_000, width=1200, height=600, sha256="a" * 64, data=b"p" * 10_000
+        )
+        uow.registration_images.add(image)
+        return image
+
+    def _serve(self, uow, image, width=None, webp=True):
+        return service.get_registration_image_rendition_for_serving(
+            uow, "live", f"{image.sha256}.png", requested_width=width, accepts_webp=webp
+        )
+
+    def test_picks_the_smallest_variant_covering_the_width(self, uow):
+        image = self._image(uow)
+        for variant in (_variant(image, "webp", 640, 900), _variant(image, "webp", 1024, 2000)):
+            uow.registration_image_variants.add(variant)
+
+        rendition = self._serve(uow, image, width=500)
+
+        assert rendition.is_variant
+        assert rendition.content_type == "image/webp"
+        assert rendition.info.byte_size == 900
+
+    def test_png_only_when_webp_is_not_accepted(self, uow):
+        image = self._image(uow)
+        for variant in (_variant(image, "webp", 640, 900), _variant(image, "png", 640, 3000)):
+            uow.registration_image_variants.add(variant)
+
+        rendition = self._serve(uow, image, width=600, webp=False)
+
+        assert rendition.content_type == "image/png"
+        assert rendition.info.byte_size == 3000
+
+    def test_original_is_provisional_until_variants_exist(self, uow):
+        image = self._image(uow)
+
+        rendition = self._serve(uow, image, width=320)
+
+        assert not rendition.is_variant
+        assert rendition.info.id == image.id
+        assert rendition.provisional
+
+    def test_original_is_final_when_no_variant_would_be_smaller(self, uow):
+        image = self._image(uow)
+        uow.registration_image_variants.add(_variant(image, "png", 640, 3000))
+
+        rendition = self._serve(uow, image, webp=False)
+
+        assert not rendition.is_variant
+        assert not rendition.provisional
+
+    def test_none_for_unknown_sha(self, uow):
+        _page(uow, _assembly(uow), url_slug="live")
+        assert (
+            service.get_registration_image_rendition_for_serving(uow, "live", "deadbeef.png", None, accepts_webp=True)
+            is None
+        )
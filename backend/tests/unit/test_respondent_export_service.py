@@ -5,10 +5,11 @@ import csv
 import uuid
 from datetime import UTC, datetime
 from io import StringIO
+from unittest.mock import patch
 
 import pytest
 
-from opendlp.adapters.tabular_export import CsvExportTarget
+from opendlp.adapters.tabular_export import CsvExportTarget, ExportTargetError
 from opendlp.domain.assembly import Assembly
 from opendlp.domain.assembly_csv import AssemblyCSV
 from opendlp.domain.respondent_field_schema import RespondentFieldDefinition, RespondentFieldGroup
@@ -24,11 +25,17 @@ from opendlp.service_layer.exceptions import (
 from opendlp.service_layer.respondent_export_service import (
     STATUS_FILTER_ALL,
     STATUS_FILTER_SELECTED_OR_CONFIRMED,
+    GSheetExportState,
+    GSheetExportStatus,
     build_respondent_table,
+    dismiss_respondent_gsheet_export_state,
     export_respondents,
     export_respondents_to_gsheet,
     get_respondent_gsheet_config,
+    get_respondent_gsheet_export_state,
     resolve_status_filter,
+    run_respondent_gsheet_export,
+    start_respondent_gsheet_export,
 )
 from tests.fakes import FakeGSheetExportTarget, FakeUnitOfWork
 
@@ -405,3 +412,171 @@ class TestExportRespondentsToGSheet:
     def test_get_config_returns_none_when_unset(self, uow):
         user, assembly = _seed(uow)
         assert get_respondent_gsheet_config(uow, user.id, assembly.id) is None
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self.store[key] = value.encode("utf-8")
+        return True
+
+    def delete(self, key: str) -> int:
+        return 1 if self.store.pop(key, None) is not None else 0
+
+
+def _run(uow, user, assembly, redis, target, *, task_id: str = "task-1") -> GSheetExportState:
+    return run_respondent_gsheet_export(
+        uow,
+        user.id,
+        assembly.id,
+        task_id=task_id,
+        status_filter=None,
+        spreadsheet_url=_SHEET_URL,
+        worksheet_name="Export tab",
+        target=target,
+        redis_client=redis,
+    )
+
+
+class TestBackgroundGSheetExport:
+    def test_start_queues_the_task_and_records_it_as_pending(self, uow):
+        user, assembly = _seed(uow)
+        redis = _FakeRedis()
+
+        with patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay") as delay:
+            state = start_respondent_gsheet_export(
+                uow,
+                user.id,
+                assembly.id,
+                status_filter=[RespondentStatus.SELECTED, RespondentStatus.CONFIRMED],
+                spreadsheet_url=_SHEET_URL,
+                worksheet_name="Export tab",
+                redis_client=redis,
+            )
+
+        assert state.status == GSheetExportStatus.PENDING
+        assert delay.call_args.kwargs["task_id"] == state.task_id
+        assert delay.call_args.kwargs["statuses"] == ["SELECTED", "CONFIRMED"]
+        assert get_respondent_gsheet_export_state(uow, user.id, assembly.id, redis_client=redis) == state
+
+    def test_start_rejects_a_malformed_url_without_queueing(self, uow):
+        user, assembly = _seed(uow)
+        redis = _FakeRedis()
+
+        with (
+            patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay") as delay,
+            pytest.raises(ValueError),
+        ):
+            start_respondent_gsheet_export(
+                uow,
+                user.id,
+                assembly.id,
+                status_filter=None,
+                spreadsheet_url="not a url",
+                worksheet_name="",
+                redis_client=redis,
+            )
+
+        delay.assert_not_called()
+        assert redis.store == {}
+
+    def test_run_records_completion_with_row_counts(self, uow):
+        user, assembly = _seed(uow)
+        _add_respondent(uow, assembly, "R1", RespondentStatus.POOL)
+        _add_respondent(uow, assembly, "R2", RespondentStatus.SELECTED)
+        redis = _FakeRedis()
+
+        state = _run(uow, user, assembly, redis, FakeGSheetExportTarget())
+
+        assert state.status == GSheetExportStatus.COMPLETED
+        assert (state.rows_written, state.total_rows) == (2, 2)
+        assert get_respondent_gsheet_export_state(uow, user.id, assembly.id, redis_client=redis) == state
+        assert get_respondent_gsheet_config(uow, user.id, assembly.id) is not None
+
+    def test_run_records_a_write_failure_and_saves_no_config(self, uow):
+        user, assembly = _seed(uow)
+        _add_respondent(uow, assembly, "R1", RespondentStatus.POOL)
+        redis = _FakeRedis()
+
+        error = ExportTargetError("no access", access_denied=True)
+        state = _run(uow, user, assembly, redis, FakeGSheetExportTarget(error=error))
+
+        assert state.status == GSheetExportStatus.FAILED
+        assert state.error_message == "no access"
+        assert state.sharing_problem
+        assert get_respondent_gsheet_config(uow, user.id, assembly.id) is None
+
+    def test_run_only_blames_sharing_when_access_was_denied(self, uow):
+        user, assembly = _seed(uow)
+        _add_respondent(uow, assembly, "R1", RespondentStatus.POOL)
+        redis = _FakeRedis()
+
+        error = ExportTargetError("APIError: [500]: Internal error")
+        state = _run(uow, user, assembly, redis, FakeGSheetExportTarget(error=error))
+
+        assert state.status == GSheetExportStatus.FAILED
+        assert state.error_message == "APIError: [500]: Internal error"
+        assert not state.sharing_problem
+
+    def test_run_records_an_unexpected_failure_without_blaming_sharing(self, uow):
+        user, assembly = _seed(uow)
+        _add_respondent(uow, assembly, "R1", RespondentStatus.POOL)
+        redis = _FakeRedis()
+
+        state = _run(uow, user, assembly, redis, FakeGSheetExportTarget(error=RuntimeError("quota exceeded")))
+
+        assert state.status == GSheetExportStatus.FAILED
+        assert "quota exceeded" in state.error_message
+        assert not state.sharing_problem
+
+    def test_dismiss_forgets_a_finished_export(self, uow):
+        user, assembly = _seed(uow)
+        redis = _FakeRedis()
+        state = _run(uow, user, assembly, redis, FakeGSheetExportTarget())
+
+        dismiss_respondent_gsheet_export_state(uow, user.id, assembly.id, state.task_id, redis_client=redis)
+
+        assert get_respondent_gsheet_export_state(uow, user.id, assembly.id, redis_client=redis) is None
+
+    def test_dismiss_keeps_a_newer_export(self, uow):
+        user, assembly = _seed(uow)
+        redis = _FakeRedis()
+        finished = _run(uow, user, assembly, redis, FakeGSheetExportTarget(), task_id="older-task")
+        with patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay"):
+            newer = start_respondent_gsheet_export(
+                uow,
+                user.id,
+                assembly.id,
+                status_filter=None,
+                spreadsheet_url=_SHEET_URL,
+                worksheet_name="",
+                redis_client=redis,
+            )
+
+        dismiss_respondent_gsheet_export_state(uow, user.id, assembly.id, finished.task_id, redis_client=redis)
+
+        assert get_respondent_gsheet_export_state(uow, user.id, assembly.id, redis_client=redis) == newer
+
+    def test_a_superseded_run_does_not_overwrite_the_newer_export(self, uow):
+        user, assembly = _seed(uow)
+        _add_respondent(uow, assembly, "R1", RespondentStatus.POOL)
+        redis = _FakeRedis()
+        with patch("opendlp.entrypoints.celery.tasks.export_respondents_to_gsheet.delay"):
+            newer = start_respondent_gsheet_export(
+                uow,
+                user.id,
+                assembly.id,
+                status_filter=None,
+                spreadsheet_url=_SHEET_URL,
+                worksheet_name="",
+                redis_client=redis,
+            )
+
+        _run(uow, user, assembly, redis, FakeGSheetExportTarget(), task_id="older-task")
+
+        assert get_respondent_gsheet_export_state(uow, user.id, assembly.id, redis_client=redis) == newer
@@ -1,7 +1,9 @@
 """ABOUTME: Unit tests for respondent service layer functions
 ABOUTME: Uses FakeUnitOfWork to test service-level behaviour without a database"""
 
+import csv
 import uuid
+from io import BytesIO, StringIO
 
 import pytest
 
@@ -406,6 +408,71 @@ class TestCreateRespondentEmitsCreateComment:
             assert create_comments[0].author_id == user.id
 
 
+class TestParseCsv:
+    @pytest.mark.parametrize(
+        "csv_content",
+        [
+            "id,name,age\nR1,Alice,30\n\nR2,Bob\nR3,Cy,40,extra\n",
+            'id,notes\r\nR1,"two\nlines"\r\n',
+            "id,id\nR1,R2\n",
+            "",
+        ],
+    )
+    def test_row_dicts_match_dict_reader(self, csv_content):
+        reader = csv.DictReader(StringIO(csv_content))
+        expected_rows = list(reader)
+
+        parsed = respondent_service.parse_csv(csv_content)
+
+        assert parsed.headers == list(reader.fieldnames or [])
+        assert list(parsed.row_dicts()) == expected_rows
+
+    def test_rows_are_kept_as_values_in_column_order(self):
+        parsed = respondent_service.parse_csv("id,name\nR1,Alice\n")
+
+        assert parsed.rows == [["R1", "Alice"]]
+
+    def test_stream_is_read_lazily(self):
+        stream = BytesIO(("id,name\n" + "".join(f"R{i},Name {i}\n" for i in range(100_000))).encode())
+
+        headers, rows = respondent_service.read_csv_stream(stream)
+
+        assert headers == ["id", "name"]
+        assert stream.tell() < 64 * 1024
+        assert next(rows) == ["R0", "Name 0"]
+        assert sum(1 for _ in rows) == 99_999
+
+
+class TestImportRespondentsFromCsvRows:
+    def test_imports_in_batches(self, uow):
+        user, assembly, _ = _seed(uow)
+        batches: list[int] = []
+        bulk_add = uow.respondents.bulk_add
+        uow.respondents.bulk_add = lambda items: (batches.append(len(items)), bulk_add(items))
+        rows = iter([["ROW-1", "Female"], ["ROW-2", "Male"], [""], ["ROW-3", "Male"], ["ROW-1", "Male"]])
+
+        count, errors, id_col = respondent_service.import_respondents_from_csv_rows(
+            uow, user.id, assembly.id, ["person_id", "Gender"], rows, batch_size=2
+        )
+
+        assert (count, id_col) == (3, "person_id")
+        assert batches == [2, 1]
+        assert errors == ["Row 4: skipped, empty person_id", "Row 6: skipped duplicate person_id: ROW-1"]
+        assert uow.respondents.get_by_external_id(assembly.id, "ROW-3").attributes == {"Gender": "Male"}
+
+    def test_bad_header_row_is_rejected_before_any_row_is_read(self, uow):
+        user, assembly, _ = _seed(uow)
+
+        def rows():
+            raise AssertionError("rows should not be read")
+            yield []
+
+        with pytest.raises(InvalidSelection, match="must have 'external_id' column"):
+            respondent_service.import_respondents_from_csv_rows(
+                uow, user.id, assembly.id, ["id", "name"], rows(), id_column="external_id"
+            )
+
+
 class TestImportRespondentsFromRows:
     # Row-to-Respondent mapping (attributes, flags, internal columns, comment) is
     # covered directly in TestRespondentFromRow. These tests cover the
@@ -0,0 +1,310 @@
+"""ABOUTME: Unit tests for the Redis-backed parsed selection data cache
+ABOUTME: Uses an in-memory fake Redis and FakeUnitOfWork to check hits, invalidation and fallbacks"""
+
+import uuid
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from redis.exceptions import ConnectionError as RedisConnectionError
+from sortition_algorithms import adapters
+from sortition_algorithms.errors import SelectionError
+from sortition_algorithms.settings import Settings
+
+from opendlp.adapters.selection_data_cache import (
+    CachedSelectionData,
+    SelectionDataUnavailable,
+    bump_data_versions,
+    get_data_version,
+    load_shared_selection_data,
+    share_selection_data,
+)
+from opendlp.adapters.sortition_data_adapter import OpenDLPDataAdapter
+from opendlp.domain.assembly import SelectionRunRecord
+from opendlp.domain.respondents import Respondent
+from opendlp.domain.targets import TargetCategory, TargetValue
+from opendlp.domain.value_objects import RespondentStatus, SelectionRunStatus, SelectionTaskType
+from opendlp.service_layer.sortition import generate_selection_csvs
+from tests.fakes import FakeStore, FakeUnitOfWork
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self.redis = redis
+        self.ops: list[tuple[str, Any]] = []
+
+    def set(self, key: str, value: Any) -> None:
+        self.ops.append((key, value))
+
+    def execute(self) -> None:
+        for key, value in self.ops:
+            self.redis.set(key, value)
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key: str) -> bytes | None:
+        return self.store.get(key)
+
+    def set(self, key: str, value: Any, nx: bool = False, ex: int | None = None) -> bool:
+        if nx and key in self.store:
+            return False
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+class _BrokenRedis:
+    def get(self, key: str) -> None:
+        raise RedisConnectionError("down")
+
+    def set(self, *args: Any, **kwargs: Any) -> None:
+        raise RedisConnectionError("down")
+
+
+class _ReplicaUnitOfWork(FakeUnitOfWork):
+    read_only = True
+    using_replica = True
+
+
+def _add_data(uow: FakeUnitOfWork) -> uuid.UUID:
+    assembly_id = uuid.uuid4()
+    uow.target_categories.add(
+        TargetCategory(
+            assembly_id=assembly_id,
+            name="gender",
+            values=[TargetValue(value="male", min=3, max=7), TargetValue(value="female", min=3, max=7)],
+        )
+    )
+    for i in range(20):
+        uow.respondents.add(
+            Respondent(
+                assembly_id=assembly_id,
+                external_id=f"p{i}",
+                attributes={"gender": "male" if i % 2 == 0 else "female"},
+                selection_status=RespondentStatus.POOL,
+            )
+        )
+    return assembly_id
+
+
+def _settings(**kwargs: Any) -> Settings:
+    return Settings(id_column="external_id", columns_to_keep=[], check_same_address=False, **kwargs)
+
+
+def _cached(uow: FakeUnitOfWork, assembly_id: uuid.UUID, redis: Any, ttl: int = 3600) -> CachedSelectionData:
+    select_data = adapters.SelectionData(OpenDLPDataAdapter(uow, assembly_id))
+    return CachedSelectionData(select_data, assembly_id, redis_client=redis, ttl_seconds=ttl)
+
+
+class TestDataVersion:
+    def test_version_is_stable_until_bumped(self):
+        redis = _FakeRedis()
+        assembly_id = uuid.uuid4()
+
+        first = get_data_version(assembly_id, redis_client=redis)
+        assert get_data_version(assembly_id, redis_client=redis) == first
+
+        bump_data_versions([assembly_id], redis_client=redis)
+
+        assert get_data_version(assembly_id, redis_client=redis) != first
+
+    def test_bump_leaves_other_assemblies_alone(self):
+        redis = _FakeRedis()
+        assembly_id = uuid.uuid4()
+        other_id = uuid.uuid4()
+        other_version = get_data_version(other_id, redis_client=redis)
+
+        bump_data_versions([assembly_id], redis_client=redis)
+
+        assert get_data_version(other_id, redis_client=redis) == other_version
+
+
+class TestCachedSelectionData:
+    def test_second_load_reuses_parsed_data(self, uow):
+        assembly_id = _add_data(uow)
+        redis = _FakeRedis()
+        settings = _settings()
+
+        first = _cached(uow, assembly_id, redis)
+        features, _ = first.load_features(number_to_select=10)
+        people, _ = first.load_people(settings, features)
+
+        second = _cached(uow, assembly_id, redis)
+        with patch.object(adapters.SelectionData, "load_people") as load_people:
+            cached_features, _ = second.load_features(number_to_select=10)
+            cached_people, _ = second.load_people(settings, cached_features)
+
+        load_people.assert_not_called()
+        assert list(cached_features.keys()) == list(features.keys())
+        assert cached_people.count == people.count == 20
+        assert second.select_data.feature_column_name == first.select_data.feature_column_name
+
+    def test_bumped_version_forces_reparse(self, uow):
+        assembly_id = _add_data(uow)
+        redis = _FakeRedis()
+        settings = _settings()
+        first = _cached(uow, assembly_id, redis)
+        features, _ = first.load_features()
+        first.load_people(settings, features)
+
+        uow.respondents.add(
+            Respondent(
+                assembly_id=assembly_id,
+                external_id="p99",
+                attributes={"gender": "male"},
+                selection_status=RespondentStatus.POOL,
+            )
+        )
+        bump_data_versions([assembly_id], redis_client=redis)
+
+        second = _cached(uow, assembly_id, redis)
+        features, _ = second.load_features()
+        people, _ = second.load_people(settings, features)
+        assert people.count == 21
+
+    def test_number_to_select_is_still_checked_on_a_hit(self, uow):
+        assembly_id = _add_data(uow)
+        redis = _FakeRedis()
+        _cached(uow, assembly_id, redis).load_features(number_to_select=10)
+
+        # The gender minimums add up to 6, so selecting 2 is infeasible.
+        with pytest.raises(SelectionError):
+            _cached(uow, assembly_id, redis).load_features(number_to_select=2)
+
+    def test_parse_settings_are_part_of_the_key(self, uow):
+        assembly_id = _add_data(uow)
+        redis = _FakeRedis()
+        first = _cached(uow, assembly_id, redis)
+        features, _ = first.load_features()
+        first.load_people(_settings(), features)
+
+        second = _cached(uow, assembly_id, redis)
+        features, _ = second.load_features()
+        with patch.object(adapters.SelectionData, "load_people", wraps=second.select_data.load_people) as load_people:
+            second.load_people(_settings(check_same_address_columns=[]), features)
+            second.load_people(Settings(id_column="external_id", columns_to_keep=["gender"]), features)
+
+        assert load_people.call_count == 1
+
+    def test_zero_ttl_is_pass_through(self, uow):
+        assembly_id = _add_data(uow)
+        redis = _FakeRedis()
+        cached = _cached(uow, assembly_id, redis, ttl=0)
+
+        features, _ = cached.load_features(number_to_select=10)
+        people, _ = cached.load_people(_settings(), features)
+
+        assert people.count == 20
+        assert redis.store == {}
+
+    def test_redis_errors_fall_back_to_parsing(self, uow):
+        assembly_id = _add_data(uow)
+        cached = _cached(uow, assembly_id, _BrokenRedis())
+
+        features, _ = cached.load_features(number_to_select=10)
+        people, _ = cached.load_people(_settings(), features)
+
+        assert people.count == 20
+
+    def test_without_fill_cache_hits_are_used_but_misses_are_not_stored(self, uow):
+        assembly_id = _add_data(uow)
+        redis = _FakeRedis()
+        settings = _settings()
+        first = _cached(uow, assembly_id, redis)
+        features, _ = first.load_features(number_to_select=10)
+        stored = dict(redis.store)
+
+        reader = CachedSelectionData(
+            adapters.SelectionData(OpenDLPDataAdapter(uow, assembly_id)),
+            assembly_id,
+            redis_client=redis,
+            ttl_seconds=3600,
+            fill_cache=False,
+        )
+        cached_features, _ = reader.load_features(number_to_select=10)
+        people, _ = reader.load_people(settings, cached_features)
+
+        assert list(cached_features.keys()) == list(features.keys())
+        assert people.count == 20
+        assert redis.store == stored
+
+
+class TestSharedSelectionData:
+    def _share(self, uow: FakeUnitOfWork, redis: _FakeRedis) -> tuple[uuid.UUID, str]:
+        assembly_id = _add_data(uow)
+        select_data = adapters.SelectionData(OpenDLPDataAdapter(uow, assembly_id))
+        features, _ = select_data.load_features()
+        people, _ = select_data.load_people(_settings(), features)
+        data_version = get_data_version(assembly_id, redis_client=redis)
+        share_selection_data(assembly_id, data_version, _settings(), features, people, 60, redis_client=redis)
+        return assembly_id, data_version
+
+    def test_shared_data_is_loaded_without_parsing(self, uow):
+        redis = _FakeRedis()
+        assembly_id, data_version = self._share(uow, redis)
+
+        with patch.object(adapters.SelectionData, "load_people") as load_people:
+            features, people = load_shared_selection_data(assembly_id, data_version, _settings(), redis_client=redis)
+
+        load_people.assert_not_called()
+        assert list(features.keys()) == ["gender"]
+        assert people.count == 20
+
+    def test_changed_version_is_refused(self, uow):
+        redis = _FakeRedis()
+        assembly_id, data_version = self._share(uow, redis)
+        bump_data_versions([assembly_id], redis_client=redis)
+
+        with pytest.raises(SelectionDataUnavailable) as excinfo:
+            load_shared_selection_data(assembly_id, data_version, _settings(), redis_client=redis)
+
+        assert excinfo.value.changed
+
+    def test_expired_data_is_refused(self, uow):
+        redis = _FakeRedis()
+        assembly_id = _add_data(uow)
+        data_version = get_data_version(assembly_id, redis_client=redis)
+
+        with pytest.raises(SelectionDataUnavailable) as excinfo:
+            load_shared_selection_data(assembly_id, data_version, _settings(), redis_client=redis)
+
+        assert not excinfo.value.changed
+
+
+class TestSelectionCsvsFromReplica:
+    def test_replica_read_does_not_fill_the_cache(self):
+        store = FakeStore()
+        task_id = uuid.uuid4()
+        with FakeUnitOfWork(store=store) as primary:
+            assembly_id = _add_data(primary)
+            primary.selection_run_records.add(
+                SelectionRunRecord(
+                    assembly_id=assembly_id,
+                    task_id=task_id,
+                    status=SelectionRunStatus.COMPLETED,
+                    task_type=SelectionTaskType.SELECT_FROM_DB,
+                    selected_ids=[["p0", "p1"]],
+                    remaining_ids=["p2"],
+                )
+            )
+            primary.commit()
+        redis = _FakeRedis()
+
+        with (
+            patch("opendlp.adapters.selection_data_cache._get_redis", return_value=redis),
+            patch("opendlp.config.get_selection_data_cache_ttl_seconds", return_value=3600),
+            _ReplicaUnitOfWork(store=store) as replica,
+        ):
+            selected_csv, _remaining_csv = generate_selection_csvs(
+                replica, assembly_id, task_id, timing_uow=FakeUnitOfWork(store=store)
+            )
+
+        assert "p0" in selected_csv
+        assert not [key for key in redis.store if key.startswith("selection_data:")]
+        record = store.selection_run_records.get_by_task_id(task_id)
+        assert "csv_generation" in record.phase_timings
@@ -339,3 +339,33 @@ def test_get_by_assembly_id_paginated_filters_by_assembly(session):
     assert len(result2) == 2
     for run_record, _ in result2:
         assert run_record.assembly_id == assembly2_id
+
+
+def test_get_timed_runs_returns_completed_runs_with_pool_size_newest_first(session):
+    assembly_id = _create_assembly(session)
+    now = datetime.now(UTC)
+
+    def add_run(status: SelectionRunStatus, pool_size: int | None, minutes_ago: int) -> SelectionRunRecord:
+        record = SelectionRunRecord(
+            assembly_id=assembly_id,
+            task_id=uuid4(),
+            status=status,
+            task_type=SelectionTaskType.SELECT_FROM_DB,
+            pool_size=pool_size,
+            remaining_ids=["R1", "R2"],
+            created_at=now - timedelta(minutes=minutes_ago),
+        )
+        record.add_phase_timing("select", 2.5, 3.0)
+        session.add(record)
+        return record
+
+    older = add_run(SelectionRunStatus.COMPLETED, 100, minutes_ago=10)
+    newer = add_run(SelectionRunStatus.COMPLETED, 200, minutes_ago=5)
+    add_run(SelectionRunStatus.FAILED, 300, minutes_ago=1)
+    add_run(SelectionRunStatus.COMPLETED, None, minutes_ago=1)
+    session.commit()
+
+    runs = SqlAlchemySelectionRunRecordRepository(session).get_timed_runs()
+
+    assert [run.task_id for run in runs] == [newer.task_id, older.task_id]
+    assert runs[0].phase_timings == {"select": {"wall_seconds": 2.5, "cpu_seconds": 3.0}}
@@ -0,0 +1,93 @@
+"""ABOUTME: Unit tests for the selection timings report across assemblies and algorithms
+ABOUTME: Uses FakeUnitOfWork with run records carrying phase timings and pool sizes"""
+
+import uuid
+
+import pytest
+
+from opendlp.domain.assembly import Assembly, SelectionRunRecord
+from opendlp.domain.users import User
+from opendlp.domain.value_objects import GlobalRole, SelectionRunStatus, SelectionTaskType
+from opendlp.service_layer.exceptions import InsufficientPermissions
+from opendlp.service_layer.selection_timings import build_timing_report
+
+
+def _run(
+    assembly_id: uuid.UUID,
+    pool_size: int | None,
+    solver_seconds: float,
+    algorithm: str = "maximin",
+    status: SelectionRunStatus = SelectionRunStatus.COMPLETED,
+) -> SelectionRunRecord:
+    record = SelectionRunRecord(
+        assembly_id=assembly_id,
+        task_id=uuid.uuid4(),
+        status=status,
+        task_type=SelectionTaskType.SELECT_FROM_DB,
+        pool_size=pool_size,
+        category_count=4,
+        selection_algorithm=algorithm,
+    )
+    record.add_phase_timing("load_people", 1.0, 1.0)
+    record.add_phase_timing("select", solver_seconds, solver_seconds * 2)
+    return record
+
+
+@pytest.fixture
+def admin(uow) -> User:
+    user = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+    uow.users.add(user)
+    return user
+
+
+def test_groups_runs_by_assembly_and_algorithm(uow, admin):
+    assembly = Assembly(title="Climate Assembly")
+    uow.assemblies.add(assembly)
+    for run in (
+        _run(assembly.id, 1000, 4.0),
+        _run(assembly.id, 3000, 8.0),
+        _run(assembly.id, 2000, 20.0, algorithm="leximin"),
+    ):
+        uow.selection_run_records.add(run)
+
+    report = build_timing_report(uow, admin.id)
+
+    assert [(s.selection_algorithm, s.run_count) for s in report.summaries] == [("leximin", 1), ("maximin", 2)]
+    maximin = report.summaries[1]
+    assert maximin.assembly_title == "Climate Assembly"
+    assert (maximin.min_pool_size, maximin.max_pool_size) == (1000, 3000)
+    assert maximin.max_category_count == 4
+    assert maximin.mean_solver_seconds == 6.0
+    assert maximin.max_solver_seconds == 8.0
+    assert maximin.mean_solver_cpu_seconds == 12.0
+    assert maximin.mean_total_seconds == 7.0
+    assert [run.pool_size for run in report.runs] == [3000, 2000, 1000]
+
+
+def test_leaves_out_unfinished_and_untimed_runs(uow, admin):
+    assembly = Assembly(title="Assembly")
+    uow.assemblies.add(assembly)
+    uow.selection_run_records.add(_run(assembly.id, 1000, 4.0, status=SelectionRunStatus.FAILED))
+    uow.selection_run_records.add(_run(assembly.id, None, 4.0))
+    uow.selection_run_records.add(
+        SelectionRunRecord(
+            assembly_id=assembly.id,
+            task_id=uuid.uuid4(),
+            status=SelectionRunStatus.COMPLETED,
+            task_type=SelectionTaskType.SELECT_FROM_DB,
+            pool_size=1000,
+        )
+    )
+
+    report = build_timing_report(uow, admin.id)
+
+    assert report.summaries == []
+    assert report.runs == []
+
+
+def test_only_admins_can_see_timings(uow):
+    organiser = User(email="organiser@example.com", global_role=GlobalRole.GLOBAL_ORGANISER, password_hash="hash")
+    uow.users.add(organiser)
+
+    with pytest.raises(InsufficientPermissions):
+        build_timing_report(uow, organiser.id)
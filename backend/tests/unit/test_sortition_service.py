@@ -3,9 +3,10 @@ ABOUTME: Tests Google Sheets loading task management and selection run monitorin
 
 import uuid
 from datetime import UTC, datetime, timedelta
-from unittest.mock import Mock, patch
+from unittest.mock import Mock, call, patch
 
 import pytest
+from kombu.serialization import dumps
 from sortition_algorithms import GSheetDataSource, RunReport
 
 from opendlp.domain.assembly import Assembly, AssemblyGSheet, SelectionRunRecord
@@ -54,7 +55,7 @@ class TestStartGsheetLoadTask:
         )
         assembly.selection_settings = sel_settings
 
-        with patch("opendlp.service_layer.sortition.tasks.load_gsheet.delay") as mock_celery:
+        with patch("opendlp.entrypoints.celery.tasks.load_gsheet.delay") as mock_celery:
             mock_result = Mock()
             mock_result.id = "celery-task-id"
             mock_celery.return_value = mock_result
@@ -182,7 +183,7 @@ class TestGetSelectionRunStatus:
         )
         uow.selection_run_records.add(record)
 
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.id = "celery-progress"
             mock_result.state = "PROGRESS"
@@ -212,7 +213,7 @@ class TestGetSelectionRunStatus:
         )
         uow.selection_run_records.add(record)
 
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.id = "celery-pending"
             mock_result.state = "PENDING"
@@ -224,6 +225,64 @@ class TestGetSelectionRunStatus:
 
         assert result.log_messages == ["Task submitted"]
 
+    def test_stability_analysis_status_comes_from_the_record(self, uow):
+        """The stability analysis task succeeds once it has handed off its test
+        selections, so a successful Celery result must not mark the run as done."""
+        task_id = uuid.uuid4()
+        record = SelectionRunRecord(
+            assembly_id=uuid.uuid4(),
+            task_id=task_id,
+            task_type=SelectionTaskType.STABILITY_ANALYSIS_FROM_DB,
+            status=SelectionRunStatus.RUNNING,
+            celery_task_id="celery-dispatched",
+            log_messages=["Starting 20 test selections for stability analysis"],
+        )
+        uow.selection_run_records.add(record)
+
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
+            mock_result = Mock()
+            mock_result.id = "celery-dispatched"
+            mock_result.successful.return_value = True
+            mock_async_result.return_value = mock_result
+
+            result = sortition.get_selection_run_status(uow, task_id)
+
+        mock_result.get.assert_not_called()
+        assert result.success is None
+        assert result.log_messages == ["Starting 20 test selections for stability analysis"]
+
+    def test_db_selection_result_comes_from_the_record(self, uow):
+        """Database selections only return a success flag to Celery, so the panels
+        and report are read from the run record."""
+        task_id = uuid.uuid4()
+        report = RunReport()
+        report.add_line("Selected 2 people")
+        record = SelectionRunRecord(
+            assembly_id=uuid.uuid4(),
+            task_id=task_id,
+            task_type=SelectionTaskType.SELECT_FROM_DB,
+            status=SelectionRunStatus.COMPLETED,
+            celery_task_id="celery-done",
+            log_messages=["Selection completed successfully."],
+            selected_ids=[["a", "b"]],
+            run_report=report,
+        )
+        uow.selection_run_records.add(record)
+
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
+            mock_result = Mock()
+            mock_result.id = "celery-done"
+            mock_result.successful.return_value = True
+            mock_async_result.return_value = mock_result
+
+            result = sortition.get_selection_run_status(uow, task_id)
+
+        mock_result.get.assert_not_called()
+        assert isinstance(result, sortition.SelectionRunResult)
+        assert result.success is True
+        assert result.selected_ids == [frozenset({"a", "b"})]
+        assert result.run_report.as_text() == report.as_text()
+
 
 class TestGetManageOldTabsStatus:
     def get_run_result(self, task_is_list: bool, success: bool | None) -> sortition.RunResult:
@@ -383,7 +442,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return FAILURE state
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "FAILURE"
             mock_result.info = Exception("Task crashed")
@@ -414,7 +473,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return REVOKED state
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "REVOKED"
             mock_result.info = None
@@ -442,7 +501,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return PENDING (which means Celery forgot about it)
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "PENDING"
             mock_result.info = None
@@ -470,7 +529,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return STARTED state (task is running fine)
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "STARTED"
             mock_result.info = {}
@@ -498,7 +557,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return SUCCESS state
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "SUCCESS"
             mock_result.info = {}
@@ -526,7 +585,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return FAILURE state
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "FAILURE"
             mock_result.info = Exception("Failed to start")
@@ -582,7 +641,7 @@ class TestCheckAndUpdateTaskHealth:
         uow.selection_run_records.add(record)
 
         # Mock Celery to return STARTED (running normally)
-        with patch("opendlp.service_layer.sortition.app.app.AsyncResult") as mock_async_result:
+        with patch("opendlp.entrypoints.celery.app.app.AsyncResult") as mock_async_result:
             mock_result = Mock()
             mock_result.state = "STARTED"
             mock_result.info = {}
@@ -675,7 +734,7 @@ class TestCancelTask:
         uow.selection_run_records.add(record)
 
         # Cancel the task
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke") as mock_revoke:
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke") as mock_revoke:
             sortition.cancel_task(uow, admin_user.id, assembly.id, task_id)
             mock_revoke.assert_called_once_with("celery-123", terminate=True)
 
@@ -711,7 +770,7 @@ class TestCancelTask:
         uow.selection_run_records.add(record)
 
         # Cancel the task
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke") as mock_revoke:
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke") as mock_revoke:
             sortition.cancel_task(uow, admin_user.id, assembly.id, task_id)
             mock_revoke.assert_called_once_with("celery-456", terminate=True)
 
@@ -720,6 +779,33 @@ class TestCancelTask:
         assert updated_record.status == SelectionRunStatus.CANCELLED
         assert updated_record.completed_at is not None
 
+    def test_cancel_also_revokes_child_tasks(self, uow):
+        """Cancelling a stability analysis revokes the samples and callback it queued."""
+        admin_user = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        uow.users.add(admin_user)
+        assembly = Assembly(title="Test Assembly")
+        uow.assemblies.add(assembly)
+        task_id = uuid.uuid4()
+        uow.selection_run_records.add(
+            SelectionRunRecord(
+                assembly_id=assembly.id,
+                task_id=task_id,
+                task_type=SelectionTaskType.STABILITY_ANALYSIS_FROM_DB,
+                status=SelectionRunStatus.RUNNING,
+                celery_task_id="celery-dispatch",
+                child_celery_task_ids=["sample-1", "sample-2", "callback"],
+            )
+        )
+
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke") as mock_revoke:
+            sortition.cancel_task(uow, admin_user.id, assembly.id, task_id)
+
+        assert mock_revoke.call_args_list == [
+            call("celery-dispatch", terminate=True),
+            call(["sample-1", "sample-2", "callback"], terminate=True),
+        ]
+        assert uow.selection_run_records.get_by_task_id(task_id).status == SelectionRunStatus.CANCELLED
+
     def test_cancel_already_completed_task_fails(self, uow):
         """Test that cancelling a COMPLETED task raises an error."""
 
@@ -845,7 +931,7 @@ class TestCancelTask:
         uow.selection_run_records.add(record)
 
         # Cancel the task with Celery revoke failing
-        with patch("opendlp.service_layer.sortition.app.app.control.revoke") as mock_revoke:
+        with patch("opendlp.entrypoints.celery.app.app.control.revoke") as mock_revoke:
             mock_revoke.side_effect = Exception("Celery connection error")
             sortition.cancel_task(uow, admin_user.id, assembly.id, task_id)
 
@@ -893,7 +979,7 @@ class TestStartGsheetSelectTaskCeleryApplyKwargs:
     def test_default_call_uses_apply_async_without_extra_kwargs(self, uow):
         uow, admin, assembly = self._make_uow_with_select_setup(uow)
 
-        with patch("opendlp.service_layer.sortition.tasks.run_select.apply_async") as mock_apply:
+        with patch("opendlp.entrypoints.celery.tasks.run_select.apply_async") as mock_apply:
             mock_result = Mock()
             mock_result.id = "celery-task-id"
             mock_apply.return_value = mock_result
@@ -911,6 +997,7 @@ class TestStartGsheetSelectTaskCeleryApplyKwargs:
             "settings",
             "test_selection",
             "gen_rem_tab",
+            "profile",
         }
         # No celery options should have been passed
         extra = {k: v for k, v in call_args.kwargs.items() if k != "kwargs"}
@@ -919,7 +1006,7 @@ class TestStartGsheetSelectTaskCeleryApplyKwargs:
     def test_forwards_celery_apply_kwargs_to_apply_async(self, uow):
         uow, admin, assembly = self._make_uow_with_select_setup(uow)
 
-        with patch("opendlp.service_layer.sortition.tasks.run_select.apply_async") as mock_apply:
+        with patch("opendlp.entrypoints.celery.tasks.run_select.apply_async") as mock_apply:
             mock_result = Mock()
             mock_result.id = "celery-task-id"
             mock_apply.return_value = mock_result
@@ -944,6 +1031,7 @@ class TestStartGsheetSelectTaskCeleryApplyKwargs:
             "settings",
             "test_selection",
             "gen_rem_tab",
+            "profile",
         }
 
 
@@ -1090,7 +1178,7 @@ class TestStartDbSelectTask:
         assembly.selection_settings = SelectionSettings(assembly_id=assembly.id, check_same_address=False)
         uow.assemblies.add(assembly)
 
-        with patch("opendlp.service_layer.sortition.tasks.run_select_from_db.delay") as mock_celery:
+        with patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay") as mock_celery:
             mock_result = Mock()
             mock_result.id = "celery-task-id"
             mock_celery.return_value = mock_result
@@ -1112,6 +1200,9 @@ class TestStartDbSelectTask:
         assert call_kwargs["task_id"] == task_id
         assert call_kwargs["assembly_id"] == assembly.id
         assert call_kwargs["number_people_wanted"] == 2
+        # the message is JSON: the settings travel as a plain dict, not a pickled object
+        assert call_kwargs["settings"]["id_column"] == "external_id"
+        assert dumps(call_kwargs, "json")
 
         assert uow.committed
 
@@ -1138,7 +1229,7 @@ class TestStartDbSelectTask:
         assembly.selection_settings = SelectionSettings(assembly_id=assembly.id, check_same_address=False)
         uow.assemblies.add(assembly)
 
-        with patch("opendlp.service_layer.sortition.tasks.run_select_from_db.delay") as mock_celery:
+        with patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay") as mock_celery:
             mock_result = Mock()
             mock_result.id = "celery-task-id"
             mock_celery.return_value = mock_result
@@ -1153,6 +1244,41 @@ class TestStartDbSelectTask:
         call_kwargs = mock_celery.call_args[1]
         assert call_kwargs["test_selection"] is True
 
+    def test_start_db_select_task_with_profile_by_profiling_admin(self, uow, monkeypatch):
+        monkeypatch.setenv("PROFILING_ADMIN_EMAILS", "admin@example.com")
+        admin_user = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        uow.users.add(admin_user)
+
+        assembly = Assembly(title="Test Assembly", number_to_select=2)
+        assembly.csv = AssemblyCSV(assembly_id=assembly.id)
+        assembly.selection_settings = SelectionSettings(assembly_id=assembly.id, check_same_address=False)
+        uow.assemblies.add(assembly)
+
+        with patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay") as mock_celery:
+            mock_celery.return_value = Mock(id="celery-task-id")
+
+            sortition.start_db_select_task(uow, admin_user.id, assembly.id, profile=True)
+
+        assert mock_celery.call_args[1]["profile"] is True
+
+    def test_start_db_select_task_with_profile_needs_profiling_admin(self, uow, monkeypatch):
+        monkeypatch.setenv("PROFILING_ADMIN_EMAILS", "someone-else@example.com")
+        admin_user = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        uow.users.add(admin_user)
+
+        assembly = Assembly(title="Test Assembly", number_to_select=2)
+        assembly.csv = AssemblyCSV(assembly_id=assembly.id)
+        assembly.selection_settings = SelectionSettings(assembly_id=assembly.id, check_same_address=False)
+        uow.assemblies.add(assembly)
+
+        with (
+            patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay") as mock_celery,
+            pytest.raises(InsufficientPermissions),
+        ):
+            sortition.start_db_select_task(uow, admin_user.id, assembly.id, profile=True)
+
+        mock_celery.assert_not_called()
+
     def test_start_db_select_task_snapshots_targets(self, uow):
         admin_user = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
         uow.users.add(admin_user)
@@ -1166,7 +1292,7 @@ class TestStartDbSelectTask:
         gender.add_value(TargetValue(value="Woman", min=1, max=1, percentage_target=50.0))
         uow.target_categories.add(gender)
 
-        with patch("opendlp.service_layer.sortition.tasks.run_select_from_db.delay") as mock_celery:
+        with patch("opendlp.entrypoints.celery.tasks.run_select_from_db.delay") as mock_celery:
             mock_result = Mock()
             mock_result.id = "celery-task-id"
             mock_celery.return_value = mock_result
@@ -1213,3 +1339,57 @@ class TestStartDbSelectTask:
 
         with pytest.raises(AssemblyNotFoundError, match=f"Assembly {non_existent_id} not found"):
             sortition.start_db_select_task(uow, admin_user.id, non_existent_id)
+
+
+class TestStartDbStabilityAnalysisTask:
+    """Test starting database stability analysis tasks."""
+
+    def _assembly(self, uow) -> tuple[User, Assembly]:
+        admin_user = User(email="admin@example.com", global_role=GlobalRole.ADMIN, password_hash="hash")
+        uow.users.add(admin_user)
+        assembly = Assembly(title="Test Assembly", number_to_select=2)
+        assembly.csv = AssemblyCSV(assembly_id=assembly.id)
+        assembly.selection_settings = SelectionSettings(assembly_id=assembly.id, check_same_address=False)
+        uow.assemblies.add(assembly)
+        return admin_user, assembly
+
+    def test_start_stability_analysis_success(self, uow):
+        admin_user, assembly = self._assembly(uow)
+
+        with patch("opendlp.entrypoints.celery.tasks.run_stability_analysis_from_db.delay") as mock_celery:
+            mock_celery.return_value = Mock(id="celery-task-id")
+
+            task_id = sortition.start_db_stability_analysis_task(uow, admin_user.id, assembly.id, num_runs=10)
+
+        record = uow.selection_run_records.get_by_task_id(task_id)
+        assert record is not None
+        assert record.task_type == SelectionTaskType.STABILITY_ANALYSIS_FROM_DB
+        assert record.status == SelectionRunStatus.PENDING
+        assert record.celery_task_id == "celery-task-id"
+        assert "10 test selections" in record.log_messages[0]
+
+        call_kwargs = mock_celery.call_args[1]
+        assert call_kwargs["task_id"] == task_id
+        assert call_kwargs["number_people_wanted"] == 2
+        assert call_kwargs["num_runs"] == 10
+
+    @pytest.mark.parametrize("num_runs", [0, 1, 101])
+    def test_start_stability_analysis_rejects_run_count(self, uow, num_runs):
+        admin_user, assembly = self._assembly(uow)
+
+        with (
+            patch("opendlp.entrypoints.celery.tasks.run_stability_analysis_from_db.delay") as mock_celery,
+            pytest.raises(InvalidSelection, match="number of runs"),
+        ):
+            sortition.start_db_stability_analysis_task(uow, admin_user.id, assembly.id, num_runs=num_runs)
+
+        mock_celery.assert_not_called()
+
+    def test_stability_analysis_counts_as_initial_selection(self, uow):
+        admin_user, assembly = self._assembly(uow)
+
+        with patch("opendlp.entrypoints.celery.tasks.run_stability_analysis_from_db.delay") as mock_celery:
+            mock_celery.return_value = Mock(id="celery-task-id")
+            task_id = sortition.start_db_stability_analysis_task(uow, admin_user.id, assembly.id)
+
+        assert sortition.get_active_initial_selection_run_id(uow, assembly.id) == task_id
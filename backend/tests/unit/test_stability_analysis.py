@@ -0,0 +1,72 @@
+"""ABOUTME: Unit tests for aggregating many test selections into a stability report
+ABOUTME: Checks respondent and category-value frequencies and the rendered report tables"""
+
+from sortition_algorithms.features import FeatureValueMinMax
+from sortition_algorithms.people import People
+
+from opendlp.service_layer.stability_analysis import stability_report, summarise_panels
+
+
+def _features() -> dict:
+    return {"gender": {"male": FeatureValueMinMax(min=1, max=2), "female": FeatureValueMinMax(min=1, max=2)}}
+
+
+def _people(features: dict) -> People:
+    people = People(columns_to_keep=[])
+    for i, gender in enumerate(["male", "male", "female", "female"]):
+        people.add(f"p{i}", {"gender": gender}, features, row_number=i + 2)
+    return people
+
+
+class TestSummarisePanels:
+    def test_counts_respondents_across_panels(self):
+        features = _features()
+        panels = [frozenset({"p0", "p2"}), frozenset({"p0", "p3"}), frozenset({"p1", "p2"})]
+
+        summary = summarise_panels(features, _people(features), panels, runs_requested=3)
+
+        assert summary.runs_succeeded == 3
+        assert summary.respondent_counts == {"p0": 2, "p1": 1, "p2": 2, "p3": 1}
+        assert summary.always_selected == 0
+
+    def test_value_frequencies(self):
+        features = _features()
+        panels = [frozenset({"p0", "p2"}), frozenset({"p0", "p1"})]
+
+        summary = summarise_panels(features, _people(features), panels, runs_requested=2)
+
+        male = next(freq for freq in summary.value_frequencies if freq.value_name == "male")
+        assert (male.lowest_selected, male.highest_selected, male.mean_selected) == (1, 2, 1.5)
+        assert (male.min, male.max) == (1, 2)
+
+    def test_no_successful_panels(self):
+        features = _features()
+
+        summary = summarise_panels(features, _people(features), [], runs_requested=5)
+
+        assert summary.runs_succeeded == 0
+        assert summary.respondent_counts == {}
+        assert all(freq.mean_selected == 0.0 for freq in summary.value_frequencies)
+
+
+class TestStabilityReport:
+    def test_report_has_value_and_respondent_tables(self):
+        features = _features()
+        panels = [frozenset({"p0", "p2"}), frozenset({"p0", "p3"})]
+        summary = summarise_panels(features, _people(features), panels, runs_requested=3)
+
+        html = stability_report(summary).as_html()
+
+        assert "2 of 3 test selections succeeded" in html
+        assert "Selected in every run: 1." in html
+        assert "Times selected" in html
+        assert "100%" in html
+
+    def test_report_without_panels_has_no_tables(self):
+        features = _features()
+        summary = summarise_panels(features, _people(features), [], runs_requested=3)
+
+        html = stability_report(summary).as_html()
+
+        assert "0 of 3 test selections succeeded" in html
+        assert "Times selected" not in html
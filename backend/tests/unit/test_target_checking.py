@@ -1,7 +1,8 @@
 """ABOUTME: Unit tests for the detailed target checking service
-ABOUTME: Tests annotation helpers and the check_targets_detailed service function"""
+ABOUTME: Tests annotation helpers, check_targets_detailed and the background check state"""
 
 import uuid
+from unittest.mock import patch
 
 import pytest
 from sortition_algorithms.errors import (
@@ -22,12 +23,18 @@ from opendlp.domain.users import User
 from opendlp.domain.value_objects import GlobalRole, RespondentStatus
 from opendlp.service_layer.exceptions import AssemblyNotFoundError
 from opendlp.service_layer.target_checking import (
+    DetailedCheckResult,
     TargetAnnotation,
+    TargetCheckState,
+    TargetCheckStatus,
     _annotations_from_cross_feature_issues,
     _annotations_from_infeasible_quotas,
     _annotations_from_parse_errors,
     _annotations_from_people_checks,
     check_targets_detailed,
+    get_targets_check_state,
+    run_targets_check,
+    start_targets_check,
 )
 from tests.fakes import FakeUnitOfWork
 
@@ -429,9 +436,203 @@ class TestCheckTargetsDetailed:
         female_anns = result.annotations["gender"]["female"]
         assert any(ann.level == "error" and ann.field == "min" for ann in female_anns)
 
+    def test_feasibility_ilp_skipped_when_prescreen_fails(self, uow):
+        targets = [
+            TargetCategory(
+                assembly_id=uuid.uuid4(),
+                name="gender",
+                values=[
+                    TargetValue(value="male", min=3, max=7),
+                    TargetValue(value="female", min=5, max=7),
+                ],
+            ),
+        ]
+        respondents = [
+            Respondent(
+                assembly_id=uuid.uuid4(),
+                external_id=f"p{i}",
+                attributes={"gender": "female" if i == 0 else "male"},
+                selection_status=RespondentStatus.POOL,
+            )
+            for i in range(20)
+        ]
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, number_to_select=10, target_categories=targets, respondents=respondents
+        )
+
+        with patch("opendlp.service_layer.target_checking._run_feasibility_check") as feasibility:
+            result = check_targets_detailed(uow, user_id, assembly_id)
+
+        assert result.success is False
+        feasibility.assert_not_called()
+
+    def test_joint_count_shortfall_annotated(self, uow):
+        targets = [
+            TargetCategory(
+                assembly_id=uuid.uuid4(),
+                name="gender",
+                values=[TargetValue(value="male", min=0, max=10), TargetValue(value="female", min=4, max=10)],
+            ),
+            TargetCategory(
+                assembly_id=uuid.uuid4(),
+                name="age",
+                values=[TargetValue(value="young", min=0, max=2), TargetValue(value="old", min=0, max=10)],
+            ),
+        ]
+        # Every woman is young, and at most 2 young people can be selected
+        respondents = [
+            Respondent(
+                assembly_id=uuid.uuid4(),
+                external_id=f"p{i}",
+                attributes={"gender": "female", "age": "young"} if i < 6 else {"gender": "male", "age": "old"},
+                selection_status=RespondentStatus.POOL,
+            )
+            for i in range(16)
+        ]
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, number_to_select=6, target_categories=targets, respondents=respondents
+        )
+
+        result = check_targets_detailed(uow, user_id, assembly_id)
+
+        assert result.success is False
+        female_anns = result.annotations["gender"]["female"]
+        assert any(ann.field == "min" and ann.suggested_value == 2 and "age" in ann.message for ann in female_anns)
+
     def test_assembly_not_found_raises(self, uow):
         admin = User(email="admin@test.com", global_role=GlobalRole.ADMIN, password_hash="hash")
         uow.users.add(admin)
 
         with pytest.raises(AssemblyNotFoundError):
             check_targets_detailed(uow, admin.id, uuid.uuid4())
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store: dict[str, bytes] = {}
+
+    def get(self, key):
+        return self.store.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.store:
+            return False
+        self.store[key] = value.encode("utf-8") if isinstance(value, str) else value
+        return True
+
+
+def _gender_targets() -> list[TargetCategory]:
+    return [
+        TargetCategory(
+            assembly_id=uuid.uuid4(),
+            name="gender",
+            values=[TargetValue(value="male", min=3, max=7), TargetValue(value="female", min=3, max=7)],
+        )
+    ]
+
+
+def _respondents(count: int) -> list[Respondent]:
+    return [
+        Respondent(
+            assembly_id=uuid.uuid4(),
+            external_id=f"p{i}",
+            attributes={"gender": "male" if i % 2 == 0 else "female"},
+            selection_status=RespondentStatus.POOL,
+        )
+        for i in range(count)
+    ]
+
+
+class TestBackgroundTargetCheck:
+    def test_state_round_trips_through_json(self):
+        result = DetailedCheckResult(
+            success=False,
+            global_errors=["oops"],
+            annotations={"gender": {"female": [TargetAnnotation(level="error", message="too few", field="min")]}},
+            category_annotations={"gender": [TargetAnnotation(level="warning", message="hmm")]},
+            num_features=1,
+            num_people=20,
+        )
+        state = TargetCheckState(task_id="t1", inputs_key="k", status=TargetCheckStatus.COMPLETED, result=result)
+
+        assert TargetCheckState.from_json(state.to_json()) == state
+
+    def test_start_records_pending_and_submits_task(self, uow):
+        redis = _FakeRedis()
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, target_categories=_gender_targets(), respondents=_respondents(20)
+        )
+
+        with patch("opendlp.entrypoints.celery.tasks.check_targets.delay") as delay:
+            state = start_targets_check(uow, user_id, assembly_id, redis_client=redis)
+
+        assert state.status == TargetCheckStatus.PENDING
+        delay.assert_called_once_with(
+            task_id=state.task_id, assembly_id=assembly_id, user_id=user_id, inputs_key=state.inputs_key
+        )
+        assert get_targets_check_state(uow, user_id, assembly_id, redis_client=redis) == state
+
+    def test_run_stores_completed_result(self, uow):
+        redis = _FakeRedis()
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, target_categories=_gender_targets(), respondents=_respondents(20)
+        )
+        with patch("opendlp.entrypoints.celery.tasks.check_targets.delay"):
+            started = start_targets_check(uow, user_id, assembly_id, redis_client=redis)
+
+        run_targets_check(
+            uow, user_id, assembly_id, task_id=started.task_id, inputs_key=started.inputs_key, redis_client=redis
+        )
+
+        state = get_targets_check_state(uow, user_id, assembly_id, redis_client=redis)
+        assert state is not None
+        assert state.status == TargetCheckStatus.COMPLETED
+        assert state.result is not None
+        assert state.result.success is True
+        assert state.result.num_people == 20
+
+    def test_run_does_not_overwrite_a_newer_check(self, uow):
+        redis = _FakeRedis()
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, target_categories=_gender_targets(), respondents=_respondents(20)
+        )
+        with patch("opendlp.entrypoints.celery.tasks.check_targets.delay"):
+            older = start_targets_check(uow, user_id, assembly_id, redis_client=redis)
+            newer = start_targets_check(uow, user_id, assembly_id, redis_client=redis)
+
+        run_targets_check(
+            uow, user_id, assembly_id, task_id=older.task_id, inputs_key=older.inputs_key, redis_client=redis
+        )
+
+        state = get_targets_check_state(uow, user_id, assembly_id, redis_client=redis)
+        assert state == newer
+
+    def test_state_is_ignored_once_inputs_change(self, uow):
+        redis = _FakeRedis()
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, target_categories=_gender_targets(), respondents=_respondents(20)
+        )
+        with patch("opendlp.entrypoints.celery.tasks.check_targets.delay"):
+            start_targets_check(uow, user_id, assembly_id, redis_client=redis)
+
+        uow.assemblies.get(assembly_id).number_to_select = 12
+
+        assert get_targets_check_state(uow, user_id, assembly_id, redis_client=redis) is None
+
+    def test_failure_is_recorded(self, uow):
+        redis = _FakeRedis()
+        uow, user_id, assembly_id = _make_uow_with_targets_and_respondents(
+            uow, target_categories=_gender_targets(), respondents=_respondents(20)
+        )
+        with patch("opendlp.entrypoints.celery.tasks.check_targets.delay"):
+            started = start_targets_check(uow, user_id, assembly_id, redis_client=redis)
+
+        with patch(
+            "opendlp.service_layer.target_checking.check_targets_detailed", side_effect=RuntimeError("db went away")
+        ):
+            state = run_targets_check(
+                uow, user_id, assembly_id, task_id=started.task_id, inputs_key=started.inputs_key, redis_client=redis
+            )
+
+        assert state.status == TargetCheckStatus.FAILED
+        assert "db went away" in state.error_message
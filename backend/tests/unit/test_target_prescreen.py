@@ -0,0 +1,101 @@
+"""ABOUTME: Unit tests for the NumPy pre-screen of targets against respondent counts
+ABOUTME: Covers marginal shortfalls, category capacity and pairwise joint-count checks"""
+
+from sortition_algorithms.features import FeatureValueMinMax
+from sortition_algorithms.people import FeatureValueCountCheck, People
+
+from opendlp.service_layer.target_prescreen import CategoryCapacityIssue, JointCountIssue, prescreen_targets
+
+
+def _features(spec: dict[str, dict[str, tuple[int, int]]]) -> dict:
+    return {
+        fname: {value: FeatureValueMinMax(min=lo, max=hi) for value, (lo, hi) in values.items()}
+        for fname, values in spec.items()
+    }
+
+
+def _people(features: dict, rows: list[dict[str, str]]) -> People:
+    people = People(columns_to_keep=[])
+    for i, row in enumerate(rows):
+        people.add(f"p{i}", row, features, row_number=i + 2)
+    return people
+
+
+def _pool(gender_age_counts: dict[tuple[str, str], int]) -> list[dict[str, str]]:
+    rows = []
+    for (gender, age), count in gender_age_counts.items():
+        rows.extend({"gender": gender, "age": age} for _ in range(count))
+    return rows
+
+
+class TestPrescreenTargets:
+    def test_feasible_targets_pass(self):
+        features = _features({
+            "gender": {"male": (3, 7), "female": (3, 7)},
+            "age": {"young": (3, 7), "old": (3, 7)},
+        })
+        people = _people(
+            features,
+            _pool({("male", "young"): 5, ("male", "old"): 5, ("female", "young"): 5, ("female", "old"): 5}),
+        )
+
+        assert prescreen_targets(features, people, number_to_select=10).passed
+
+    def test_value_with_too_few_respondents(self):
+        features = _features({"gender": {"male": (3, 7), "female": (5, 7)}})
+        people = _people(features, _pool({("male", ""): 19, ("female", ""): 1}))
+
+        result = prescreen_targets(features, people, number_to_select=10)
+
+        assert result.value_count_issues == [
+            FeatureValueCountCheck(feature_name="gender", value_name="female", min_required=5, actual_count=1)
+        ]
+
+    def test_category_cannot_fill_the_panel(self):
+        # 2 + 2 people available within the maximums, but 10 to select
+        features = _features({"gender": {"male": (0, 2), "female": (0, 7)}})
+        people = _people(features, _pool({("male", ""): 10, ("female", ""): 2}))
+
+        result = prescreen_targets(features, people, number_to_select=10)
+
+        assert result.capacity_issues == [CategoryCapacityIssue(feature_name="gender", capacity=4, number_to_select=10)]
+
+    def test_min_unreachable_through_another_category(self):
+        # All 6 women are young, and at most 2 young people may be selected
+        features = _features({
+            "gender": {"male": (0, 10), "female": (4, 10)},
+            "age": {"young": (0, 2), "old": (0, 10)},
+        })
+        people = _people(features, _pool({("female", "young"): 6, ("male", "old"): 10}))
+
+        result = prescreen_targets(features, people, number_to_select=6)
+
+        assert (
+            JointCountIssue(feature_name="gender", value_name="female", other_feature_name="age", field="min", bound=2)
+            in result.joint_count_issues
+        )
+
+    def test_max_exceeded_through_another_category(self):
+        # Everyone who is not old is a woman and the women are capped at 2, so at
+        # least 8 - 2 = 6 old people are needed, above old's max of 4.
+        features = _features({
+            "gender": {"male": (0, 10), "female": (0, 2)},
+            "age": {"young": (0, 10), "old": (0, 4)},
+        })
+        people = _people(features, _pool({("female", "young"): 10, ("male", "old"): 10}))
+
+        result = prescreen_targets(features, people, number_to_select=8)
+
+        assert (
+            JointCountIssue(feature_name="age", value_name="old", other_feature_name="gender", field="max", bound=6)
+            in result.joint_count_issues
+        )
+
+    def test_number_to_select_zero_skips_panel_checks(self):
+        features = _features({"gender": {"male": (0, 2), "female": (0, 2)}})
+        people = _people(features, _pool({("male", ""): 10, ("female", ""): 10}))
+
+        assert prescreen_targets(features, people, number_to_select=0).passed
+
+    def test_no_features(self):
+        assert prescreen_targets({}, People(columns_to_keep=[]), number_to_select=10).passed
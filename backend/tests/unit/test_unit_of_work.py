@@ -5,6 +5,7 @@ import uuid
 from unittest.mock import MagicMock
 
 import pytest
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, sessionmaker
 
 from opendlp.adapters.sql_repository import (
@@ -15,7 +16,7 @@ from opendlp.adapters.sql_repository import (
 )
 from opendlp.domain.users import User
 from opendlp.domain.value_objects import GlobalRole
-from opendlp.service_layer.unit_of_work import SqlAlchemyUnitOfWork, UnitOfWorkError
+from opendlp.service_layer.unit_of_work import ReadOnlySqlAlchemyUnitOfWork, SqlAlchemyUnitOfWork, UnitOfWorkError
 from tests.fakes import FakeStore, FakeUnitOfWork
 
 
@@ -285,3 +286,59 @@ class TestFakeUnitOfWorkStrictness:
             raise ValueError("boom")
 
         assert store.users.get(user.id) is None
+
+
+def _mock_session_factory() -> MagicMock:
+    session = MagicMock(spec=Session)
+    session.new = set()
+    session.dirty = set()
+    session.deleted = set()
+    factory = MagicMock(spec=sessionmaker)
+    factory.return_value = session
+    return factory
+
+
+class TestReadOnlySqlAlchemyUnitOfWork:
+    def test_reads_from_primary_without_replica(self):
+        primary = _mock_session_factory()
+
+        with ReadOnlySqlAlchemyUnitOfWork(primary) as uow:
+            assert uow.session is primary.return_value
+            assert uow.using_replica is False
+        assert uow.read_only is True
+
+    def test_reads_from_replica_when_caught_up(self, monkeypatch):
+        monkeypatch.setattr("opendlp.service_layer.unit_of_work.replica_lag_seconds", lambda session: 2.0)
+        primary, replica = _mock_session_factory(), _mock_session_factory()
+
+        with ReadOnlySqlAlchemyUnitOfWork(primary, replica_session_factory=replica, max_lag_seconds=5) as uow:
+            assert uow.session is replica.return_value
+            assert uow.using_replica is True
+        primary.assert_not_called()
+
+    def test_falls_back_to_primary_when_replica_lags(self, monkeypatch):
+        monkeypatch.setattr("opendlp.service_layer.unit_of_work.replica_lag_seconds", lambda session: 2.0)
+        primary, replica = _mock_session_factory(), _mock_session_factory()
+
+        with ReadOnlySqlAlchemyUnitOfWork(primary, replica_session_factory=replica, max_lag_seconds=0) as uow:
+            assert uow.session is primary.return_value
+            assert uow.using_replica is False
+
+    def test_falls_back_to_primary_when_replica_is_down(self, monkeypatch):
+        def unreachable(session):
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+        monkeypatch.setattr("opendlp.service_layer.unit_of_work.replica_lag_seconds", unreachable)
+        primary, replica = _mock_session_factory(), _mock_session_factory()
+
+        with ReadOnlySqlAlchemyUnitOfWork(primary, replica_session_factory=replica) as uow:
+            assert uow.session is primary.return_value
+
+    def test_refuses_to_write(self):
+        primary = _mock_session_factory()
+        primary.return_value.new = {object()}
+
+        with pytest.raises(UnitOfWorkError, match="read-only"), ReadOnlySqlAlchemyUnitOfWork(primary):
+            pass
+        primary.return_value.commit.assert_not_called()
+        primary.return_value.close.assert_called_once()